@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
-application = get_asgi_application()
+django.setup(set_prefix=False)
+
+# ✅ NOVO: Uploads multipart gravados em streaming e corpo acima de
+# MAX_REQUEST_BODY_MB recusado antes da leitura (equivale a get_asgi_application)
+from transcription.asgi_upload import StreamingUploadASGIHandler  # noqa: E402
+
+application = StreamingUploadASGIHandler()
@@ -54,6 +54,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'transcription.middleware.upload_parsing_middleware',  # ✅ NOVO: multipart lido fora do event loop (ASGI)
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -140,16 +141,94 @@ WHISPER_MODEL = os.getenv('WHISPER_MODEL', 'medium')
 WHISPER_LANGUAGE = os.getenv('WHISPER_LANGUAGE', 'pt')  # Português como padrão
 WHISPER_LANGUAGE_NAME = 'pt-BR'  # Português Brasileiro
 MAX_AUDIO_SIZE_MB = int(os.getenv('MAX_AUDIO_SIZE_MB', 500))  # 500 MB padrão
+MAX_REQUEST_BODY_MB = int(os.getenv('MAX_REQUEST_BODY_MB', MAX_AUDIO_SIZE_MB + 1))  # ✅ NOVO: Corpo maior é recusado (413) antes da leitura sob ASGI; aumente para lotes grandes em /transcribe/batch
 TEMP_AUDIO_DIR = os.getenv('TEMP_AUDIO_DIR', '/tmp/daredevil')
 ENABLE_CACHE = os.getenv('ENABLE_CACHE', 'true').lower() == 'true'
+UPLOAD_TOKEN_MAX_AGE_SECONDS = int(os.getenv('UPLOAD_TOKEN_MAX_AGE_SECONDS', 3600))  # ✅ NOVO: Validade do token do /transcribe/precheck
+RESUMABLE_UPLOAD_EXPIRY_SECONDS = int(os.getenv('RESUMABLE_UPLOAD_EXPIRY_SECONDS', 86400))  # ✅ NOVO: Sessão de /uploads sem pedaço novo expira (24h)
+RESUMABLE_UPLOAD_MAX_CHUNK_MB = int(os.getenv('RESUMABLE_UPLOAD_MAX_CHUNK_MB', 64))  # ✅ NOVO: Maior pedaço aceito por PATCH /uploads/{id}
+
+# ✅ NOVO: Engine de inferência (selecionável por deploy e por requisição)
+# 'openai' = openai-whisper (PyTorch) | 'faster-whisper' = CTranslate2 (int8 em CPU)
+WHISPER_ENGINE = os.getenv('WHISPER_ENGINE', 'openai')
+FASTER_WHISPER_COMPUTE_TYPE_CPU = os.getenv('FASTER_WHISPER_COMPUTE_TYPE_CPU', 'int8')  # int8 ou int8_float32
+FASTER_WHISPER_COMPUTE_TYPE_GPU = os.getenv('FASTER_WHISPER_COMPUTE_TYPE_GPU', 'float16')
+FASTER_WHISPER_CPU_THREADS = int(os.getenv('FASTER_WHISPER_CPU_THREADS', 0))  # 0 = todos os núcleos
+FASTER_WHISPER_BEAM_SIZE = int(os.getenv('FASTER_WHISPER_BEAM_SIZE', 5))
+
+# ✅ NOVO: Decodificação em memória (ffmpeg s16le -> NumPy) em vez de WAV temporário
+ENABLE_IN_MEMORY_DECODE = os.getenv('ENABLE_IN_MEMORY_DECODE', 'true').lower() == 'true'
+
+# ✅ NOVO: Pré-filtro VAD - só as regiões de fala vão para o modelo
+ENABLE_VAD = os.getenv('ENABLE_VAD', 'false').lower() == 'true'
+VAD_DETECTOR = os.getenv('VAD_DETECTOR', 'energy')  # 'energy' ou 'silero' (requer faster-whisper)
+VAD_THRESHOLD_DB = float(os.getenv('VAD_THRESHOLD_DB', -40))  # Relativo ao pico (detector energy)
+VAD_MIN_SILENCE_MS = int(os.getenv('VAD_MIN_SILENCE_MS', 1000))  # Silêncios menores ficam no áudio
+VAD_PADDING_MS = int(os.getenv('VAD_PADDING_MS', 200))  # Margem em volta de cada região de fala
+VAD_GAP_MS = int(os.getenv('VAD_GAP_MS', 300))  # Silêncio inserido entre regiões concatenadas
+VAD_MIN_SKIP_SECONDS = float(os.getenv('VAD_MIN_SKIP_SECONDS', 2.0))  # Abaixo disso, transcreve o original
+
+# ✅ NOVO: Early-exit para áudio silencioso (resposta vazia sem carregar o modelo)
+ENABLE_SILENCE_EARLY_EXIT = os.getenv('ENABLE_SILENCE_EARLY_EXIT', 'true').lower() == 'true'
+SILENCE_PEAK_DBFS = float(os.getenv('SILENCE_PEAK_DBFS', -50))  # Pico abaixo disso = silêncio
+SILENCE_FRAME_DBFS = float(os.getenv('SILENCE_FRAME_DBFS', -45))  # Quadro de 30ms considerado ativo
+SILENCE_MIN_ACTIVE_SECONDS = float(os.getenv('SILENCE_MIN_ACTIVE_SECONDS', 0.3))  # Mínimo de áudio ativo
+
+# ✅ NOVO: Áudio longo - trechos cortados em silêncio transcritos em paralelo
+ENABLE_LONG_AUDIO_CHUNKING = os.getenv('ENABLE_LONG_AUDIO_CHUNKING', 'true').lower() == 'true'
+LONG_AUDIO_MIN_DURATION = float(os.getenv('LONG_AUDIO_MIN_DURATION', 600))  # Segundos para ativar o modo
+LONG_AUDIO_CHUNK_SECONDS = float(os.getenv('LONG_AUDIO_CHUNK_SECONDS', 120))  # Tamanho alvo do trecho
+LONG_AUDIO_OVERLAP_SECONDS = float(os.getenv('LONG_AUDIO_OVERLAP_SECONDS', 1.0))  # Contexto extra em cada lado
+LONG_AUDIO_SEARCH_SECONDS = float(os.getenv('LONG_AUDIO_SEARCH_SECONDS', 15))  # Janela de busca por silêncio
+LONG_AUDIO_SILENCE_THRESHOLD_DB = float(os.getenv('LONG_AUDIO_SILENCE_THRESHOLD_DB', -35))  # Relativo ao pico
+LONG_AUDIO_MIN_SILENCE_MS = int(os.getenv('LONG_AUDIO_MIN_SILENCE_MS', 300))
+LONG_AUDIO_WORKERS = int(os.getenv('LONG_AUDIO_WORKERS', 0))  # Processos do pool (0 = min(4, núcleos))
+LONG_AUDIO_CHUNKING_ON_GPU = os.getenv('LONG_AUDIO_CHUNKING_ON_GPU', 'false').lower() == 'true'  # Processos do pool rodam em CPU
+
+# ✅ NOVO: Micro-batching de áudios curtos (<=30s) entre requisições concorrentes (engine openai)
+# Só tem efeito com várias requisições simultâneas no mesmo processo (ex: celery --pool=threads --concurrency>1)
+ENABLE_MICRO_BATCHING = os.getenv('ENABLE_MICRO_BATCHING', 'true').lower() == 'true'
+MICRO_BATCH_MAX_SIZE = int(os.getenv('MICRO_BATCH_MAX_SIZE', 16))  # Máximo de janelas por lote
+MICRO_BATCH_WINDOW_MS = int(os.getenv('MICRO_BATCH_WINDOW_MS', 50))  # Espera por outras requisições
+
+# ✅ NOVO: Streaming de segmentos via SSE (/transcribe/stream)
+STREAM_CHUNK_SECONDS = float(os.getenv('STREAM_CHUNK_SECONDS', 30))  # Trecho por vez (engine openai)
 
 # Cache Configuration
-CACHE_SIZE = int(os.getenv('CACHE_SIZE', 100))  # Número máximo de itens no cache
+CACHE_SIZE = int(os.getenv('CACHE_SIZE', 0))  # Máximo de itens no cache (0 = limitado apenas por bytes)
+CACHE_MEMORY_MAX_MB = int(os.getenv('CACHE_MEMORY_MAX_MB', 256))  # ✅ NOVO: Orçamento do cache em memória (comprimido)
 CACHE_TTL_SECONDS = int(os.getenv('CACHE_TTL_SECONDS', 3600))  # 1 hora padrão
 ENABLE_DISK_CACHE = os.getenv('ENABLE_DISK_CACHE', 'false').lower() == 'true'
+# ✅ NOVO: Tier em disco em um único SQLite (WAL) com varredura de expirados
+CACHE_DISK_TTL_SECONDS = int(os.getenv('CACHE_DISK_TTL_SECONDS', os.getenv('CACHE_TTL_SECONDS', 3600)))
+CACHE_DISK_SWEEP_SECONDS = float(os.getenv('CACHE_DISK_SWEEP_SECONDS', 300))  # Intervalo da varredura
+# ✅ NOVO: Tier compartilhado no Redis (atrás do LRU local de cada processo)
+ENABLE_REDIS_CACHE = os.getenv('ENABLE_REDIS_CACHE', 'true').lower() == 'true'
+CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+CACHE_REDIS_TTL_SECONDS = int(os.getenv('CACHE_REDIS_TTL_SECONDS', 7 * 24 * 3600))  # 7 dias padrão
+CACHE_COMPRESSION_LEVEL = int(os.getenv('CACHE_COMPRESSION_LEVEL', 6))  # zlib 1-9
+# ✅ NOVO: Chave secundária pelo PCM decodificado - mesmo áudio em outro container é hit
+ENABLE_PCM_FINGERPRINT = os.getenv('ENABLE_PCM_FINGERPRINT', 'true').lower() == 'true'
+FINGERPRINT_INDEX_SIZE = int(os.getenv('FINGERPRINT_INDEX_SIZE', 10000))  # Entradas do índice em memória
+# ✅ NOVO: Cache negativo - arquivos corrompidos/sem áudio recusados pelo hash sem novo ffprobe
+ENABLE_NEGATIVE_CACHE = os.getenv('ENABLE_NEGATIVE_CACHE', 'true').lower() == 'true'
+NEGATIVE_CACHE_TTL_SECONDS = int(os.getenv('NEGATIVE_CACHE_TTL_SECONDS', 600))  # TTL curto (10 min)
+# ✅ NOVO: Cache de artefatos (ffprobe + áudio convertido em FLAC) por hash do arquivo
+ENABLE_ARTIFACT_CACHE = os.getenv('ENABLE_ARTIFACT_CACHE', 'true').lower() == 'true'
+ARTIFACT_CACHE_DIR = os.getenv('ARTIFACT_CACHE_DIR', '')  # Padrão: $TEMP_AUDIO_DIR/artifacts
+ARTIFACT_CACHE_MAX_MB = int(os.getenv('ARTIFACT_CACHE_MAX_MB', 2048))  # Cota em disco (LRU)
+# ✅ NOVO: Single-flight - requisições idênticas simultâneas esperam a primeira (lease no Redis)
+ENABLE_SINGLE_FLIGHT = os.getenv('ENABLE_SINGLE_FLIGHT', 'true').lower() == 'true'
+SINGLE_FLIGHT_LEASE_SECONDS = float(os.getenv('SINGLE_FLIGHT_LEASE_SECONDS', 30))  # Renovado enquanto transcreve
+SINGLE_FLIGHT_WAIT_SECONDS = float(os.getenv('SINGLE_FLIGHT_WAIT_SECONDS', 1800))  # Espera máxima por outra requisição
 
 # GPU Configuration
 GPU_MEMORY_THRESHOLD = float(os.getenv('GPU_MEMORY_THRESHOLD', 0.9))  # 90% uso antes de fallback CPU
+# ✅ NOVO: Pool de modelos residentes (LRU por orçamento de memória)
+MODEL_POOL_RAM_BUDGET_MB = int(os.getenv('MODEL_POOL_RAM_BUDGET_MB', 8192))  # Modelos em CPU
+MODEL_POOL_VRAM_BUDGET_MB = int(os.getenv('MODEL_POOL_VRAM_BUDGET_MB', 0))  # 0 = GPU_MEMORY_THRESHOLD da VRAM
+MODEL_POOL_IDLE_UNLOAD_SECONDS = int(os.getenv('MODEL_POOL_IDLE_UNLOAD_SECONDS', 3600))  # Descarregar modelos ociosos
+MODEL_LOAD_WAIT_TIMEOUT = int(os.getenv('MODEL_LOAD_WAIT_TIMEOUT', 600))  # Espera por carga em andamento (0 = sem limite)
 # ✅ NOVO: Distribuição de GPUs entre workers
 NUM_GPUS = int(os.getenv('NUM_GPUS', 2))  # Número de GPUs disponíveis
 CUDA_VISIBLE_DEVICES = os.getenv('CUDA_VISIBLE_DEVICES', '0,1')  # GPUs visíveis
@@ -157,6 +236,14 @@ CUDA_VISIBLE_DEVICES = os.getenv('CUDA_VISIBLE_DEVICES', '0,1')  # GPUs visívei
 # Redis Configuration
 REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
 
+# ✅ NOVO: Estado dos workers de inferência publicado no Redis (lido por /health e /gpu-status)
+WORKER_STATUS_PUBLISH = os.getenv('WORKER_STATUS_PUBLISH', 'true').lower() == 'true'  # false em workers sem inferência
+WORKER_STATUS_INTERVAL_SECONDS = float(os.getenv('WORKER_STATUS_INTERVAL_SECONDS', 10))  # Intervalo de publicação
+WORKER_STATUS_TTL_SECONDS = float(os.getenv('WORKER_STATUS_TTL_SECONDS', 30))  # Worker sem publicar some após isso
+# ✅ NOVO: /transcribe executado no worker GPU (o processo web não importa torch/whisper)
+INFERENCE_IN_WORKERS = os.getenv('INFERENCE_IN_WORKERS', 'false').lower() == 'true'
+INFERENCE_WORKER_TIMEOUT_SECONDS = int(os.getenv('INFERENCE_WORKER_TIMEOUT_SECONDS', 1800))  # Espera pelo resultado
+
 # ========== REMOTE AUDIO CONVERTER CONFIGURATION ==========
 # ✨ NOVO: Integração com serviço remoto de conversão de áudio
 # Máquina remota com mais poder de processamento para conversão de áudio/vídeo
@@ -212,13 +299,20 @@ TEMP_DIR_MAX_SIZE_MB = int(os.getenv('TEMP_DIR_MAX_SIZE_MB', 5000))  # Máximo 5
 # ✅ NOVO: Maximum concurrent transcriptions
 MAX_CONCURRENT_TRANSCRIPTIONS = int(os.getenv('MAX_CONCURRENT_TRANSCRIPTIONS', 4))
 
+# ✅ NOVO: Views assíncronas (ASGI) - trabalho bloqueante vai para pools limitados
+ASYNC_INFERENCE_WORKERS = int(os.getenv('ASYNC_INFERENCE_WORKERS', MAX_CONCURRENT_TRANSCRIPTIONS))  # Requisições no pipeline do processo web (inferência serializada por modelo)
+ASYNC_IO_WORKERS = int(os.getenv('ASYNC_IO_WORKERS', 16))  # Redis, Celery, cache e disco
+ASYNC_UPLOAD_WORKERS = int(os.getenv('ASYNC_UPLOAD_WORKERS', 32))  # Uploads multipart gravados em streaming (uma thread por envio em andamento)
+
 # Create temp directory if it doesn't exist
 Path(TEMP_AUDIO_DIR).mkdir(parents=True, exist_ok=True)
 
-# Django Upload Limits - Configurar para permitir uploads grandes
-# 500 MB em bytes (500 * 1024 * 1024)
-FILE_UPLOAD_MAX_MEMORY_SIZE = 500 * 1024 * 1024  # 500 MB
-DATA_UPLOAD_MAX_MEMORY_SIZE = 500 * 1024 * 1024  # 500 MB
+# Django Upload Limits
+# ✅ NOVO: Arquivos vão direto para TEMP_AUDIO_DIR em streaming (hash e limite
+# MAX_AUDIO_SIZE_MB aplicados durante o envio) - nada fica inteiro na RAM
+FILE_UPLOAD_HANDLERS = ['transcription.upload_handler.StreamingUploadHandler']
+FILE_UPLOAD_MAX_MEMORY_SIZE = 2621440  # 2.5 MB (padrão do Django; sem uso com o handler acima)
+DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10 MB - só campos de formulário, não arquivos
 FILE_UPLOAD_PERMISSIONS = 0o644
 
 # Supported audio formats
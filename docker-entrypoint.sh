@@ -65,8 +65,8 @@ fi
 if [ "$DEBUG" = "1" ]; then
   echo "Starting Django development server on 0.0.0.0:8000..."
   exec uv run python manage.py runserver 0.0.0.0:8000
-else
-  echo "Starting Gunicorn server on 0.0.0.0:8000..."
+elif [ "${WEB_INTERFACE:-asgi}" = "wsgi" ]; then
+  echo "Starting Gunicorn server (WSGI) on 0.0.0.0:8000..."
   # Instalar gunicorn se não estiver
   uv pip install gunicorn 2>&1 || uv add gunicorn
   
@@ -82,4 +82,20 @@ else
     --error-logfile - \
     --log-level info \
     config.wsgi
+else
+  echo "Starting Gunicorn server (ASGI/uvicorn) on 0.0.0.0:8000..."
+  # Views async: transcrições longas não bloqueiam health/status
+  uv pip install gunicorn uvicorn 2>&1 || uv add gunicorn uvicorn
+  
+  exec uv run gunicorn \
+    --bind 0.0.0.0:8000 \
+    --workers 4 \
+    --worker-class uvicorn.workers.UvicornWorker \
+    --max-requests 1000 \
+    --max-requests-jitter 100 \
+    --timeout 300 \
+    --access-logfile - \
+    --error-logfile - \
+    --log-level info \
+    config.asgi
 fi
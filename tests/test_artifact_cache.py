@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""
+Testes do cache de artefatos (ffprobe e áudio convertido)
+
+Uso:
+    python tests/test_artifact_cache.py
+"""
+import os
+import sys
+import shutil
+import tempfile
+import django
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from pathlib import Path
+
+import numpy as np
+
+from transcription.artifact_cache import ArtifactCache
+
+
+def make_cache(max_bytes: int = 10 * 1024 * 1024) -> ArtifactCache:
+    return ArtifactCache(Path(tempfile.mkdtemp()), max_bytes=max_bytes)
+
+
+def probe(seed: int) -> dict:
+    """Metadata de ffprobe sintética, pouco compressível (~2KB)"""
+    rng = np.random.default_rng(seed)
+    return {"format": {"duration": "12.5"}, "noise": rng.bytes(1500).hex()}
+
+
+def test_probe_roundtrip():
+    """Probe salvo é devolvido para o mesmo hash e só para ele"""
+    cache = make_cache()
+    cache.put_probe("a" * 32, "ffprobe", probe(1))
+
+    assert cache.get_probe("a" * 32, "ffprobe") == probe(1)
+    assert cache.get_probe("a" * 32, "video_info") is None
+    assert cache.get_probe("b" * 32, "ffprobe") is None
+    print("✓ Probe reaproveitado pelo hash do arquivo")
+
+
+def test_quota_lru():
+    """Acima da cota, sai o artefato acessado há mais tempo"""
+    cache = make_cache(max_bytes=12_000)
+    for i in range(4):
+        cache.put_probe(f"{i:032d}", "ffprobe", probe(i))
+    cache.get_probe(f"{0:032d}", "ffprobe")  # Acesso recente protege a entrada
+    for i in range(4, 8):
+        cache.put_probe(f"{i:032d}", "ffprobe", probe(i))
+
+    stats = cache.get_stats()
+    assert stats["bytes"] <= 12_000
+    assert stats["evictions"] > 0
+    assert cache.get_probe(f"{0:032d}", "ffprobe") is not None
+    assert cache.get_probe(f"{1:032d}", "ffprobe") is None
+    print(f"✓ Cota respeitada ({stats['bytes']} bytes, {stats['evictions']} despejos)")
+
+
+def test_audio_flac():
+    """Áudio convertido volta idêntico (FLAC é sem perdas)"""
+    if shutil.which("ffmpeg") is None:
+        print("⚠ ffmpeg não encontrado - teste de áudio ignorado")
+        return
+
+    cache = make_cache()
+    samples = (np.random.default_rng(0).standard_normal(16000 * 3) * 0.1).astype(np.float32)
+    samples = np.rint(samples * 32768) / 32768  # Já quantizado em 16 bits, como o WAV convertido
+
+    assert cache.put_audio("c" * 32, samples)
+    restored = cache.get_audio("c" * 32)
+    assert restored is not None and np.array_equal(restored, samples.astype(np.float32))
+    assert cache.get_stats()["bytes"] < samples.size * 2, "FLAC deveria ser menor que o PCM"
+
+    cache.clear()
+    assert cache.get_audio("c" * 32) is None
+    assert cache.get_stats()["entries"] == 0
+    print("✓ Áudio convertido armazenado em FLAC e restaurado sem perdas")
+
+
+def main():
+    """Run all tests"""
+    try:
+        test_probe_roundtrip()
+        test_quota_lru()
+        test_audio_flac()
+        print("\n✅ TODOS OS TESTES DO CACHE DE ARTEFATOS PASSARAM")
+        return 0
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
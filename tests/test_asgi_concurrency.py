@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+"""
+Testes das views assíncronas sob ASGI (transcrições longas não travam o event loop)
+
+Uso:
+    python tests/test_asgi_concurrency.py
+
+A transcrição é simulada (sleep) - o teste mede o escalonamento, não o Whisper.
+"""
+import os
+import sys
+import time
+import asyncio
+import threading
+import django
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import AsyncClient
+
+from transcription import services
+from transcription.async_executors import get_executor_stats, run_inference
+from transcription.cache_manager import get_cache_manager
+from transcription.schemas import TranscriptionResponse, TranscriptionResult
+from transcription.services import TranscriptionService, WhisperTranscriber
+
+TRANSCRIPTION_SECONDS = 1.0
+settings.ALLOWED_HOSTS.append("testserver")
+
+
+class SlowTranscriber:
+    """Substitui process_audio_file/stream_audio_file medindo a concorrência"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+        self.originals = (TranscriptionService.process_audio_file, TranscriptionService.stream_audio_file)
+
+    def _enter(self):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+
+    def _exit(self):
+        with self.lock:
+            self.running -= 1
+
+    def process(self, file_path, **kwargs):
+        self._enter()
+        try:
+            with open(file_path, "rb") as f:
+                content = f.read()
+            time.sleep(TRANSCRIPTION_SECONDS)
+            # Outra requisição não pode ter sobrescrito nem removido o arquivo
+            with open(file_path, "rb") as f:
+                assert f.read() == content, "Arquivo temporário trocado durante a transcrição"
+        finally:
+            self._exit()
+        return TranscriptionResponse(
+            success=True,
+            transcription=TranscriptionResult(text=content.decode(), segments=[], language="pt", duration=1.0),
+            processing_time=TRANSCRIPTION_SECONDS
+        )
+
+    def stream(self, **kwargs):
+        for index in range(3):
+            time.sleep(TRANSCRIPTION_SECONDS / 2)
+            yield "segment", {"start": index, "end": index + 1, "text": f"parte {index}"}
+        yield "summary", {"text": "parte 0 parte 1 parte 2"}
+
+    def __enter__(self):
+        TranscriptionService.process_audio_file = staticmethod(self.process)
+        TranscriptionService.stream_audio_file = staticmethod(self.stream)
+        return self
+
+    def __exit__(self, *exc):
+        TranscriptionService.process_audio_file, TranscriptionService.stream_audio_file = self.originals
+
+
+def upload(index: int) -> SimpleUploadedFile:
+    return SimpleUploadedFile(f"audio_{index}.wav", f"RIFF conteudo {index} {time.time()}".encode(),
+                              content_type="audio/wav")
+
+
+async def timed_get(client: AsyncClient, path: str) -> float:
+    start = time.perf_counter()
+    response = await client.get(path)
+    assert response.status_code == 200, path
+    return time.perf_counter() - start
+
+
+async def check_responsive_while_transcribing():
+    """Health, cache-stats e status respondem com o pool de inferência lotado"""
+    client = AsyncClient()
+    workers = settings.ASYNC_INFERENCE_WORKERS
+    count = workers * 3
+
+    with SlowTranscriber() as transcriber:
+        start = time.perf_counter()
+        requests = [
+            asyncio.create_task(client.post("/api/transcribe", {"file": upload(i)}))
+            for i in range(count)
+        ]
+        await asyncio.sleep(0.2)
+
+        latencies = [
+            await timed_get(client, "/api/health"),
+            await timed_get(client, "/api/cache-stats"),
+            await timed_get(client, "/api/transcribe/async/status/cached-inexistente"),
+        ]
+        assert not all(r.done() for r in requests), "Transcrições terminaram cedo demais"
+
+        responses = await asyncio.gather(*requests)
+        elapsed = time.perf_counter() - start
+
+    assert all(r.json()["success"] for r in responses)
+    for index, response in enumerate(responses):
+        assert f"conteudo {index} " in response.json()["transcription"]["text"], "Upload de outra requisição"
+    assert transcriber.max_running <= workers, "Pool de inferência passou do limite"
+    assert elapsed >= (count / workers) * TRANSCRIPTION_SECONDS * 0.9
+    assert max(latencies) < 0.5, f"Latência durante transcrições: {max(latencies):.2f}s"
+    print(f"✓ {count} transcrições ({transcriber.max_running} por vez), "
+          f"health/cache-stats/status em até {max(latencies) * 1000:.0f}ms")
+
+
+class FakeModel:
+    """Instância de modelo compartilhada pelas threads"""
+
+
+class FakeEngine:
+    """Engine que detecta inferências simultâneas no mesmo modelo"""
+
+    name = "fake"
+
+    def __init__(self):
+        self.running = 0
+        self.overlaps = 0
+
+    def model_device(self, model):
+        return "cpu"
+
+    def transcribe(self, model, audio, language):
+        self.running += 1
+        if self.running > 1:
+            self.overlaps += 1
+        time.sleep(0.05)
+        self.running -= 1
+        return {"text": "ok", "segments": [], "language": language, "duration": 1.0}
+
+
+async def check_inference_pool_shares_model_safely():
+    """Threads do pool de inferência nunca usam o mesmo modelo ao mesmo tempo"""
+    engine, model = FakeEngine(), FakeModel()
+    originals = (services.get_engine, WhisperTranscriber.load_model)
+    services.get_engine = lambda name=None: engine
+    WhisperTranscriber.load_model = classmethod(lambda cls, *args, **kwargs: model)
+    try:
+        count = settings.ASYNC_INFERENCE_WORKERS * 2
+        await asyncio.gather(*[
+            run_inference(WhisperTranscriber.transcribe, f"audio_{i}.wav", "pt")
+            for i in range(count)
+        ])
+    finally:
+        services.get_engine, WhisperTranscriber.load_model = originals
+
+    assert engine.overlaps == 0, f"{engine.overlaps} inferências simultâneas no modelo compartilhado"
+    print(f"✓ {count} transcrições no pool de inferência, uma por vez no modelo")
+
+
+async def check_sse_streamed():
+    """Sob ASGI os eventos SSE chegam conforme são produzidos"""
+    client = AsyncClient()
+    with SlowTranscriber():
+        start = time.perf_counter()
+        response = await client.post("/api/transcribe/stream", {"file": upload(999)})
+        arrivals = []
+        async for chunk in response.streaming_content:
+            arrivals.append(time.perf_counter() - start)
+
+    assert len(arrivals) == 4
+    assert arrivals[0] < arrivals[-1] - TRANSCRIPTION_SECONDS * 0.5, "Eventos chegaram todos no fim"
+    print(f"✓ SSE em streaming (1º evento em {arrivals[0]:.2f}s, último em {arrivals[-1]:.2f}s)")
+
+
+class FakeGpuTask:
+    """Resultado imediato de transcribe_audio_sync (worker GPU simulado)"""
+
+    id = "fake-gpu-task"
+
+    def __init__(self, text):
+        self.text = text
+
+    def ready(self):
+        return True
+
+    def get(self, timeout=None):
+        return TranscriptionResponse(
+            success=True,
+            transcription=TranscriptionResult(text=self.text, segments=[], language="pt", duration=1.0),
+            processing_time=0.1
+        ).model_dump()
+
+
+async def check_worker_only_inference():
+    """Com INFERENCE_IN_WORKERS o lote vai para a fila 'gpu' e o stream não transcreve no web"""
+    from transcription import tasks
+
+    enqueued = []
+
+    def apply_async(kwargs=None, queue=None, **options):
+        with open(kwargs["file_path"], "rb") as f:
+            content = f.read().decode()
+        enqueued.append(queue)
+        return FakeGpuTask(content)
+
+    def web_inference(*args, **kwargs):
+        raise AssertionError("Inferência executada no processo web")
+
+    originals = (
+        settings.INFERENCE_IN_WORKERS,
+        tasks.transcribe_audio_sync.apply_async,
+        TranscriptionService.process_audio_file,
+        TranscriptionService.stream_audio_file,
+    )
+    settings.INFERENCE_IN_WORKERS = True
+    tasks.transcribe_audio_sync.apply_async = apply_async
+    TranscriptionService.process_audio_file = staticmethod(web_inference)
+    TranscriptionService.stream_audio_file = staticmethod(web_inference)
+    try:
+        client = AsyncClient()
+        batch = await client.post("/api/transcribe/batch", {"files": [upload(1), upload(2)]})
+        stream = await client.post("/api/transcribe/stream", {"file": upload(3)})
+        events = b"".join([chunk async for chunk in stream.streaming_content]).decode()
+    finally:
+        (settings.INFERENCE_IN_WORKERS, tasks.transcribe_audio_sync.apply_async,
+         TranscriptionService.process_audio_file, TranscriptionService.stream_audio_file) = originals
+
+    body = batch.json()
+    assert body["successful"] == 2 and body["failed"] == 0, body
+    assert "conteudo 1 " in body["results"][0]["transcription"]["text"]
+    assert "conteudo 2 " in body["results"][1]["transcription"]["text"]
+    assert enqueued == ["gpu", "gpu"], f"Tarefas enviadas: {enqueued}"
+    assert events.startswith("event: error") and "INFERENCE_IN_WORKERS" in events, events
+    print("✓ Lote transcrito pelos workers GPU; stream recusado sem carregar o modelo no web")
+
+
+def main():
+    """Run all tests"""
+    try:
+        get_cache_manager().clear()
+        asyncio.run(check_responsive_while_transcribing())
+        asyncio.run(check_inference_pool_shares_model_safely())
+        asyncio.run(check_sse_streamed())
+        asyncio.run(check_worker_only_inference())
+        print(f"  Pools: {get_executor_stats()}")
+        print("\n✅ TODOS OS TESTES DAS VIEWS ASSÍNCRONAS PASSARAM")
+        return 0
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+"""
+Testes do handler ASGI de config/asgi.py (upload em streaming e limite antes da leitura)
+
+A aplicação ASGI é chamada direto com mensagens http.request (o AsyncClient
+do Django usa o próprio handler e não passa por config/asgi.py). A
+transcrição é simulada.
+
+Uso:
+    python tests/test_asgi_upload.py
+"""
+import os
+import sys
+import asyncio
+import django
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from django.conf import settings
+from django.core.handlers import asgi as django_asgi
+
+from config.asgi import application
+from transcription.cache_manager import get_cache_manager
+from transcription.schemas import TranscriptionResponse, TranscriptionResult
+from transcription.services import TranscriptionService
+
+BOUNDARY = "daredevilboundary"
+CHUNK = 64 * 1024
+settings.ALLOWED_HOSTS.append("testserver")
+
+
+def multipart_body(file_size: int) -> bytes:
+    content = os.urandom(file_size)
+    return (
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="audio.wav"\r\n'
+        f"Content-Type: audio/wav\r\n\r\n"
+    ).encode() + content + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def temp_files() -> set:
+    return {
+        name for name in os.listdir(settings.TEMP_AUDIO_DIR)
+        if os.path.isfile(os.path.join(settings.TEMP_AUDIO_DIR, name))
+    }
+
+
+async def asgi_post(path: str, body: bytes, content_length=None, disconnect_after=None) -> dict:
+    """
+    POST pela aplicação ASGI em pedaços de CHUNK bytes
+
+    Returns:
+        {"status", "body", "body_messages"} - body_messages = pedaços lidos pela aplicação
+    """
+    chunks = [body[i:i + CHUNK] for i in range(0, len(body), CHUNK)]
+    headers = [
+        (b"host", b"testserver"),
+        (b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode()),
+        (b"content-length", str(len(body) if content_length is None else content_length).encode()),
+    ]
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "headers": headers,
+        "client": ("127.0.0.1", 40000), "server": ("testserver", 80),
+    }
+    result = {"status": None, "body": b"", "body_messages": 0}
+
+    async def receive():
+        if disconnect_after is not None and result["body_messages"] >= disconnect_after:
+            return {"type": "http.disconnect"}
+        if result["body_messages"] < len(chunks):
+            result["body_messages"] += 1
+            return {
+                "type": "http.request",
+                "body": chunks[result["body_messages"] - 1],
+                "more_body": result["body_messages"] < len(chunks),
+            }
+        await asyncio.Event().wait()  # Cliente conectado até a resposta
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            result["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            result["body"] += message.get("body", b"")
+
+    await application(scope, receive, send)
+    return result
+
+
+class SpoolRecorder:
+    """Conta bytes gravados no SpooledTemporaryFile do ASGIHandler padrão"""
+
+    def __init__(self):
+        self.written = 0
+        self.original = django_asgi.tempfile.SpooledTemporaryFile
+
+    def __enter__(self):
+        recorder = self
+
+        class RecordingSpool(self.original):
+            def write(self, data):
+                recorder.written += len(data)
+                return super().write(data)
+
+        django_asgi.tempfile.SpooledTemporaryFile = RecordingSpool
+        return self
+
+    def __exit__(self, *exc):
+        django_asgi.tempfile.SpooledTemporaryFile = self.original
+
+
+def test_rejects_oversized_before_reading():
+    """Content-Length acima de MAX_REQUEST_BODY_MB: 413 sem ler o corpo"""
+    original = settings.MAX_REQUEST_BODY_MB
+    settings.MAX_REQUEST_BODY_MB = 1
+    before = temp_files()
+    try:
+        body = multipart_body(2 * 1024 * 1024)
+        result = asyncio.run(asgi_post("/api/transcribe", body))
+    finally:
+        settings.MAX_REQUEST_BODY_MB = original
+
+    assert result["status"] == 413, result
+    assert b"muito grande" in result["body"]
+    assert result["body_messages"] == 0, "Corpo lido antes de recusar"
+    assert temp_files() == before, "Arquivo gravado para requisição recusada"
+    print("✓ Corpo acima do limite recusado (413) antes da leitura")
+
+
+def test_upload_written_once():
+    """Multipart vai direto para TEMP_AUDIO_DIR: um arquivo, nada no spool do Django"""
+    file_size = 5 * 1024 * 1024  # Acima de FILE_UPLOAD_MAX_MEMORY_SIZE (spool iria para o disco)
+    body = multipart_body(file_size)
+    before = temp_files()
+    seen = {}
+
+    def process(file_path, **kwargs):
+        seen["new_files"] = temp_files() - before
+        seen["size"] = os.path.getsize(file_path)
+        return TranscriptionResponse(
+            success=True,
+            transcription=TranscriptionResult(text="ok", segments=[], language="pt", duration=1.0),
+            processing_time=0.1
+        )
+
+    original = TranscriptionService.process_audio_file
+    TranscriptionService.process_audio_file = staticmethod(process)
+    try:
+        with SpoolRecorder() as spool:
+            result = asyncio.run(asgi_post("/api/transcribe", body))
+    finally:
+        TranscriptionService.process_audio_file = original
+
+    assert result["status"] == 200 and b'"success": true' in result["body"], result
+    assert spool.written == 0, f"{spool.written} bytes copiados para o spool do ASGIHandler"
+    assert len(seen["new_files"]) == 1, f"Arquivos gravados: {seen['new_files']}"
+    assert seen["size"] == file_size
+    assert temp_files() == before, "Arquivo temporário não removido"
+    print(f"✓ Upload de {file_size // (1024 * 1024)}MB gravado uma vez, sem spool do corpo")
+
+
+def test_disconnect_removes_partial_upload():
+    """Cliente desconecta no meio do envio: nenhuma resposta e nenhum arquivo parcial"""
+    body = multipart_body(1024 * 1024)
+    before = temp_files()
+    result = asyncio.run(asgi_post("/api/transcribe", body, disconnect_after=4))
+
+    assert result["status"] is None, result
+    assert temp_files() == before, f"Arquivos parciais: {temp_files() - before}"
+    print("✓ Upload interrompido não deixa arquivo parcial")
+
+
+def main():
+    """Run all tests"""
+    try:
+        get_cache_manager().clear()
+        test_rejects_oversized_before_reading()
+        test_upload_written_once()
+        test_disconnect_removes_partial_upload()
+        print("\n✅ TODOS OS TESTES DO UPLOAD ASGI PASSARAM")
+        return 0
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+"""
+Testes do /transcribe/async com cache (hit sem fila) e deduplicação de tarefas
+
+Uso:
+    python tests/test_async_cache.py
+
+A deduplicação de tarefas na fila usa o Redis (REDIS_URL); sem Redis esse
+teste é pulado.
+"""
+import os
+import sys
+import glob
+import django
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client
+
+from transcription import tasks
+from transcription.cache_manager import get_cache_manager, new_content_hasher
+from transcription.schemas import TranscriptionResponse, TranscriptionResult
+from transcription.services import TranscriptionService
+from transcription.single_flight import get_single_flight
+
+client = Client(HTTP_HOST="localhost")
+
+
+class FakeApplyAsync:
+    """Registra os enfileiramentos em vez de enviar ao broker"""
+
+    def __init__(self):
+        self.calls = []
+        self.original = tasks.transcribe_audio_async.apply_async
+
+    def __call__(self, kwargs=None, task_id=None, **options):
+        self.calls.append((task_id, kwargs))
+        return tasks.transcribe_audio_async.AsyncResult(task_id)
+
+    def __enter__(self):
+        tasks.transcribe_audio_async.apply_async = self
+        return self
+
+    def __exit__(self, *exc):
+        tasks.transcribe_audio_async.apply_async = self.original
+
+
+def upload(content: bytes) -> dict:
+    file = SimpleUploadedFile("audio.wav", content, content_type="audio/wav")
+    return client.post("/api/transcribe/async", {"file": file}).json()
+
+
+def seed_cache(content: bytes) -> None:
+    hasher = new_content_hasher()
+    hasher.update(content)
+    cache_key = TranscriptionService.generate_cache_key("", content_hash=hasher.hexdigest())
+    TranscriptionService._save_to_cache(cache_key, TranscriptionResponse(
+        success=True,
+        transcription=TranscriptionResult(text="Já transcrito.", segments=[], language="pt", duration=2.0),
+        processing_time=20.0
+    ))
+
+
+def test_hit_answered_without_queue():
+    """Hit volta concluído na mesma resposta, sem enfileirar nem manter o upload"""
+    content = b"RIFF conteudo ja transcrito"
+    seed_cache(content)
+    before = set(glob.glob(os.path.join(settings.TEMP_AUDIO_DIR, "upload_async_*")))
+
+    with FakeApplyAsync() as queue:
+        data = upload(content)
+    assert not queue.calls, "Hit não deveria enfileirar"
+    assert data["state"] == "SUCCESS" and data["cached"] is True
+    assert data["result"]["transcription"]["text"] == "Já transcrito."
+    assert set(glob.glob(os.path.join(settings.TEMP_AUDIO_DIR, "upload_async_*"))) == before
+
+    status = client.get(data["status_url"]).json()
+    assert status["state"] == "SUCCESS"
+    assert status["result"]["transcription"]["text"] == "Já transcrito."
+    print(f"✓ Hit concluído sem fila (pseudo-tarefa {data['task_id'][:24]}...)")
+
+
+def test_miss_enqueued():
+    """Miss continua enfileirando normalmente"""
+    with FakeApplyAsync() as queue:
+        data = upload(b"RIFF conteudo novo")
+    assert len(queue.calls) == 1 and data["task_id"] == queue.calls[0][0]
+    assert "result" not in data
+    os.remove(queue.calls[0][1]["file_path"])
+    print("✓ Miss enfileirado")
+
+
+def test_inflight_deduplicated():
+    """Submissões idênticas acompanham a tarefa já na fila"""
+    flight = get_single_flight()
+    if flight is None or flight._client() is None:
+        print("- Deduplicação de tarefas pulada (Redis indisponível)")
+        return
+    try:
+        flight._client().ping()
+    except Exception:
+        print("- Deduplicação de tarefas pulada (Redis indisponível)")
+        return
+
+    with FakeApplyAsync() as queue:
+        first = upload(b"RIFF conteudo em andamento")
+        second = upload(b"RIFF conteudo em andamento")
+    assert len(queue.calls) == 1
+    assert second["task_id"] == first["task_id"] and second["deduplicated"] is True
+
+    kwargs = queue.calls[0][1]
+    flight.release_task(kwargs["inflight_key"], first["task_id"])
+    os.remove(kwargs["file_path"])
+    print("✓ Submissão idêntica acompanha a tarefa existente")
+
+
+def main():
+    """Run all tests"""
+    try:
+        get_cache_manager().clear()
+        test_hit_answered_without_queue()
+        test_miss_enqueued()
+        test_inflight_deduplicated()
+        print("\n✅ TODOS OS TESTES DO ASYNC COM CACHE PASSARAM")
+        return 0
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
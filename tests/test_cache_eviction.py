@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+"""
+Testes do despejo por orçamento de bytes (cache em memória comprimido)
+
+Uso:
+    python tests/test_cache_eviction.py
+"""
+import os
+import sys
+import django
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+import random
+
+from transcription.cache_manager import LRUCache, pack_entry
+
+
+def make_entry(words: int, seed: int) -> dict:
+    """Transcrição sintética (texto pouco repetitivo, como uma real)"""
+    rng = random.Random(seed)
+    vocab = ["audio", "reunião", "cliente", "projeto", "prazo", "entrega",
+             "valor", "contrato", "semana", "equipe", "revisão", "sistema"]
+    text = " ".join(rng.choice(vocab) for _ in range(words))
+    return {"text": text, "segments": [{"start": 0.0, "end": 1.0, "text": text}]}
+
+
+def test_byte_budget():
+    """O total comprimido nunca passa do orçamento"""
+    budget = 20_000
+    cache = LRUCache(max_bytes=budget)
+    for i in range(200):
+        cache.set(f"k{i}", make_entry(200, i), cost=1.0)
+        assert cache.get_stats()["bytes_used"] <= budget
+
+    stats = cache.get_stats()
+    assert stats["evictions"] > 0
+    assert stats["compression_ratio"] > 1, "Entradas deveriam estar comprimidas"
+    assert cache.get("k199") == make_entry(200, 199)
+    print(f"✓ {stats['size']} entradas em {stats['bytes_used']} bytes "
+          f"(ratio {stats['compression_ratio']}, {stats['evictions']} despejos)")
+
+
+def test_cost_aware():
+    """Entradas caras sobrevivem a entradas baratas do mesmo tamanho"""
+    entry_size = len(pack_entry(make_entry(200, 0)))
+    cache = LRUCache(max_bytes=entry_size * 10)
+
+    cache.set("caro", make_entry(200, 0), cost=120.0)
+    for i in range(1, 50):
+        cache.set(f"barato{i}", make_entry(200, i), cost=0.5)
+
+    assert cache.get("caro") is not None, "Entrada cara foi despejada"
+    assert cache.get("barato1") is None, "Entrada barata antiga deveria sair"
+    print("✓ Transcrição cara mantida, baratas despejadas")
+
+
+def test_recency():
+    """Com custos iguais, o acesso recente protege a entrada (LRU)"""
+    entry_size = len(pack_entry(make_entry(200, 0)))
+    cache = LRUCache(max_bytes=int(entry_size * 3.5))
+
+    # Mesmo conteúdo: mesmo tamanho e mesma prioridade inicial
+    for i in range(3):
+        cache.set(f"k{i}", make_entry(200, 0), cost=1.0)
+    cache.get("k0")
+    cache.set("k3", make_entry(200, 0), cost=1.0)
+
+    assert cache.get("k0") is not None
+    assert cache.get("k1") is None
+    print("✓ Entrada acessada recentemente mantida")
+
+
+def test_replace_and_oversize():
+    """Substituição não duplica bytes; entrada maior que o orçamento é ignorada"""
+    cache = LRUCache(max_bytes=5_000)
+    cache.set("a", make_entry(50, 1))
+    cache.set("a", make_entry(50, 2))
+    assert cache.get_stats()["bytes_used"] == len(pack_entry(make_entry(50, 2)))
+
+    cache.set("grande", make_entry(20_000, 3))
+    assert cache.get("grande") is None
+    assert cache.get("a") == make_entry(50, 2)
+
+    cache.clear()
+    stats = cache.get_stats()
+    assert stats["size"] == 0 and stats["bytes_used"] == 0
+    print("✓ Contadores de bytes consistentes")
+
+
+def main():
+    """Run all tests"""
+    try:
+        test_byte_budget()
+        test_cost_aware()
+        test_recency()
+        test_replace_and_oversize()
+        print("\n✅ TODOS OS TESTES DE DESPEJO POR BYTES PASSARAM")
+        return 0
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
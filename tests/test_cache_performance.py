@@ -11,7 +11,7 @@ import django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 django.setup()
 
-from transcription.cache_manager import get_cache_manager
+from transcription.cache_manager import get_cache_manager, new_content_hasher
 from transcription.services import WhisperTranscriber
 
 
@@ -137,6 +137,15 @@ def test_cache_key_generation():
         assert key1 != key3, "Parâmetros diferentes deveriam gerar chaves diferentes"
         print("✓ Chaves diferentes para parâmetros diferentes")
         
+        print("\n4. Testando hash calculado durante o upload...")
+        hasher = new_content_hasher()
+        for chunk in (b"test audio ", b"content"):
+            hasher.update(chunk)
+        key4 = cache_manager.generate_cache_key(
+            temp_file, model="medium", language="pt", content_hash=hasher.hexdigest())
+        assert key4 == key1, "Hash incremental deveria gerar a mesma chave que ler o arquivo"
+        print("✓ Hash incremental equivalente ao hash do arquivo")
+        
     finally:
         os.unlink(temp_file)
     
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+"""
+Testes dos hits do cache servidos como bytes (sem reconstruir pydantic)
+
+Uso:
+    python tests/test_cached_response.py
+"""
+import os
+import sys
+import json
+import time
+import django
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from transcription.schemas import TranscriptionResponse, TranscriptionResult, TranscriptionSegment
+from transcription.services import TranscriptionService
+
+
+def make_response(segments: int) -> TranscriptionResponse:
+    """Transcrição longa sintética (~1 segmento a cada 3s)"""
+    return TranscriptionResponse(
+        success=True,
+        transcription=TranscriptionResult(
+            text=" ".join(f"Frase número {i}, com acentuação." for i in range(segments)),
+            segments=[
+                TranscriptionSegment(start=i * 3.0, end=i * 3.0 + 2.5, text=f"Frase número {i}, com acentuação.")
+                for i in range(segments)
+            ],
+            language="pt",
+            duration=segments * 3.0
+        ),
+        processing_time=42.0
+    )
+
+
+def test_body_matches_response():
+    """Bytes servidos equivalem à resposta original com cached/processing_time atualizados"""
+    response = make_response(50)
+    TranscriptionService._save_to_cache("body_test_key", response)
+
+    body = TranscriptionService.get_cached_response_body("body_test_key", time.time())
+    parsed = json.loads(body)
+    assert parsed["cached"] is True
+    assert parsed["processing_time"] < 1
+    expected = response.model_dump(mode="json")
+    for field in ("success", "transcription", "timing_metrics", "audio_info", "error"):
+        assert parsed[field] == expected[field], field
+
+    # Caminho com objetos (streaming/workers) continua funcionando
+    restored = TranscriptionService._get_cached_response("body_test_key", time.time())
+    assert restored.cached and restored.transcription == response.transcription
+    print("✓ Corpo do hit equivale à resposta original")
+
+
+def test_hit_latency():
+    """Hit em bytes não depende do número de segmentos como a reconstrução"""
+    response = make_response(2000)  # ~1h40 de áudio
+    TranscriptionService._save_to_cache("latency_test_key", response)
+
+    runs = 50
+    start = time.perf_counter()
+    for _ in range(runs):
+        TranscriptionService.get_cached_response_body("latency_test_key", time.time())
+    body_ms = (time.perf_counter() - start) / runs * 1000
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        TranscriptionService._get_cached_response("latency_test_key", time.time())
+    object_ms = (time.perf_counter() - start) / runs * 1000
+
+    print(f"✓ 2000 segmentos: bytes {body_ms:.2f}ms vs objetos {object_ms:.2f}ms por hit")
+    assert body_ms < object_ms
+
+
+def main():
+    """Run all tests"""
+    try:
+        test_body_matches_response()
+        test_hit_latency()
+        print("\n✅ TODOS OS TESTES DE HIT EM BYTES PASSARAM")
+        return 0
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+"""
+Testes do tier de cache em disco (SQLite em modo WAL)
+
+Uso:
+    python tests/test_disk_cache.py
+"""
+import os
+import sys
+import time
+import tempfile
+import django
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from pathlib import Path
+
+from transcription.cache_manager import DiskCache
+
+
+def make_cache(ttl_seconds: int = 60) -> DiskCache:
+    db_path = Path(tempfile.mkdtemp()) / "cache.sqlite3"
+    return DiskCache(db_path, ttl_seconds=ttl_seconds, sweep_interval=0)
+
+
+def test_set_get_replace():
+    """Substituir uma chave não duplica a contagem de entradas"""
+    cache = make_cache()
+    cache.set("a", {"text": "primeiro"})
+    cache.set("a", {"text": "segundo"})
+    cache.set("b", {"text": "x" * 5000})
+
+    assert cache.get("a") == {"text": "segundo"}
+    stats = cache.get_stats()
+    assert stats["entries"] == 2
+    assert 0 < stats["bytes"] < 5000, "Valores deveriam estar comprimidos"
+    print(f"✓ 2 entradas em {stats['bytes']} bytes comprimidos")
+
+
+def test_expiry_and_sweep():
+    """Entradas expiradas não são retornadas e a varredura atualiza os contadores"""
+    cache = make_cache(ttl_seconds=1)
+    cache.set("a", {"text": "expira"})
+    time.sleep(1.1)
+
+    assert cache.get("a") is None
+    assert cache.get_stats()["entries"] == 1, "Ainda não varrida"
+    assert cache.sweep() == 1
+    stats = cache.get_stats()
+    assert stats["entries"] == 0 and stats["bytes"] == 0
+    print("✓ Expiradas ignoradas na leitura e removidas pela varredura")
+
+
+def test_clear():
+    """clear zera entradas e bytes"""
+    cache = make_cache()
+    for i in range(50):
+        cache.set(f"k{i}", {"i": i})
+    cache.clear()
+    stats = cache.get_stats()
+    assert stats["entries"] == 0 and stats["bytes"] == 0
+    print("✓ Cache em disco limpo")
+
+
+def main():
+    """Run all tests"""
+    try:
+        test_set_get_replace()
+        test_expiry_and_sweep()
+        test_clear()
+        print("\n✅ TODOS OS TESTES DO CACHE EM DISCO PASSARAM")
+        return 0
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+#!/usr/bin/env python
+"""
+Testes do modo de áudio longo (trechos cortados em silêncio)
+
+Sem argumentos, testa detecção de silêncio, planejamento de trechos e costura
+de segmentos com áudio sintético.
+
+Com um arquivo WAV 16kHz mono, roda o benchmark comparando a chamada única
+atual com a transcrição em trechos paralelos:
+
+Uso:
+    python tests/test_long_audio.py
+    python tests/test_long_audio.py /caminho/audio_longo.wav [workers]
+"""
+import os
+import sys
+import django
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+import numpy as np
+
+from concurrent.futures import ThreadPoolExecutor
+
+from transcription import long_audio
+from transcription.long_audio import (
+    SAMPLE_RATE,
+    LongAudioTranscriber,
+    find_silences,
+    plan_chunks,
+    stitch_segments,
+)
+
+
+def make_speech_like(seconds_on: float, seconds_off: float, repeats: int) -> np.ndarray:
+    """Alterna tom (fala simulada) e silêncio"""
+    t = np.arange(int(seconds_on * SAMPLE_RATE)) / SAMPLE_RATE
+    tone = (0.5 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+    silence = np.zeros(int(seconds_off * SAMPLE_RATE), dtype=np.float32)
+    return np.concatenate([np.concatenate([tone, silence]) for _ in range(repeats)])
+
+
+def test_find_silences():
+    """Detecta os intervalos de silêncio entre os tons"""
+    samples = make_speech_like(seconds_on=5, seconds_off=1, repeats=4)
+    silences = find_silences(samples, threshold_db=-35, min_silence_ms=300)
+
+    assert len(silences) == 4, f"Esperado 4 silêncios, encontrado {len(silences)}"
+    for start, end in silences:
+        assert (end - start) / SAMPLE_RATE >= 0.9
+    print("✓ Silêncios detectados")
+
+
+def test_plan_chunks_cuts_at_silence():
+    """Cortes caem dentro dos silêncios e cobrem o áudio inteiro"""
+    samples = make_speech_like(seconds_on=25, seconds_off=2, repeats=20)  # ~9 min
+    silences = find_silences(samples, threshold_db=-35, min_silence_ms=300)
+    chunks = plan_chunks(
+        len(samples), silences, chunk_seconds=60, overlap_seconds=1.0, search_seconds=15
+    )
+
+    assert len(chunks) > 1
+    assert chunks[0].keep_start == 0
+    assert chunks[-1].keep_end == len(samples)
+    for prev, nxt in zip(chunks, chunks[1:]):
+        assert prev.keep_end == nxt.keep_start, "Regiões devem ser contíguas"
+        cut = prev.keep_end
+        assert any(s <= cut <= e for s, e in silences), f"Corte fora de silêncio: {cut}"
+        assert nxt.start < cut < prev.end, "Sobreposição deve envolver o corte"
+    print(f"✓ {len(chunks)} trechos com cortes em silêncio")
+
+
+def test_plan_chunks_without_silence():
+    """Sem silêncio, corta no tamanho alvo"""
+    total = 300 * SAMPLE_RATE
+    chunks = plan_chunks(total, [], chunk_seconds=60, overlap_seconds=0, search_seconds=10)
+    assert [c.keep_start // SAMPLE_RATE for c in chunks] == [0, 60, 120, 180, 240]
+    assert chunks[-1].keep_end == total
+    print("✓ Cortes fixos quando não há silêncio")
+
+
+def test_stitch_segments():
+    """Offsets corrigidos e duplicatas da sobreposição descartadas"""
+    total = 120 * SAMPLE_RATE
+    chunks = plan_chunks(total, [], chunk_seconds=60, overlap_seconds=2, search_seconds=0)
+    first, second = chunks
+
+    results = [
+        (second, {"segments": [
+            {"start": 0.0, "end": 1.5, "text": "fim", "no_speech_prob": 0.1},  # duplicata
+            {"start": 3.0, "end": 6.0, "text": "segundo", "no_speech_prob": 0.1},
+        ]}),
+        (first, {"segments": [
+            {"start": 0.0, "end": 5.0, "text": "primeiro", "no_speech_prob": 0.1},
+            {"start": 58.0, "end": 59.5, "text": "fim", "no_speech_prob": 0.1},
+        ]}),
+    ]
+    segments = stitch_segments(results)
+
+    assert [s["text"] for s in segments] == ["primeiro", "fim", "segundo"]
+    assert segments[2]["start"] == 61.0, f"Offset incorreto: {segments[2]['start']}"
+    print("✓ Segmentos costurados com timestamps absolutos")
+
+
+def fake_transcribe_chunk(samples, language, model_name, engine, force_cpu):
+    """Um segmento no meio do trecho, sem carregar modelo"""
+    middle = len(samples) / SAMPLE_RATE / 2
+    return {"segments": [{"start": middle, "end": middle + 1, "text": "trecho", "no_speech_prob": 0.1}],
+            "language": language}
+
+
+class FakePool(ThreadPoolExecutor):
+    """Pool em threads no lugar do ProcessPoolExecutor, contando criações"""
+
+    created = 0
+
+    def __init__(self, max_workers, mp_context=None, initializer=None, initargs=()):
+        FakePool.created += 1
+        super().__init__(max_workers=max_workers)
+
+
+def test_pool_reused_across_chunk_counts():
+    """Áudios com números de trechos diferentes reutilizam o mesmo pool"""
+    originals = (long_audio.ProcessPoolExecutor, long_audio._transcribe_chunk,
+                 LongAudioTranscriber._reserve_budget)
+    long_audio.ProcessPoolExecutor = FakePool
+    long_audio._transcribe_chunk = fake_transcribe_chunk
+    LongAudioTranscriber._reserve_budget = classmethod(lambda cls, *args: None)
+    try:
+        for minutes in (5, 9, 13):
+            samples = np.zeros(minutes * 60 * SAMPLE_RATE, dtype=np.float32)
+            result = LongAudioTranscriber.transcribe_raw(samples, "pt", workers=3)
+            assert len(result["segments"]) > 1, "Trechos deveriam ser transcritos"
+        assert FakePool.created == 1, f"Pool recriado {FakePool.created} vezes"
+    finally:
+        LongAudioTranscriber.shutdown()
+        (long_audio.ProcessPoolExecutor, long_audio._transcribe_chunk,
+         LongAudioTranscriber._reserve_budget) = originals
+    print("✓ Pool mantido entre áudios com números de trechos diferentes")
+
+
+def test_pool_shut_down_elsewhere_falls_back_to_serial():
+    """Pool encerrado por outra requisição: transcrição segue em série"""
+    closed = ThreadPoolExecutor(max_workers=2)
+    closed.shutdown()
+    originals = (LongAudioTranscriber._get_executor, long_audio._transcribe_chunk)
+    LongAudioTranscriber._get_executor = classmethod(lambda cls, *args: closed)
+    long_audio._transcribe_chunk = fake_transcribe_chunk
+    try:
+        samples = np.zeros(9 * 60 * SAMPLE_RATE, dtype=np.float32)
+        result = LongAudioTranscriber.transcribe_raw(samples, "pt", workers=2)
+        assert len(result["segments"]) > 1
+    finally:
+        LongAudioTranscriber._get_executor, long_audio._transcribe_chunk = originals
+    print("✓ Pool encerrado por outra requisição cai para a transcrição em série")
+
+
+def benchmark(wav_path: str, workers: int = None):
+    """Compara chamada única com trechos paralelos no mesmo arquivo"""
+    from transcription.services import WhisperTranscriber
+    from transcription.long_audio import LongAudioTranscriber
+    from transcription.pcm_decoder import get_wav_duration
+
+    duration = get_wav_duration(wav_path)
+    print("=" * 60)
+    print(f"BENCHMARK: {wav_path} ({duration / 60:.1f} min)")
+    print("=" * 60)
+
+    # Pré-carregar modelo para não contar o carregamento na chamada única
+    WhisperTranscriber.load_model()
+
+    single, single_time = WhisperTranscriber.transcribe_with_timing(wav_path)
+    print(f"Chamada única:     {single_time:8.1f}s  ({len(single.segments)} segmentos)")
+
+    # Primeira chamada inicia o pool (carrega modelo em cada processo)
+    chunked, chunked_time = WhisperTranscriber.transcribe_long(wav_path, workers=workers)
+    print(f"Trechos (1ª vez):  {chunked_time:8.1f}s  ({len(chunked.segments)} segmentos)")
+
+    chunked, warm_time = WhisperTranscriber.transcribe_long(wav_path, workers=workers)
+    print(f"Trechos (pool ok): {warm_time:8.1f}s")
+
+    print(f"\nSpeedup: {single_time / warm_time:.2f}x "
+          f"(workers={workers or LongAudioTranscriber.get_workers()})")
+    print(f"Caracteres: chamada única={len(single.text)}, trechos={len(chunked.text)}")
+
+    LongAudioTranscriber.shutdown()
+
+
+def main():
+    """Run all tests"""
+    if len(sys.argv) > 1:
+        workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+        benchmark(sys.argv[1], workers)
+        return 0
+
+    try:
+        test_find_silences()
+        test_plan_chunks_cuts_at_silence()
+        test_plan_chunks_without_silence()
+        test_stitch_segments()
+        test_pool_reused_across_chunk_counts()
+        test_pool_shut_down_elsewhere_falls_back_to_serial()
+        print("\n✅ TODOS OS TESTES DE ÁUDIO LONGO PASSARAM")
+        return 0
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
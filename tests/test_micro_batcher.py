@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+"""
+Testes do micro-batching de janelas de 30s entre requisições
+
+Não carrega o Whisper: testa o agrupamento do agendador e a separação de
+segmentos pelos tokens de timestamp com objetos fictícios.
+
+Uso:
+    python tests/test_micro_batcher.py
+"""
+import os
+import sys
+import time
+import threading
+import django
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from transcription.micro_batcher import BatchItem, MicroBatcher
+
+TIMESTAMP_BEGIN = 1000
+
+
+class FakeTokenizer:
+    """Tokens < 1000 são palavras; >= 1000 são timestamps de 0,02s"""
+    timestamp_begin = TIMESTAMP_BEGIN
+
+    def decode(self, tokens):
+        return " ".join(f"w{t}" for t in tokens)
+
+
+def ts(seconds: float) -> int:
+    return TIMESTAMP_BEGIN + int(round(seconds / 0.02))
+
+
+def test_split_segments():
+    """Segmentos delimitados por pares de timestamps"""
+    tokens = [ts(0.0), 1, 2, ts(2.4), ts(2.4), 3, ts(5.0)]
+    segments = MicroBatcher._split_segments(tokens, FakeTokenizer(), duration=6.0)
+
+    assert len(segments) == 2, f"Esperado 2 segmentos, obtido {segments}"
+    assert segments[0]["start"] == 0.0 and abs(segments[0]["end"] - 2.4) < 1e-6
+    assert segments[0]["text"] == "w1 w2"
+    assert abs(segments[1]["start"] - 2.4) < 1e-6 and abs(segments[1]["end"] - 5.0) < 1e-6
+    print("✓ Segmentos separados por timestamps")
+
+
+def test_split_segments_without_closing_timestamp():
+    """Texto sem timestamp final termina na duração do áudio"""
+    segments = MicroBatcher._split_segments([ts(1.0), 7, 8], FakeTokenizer(), duration=4.0)
+    assert segments == [{"start": 1.0, "end": 4.0, "text": "w7 w8"}]
+    print("✓ Segmento final fechado na duração")
+
+
+def test_concurrent_requests_share_batch():
+    """Requisições simultâneas caem no mesmo lote, agrupadas por modelo e idioma"""
+    batcher = MicroBatcher(max_batch_size=8, window_ms=200)
+    decoded_groups = []
+
+    def fake_decode_group(items):
+        decoded_groups.append([(item.model, item.language) for item in items])
+        for item in items:
+            item.future.set_result({"text": item.language, "segments": []})
+
+    batcher._decode_group = fake_decode_group
+
+    model_a, model_b = object(), object()
+    requests = [(model_a, "pt")] * 4 + [(model_b, "pt")] * 2 + [(model_a, "en")]
+    results = []
+
+    def submit(model, language):
+        item = BatchItem(model, mel=None, language=language, duration=5.0)
+        batcher._ensure_started()
+        batcher._queue.put(item)
+        results.append(item.future.result(timeout=5))
+
+    threads = [threading.Thread(target=submit, args=req) for req in requests]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    sizes = sorted(len(group) for group in decoded_groups)
+    assert sizes == [1, 2, 4], f"Grupos inesperados: {sizes}"
+    assert len(results) == len(requests)
+    print("✓ Requisições concorrentes compartilham lote")
+
+
+def test_batch_size_limit():
+    """Lote não excede max_batch_size; excedente vai para o próximo"""
+    batcher = MicroBatcher(max_batch_size=3, window_ms=100)
+    sizes = []
+
+    def fake_decode_group(items):
+        sizes.append(len(items))
+        time.sleep(0.01)
+        for item in items:
+            item.future.set_result({})
+
+    batcher._decode_group = fake_decode_group
+    model = object()
+    items = [BatchItem(model, None, "pt", 1.0) for _ in range(7)]
+    for item in items:
+        batcher._queue.put(item)
+    batcher._ensure_started()
+    for item in items:
+        item.future.result(timeout=5)
+
+    assert max(sizes) <= 3 and sum(sizes) == 7, f"Tamanhos: {sizes}"
+    print("✓ Limite de tamanho do lote respeitado")
+
+
+def main():
+    """Run all tests"""
+    try:
+        test_split_segments()
+        test_split_segments_without_closing_timestamp()
+        test_concurrent_requests_share_batch()
+        test_batch_size_limit()
+        print("\n✅ TODOS OS TESTES DE MICRO-BATCHING PASSARAM")
+        return 0
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,306 @@
+#!/usr/bin/env python
+"""
+Testes do pool de modelos residentes (LRU com orçamento de memória)
+
+Não carrega modelos reais: usa objetos fictícios com tamanhos conhecidos.
+
+Uso:
+    python tests/test_model_pool.py
+"""
+import os
+import sys
+import time
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transcription.model_pool import ModelPool, inference_lock, iterate_locked
+
+MB = 1024 * 1024
+
+
+def test_hit_and_miss():
+    """Modelo residente é reutilizado e contabilizado como hit"""
+    pool = ModelPool(ram_budget_bytes=1000 * MB, vram_budget_bytes=0)
+    key = ("openai", "small", "cpu", "fp32")
+
+    assert pool.get(key) is None, "Pool vazio deveria retornar None"
+    pool.put(key, object(), 500 * MB, load_time=2.0)
+    assert pool.get(key) is not None, "Modelo deveria estar residente"
+
+    stats = pool.get_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["loads"] == 1
+    assert stats["avg_load_time_s"] == 2.0
+    print("✓ Hit/miss contabilizados")
+
+
+def test_models_alternating_stay_resident():
+    """small e medium cabem juntos no orçamento: nenhuma troca recarrega"""
+    pool = ModelPool(ram_budget_bytes=4000 * MB, vram_budget_bytes=0)
+    small = ("openai", "small", "cpu", "fp32")
+    medium = ("openai", "medium", "cpu", "fp32")
+
+    pool.put(small, object(), 1000 * MB, load_time=3.0)
+    pool.reserve("cpu", 3000 * MB)
+    pool.put(medium, object(), 3000 * MB, load_time=8.0)
+
+    for _ in range(5):
+        assert pool.get(small) is not None
+        assert pool.get(medium) is not None
+
+    stats = pool.get_stats()
+    assert stats["loads"] == 2, "Apenas os dois carregamentos iniciais"
+    assert stats["evictions"] == 0
+    print("✓ Modelos alternados permanecem residentes")
+
+
+def test_lru_eviction_by_budget():
+    """Modelo menos usado recentemente é despejado quando o orçamento estoura"""
+    pool = ModelPool(ram_budget_bytes=1000 * MB, vram_budget_bytes=0)
+    a = ("openai", "a", "cpu", "fp32")
+    b = ("openai", "b", "cpu", "fp32")
+    c = ("openai", "c", "cpu", "fp32")
+
+    pool.put(a, object(), 400 * MB, load_time=1.0)
+    pool.put(b, object(), 400 * MB, load_time=1.0)
+    pool.get(a)  # "a" passa a ser o mais recente
+
+    evicted_entries = []
+    evicted = pool.reserve("cpu", 400 * MB, on_evict=evicted_entries.append)
+    assert evicted == [b], f"Deveria despejar 'b' (LRU), despejou {evicted}"
+    assert len(evicted_entries) == 1
+
+    pool.put(c, object(), 400 * MB, load_time=1.0)
+    assert pool.get(a) is not None
+    assert pool.get(b) is None
+    assert pool.used_bytes("ram") == 800 * MB
+    print("✓ Despejo LRU respeita orçamento")
+
+
+def test_budgets_are_per_memory_kind():
+    """Modelos em GPU não são despejados para abrir espaço em RAM"""
+    pool = ModelPool(ram_budget_bytes=500 * MB, vram_budget_bytes=500 * MB)
+    gpu = ("openai", "small", "cuda", "fp16")
+    cpu = ("openai", "small", "cpu", "fp32")
+
+    pool.put(gpu, object(), 500 * MB, load_time=1.0)
+    evicted = pool.reserve("cpu", 500 * MB)
+    assert evicted == [], "Modelo em GPU não deveria ser despejado"
+    pool.put(cpu, object(), 500 * MB, load_time=1.0)
+    assert len(pool) == 2
+    print("✓ Orçamentos separados por RAM/VRAM")
+
+
+def test_evict_idle():
+    """Apenas modelos ociosos são removidos"""
+    pool = ModelPool(ram_budget_bytes=1000 * MB, vram_budget_bytes=0)
+    key = ("openai", "tiny", "cpu", "fp32")
+    pool.put(key, object(), 100 * MB, load_time=0.5)
+
+    assert pool.evict_idle(max_idle_seconds=3600) == []
+    assert len(pool.evict_idle(max_idle_seconds=-1)) == 1
+    assert len(pool) == 0
+    print("✓ Despejo de modelos ociosos")
+
+
+def test_concurrent_loads_are_single_flight():
+    """Chamadas concorrentes para o mesmo modelo disparam um único carregamento"""
+    pool = ModelPool(ram_budget_bytes=1000 * MB, vram_budget_bytes=0)
+    key = ("openai", "small", "cpu", "fp32")
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.2)
+        return object(), 500 * MB, 0.2
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(pool.get_or_load(key, loader)))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    assert pool.is_loading(key), "Carregamento deveria estar em andamento"
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1, f"Esperado 1 carregamento, houve {len(calls)}"
+    assert len(set(id(r) for r in results)) == 1, "Todos deveriam receber a mesma instância"
+    assert not pool.is_loading()
+    stats = pool.get_stats()
+    assert stats["loads"] == 1
+    assert stats["coalesced_loads"] == 7
+    print("✓ Carregamento single-flight")
+
+
+def test_load_failure_propagates_to_waiters():
+    """Erro no carregamento chega a todos os que aguardavam, sem deixar estado preso"""
+    pool = ModelPool(ram_budget_bytes=1000 * MB, vram_budget_bytes=0)
+    key = ("openai", "small", "cpu", "fp32")
+
+    def failing_loader():
+        time.sleep(0.1)
+        raise RuntimeError("falha simulada")
+
+    errors = []
+
+    def worker():
+        try:
+            pool.get_or_load(key, failing_loader)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == ["falha simulada"] * 4, f"Erros inesperados: {errors}"
+    assert not pool.is_loading(key)
+    assert len(pool) == 0
+
+    # Nova tentativa após a falha carrega normalmente
+    model = pool.get_or_load(key, lambda: (object(), 100 * MB, 0.1))
+    assert model is not None and len(pool) == 1
+    print("✓ Falha propagada aos aguardando")
+
+
+def test_external_reservation_counts_in_budget():
+    """Modelos fora do pool (processos do áudio longo) ocupam o orçamento"""
+    pool = ModelPool(ram_budget_bytes=4000 * MB, vram_budget_bytes=0)
+    small = ("openai", "small", "cpu", "fp32")
+    pool.put(small, object(), 1000 * MB, load_time=1.0)
+
+    evicted = pool.reserve_external("long_audio", "cpu", 3500 * MB)
+    assert evicted == [small], "Reserva externa deveria despejar o LRU"
+    assert pool.used_bytes("ram") == 3500 * MB
+    assert pool.get_stats()["external"]["long_audio"]["size_mb"] == 3500
+
+    pool.release_external("long_audio")
+    assert pool.used_bytes("ram") == 0
+    print("✓ Reserva externa contada no orçamento")
+
+
+def test_concurrent_loads_respect_budget():
+    """Cargas simultâneas de modelos diferentes não estouram o orçamento juntas"""
+    pool = ModelPool(ram_budget_bytes=1000 * MB, vram_budget_bytes=0)
+    lock = threading.Lock()
+    state = {"loading_bytes": 0, "peak": 0}
+
+    def loader_for(key):
+        def load():
+            pool.reserve("cpu", 600 * MB, key=key)
+            with lock:
+                state["loading_bytes"] += 600 * MB
+                state["peak"] = max(state["peak"], pool.used_bytes("ram"), state["loading_bytes"])
+            time.sleep(0.1)
+            with lock:
+                state["loading_bytes"] -= 600 * MB
+            return object(), 600 * MB, 0.1
+        return load
+
+    keys = [("openai", "small", "cpu", "fp32"), ("openai", "medium", "cpu", "fp32")]
+    threads = [
+        threading.Thread(target=pool.get_or_load, args=(key, loader_for(key)))
+        for key in keys
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert state["peak"] <= 1000 * MB, f"Orçamento estourado: {state['peak'] / MB:.0f}MB"
+    assert len(pool) == 1 and pool.get_stats()["evictions"] == 1, "Segunda carga deveria despejar a primeira"
+    assert pool.used_bytes("ram") == 600 * MB, "Reservas devolvidas ao fim das cargas"
+    print("✓ Cargas simultâneas respeitam o orçamento")
+
+
+def test_failed_load_returns_reservation():
+    """Carga que falha devolve o orçamento reservado"""
+    pool = ModelPool(ram_budget_bytes=1000 * MB, vram_budget_bytes=0)
+    key = ("openai", "small", "cpu", "fp32")
+
+    def failing_loader():
+        pool.reserve("cpu", 600 * MB, key=key)
+        raise RuntimeError("falha")
+
+    try:
+        pool.get_or_load(key, failing_loader)
+    except RuntimeError:
+        pass
+    assert pool.used_bytes("ram") == 0
+    print("✓ Carga com falha devolve a reserva")
+
+
+class FakeModel:
+    """Modelo fictício que detecta inferências sobrepostas"""
+
+    def __init__(self):
+        self.running = 0
+        self.overlaps = 0
+
+    def infer(self):
+        self.running += 1
+        if self.running > 1:
+            self.overlaps += 1
+        time.sleep(0.01)
+        self.running -= 1
+
+
+def test_inference_serialized_per_model():
+    """Threads no mesmo modelo não se sobrepõem; modelos distintos não se bloqueiam"""
+    model, other = FakeModel(), FakeModel()
+    assert inference_lock(model) is inference_lock(model)
+    assert inference_lock(model) is not inference_lock(other)
+
+    def run():
+        for _ in range(5):
+            with inference_lock(model):
+                model.infer()
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert model.overlaps == 0, f"{model.overlaps} inferências simultâneas no mesmo modelo"
+
+    # Streaming: o lock fica livre entre um segmento e outro
+    lock = inference_lock(model)
+    stream = iterate_locked(iter(range(3)), lock)
+    assert next(stream) == 0
+    assert not lock.locked(), "Lock preso entre segmentos"
+    assert list(stream) == [1, 2]
+    print("✓ Inferência serializada por instância de modelo")
+
+
+def main():
+    """Run all tests"""
+    try:
+        test_hit_and_miss()
+        test_models_alternating_stay_resident()
+        test_lru_eviction_by_budget()
+        test_budgets_are_per_memory_kind()
+        test_evict_idle()
+        test_concurrent_loads_are_single_flight()
+        test_load_failure_propagates_to_waiters()
+        test_external_reservation_counts_in_budget()
+        test_concurrent_loads_respect_budget()
+        test_failed_load_returns_reservation()
+        test_inference_serialized_per_model()
+        print("\n✅ TODOS OS TESTES DO POOL PASSARAM")
+        return 0
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+"""
+Testes do cache negativo (conteúdo corrompido/sem áudio recusado pelo hash)
+
+Uso:
+    python tests/test_negative_cache.py
+"""
+import os
+import sys
+import time
+import tempfile
+import subprocess
+import django
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from transcription.cache_manager import InvalidMediaCache, get_cache_manager
+from transcription.services import TranscriptionService
+
+
+def corrupt_file() -> str:
+    """Arquivo .mp3 com bytes aleatórios (conteúdo novo a cada chamada)"""
+    fd, path = tempfile.mkstemp(suffix=".mp3")
+    with os.fdopen(fd, "wb") as f:
+        f.write(os.urandom(4096))
+    return path
+
+
+class FakeProbe:
+    """Substitui subprocess.run contando as chamadas ao ffprobe"""
+
+    def __init__(self, timeout: bool = False):
+        self.timeout = timeout
+        self.calls = 0
+        self.original = subprocess.run
+
+    def __call__(self, cmd, *args, **kwargs):
+        self.calls += 1
+        if self.timeout:
+            raise subprocess.TimeoutExpired(cmd, 10)
+        return subprocess.CompletedProcess(cmd, 1, stdout="", stderr="Invalid data found")
+
+    def __enter__(self):
+        subprocess.run = self
+        return self
+
+    def __exit__(self, *exc):
+        subprocess.run = self.original
+
+
+def test_ttl_and_clear():
+    """Entradas expiram pelo TTL curto e somem no clear"""
+    cache = InvalidMediaCache(ttl_seconds=1)
+    cache.add("a" * 32, "Arquivo não contém faixa de áudio")
+    assert cache.get("a" * 32) == "Arquivo não contém faixa de áudio"
+    time.sleep(1.1)
+    assert cache.get("a" * 32) is None
+
+    cache.add("b" * 32, "inválido")
+    cache.clear()
+    assert cache.get("b" * 32) is None
+    print("✓ TTL e limpeza do cache negativo")
+
+
+def test_rejection_cached():
+    """Arquivo recusado pelo ffprobe é recusado de novo sem subprocesso"""
+    path = corrupt_file()
+    try:
+        with FakeProbe() as probe:
+            first = TranscriptionService.process_audio_file(path)
+            assert not first.success and probe.calls == 1
+
+            start = time.perf_counter()
+            second = TranscriptionService.process_audio_file(path)
+            elapsed_us = (time.perf_counter() - start) * 1e6
+            assert not second.success
+            assert probe.calls == 1, "Reenvio não deveria rodar ffprobe"
+            assert "corrompido" in second.error
+    finally:
+        os.remove(path)
+    print(f"✓ Reenvio recusado em {elapsed_us:.0f}µs sem ffprobe")
+
+
+def test_transient_failure_not_cached():
+    """Timeout do ffprobe não depende do conteúdo: não entra no cache negativo"""
+    path = corrupt_file()
+    try:
+        with FakeProbe(timeout=True) as probe:
+            TranscriptionService.process_audio_file(path)
+            TranscriptionService.process_audio_file(path)
+            assert probe.calls == 2
+    finally:
+        os.remove(path)
+    print("✓ Falhas transitórias são tentadas de novo")
+
+
+def main():
+    """Run all tests"""
+    try:
+        get_cache_manager().clear()
+        test_ttl_and_clear()
+        test_rejection_cached()
+        test_transient_failure_not_cached()
+        print("\n✅ TODOS OS TESTES DO CACHE NEGATIVO PASSARAM")
+        return 0
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
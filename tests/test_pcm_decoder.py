@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+"""
+Testes da decodificação em memória (ffmpeg s16le -> NumPy)
+
+Gera áudio e vídeo curtos com ffmpeg e verifica que o pipe produz as mesmas
+amostras que o WAV temporário produzia, sem gravar nada em disco.
+
+Uso:
+    python tests/test_pcm_decoder.py
+"""
+import os
+import sys
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from transcription.pcm_decoder import PCMDecoder, SAMPLE_RATE, read_wav_samples
+from transcription.video_processor import VideoProcessor
+
+
+def ffmpeg(*args):
+    subprocess.run(['ffmpeg', '-loglevel', 'error', '-y', *args], check=True, timeout=60)
+
+
+def test_decode_matches_wav():
+    """Pipe s16le gera as mesmas amostras que o WAV convertido"""
+    with tempfile.TemporaryDirectory() as tmp:
+        mp3 = os.path.join(tmp, 'tone.mp3')
+        wav = os.path.join(tmp, 'tone.wav')
+        ffmpeg('-f', 'lavfi', '-i', 'sine=frequency=440:duration=3', '-ar', '44100', '-ac', '2', mp3)
+        ffmpeg('-i', mp3, '-acodec', 'pcm_s16le', '-ar', '16000', '-ac', '1', wav)
+
+        success, samples = PCMDecoder.decode(mp3, timeout=30, expected_duration=3.0)
+        assert success, f"Decodificação falhou: {samples}"
+        assert samples.dtype == np.float32
+
+        reference = read_wav_samples(wav)
+        assert reference is not None
+        assert len(samples) == len(reference), f"{len(samples)} != {len(reference)}"
+        assert np.allclose(samples, reference), "Amostras diferentes do WAV"
+        print(f"✓ Pipe igual ao WAV ({len(samples) / SAMPLE_RATE:.2f}s)")
+
+
+def test_buffer_grows_when_duration_underestimated():
+    """Duração esperada menor que a real não trunca o áudio"""
+    with tempfile.TemporaryDirectory() as tmp:
+        wav = os.path.join(tmp, 'tone.wav')
+        ffmpeg('-f', 'lavfi', '-i', 'sine=frequency=440:duration=5', '-ar', '8000', wav)
+
+        success, samples = PCMDecoder.decode(wav, expected_duration=0.5)
+        assert success
+        assert abs(len(samples) / SAMPLE_RATE - 5.0) < 0.05
+        print("✓ Buffer cresce além da duração estimada")
+
+
+def test_invalid_file():
+    """Arquivo inválido retorna mensagem de erro"""
+    with tempfile.NamedTemporaryFile(suffix='.mp3') as f:
+        f.write(b'nao e audio')
+        f.flush()
+        success, error = PCMDecoder.decode(f.name, timeout=10)
+        assert not success and isinstance(error, str)
+    print("✓ Arquivo inválido rejeitado")
+
+
+def test_error_flood_reported_without_timeout():
+    """Log de erro maior que o buffer do pipe não trava o ffmpeg até o timeout"""
+    with tempfile.TemporaryDirectory() as tmp:
+        fake = os.path.join(tmp, 'ffmpeg')
+        with open(fake, 'w') as f:
+            f.write("#!/bin/sh\nhead -c 300000 /dev/zero | tr '\\0' 'e' >&2\necho 'Invalid data found' >&2\nexit 1\n")
+        os.chmod(fake, 0o755)
+
+        original_path = os.environ['PATH']
+        os.environ['PATH'] = f"{tmp}:{original_path}"
+        try:
+            success, error = PCMDecoder.decode('/dev/null', timeout=5)
+        finally:
+            os.environ['PATH'] = original_path
+
+    assert not success
+    assert 'Timeout' not in error and error.endswith('Invalid data found'), error[-80:]
+    assert len(error) <= PCMDecoder.MAX_STDERR_BYTES
+    print("✓ Erro real reportado mesmo com log maior que o pipe")
+
+
+def test_oversized_buffer_released():
+    """Duração superestimada não mantém o buffer inteiro vivo"""
+    with tempfile.TemporaryDirectory() as tmp:
+        wav = os.path.join(tmp, 'tone.wav')
+        ffmpeg('-f', 'lavfi', '-i', 'sine=frequency=440:duration=2', wav)
+
+        success, samples = PCMDecoder.decode(wav, expected_duration=60.0)
+        assert success
+        assert samples.base is None, "Amostras ainda apontam para o buffer de 60s"
+        print("✓ Sobra do buffer liberada")
+
+
+def test_video_extract_array():
+    """Vídeo extraído direto para memória"""
+    with tempfile.TemporaryDirectory() as tmp:
+        video = os.path.join(tmp, 'clip.mp4')
+        ffmpeg(
+            '-f', 'lavfi', '-i', 'color=c=black:s=64x64:d=2',
+            '-f', 'lavfi', '-i', 'sine=frequency=440:duration=2',
+            '-shortest', '-c:v', 'libx264', '-c:a', 'aac', video
+        )
+        success, samples = VideoProcessor.extract_audio_array(video, timeout=30, expected_duration=2.0)
+        assert success, f"Extração falhou: {samples}"
+        assert abs(len(samples) / SAMPLE_RATE - 2.0) < 0.1
+        assert not [f for f in os.listdir(tmp) if f.endswith('.wav')], "Nenhum WAV deveria ser gravado"
+        print("✓ Áudio de vídeo extraído em memória")
+
+
+def main():
+    """Run all tests"""
+    try:
+        test_decode_matches_wav()
+        test_buffer_grows_when_duration_underestimated()
+        test_invalid_file()
+        test_error_flood_reported_without_timeout()
+        test_oversized_buffer_released()
+        test_video_extract_array()
+        print("\n✅ TODOS OS TESTES DE DECODIFICAÇÃO PASSARAM")
+        return 0
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+"""
+Testes do fingerprint do PCM (chave secundária do cache)
+
+Uso:
+    python tests/test_pcm_fingerprint.py
+"""
+import os
+import sys
+import tempfile
+import django
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+import numpy as np
+
+from transcription.cache_manager import TranscriptionCacheManager, hash_pcm
+
+
+def make_audio(seconds: float = 2.0, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return (rng.standard_normal(int(16000 * seconds)) * 0.1).astype(np.float32)
+
+
+def test_fingerprint_stable():
+    """Silêncio digital nas bordas (preenchimento do codec) não muda o fingerprint"""
+    audio = make_audio()
+    padded = np.concatenate([np.zeros(1024, np.float32), audio, np.zeros(2048, np.float32)])
+
+    assert hash_pcm(audio) == hash_pcm(padded)
+    assert hash_pcm(audio) != hash_pcm(make_audio(seed=1))
+    assert len(hash_pcm(audio)) == 32
+    print("✓ Fingerprint estável entre containers, distinto entre áudios")
+
+
+def test_lookup_through_index():
+    """Arquivo com outros bytes e mesmo PCM reaproveita o resultado"""
+    manager = TranscriptionCacheManager(cache_dir=tempfile.mkdtemp(), ttl_seconds=60)
+    data = {
+        "success": True,
+        "processing_time": 12.5,
+        "transcription": {"text": "olá", "language": "pt", "segments": [], "duration": 2.0},
+    }
+
+    original_key = manager._key_for("bytes-ogg", "base", "pt", "openai")
+    forwarded_key = manager._key_for("bytes-mp4", "base", "pt", "openai")
+    fingerprint_key = manager.generate_fingerprint_key(hash_pcm(make_audio()), "base", "pt", "openai")
+
+    manager.set(original_key, data)
+    manager.add_alias(fingerprint_key, original_key)
+
+    assert manager.get(forwarded_key) is None
+    assert manager.get(fingerprint_key)["transcription"]["text"] == "olá"
+
+    # Após o hit, a chave do arquivo reencaminhado aponta direto para o resultado
+    manager.add_alias(forwarded_key, fingerprint_key)
+    assert manager.fingerprint_index.resolve(forwarded_key) == original_key
+    assert manager.get(forwarded_key)["transcription"]["text"] == "olá"
+    assert manager.memory_cache.get_stats()["size"] == 1, "Resultado não deve ser duplicado"
+    print("✓ Busca pelo índice de fingerprints sem duplicar o resultado")
+
+
+def test_other_params_miss():
+    """Fingerprint igual com outro modelo não é hit"""
+    fingerprint = hash_pcm(make_audio())
+    manager = TranscriptionCacheManager(cache_dir=tempfile.mkdtemp(), ttl_seconds=60)
+    assert manager.generate_fingerprint_key(fingerprint, "base", "pt", "openai") != \
+        manager.generate_fingerprint_key(fingerprint, "small", "pt", "openai")
+    print("✓ Modelo/idioma/engine fazem parte da chave do fingerprint")
+
+
+def main():
+    """Run all tests"""
+    try:
+        test_fingerprint_stable()
+        test_lookup_through_index()
+        test_other_params_miss()
+        print("\n✅ TODOS OS TESTES DE FINGERPRINT PASSARAM")
+        return 0
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+"""
+Testes do cache com transcrição bruta e pós-processamento versionado
+
+Uso:
+    python tests/test_postprocess_view.py
+"""
+import os
+import sys
+import json
+import time
+import django
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from django.conf import settings
+
+from transcription.cache_manager import get_cache_manager
+from transcription.portuguese_processor import PortugueseBRTextProcessor
+from transcription.schemas import TranscriptionResponse
+from transcription.services import TranscriptionService, WhisperTranscriber
+
+RAW_RESULT = {
+    "text": " então tipo o sr joão chegou ontem",
+    "segments": [
+        {"start": 0.0, "end": 2.0, "text": " então tipo o sr joão"},
+        {"start": 2.0, "end": 3.5, "text": " chegou ontem"},
+    ],
+    "language": "pt",
+    "duration": 3.5,
+}
+
+
+def raw_response() -> TranscriptionResponse:
+    return TranscriptionResponse(
+        success=True,
+        transcription=WhisperTranscriber._build_result(RAW_RESULT, "pt", postprocess=False),
+        processing_time=30.0
+    )
+
+
+def cached_text(cache_key: str) -> str:
+    body = TranscriptionService.get_cached_response_body(cache_key, time.time())
+    return json.loads(body)["transcription"]["text"]
+
+
+def test_postprocess_matches_build_result():
+    """Pós-processar o resultado bruto dá o mesmo texto do caminho antigo"""
+    direct = WhisperTranscriber._build_result(RAW_RESULT, "pt")
+    derived = WhisperTranscriber.postprocess(raw_response().transcription, "pt")
+    assert derived == direct
+    assert WhisperTranscriber.postprocess(raw_response().transcription, "en") == \
+        raw_response().transcription
+    print(f"✓ Texto derivado igual ao processado na inferência: '{direct.text}'")
+
+
+def test_raw_stored_view_served():
+    """O cache guarda o texto do modelo e o hit devolve o texto processado"""
+    TranscriptionService._save_to_cache("pp_view_key", raw_response(), language="pt")
+
+    stored = get_cache_manager().get("pp_view_key")
+    assert b"tipo o sr" in stored["body"], "Entrada deveria guardar o texto bruto"
+
+    expected = WhisperTranscriber._build_result(RAW_RESULT, "pt").text
+    assert cached_text("pp_view_key") == expected
+    restored = TranscriptionService._get_cached_response("pp_view_key", time.time())
+    assert restored.transcription.segments[0].text == \
+        PortugueseBRTextProcessor.process("então tipo o sr joão")
+    print("✓ Bruto no cache, processado na resposta")
+
+
+def test_view_memoized():
+    """Hits seguintes não refazem o processamento de texto"""
+    TranscriptionService._save_to_cache("pp_memo_key", raw_response(), language="pt")
+    original = PortugueseBRTextProcessor.process
+    calls = []
+
+    def counting_process(text, *args, **kwargs):
+        calls.append(text)
+        return original(text, *args, **kwargs)
+
+    PortugueseBRTextProcessor.process = counting_process
+    try:
+        cached_text("pp_memo_key")
+        first = len(calls)
+        for _ in range(5):
+            cached_text("pp_memo_key")
+    finally:
+        PortugueseBRTextProcessor.process = original
+
+    assert first > 0 and len(calls) == first, f"{len(calls)} chamadas (esperado {first})"
+    print(f"✓ Processamento memorizado ({first} chamadas no primeiro hit, 0 depois)")
+
+
+def test_config_change_reprocesses():
+    """Mudar PORTUGUESE_BR_CONFIG muda a versão e o texto servido, sem nova inferência"""
+    TranscriptionService._save_to_cache("pp_config_key", raw_response(), language="pt")
+    before_version = PortugueseBRTextProcessor.version()
+    assert "ontem" in cached_text("pp_config_key")
+
+    hesitations = settings.PORTUGUESE_BR_CONFIG['hesitations']
+    hesitations.append('ontem')
+    try:
+        assert PortugueseBRTextProcessor.version() != before_version
+        assert "ontem" not in cached_text("pp_config_key")
+    finally:
+        hesitations.remove('ontem')
+
+    assert PortugueseBRTextProcessor.version() == before_version
+    assert "ontem" in cached_text("pp_config_key")
+    print("✓ Nova configuração aplicada ao resultado já em cache")
+
+
+def test_unmarked_entries_served_as_is():
+    """Outros idiomas e entradas antigas (já processadas) não são reprocessadas"""
+    response = raw_response()
+    TranscriptionService._save_to_cache("pp_en_key", response, language="en")
+    TranscriptionService._save_to_cache("pp_legacy_key", response)
+    assert cached_text("pp_en_key") == response.transcription.text
+    assert cached_text("pp_legacy_key") == response.transcription.text
+    print("✓ Entradas sem pós-processamento servidas como estão")
+
+
+def main():
+    """Run all tests"""
+    try:
+        get_cache_manager().clear()
+        test_postprocess_matches_build_result()
+        test_raw_stored_view_served()
+        test_view_memoized()
+        test_config_change_reprocesses()
+        test_unmarked_entries_served_as_is()
+        print("\n✅ TODOS OS TESTES DO PÓS-PROCESSAMENTO VERSIONADO PASSARAM")
+        return 0
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+"""
+Testes do upload retomável (/uploads: criar, PATCH por offset, finalizar)
+
+Uso:
+    python tests/test_resumable_upload.py
+"""
+import os
+import sys
+import time
+import base64
+import hashlib
+import django
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from django.conf import settings
+from django.test import Client
+
+from transcription import tasks
+from transcription.cache_manager import get_cache_manager, new_content_hasher
+from transcription.resumable_upload import ResumableUploadStore
+from transcription.schemas import TranscriptionResponse, TranscriptionResult
+from transcription.services import TranscriptionService
+
+client = Client(HTTP_HOST="localhost")
+CONTENT = os.urandom(300 * 1024)
+
+
+def checksum(data: bytes) -> str:
+    return "sha256 " + base64.b64encode(hashlib.sha256(data).digest()).decode()
+
+
+def create(content: bytes = CONTENT) -> str:
+    data = client.post("/api/uploads", {"filename": "video.mp4", "size": len(content)}).json()
+    assert data["success"] is True and data["offset"] == 0
+    return data["upload_id"]
+
+
+def patch(upload_id: str, offset: int, data: bytes, digest: str = None) -> dict:
+    headers = {"Upload-Offset": str(offset)}
+    if digest:
+        headers["Upload-Checksum"] = digest
+    return client.patch(f"/api/uploads/{upload_id}", data=data,
+                        content_type="application/offset+octet-stream", headers=headers).json()
+
+
+def test_resume_from_offset():
+    """Pedaços em ordem, offset errado recusado e retomada pelo GET"""
+    upload_id = create()
+    first = CONTENT[:100 * 1024]
+    assert patch(upload_id, 0, first, checksum(first))["offset"] == len(first)
+
+    # Cliente que perdeu a resposta e reenvia o mesmo pedaço
+    stale = patch(upload_id, 0, first)
+    assert stale["success"] is False and stale["offset"] == len(first)
+
+    offset = client.get(f"/api/uploads/{upload_id}").json()["offset"]
+    rest = CONTENT[offset:]
+    data = patch(upload_id, offset, rest, checksum(rest))
+    assert data["success"] is True and data["offset"] == len(CONTENT) == data["size"]
+    ResumableUploadStore.delete(upload_id)
+    print("✓ Upload retomado do offset confirmado")
+
+
+def test_checksum_mismatch_rolled_back():
+    """Pedaço com checksum divergente é descartado"""
+    upload_id = create()
+    chunk = CONTENT[:50 * 1024]
+    data = patch(upload_id, 0, chunk, checksum(b"outro conteudo"))
+    assert data["success"] is False and "Checksum" in data["error"] and data["offset"] == 0
+    assert patch(upload_id, 0, chunk, checksum(chunk))["offset"] == len(chunk)
+    ResumableUploadStore.delete(upload_id)
+    print("✓ Checksum divergente não avança o offset")
+
+
+def test_incomplete_and_invalid_sessions():
+    """Finalizar incompleto, tamanho acima do limite e sessão inexistente"""
+    upload_id = create()
+    data = client.post(f"/api/uploads/{upload_id}/finalize").json()
+    assert data["success"] is False and "incompleto" in data["error"]
+    assert client.delete(f"/api/uploads/{upload_id}").json()["success"] is True
+    assert client.get(f"/api/uploads/{upload_id}").json()["success"] is False
+
+    too_big = settings.MAX_AUDIO_SIZE_MB * 1024 * 1024 + 1
+    data = client.post("/api/uploads", {"filename": "video.mp4", "size": too_big}).json()
+    assert data["success"] is False and "muito grande" in data["error"]
+    print("✓ Sessões incompletas, grandes demais ou removidas recusadas")
+
+
+def test_expired_sessions_removed():
+    """Sessão sem pedaço novo dentro da expiração some"""
+    upload_id = create()
+    part_path, meta_path = ResumableUploadStore._paths(upload_id)
+    old = time.time() - settings.RESUMABLE_UPLOAD_EXPIRY_SECONDS - 1
+    os.utime(part_path, (old, old))
+    assert ResumableUploadStore.cleanup_expired() == 1
+    assert not part_path.exists() and not meta_path.exists()
+    print("✓ Sessões abandonadas expiram")
+
+
+def test_finalize_to_async_and_sync():
+    """Arquivo montado segue pelo /transcribe/async e /transcribe (cache hit, sem fila)"""
+    hasher = new_content_hasher()
+    hasher.update(CONTENT)
+    TranscriptionService._save_to_cache(
+        TranscriptionService.generate_cache_key("", content_hash=hasher.hexdigest()),
+        TranscriptionResponse(
+            success=True,
+            transcription=TranscriptionResult(text="Vídeo montado.", segments=[], language="pt", duration=3.0),
+            processing_time=30.0
+        )
+    )
+
+    original = tasks.transcribe_audio_async.apply_async
+    tasks.transcribe_audio_async.apply_async = lambda *a, **kw: (_ for _ in ()).throw(
+        AssertionError("Hit não deveria enfileirar"))
+    try:
+        upload_id = create()
+        patch(upload_id, 0, CONTENT, checksum(CONTENT))
+        data = client.post(f"/api/uploads/{upload_id}/finalize").json()
+        assert data["state"] == "SUCCESS" and data["result"]["transcription"]["text"] == "Vídeo montado."
+        assert client.get(f"/api/uploads/{upload_id}").json()["success"] is False
+    finally:
+        tasks.transcribe_audio_async.apply_async = original
+
+    upload_id = create()
+    patch(upload_id, 0, CONTENT)
+    data = client.post(f"/api/uploads/{upload_id}/finalize", {"mode": "sync"}).json()
+    assert data["success"] is True and data["transcription"]["text"] == "Vídeo montado."
+    assert not os.path.exists(os.path.join(settings.TEMP_AUDIO_DIR, f"upload_part_{upload_id}.part"))
+    print("✓ Finalização entrega o arquivo aos caminhos async e sync")
+
+
+def main():
+    """Run all tests"""
+    try:
+        get_cache_manager().clear()
+        test_resume_from_offset()
+        test_checksum_mismatch_rolled_back()
+        test_incomplete_and_invalid_sessions()
+        test_expired_sessions_removed()
+        test_finalize_to_async_and_sync()
+        print("\n✅ TODOS OS TESTES DO UPLOAD RETOMÁVEL PASSARAM")
+        return 0
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+"""
+Testes do streaming de segmentos (/transcribe/stream)
+
+Usa uma engine falsa que devolve um segmento por trecho; não carrega o Whisper.
+
+Uso:
+    python tests/test_streaming.py
+"""
+import os
+import sys
+import json
+import django
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+import numpy as np
+from django.conf import settings
+
+from transcription.api import format_sse
+from transcription.inference_engines import InferenceEngine
+from transcription.pcm_decoder import SAMPLE_RATE
+
+
+class FakeEngine(InferenceEngine):
+    """Um segmento cobrindo o trecho inteiro; registra cada chamada"""
+
+    name = "fake"
+
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, model, audio, language):
+        duration = len(audio) / SAMPLE_RATE
+        self.calls.append(duration)
+        return {
+            "text": f"trecho {len(self.calls)}",
+            "segments": [{"start": 0.0, "end": duration, "text": f"trecho {len(self.calls)}",
+                          "no_speech_prob": 0.1}],
+            "language": language,
+            "duration": duration,
+        }
+
+
+def test_default_stream_is_incremental():
+    """Cada trecho é transcrito só quando o consumidor pede o próximo segmento"""
+    engine = FakeEngine()
+    samples = (0.1 * np.random.default_rng(0).standard_normal(
+        int(settings.STREAM_CHUNK_SECONDS * 4 * SAMPLE_RATE))).astype(np.float32)
+
+    stream = engine.transcribe_stream(None, samples, "pt")
+    first = next(stream)
+    assert len(engine.calls) == 1, "Primeiro segmento deveria sair após um único trecho"
+    assert first["start"] == 0.0
+
+    rest = list(stream)
+    segments = [first] + rest
+    assert len(engine.calls) > 1
+    assert len(segments) == len(engine.calls)
+    starts = [seg["start"] for seg in segments]
+    assert starts == sorted(starts), "Timestamps absolutos e em ordem"
+    print(f"✓ {len(segments)} segmentos entregues um trecho por vez")
+
+
+def test_format_sse():
+    """Evento SSE: linha event, linha data com JSON e linha em branco"""
+    message = format_sse("segment", {"text": "olá", "start": 1.5})
+    assert message.startswith("event: segment\n")
+    assert message.endswith("\n\n")
+    data_line = message.splitlines()[1]
+    assert data_line.startswith("data: ")
+    assert json.loads(data_line[len("data: "):]) == {"text": "olá", "start": 1.5}
+    print("✓ Formato SSE correto")
+
+
+def main():
+    """Run all tests"""
+    try:
+        test_default_stream_is_incremental()
+        test_format_sse()
+        print("\n✅ TODOS OS TESTES DE STREAMING PASSARAM")
+        return 0
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
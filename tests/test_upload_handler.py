@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+"""
+Testes do StreamingUploadHandler (upload direto para o disco, hash e limite no envio)
+
+Uso:
+    python tests/test_upload_handler.py
+"""
+import os
+import sys
+import glob
+import tracemalloc
+import django
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client
+
+from transcription.cache_manager import new_content_hasher
+from transcription.upload_handler import PART_PREFIX, StreamedUploadedFile
+
+BOUNDARY = "daredevilboundary"
+BLOCK = 256 * 1024
+
+
+class GeneratedBody:
+    """Corpo multipart gerado sob demanda - o arquivo nunca existe inteiro na memória"""
+
+    def __init__(self, file_size: int):
+        self.head = (
+            f"--{BOUNDARY}\r\n"
+            f'Content-Disposition: form-data; name="file"; filename="audio.wav"\r\n'
+            f"Content-Type: audio/wav\r\n\r\n"
+        ).encode()
+        self.tail = f"\r\n--{BOUNDARY}--\r\n".encode()
+        self.file_size = file_size
+        self.length = len(self.head) + file_size + len(self.tail)
+        self.pos = 0
+
+    @staticmethod
+    def block(index: int) -> bytes:
+        return bytes([index % 251]) * BLOCK
+
+    def _byte_range(self, start: int, end: int) -> bytes:
+        parts = []
+        offset = len(self.head)
+        if start < offset:
+            parts.append(self.head[start:min(end, offset)])
+        file_start, file_end = max(start, offset) - offset, min(end, offset + self.file_size) - offset
+        while file_start < file_end:
+            index, inner = divmod(file_start, BLOCK)
+            piece = self.block(index)[inner:inner + file_end - file_start]
+            parts.append(piece)
+            file_start += len(piece)
+        if end > offset + self.file_size:
+            tail_start = max(start - offset - self.file_size, 0)
+            parts.append(self.tail[tail_start:end - offset - self.file_size])
+        return b"".join(parts)
+
+    def read(self, size: int = -1) -> bytes:
+        end = self.length if size is None or size < 0 else min(self.pos + size, self.length)
+        data = self._byte_range(self.pos, end)
+        self.pos = end
+        return data
+
+    def readline(self, size: int = -1) -> bytes:
+        start = self.pos
+        data = self.read(BLOCK if size is None or size < 0 else size)
+        newline = data.find(b"\n")
+        if newline >= 0:
+            data = data[:newline + 1]
+            self.pos = start + len(data)
+        return data
+
+    def expected_hash(self) -> str:
+        hasher = new_content_hasher()
+        for index in range(self.file_size // BLOCK):
+            hasher.update(self.block(index))
+        return hasher.hexdigest()
+
+
+def make_request(body: GeneratedBody) -> WSGIRequest:
+    return WSGIRequest({
+        "REQUEST_METHOD": "POST",
+        "PATH_INFO": "/api/transcribe",
+        "CONTENT_TYPE": f"multipart/form-data; boundary={BOUNDARY}",
+        "CONTENT_LENGTH": str(body.length),
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "80",
+        "wsgi.input": body,
+    })
+
+
+def part_files() -> set:
+    return set(glob.glob(os.path.join(settings.TEMP_AUDIO_DIR, f"{PART_PREFIX}*")))
+
+
+def test_streams_to_disk_with_flat_memory():
+    """64MB de upload com pico de memória de poucos pedaços e hash correto"""
+    body = GeneratedBody(64 * 1024 * 1024)
+    request = make_request(body)
+
+    tracemalloc.start()
+    upload = request.FILES["file"]
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert isinstance(upload, StreamedUploadedFile)
+    assert upload.size == body.file_size
+    assert os.path.getsize(upload.temporary_file_path()) == body.file_size
+    assert upload.content_hash == body.expected_hash()
+    assert peak < 16 * 1024 * 1024, f"Pico de {peak / 1024 / 1024:.1f}MB"
+
+    path = upload.temporary_file_path()
+    request.close()
+    assert not os.path.exists(path), "Arquivo não movido deve sair no fim da requisição"
+    print(f"✓ 64MB gravados em disco com pico de {peak / 1024 / 1024:.1f}MB e hash no envio")
+
+
+def test_size_limit_enforced_mid_stream():
+    """Acima de MAX_AUDIO_SIZE_MB o conteúdo é descartado e só o tamanho é contado"""
+    original = settings.MAX_AUDIO_SIZE_MB
+    settings.MAX_AUDIO_SIZE_MB = 1
+    try:
+        request = make_request(GeneratedBody(3 * 1024 * 1024))
+        upload = request.FILES["file"]
+        assert upload.content_hash is None
+        assert upload.size == 3 * 1024 * 1024
+        assert os.path.getsize(upload.temporary_file_path()) == 0
+        request.close()
+
+        data = Client(HTTP_HOST="localhost").post("/api/transcribe", {
+            "file": SimpleUploadedFile("audio.wav", b"x" * (2 * 1024 * 1024), content_type="audio/wav")
+        }).json()
+        assert data["success"] is False and "muito grande" in data["error"]
+    finally:
+        settings.MAX_AUDIO_SIZE_MB = original
+    print("✓ Limite de tamanho aplicado durante o envio")
+
+
+def test_no_leftovers_after_requests():
+    """Uploads recusados pela view não deixam arquivo parcial no disco"""
+    before = part_files()
+    data = Client(HTTP_HOST="localhost").post("/api/transcribe", {
+        "file": SimpleUploadedFile("audio.xyz", b"formato nao suportado", content_type="audio/wav")
+    }).json()
+    assert data["success"] is False and "não suportado" in data["error"]
+    assert part_files() == before
+    print("✓ Nenhum arquivo parcial sobra após a requisição")
+
+
+def main():
+    """Run all tests"""
+    try:
+        test_streams_to_disk_with_flat_memory()
+        test_size_limit_enforced_mid_stream()
+        test_no_leftovers_after_requests()
+        print("\n✅ TODOS OS TESTES DO UPLOAD EM STREAMING PASSARAM")
+        return 0
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""
+Testes do precheck por hash (/transcribe/precheck) e do upload_token
+
+Uso:
+    python tests/test_upload_precheck.py
+"""
+import os
+import sys
+import hashlib
+import django
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client
+
+from transcription.api import _issue_upload_token, _upload_token_error
+from transcription.cache_manager import get_cache_manager
+from transcription.schemas import TranscriptionResponse, TranscriptionResult
+from transcription.services import TranscriptionService
+
+client = Client(HTTP_HOST="localhost")
+
+
+def blake(data: bytes) -> str:
+    """Mesmo hash que o cliente calcula (BLAKE2b, 128 bits)"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def test_miss_returns_token():
+    """Miss devolve upload_token amarrado ao hash"""
+    content_hash = blake(b"arquivo ainda nao transcrito")
+    data = client.post("/api/transcribe/precheck", {"content_hash": content_hash}).json()
+    assert data["cached"] is False and data["upload_token"]
+
+    token = data["upload_token"]
+    assert _upload_token_error(token, content_hash) is None
+    assert "não corresponde" in _upload_token_error(token, blake(b"outro arquivo"))
+    assert _upload_token_error(token + "x", content_hash) == "upload_token inválido"
+    print("✓ Miss com upload_token verificável")
+
+
+def test_hit_without_upload():
+    """Hit devolve a transcrição do cache só com o hash"""
+    content_hash = blake(b"arquivo ja transcrito")
+    cache_key = TranscriptionService.generate_cache_key("", content_hash=content_hash)
+    TranscriptionService._save_to_cache(cache_key, TranscriptionResponse(
+        success=True,
+        transcription=TranscriptionResult(text="Olá mundo.", segments=[], language="pt", duration=1.0),
+        processing_time=12.0
+    ))
+
+    data = client.post("/api/transcribe/precheck", {"content_hash": content_hash.upper()}).json()
+    assert data["cached"] is True and data["success"] is True
+    assert data["transcription"]["text"] == "Olá mundo."
+    assert "upload_token" not in data
+    print("✓ Hit servido sem upload")
+
+
+def test_invalid_hash_and_rejected_content():
+    """Hash mal formado e conteúdo já recusado não recebem token"""
+    data = client.post("/api/transcribe/precheck", {"content_hash": "abc"}).json()
+    assert data["success"] is False and "upload_token" not in data
+
+    content_hash = blake(b"arquivo corrompido")
+    get_cache_manager().mark_invalid_media(content_hash, "Arquivo não contém faixa de áudio")
+    data = client.post("/api/transcribe/precheck", {"content_hash": content_hash}).json()
+    assert data["success"] is False and data["error"] == "Arquivo não contém faixa de áudio"
+    print("✓ Hash inválido e conteúdo recusado respondidos sem token")
+
+
+def test_upload_checked_against_token():
+    """Upload com conteúdo diferente do anunciado é recusado"""
+    token = _issue_upload_token(blake(b"conteudo anunciado"))
+    upload = SimpleUploadedFile("audio.wav", b"conteudo diferente", content_type="audio/wav")
+    data = client.post("/api/transcribe", {"file": upload, "upload_token": token}).json()
+    assert data["success"] is False and "não corresponde" in data["error"]
+    print("✓ Upload divergente do precheck recusado")
+
+
+def main():
+    """Run all tests"""
+    try:
+        get_cache_manager().clear()
+        test_miss_returns_token()
+        test_hit_without_upload()
+        test_invalid_hash_and_rejected_content()
+        test_upload_checked_against_token()
+        print("\n✅ TODOS OS TESTES DO PRECHECK PASSARAM")
+        return 0
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+"""
+Testes do pré-filtro de fala (VAD) e do mapa de tempo
+
+Usa áudio sintético (tom = fala, zeros = silêncio); não carrega o Whisper.
+
+Uso:
+    python tests/test_vad.py
+"""
+import os
+import sys
+import django
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+import numpy as np
+
+from transcription.pcm_decoder import SAMPLE_RATE
+from transcription.schemas import TranscriptionResult, TranscriptionSegment
+from transcription.vad import (
+    EnergySpeechDetector,
+    TimeMap,
+    apply_vad,
+    get_speech_detector,
+    is_silent,
+)
+
+
+def tone(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (0.5 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+
+def test_energy_detector_finds_speech():
+    """Regiões de fala separadas por silêncios longos"""
+    samples = np.concatenate([silence(10), tone(3), silence(20), tone(2), silence(5)])
+    regions = EnergySpeechDetector().detect(samples)
+
+    assert len(regions) == 2, f"Esperado 2 regiões, obtido {regions}"
+    (s1, e1), (s2, e2) = regions
+    assert abs(s1 / SAMPLE_RATE - 10) < 0.1 and abs(e1 / SAMPLE_RATE - 13) < 0.1
+    assert abs(s2 / SAMPLE_RATE - 33) < 0.1 and abs(e2 / SAMPLE_RATE - 35) < 0.1
+    print("✓ Detector por energia encontrou as regiões de fala")
+
+
+def test_apply_vad_and_time_map():
+    """Áudio compactado + mapa de tempo levam de volta ao original"""
+    samples = np.concatenate([silence(10), tone(3), silence(20), tone(2), silence(5)])
+    regions = [(10 * SAMPLE_RATE, 13 * SAMPLE_RATE), (33 * SAMPLE_RATE, 35 * SAMPLE_RATE)]
+
+    compact, time_map = apply_vad(samples, regions, padding_ms=0, gap_ms=500)
+    assert abs(len(compact) / SAMPLE_RATE - 5.5) < 1e-3, "3s + 0,5s de intervalo + 2s"
+
+    assert abs(time_map.to_original(0.0) - 10.0) < 1e-6
+    assert abs(time_map.to_original(1.5) - 11.5) < 1e-6
+    assert abs(time_map.to_original(3.2) - 13.0) < 1e-6, "Intervalo mapeia para o fim do trecho"
+    assert abs(time_map.to_original(3.5) - 33.0) < 1e-6
+    assert abs(time_map.to_original(5.0) - 34.5) < 1e-6
+    print("✓ Mapa de tempo converte para o arquivo original")
+
+
+def test_padding_merges_close_regions():
+    """Margens que se sobrepõem unem as regiões"""
+    samples = silence(10)
+    regions = [(1 * SAMPLE_RATE, 2 * SAMPLE_RATE), (2 * SAMPLE_RATE + 1600, 3 * SAMPLE_RATE)]
+    compact, time_map = apply_vad(samples, regions, padding_ms=200, gap_ms=300)
+    assert len(time_map.pieces) == 1
+    assert abs(len(compact) / SAMPLE_RATE - 2.4) < 1e-3
+    print("✓ Regiões próximas unidas pela margem")
+
+
+def test_remap_result():
+    """Segmentos do resultado passam a usar tempos do original"""
+    time_map = TimeMap()
+    time_map.add(10.0, 0.0, 3.0)
+    time_map.add(33.0, 3.5, 2.0)
+
+    result = TranscriptionResult(
+        text="um dois",
+        segments=[
+            TranscriptionSegment(start=0.2, end=2.8, text="um"),
+            TranscriptionSegment(start=3.6, end=5.4, text="dois"),
+        ],
+        language="pt",
+        duration=5.5
+    )
+    remapped = time_map.remap_result(result, original_duration=40.0)
+
+    assert [(s.start, s.end) for s in remapped.segments] == [(10.2, 12.8), (33.1, 34.9)]
+    assert remapped.duration == 40.0 and remapped.text == "um dois"
+    print("✓ Timestamps do resultado remapeados")
+
+
+def test_detector_registry():
+    """Detectores selecionáveis por nome"""
+    assert get_speech_detector("energy").name == "energy"
+    try:
+        get_speech_detector("inexistente")
+        raise AssertionError("Detector inexistente deveria gerar ValueError")
+    except ValueError:
+        pass
+    print("✓ Registro de detectores")
+
+
+def test_is_silent():
+    """Early-exit: silêncio digital, ruído baixo e cliques isolados são silêncio"""
+    rng = np.random.default_rng(0)
+
+    assert is_silent(silence(10)), "Zeros deveriam ser silêncio"
+    assert is_silent(np.zeros(0, dtype=np.float32)), "Áudio vazio deveria ser silêncio"
+    noise = (rng.standard_normal(10 * SAMPLE_RATE) * 1e-4).astype(np.float32)
+    assert is_silent(noise), "Ruído de fundo muito baixo deveria ser silêncio"
+    click = silence(10)
+    click[SAMPLE_RATE] = 0.9
+    assert is_silent(click), "Clique isolado não é fala"
+
+    assert not is_silent(np.concatenate([silence(5), tone(2), silence(5)]))
+    print("✓ Áudio silencioso detectado sem o modelo")
+
+
+def main():
+    """Run all tests"""
+    try:
+        test_energy_detector_finds_speech()
+        test_apply_vad_and_time_map()
+        test_padding_merges_close_regions()
+        test_remap_result()
+        test_detector_registry()
+        test_is_silent()
+        print("\n✅ TODOS OS TESTES DE VAD PASSARAM")
+        return 0
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
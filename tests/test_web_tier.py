@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+"""
+Testes de isolamento do processo web
+
+Importa a API em um processo novo e verifica que torch/whisper não são
+carregados, medindo tempo de inicialização e RSS do processo web.
+
+Uso:
+    python tests/test_web_tier.py
+"""
+import os
+import sys
+import json
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import os, sys, json, time
+start = time.time()
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+import django
+django.setup()
+import transcription.api
+from transcription.worker_status import HEAVY_MODULES, get_process_info
+info = get_process_info()
+info["import_seconds"] = round(time.time() - start, 2)
+print(json.dumps(info))
+"""
+
+
+def run_probe() -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_api_does_not_import_inference():
+    """Importar a API não carrega torch, whisper nem faster-whisper"""
+    info = run_probe()
+    assert not info["heavy_modules_loaded"], \
+        f"Processo web importou módulos de inferência: {info['heavy_modules_loaded']}"
+    print("✓ API importada sem torch/whisper")
+    print(f"  import: {info['import_seconds']}s | startup: {info.get('startup_seconds')}s | "
+          f"RSS: {info.get('rss_mb')}MB")
+
+
+def main():
+    """Run all tests"""
+    try:
+        test_api_does_not_import_inference()
+        print("\n✅ TODOS OS TESTES DO PROCESSO WEB PASSARAM")
+        return 0
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -20,6 +20,8 @@ import requests
 import time
 import sys
 import json
+import base64
+import hashlib
 from pathlib import Path
 from typing import Optional, Dict, Any
 
@@ -27,16 +29,26 @@ from typing import Optional, Dict, Any
 class DaredevilAsyncClient:
     """Cliente para API assíncrona de transcrição com polling"""
     
-    def __init__(self, base_url: str = "http://localhost:8000/api", timeout: int = 300):
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000/api",
+        timeout: int = 300,
+        resumable_threshold: int = 32 * 1024 * 1024,
+        chunk_size: int = 8 * 1024 * 1024
+    ):
         """
         Inicializa cliente
         
         Args:
             base_url: URL base da API (padrão: http://localhost:8000/api)
             timeout: Timeout máximo de polling em segundos (padrão: 300 = 5 min)
+            resumable_threshold: A partir deste tamanho o envio é retomável, em pedaços (padrão: 32 MB)
+            chunk_size: Tamanho de cada pedaço do upload retomável (padrão: 8 MB)
         """
         self.base_url = base_url.rstrip('/')
         self.timeout = timeout
+        self.resumable_threshold = resumable_threshold
+        self.chunk_size = chunk_size
         
     def transcribe(
         self,
@@ -44,7 +56,8 @@ class DaredevilAsyncClient:
         language: str = "pt",
         model: Optional[str] = None,
         poll_interval: int = 2,
-        verbose: bool = True
+        verbose: bool = True,
+        precheck: bool = True
     ) -> Dict[str, Any]:
         """
         Transcreve arquivo com polling automático
@@ -55,15 +68,44 @@ class DaredevilAsyncClient:
             model: Modelo Whisper (tiny, base, small, medium, large)
             poll_interval: Intervalo entre polls em segundos (padrão: 2)
             verbose: Exibir progresso (padrão: True)
+            precheck: Perguntar pelo hash antes de enviar o arquivo (padrão: True)
             
         Returns:
             Resultado da transcrição com 'success', 'transcription', 'audio_info', etc
         """
+        # ✅ NOVO: Step 0: Arquivo já transcrito? (só o hash é enviado)
+        upload_token = None
+        if precheck:
+            prechecked = self.precheck(file_path, language, model)
+            if prechecked is not None and 'upload_token' not in prechecked:
+                if verbose:
+                    if prechecked.get('success'):
+                        print(f"\n⚡ Já transcrito - resultado do cache, sem upload")
+                    else:
+                        print(f"\n⛔ Arquivo recusado sem upload: {prechecked.get('error')}")
+                return prechecked
+            if prechecked is not None:
+                upload_token = prechecked['upload_token']
+        
         # Step 1: Upload
         if verbose:
             print(f"\n📤 Uploading: {file_path}")
         
-        task_id = self._upload_file(file_path, language, model)
+        submission = None
+        if Path(file_path).exists() and Path(file_path).stat().st_size >= self.resumable_threshold:
+            # ✅ NOVO: Arquivo grande - pedaços retomáveis em vez de um POST único
+            upload_id = self.upload_resumable(file_path, verbose=verbose)
+            if upload_id is not None:
+                submission = self._finalize_upload(upload_id, language, model, upload_token)
+        if submission is None:
+            submission = self._upload_file(file_path, language, model, upload_token)
+        task_id = submission['task_id']
+        
+        # ✅ NOVO: Hit do cache - resultado já veio na resposta do upload
+        if submission.get('state') == 'SUCCESS':
+            if verbose:
+                print(f"⚡ Já transcrito - resultado do cache, sem fila")
+            return submission['result']
         
         if verbose:
             print(f"✅ Upload concluído")
@@ -78,8 +120,169 @@ class DaredevilAsyncClient:
         
         return result
     
-    def _upload_file(self, file_path: str, language: str, model: Optional[str]) -> str:
-        """Faz upload do arquivo e retorna task_id"""
+    @staticmethod
+    def content_hash(file_path: str) -> str:
+        """Hash do arquivo no formato do servidor (BLAKE2b de 128 bits, em hex)"""
+        hasher = hashlib.blake2b(digest_size=16)
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+    
+    def precheck(
+        self,
+        file_path: str,
+        language: str = "pt",
+        model: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        ✅ NOVO: Consulta /transcribe/precheck pelo hash, sem enviar o arquivo
+        
+        Returns:
+            Resultado da transcrição (cache ou arquivo já recusado), dict com
+            'upload_token' se o arquivo precisa ser enviado, ou None se o
+            servidor não tem o endpoint
+        """
+        if not Path(file_path).exists():
+            raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
+        
+        data = {'content_hash': self.content_hash(file_path), 'language': language}
+        if model:
+            data['model'] = model
+        
+        response = requests.post(f"{self.base_url}/transcribe/precheck", data=data)
+        if response.status_code == 404:
+            return None  # Servidor sem precheck: enviar normalmente
+        if response.status_code != 200:
+            raise Exception(f"Precheck failed: {response.status_code} - {response.text}")
+        
+        return response.json()
+    
+    def upload_resumable(
+        self,
+        file_path: str,
+        upload_id: Optional[str] = None,
+        max_retries: int = 5,
+        verbose: bool = True
+    ) -> Optional[str]:
+        """
+        ✅ NOVO: Envia o arquivo em pedaços por /uploads, retomando após falhas
+        
+        Cada pedaço leva Upload-Checksum (sha256); se a conexão cair ou o
+        servidor recusar o pedaço, o envio continua do offset confirmado.
+        
+        Args:
+            upload_id: Sessão existente a retomar (ex.: de uma execução anterior)
+            max_retries: Falhas seguidas toleradas antes de desistir
+            
+        Returns:
+            upload_id da sessão completa (finalizar com mode async/sync), ou
+            None se o servidor não tem upload retomável
+        """
+        path = Path(file_path)
+        if not path.exists():
+            raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
+        size = path.stat().st_size
+        
+        if upload_id is None:
+            response = requests.post(
+                f"{self.base_url}/uploads", data={'filename': path.name, 'size': size})
+            if response.status_code == 404:
+                return None  # Servidor sem /uploads: enviar normalmente
+            session = response.json()
+            if not session.get('success'):
+                raise Exception(f"Upload error: {session.get('error')}")
+            upload_id = session['upload_id']
+            offset = 0
+        else:
+            offset = self._upload_offset(upload_id)
+        
+        failures = 0
+        with open(file_path, 'rb') as f:
+            while offset < size:
+                f.seek(offset)
+                chunk = f.read(self.chunk_size)
+                digest = base64.b64encode(hashlib.sha256(chunk).digest()).decode()
+                try:
+                    result = requests.patch(
+                        f"{self.base_url}/uploads/{upload_id}",
+                        data=chunk,
+                        headers={
+                            'Upload-Offset': str(offset),
+                            'Upload-Checksum': f"sha256 {digest}",
+                            'Content-Type': 'application/offset+octet-stream',
+                        }
+                    ).json()
+                except (requests.RequestException, ValueError) as e:
+                    result = {'success': False, 'error': str(e), 'offset': None}
+                
+                if result.get('success'):
+                    offset = result['offset']
+                    failures = 0
+                    if verbose:
+                        print(f"  ⬆️  {offset * 100 // size}% ({offset / 1024 / 1024:.1f}MB)", end='\r')
+                    continue
+                
+                # Resposta sem offset = sessão não existe mais (expirou/cancelada)
+                failures += 1
+                if 'offset' not in result or failures > max_retries:
+                    raise Exception(f"Upload failed: {result.get('error')} (upload_id: {upload_id})")
+                if verbose:
+                    print(f"\n⚠️  {result.get('error')} - retomando")
+                time.sleep(min(2 ** failures, 30))
+                
+                # Retoma do offset que o servidor confirmou
+                if result['offset'] is not None:
+                    offset = result['offset']
+                else:
+                    try:
+                        offset = self._upload_offset(upload_id)
+                    except Exception:
+                        pass  # Servidor ainda inacessível: tenta o mesmo offset
+        
+        if verbose:
+            print(f"  ⬆️  100% ({size / 1024 / 1024:.1f}MB)")
+        return upload_id
+    
+    def _upload_offset(self, upload_id: str) -> int:
+        """Bytes já confirmados pelo servidor na sessão"""
+        session = requests.get(f"{self.base_url}/uploads/{upload_id}").json()
+        if not session.get('success'):
+            raise Exception(f"Upload error: {session.get('error')} (upload_id: {upload_id})")
+        return session['offset']
+    
+    def _finalize_upload(
+        self,
+        upload_id: str,
+        language: str,
+        model: Optional[str],
+        upload_token: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Finaliza o upload retomável no modo async (mesma resposta de /transcribe/async)"""
+        data = {'language': language, 'mode': 'async'}
+        if model:
+            data['model'] = model
+        if upload_token:
+            data['upload_token'] = upload_token
+        
+        response = requests.post(f"{self.base_url}/uploads/{upload_id}/finalize", data=data)
+        if response.status_code != 200:
+            raise Exception(f"Finalize failed: {response.status_code} - {response.text}")
+        
+        result = response.json()
+        if not result.get('success'):
+            raise Exception(f"Upload error: {result.get('error')}")
+        
+        return result
+    
+    def _upload_file(
+        self,
+        file_path: str,
+        language: str,
+        model: Optional[str],
+        upload_token: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Faz upload do arquivo e retorna a submissão (task_id; result se já em cache)"""
         # Validar arquivo
         path = Path(file_path)
         if not path.exists():
@@ -93,6 +296,8 @@ class DaredevilAsyncClient:
             data = {'language': language}
             if model:
                 data['model'] = model
+            if upload_token:
+                data['upload_token'] = upload_token
             
             response = requests.post(url, files=files, data=data)
         
@@ -103,7 +308,7 @@ class DaredevilAsyncClient:
         if not result.get('success'):
             raise Exception(f"Upload error: {result.get('error')}")
         
-        return result['task_id']
+        return result
     
     def _poll_for_result(
         self,
@@ -2,16 +2,21 @@
 API endpoints usando Django Ninja
 """
 import os
+import re
+import asyncio
+import json
 import time
+import uuid
 import logging
 from typing import List, Optional
 from pathlib import Path
 
-import torch
 from ninja import NinjaAPI, File, Form
 from ninja.files import UploadedFile
 from django.conf import settings
-from django.http import HttpRequest
+from django.core import signing
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
 
 from .schemas import (
     TranscriptionResponse,
@@ -19,12 +24,24 @@ from .schemas import (
     BatchTranscriptionResponse,
     TranscribeRequest
 )
-from .services import TranscriptionService, WhisperTranscriber
-from .cache_manager import get_cache_manager
+from .services import TranscriptionService
+from .inference_engines import ENGINES
+from .cache_manager import get_cache_manager, new_content_hasher
+from .artifact_cache import get_artifact_cache
+from .single_flight import get_single_flight
+from .resumable_upload import ResumableUploadStore  # ✅ NOVO: Upload retomável
+from .async_executors import (  # ✅ NOVO: Views async com trabalho bloqueante em pools limitados
+    get_executor_stats, iterate_in_executor, run_inference, run_io, wait_for_task
+)
 from .memory_manager import MemoryManager  # ✅ NOVO: Proteção de memória
+from .worker_status import get_process_info, mark_process_ready, read_worker_status  # ✅ NOVO: Estado dos workers
 
 logger = logging.getLogger(__name__)
 
+# ✅ NOVO: Precheck por hash - formato de new_content_hasher (BLAKE2b, 128 bits)
+CONTENT_HASH_RE = re.compile(r"^[0-9a-f]{32}$")
+UPLOAD_TOKEN_SALT = "daredevil.transcription.upload-token"
+
 # Criar instância da API
 api = NinjaAPI(
     title="Daredevil Transcription API",
@@ -33,70 +50,77 @@ api = NinjaAPI(
 )
 
 
+def _worker_has_model(worker: dict, key: str, model_name: str, engine: str) -> bool:
+    """Indica se o worker tem o modelo residente ('models') ou carregando ('loading')"""
+    entries = worker.get("model_pool", {}).get(key, [])
+    return any(e.get("model") == model_name and e.get("engine") == engine for e in entries)
+
+
 @api.get("/health", response=HealthResponse, tags=["Health"])
-def health_check(request: HttpRequest):
+async def health_check(request: HttpRequest):
     """
     Verifica o status da API e configurações
 
-    Retorna informações sobre o modelo carregado e configurações disponíveis.
+    ✅ NOVO: O status vem do estado publicado pelos workers de inferência
+    (o processo web não carrega modelos):
+    - **healthy**: há worker ativo
+    - **loading**: o modelo padrão está sendo carregado e nenhum worker o tem pronto
+    - **unhealthy**: nenhum worker publicou estado recentemente
     """
-    try:
-        # Tentar carregar modelo para verificar se está OK
-        model_name = settings.WHISPER_MODEL
-        WhisperTranscriber.load_model(model_name)
-        status = "healthy"
-    except Exception as e:
-        logger.error(f"Health check falhou: {e}")
+    model_name = settings.WHISPER_MODEL
+    engine = settings.WHISPER_ENGINE
+    workers = await run_io(read_worker_status)
+
+    if not workers:
+        logger.error("Health check falhou: nenhum worker de inferência ativo")
         status = "unhealthy"
+    elif not any(_worker_has_model(w, "models", model_name, engine) for w in workers) and \
+            any(_worker_has_model(w, "loading", model_name, engine) for w in workers):
+        status = "loading"
+    else:
+        status = "healthy"
 
     return HealthResponse(
         status=status,
         whisper_model=settings.WHISPER_MODEL,
+        inference_engine=settings.WHISPER_ENGINE,
         supported_formats=settings.ALL_SUPPORTED_FORMATS,
         max_file_size_mb=settings.MAX_AUDIO_SIZE_MB,
-        temp_dir=settings.TEMP_AUDIO_DIR
+        temp_dir=settings.TEMP_AUDIO_DIR,
+        workers=len(workers)
     )
 
 
 @api.get("/gpu-status", tags=["Health"])
-def gpu_status(request: HttpRequest):
+async def gpu_status(request: HttpRequest):
     """
     Verifica o status da GPU e uso de memória
-    
-    Retorna informações sobre GPUs disponíveis e uso atual de memória.
+
+    ✅ NOVO: Informações publicadas por cada worker de inferência (GPUs,
+    uso de memória, pool de modelos residentes, micro-batching), mais as
+    métricas do próprio processo web (RSS, tempo de inicialização, pools
+    das views assíncronas).
     """
-    device = WhisperTranscriber.get_device()
-    
-    if device == "cpu":
-        return {
-            "gpu_available": False,
-            "device": "cpu",
-            "message": "Nenhuma GPU disponível. Usando CPU para processamento."
-        }
-    
-    gpu_info = {
-        "gpu_available": True,
-        "device": device,
-        "gpu_count": torch.cuda.device_count(),
-        "gpus": []
+    workers = await run_io(read_worker_status)
+    gpus = [
+        {**gpu, "worker_id": worker["worker_id"]}
+        for worker in workers
+        for gpu in worker.get("gpus", [])
+    ]
+
+    response = {
+        "gpu_available": bool(gpus),
+        "gpu_count": len(gpus),
+        "gpus": gpus,
+        "workers": workers,
+        "web_process": {**get_process_info(), "executors": get_executor_stats()},
     }
-    
-    for i in range(torch.cuda.device_count()):
-        memory_allocated = torch.cuda.memory_allocated(i) / (1024**3)
-        memory_reserved = torch.cuda.memory_reserved(i) / (1024**3)
-        memory_total = torch.cuda.get_device_properties(i).total_memory / (1024**3)
-        
-        gpu_info["gpus"].append({
-            "id": i,
-            "name": torch.cuda.get_device_name(i),
-            "memory_allocated_gb": round(memory_allocated, 2),
-            "memory_reserved_gb": round(memory_reserved, 2),
-            "memory_total_gb": round(memory_total, 2),
-            "memory_free_gb": round(memory_total - memory_reserved, 2),
-            "compute_capability": f"{torch.cuda.get_device_capability(i)[0]}.{torch.cuda.get_device_capability(i)[1]}"
-        })
-    
-    return gpu_info
+    if not workers:
+        response["message"] = "Nenhum worker de inferência publicou estado recentemente."
+    elif not gpus:
+        response["message"] = "Nenhuma GPU disponível. Workers usando CPU para processamento."
+
+    return response
 
 
 @api.get("/memory-status", tags=["Health"])
@@ -126,6 +150,7 @@ def cleanup_temp_files(request: HttpRequest):
     """
     try:
         deleted = MemoryManager.cleanup_old_temp_files(max_age_hours=1)
+        deleted += ResumableUploadStore.cleanup_expired()
         usage = MemoryManager.get_memory_usage()
         return {
             "success": True,
@@ -141,8 +166,22 @@ def cleanup_temp_files(request: HttpRequest):
         }
 
 
+def _collect_cache_stats() -> dict:
+    """Estatísticas dos caches (lê Redis/SQLite - rodar no executor de I/O)"""
+    cache_manager = get_cache_manager()
+    stats = cache_manager.get_stats()
+    stats["cache_enabled"] = True
+    # ✅ NOVO: ffprobe e áudio convertido reaproveitados entre requisições
+    artifact_cache = get_artifact_cache()
+    stats["artifacts"] = artifact_cache.get_stats() if artifact_cache else {"enabled": False}
+    # ✅ NOVO: Requisições idênticas que esperaram em vez de transcrever
+    single_flight = get_single_flight()
+    stats["single_flight"] = single_flight.get_stats() if single_flight else {"enabled": False}
+    return stats
+
+
 @api.get("/cache-stats", tags=["Health"])
-def cache_stats(request: HttpRequest):
+async def cache_stats(request: HttpRequest):
     """
     Retorna estatísticas do cache de transcrições
     
@@ -155,10 +194,7 @@ def cache_stats(request: HttpRequest):
         }
     
     try:
-        cache_manager = get_cache_manager()
-        stats = cache_manager.get_stats()
-        stats["cache_enabled"] = True
-        return stats
+        return await run_io(_collect_cache_stats)
     except Exception as e:
         logger.error(f"Erro ao obter estatísticas do cache: {e}")
         return {
@@ -172,7 +208,8 @@ def clear_cache(request: HttpRequest):
     """
     Limpa todo o cache de transcrições
     
-    Remove todos os itens do cache em memória e disco (se habilitado).
+    Remove todos os itens do cache em memória e disco (se habilitado) e os
+    artefatos intermediários (ffprobe e áudio convertido).
     Requer autenticação em produção.
     """
     if not settings.ENABLE_CACHE:
@@ -184,6 +221,9 @@ def clear_cache(request: HttpRequest):
     try:
         cache_manager = get_cache_manager()
         cache_manager.clear()
+        artifact_cache = get_artifact_cache()
+        if artifact_cache is not None:
+            artifact_cache.clear()
         return {
             "success": True,
             "message": "Cache limpo com sucesso"
@@ -196,8 +236,206 @@ def clear_cache(request: HttpRequest):
         }
 
 
+def _save_upload(file: UploadedFile, destination: str) -> str:
+    """
+    ✅ NOVO: Grava o upload em disco calculando o hash do conteúdo no caminho
+
+    Uploads recebidos pelo StreamingUploadHandler já estão em TEMP_AUDIO_DIR
+    com o hash pronto: basta renomear (sem segunda cópia).
+
+    Returns:
+        Hash do conteúdo (chave de cache) - o arquivo não precisa ser relido
+    """
+    content_hash = getattr(file, 'content_hash', None)
+    if content_hash:
+        os.replace(file.temporary_file_path(), destination)
+        return content_hash
+
+    hasher = new_content_hasher()
+    with open(destination, 'wb') as f:
+        for chunk in file.chunks():
+            hasher.update(chunk)
+            f.write(chunk)
+    return hasher.hexdigest()
+
+
+def _remove_temp_file(temp_file_path: Optional[str]) -> None:
+    """Remove o arquivo temporário do upload, se ainda existir"""
+    if temp_file_path and os.path.exists(temp_file_path):
+        try:
+            os.remove(temp_file_path)
+            logger.info(f"Arquivo temporário removido: {temp_file_path}")
+        except Exception as e:
+            logger.warning(f"Erro ao remover arquivo: {e}")
+
+
+def _cached_response_body(
+    cache_key: Optional[str],
+    start_time: float
+) -> Optional[bytes]:
+    """
+    ✅ NOVO: JSON da TranscriptionResponse em cache (None em miss ou erro)
+
+    Sem reconstruir TranscriptionResponse nem serializar de novo: o custo não
+    depende do tamanho da transcrição.
+    """
+    if not settings.ENABLE_CACHE or not cache_key:
+        return None
+    try:
+        return TranscriptionService.get_cached_response_body(cache_key, start_time)
+    except Exception as e:
+        logger.warning(f"Erro ao verificar cache: {e}")
+        return None
+
+
+def _request_cache_key(
+    file_path: str,
+    language: Optional[str],
+    model: Optional[str],
+    engine: Optional[str],
+    content_hash: str
+) -> Optional[str]:
+    """Chave de cache da requisição (None com cache desabilitado ou em erro)"""
+    if not settings.ENABLE_CACHE:
+        return None
+    try:
+        return TranscriptionService.generate_cache_key(
+            file_path, model, language, engine, content_hash=content_hash)
+    except Exception as e:
+        logger.warning(f"Erro ao gerar chave de cache: {e}")
+        return None
+
+
+def _cached_http_response(
+    file_path: str,
+    language: Optional[str],
+    model: Optional[str],
+    engine: Optional[str],
+    content_hash: str,
+    start_time: float
+) -> Optional[HttpResponse]:
+    """
+    ✅ NOVO: Hit do cache devolvido com os bytes guardados
+
+    None em miss (segue o fluxo normal).
+    """
+    cache_key = _request_cache_key(file_path, language, model, engine, content_hash)
+    body = _cached_response_body(cache_key, start_time)
+    if body is None:
+        return None
+    return HttpResponse(body, content_type="application/json")
+
+
+# ✅ NOVO: Pseudo-tarefa de um hit no /transcribe/async (resultado já pronto no cache)
+CACHED_TASK_PREFIX = "cached-"
+
+
+def _json_with_result(fields: dict, result_body: bytes) -> HttpResponse:
+    """Resposta JSON com os campos informados e `result` = bytes do cache, sem reserializar"""
+    head = json.dumps(fields, ensure_ascii=False, separators=(',', ':'))
+    return HttpResponse(
+        head[:-1].encode('utf-8') + b',"result":' + result_body + b'}',
+        content_type="application/json"
+    )
+
+
+def _issue_upload_token(content_hash: str) -> str:
+    """✅ NOVO: Token assinado que amarra o próximo upload ao hash do precheck"""
+    return signing.TimestampSigner(salt=UPLOAD_TOKEN_SALT).sign(content_hash)
+
+
+def _upload_token_error(upload_token: Optional[str], content_hash: str) -> Optional[str]:
+    """
+    ✅ NOVO: Confere o arquivo recebido com o hash anunciado no precheck
+
+    Returns:
+        Mensagem de erro, ou None se não há token ou o conteúdo confere
+    """
+    if not upload_token:
+        return None
+    try:
+        expected_hash = signing.TimestampSigner(salt=UPLOAD_TOKEN_SALT).unsign(
+            upload_token, max_age=settings.UPLOAD_TOKEN_MAX_AGE_SECONDS)
+    except signing.SignatureExpired:
+        return "upload_token expirado. Refaça o precheck."
+    except signing.BadSignature:
+        return "upload_token inválido"
+    if expected_hash != content_hash:
+        return "Arquivo recebido não corresponde ao hash do upload_token (upload corrompido?)"
+    return None
+
+
+@api.post("/transcribe/precheck", tags=["Transcription"])
+async def transcribe_precheck(
+    request: HttpRequest,
+    content_hash: str = Form(...),
+    language: str = Form("pt")
+):
+    """
+    ✅ NOVO: Verifica se o arquivo já foi transcrito - sem enviar o arquivo
+
+    O cliente calcula o hash do arquivo localmente e pergunta antes do
+    upload. Em um hit a transcrição volta na hora, sem banda de upload nem
+    I/O de disco no servidor.
+
+    ### Parâmetros:
+    - **content_hash**: BLAKE2b de 128 bits do arquivo, em hex
+      (`hashlib.blake2b(dados, digest_size=16).hexdigest()`)
+    - **language**, **model**, **engine**: os mesmos que serão usados no upload
+
+    ### Retorna:
+    - **Hit**: a `TranscriptionResponse` do cache (`cached: true`)
+    - **Conteúdo já recusado** (corrompido, sem áudio): `TranscriptionResponse`
+      com `success: false`
+    - **Miss**: `{"cached": false, "upload_token": "...", "expires_in": 3600}`.
+      Envie o `upload_token` junto com o arquivo em `/transcribe`,
+      `/transcribe/stream` ou `/transcribe/async`: o servidor confere que o
+      arquivo recebido tem o hash anunciado.
+
+    ### Exemplo:
+    ```bash
+    HASH=$(b2sum -l 128 audio.mp3 | cut -d' ' -f1)
+    curl -X POST http://localhost:8000/api/transcribe/precheck -F "content_hash=$HASH"
+    ```
+    """
+    return await run_io(_transcribe_precheck, request, content_hash, language)
+
+
+def _transcribe_precheck(request: HttpRequest, content_hash: str, language: str):
+    """Consulta ao cache negativo e de transcrições por hash (só I/O)"""
+    start_time = time.time()
+    model = request.POST.get('model', None)
+    engine = request.POST.get('engine', None)
+    content_hash = content_hash.strip().lower()
+
+    if not CONTENT_HASH_RE.match(content_hash):
+        return TranscriptionResponse(
+            success=False,
+            transcription=None,
+            processing_time=time.time() - start_time,
+            audio_info=None,
+            error="content_hash deve ser o BLAKE2b de 128 bits do arquivo em hex (32 caracteres)"
+        )
+
+    invalid_response = TranscriptionService.get_invalid_media_response(content_hash, start_time)
+    if invalid_response:
+        return invalid_response
+
+    cached_response = _cached_http_response(
+        "", language if language != "pt" else None,
+        model, engine, content_hash, start_time)
+    if cached_response is not None:
+        return cached_response
+
+    return {
+        "cached": False,
+        "upload_token": _issue_upload_token(content_hash),
+        "expires_in": settings.UPLOAD_TOKEN_MAX_AGE_SECONDS
+    }
+
+
 @api.post("/transcribe", response=TranscriptionResponse, tags=["Transcription"])
-def transcribe_audio(
+async def transcribe_audio(
     request: HttpRequest,
     file: UploadedFile = File(...),
     language: str = Form("pt")
@@ -209,6 +447,8 @@ def transcribe_audio(
     - **file**: Arquivo de áudio ou vídeo (ver formatos suportados abaixo)
     - **language**: Código do idioma (padrão: **pt** para português brasileiro)
     - **model**: Modelo Whisper a usar (tiny, base, small, medium, large) - opcional
+    - **engine**: Engine de inferência (openai, faster-whisper) - opcional
+    - **upload_token**: Token de `/transcribe/precheck` (opcional) - confere o hash do arquivo
 
     ### Formatos de Áudio Suportados:
     **WhatsApp**: .opus, .ogg  
@@ -249,10 +489,57 @@ def transcribe_audio(
     - Vídeo local: .mkv, .mov, .avi
     """
     start_time = time.time()
+    job = await run_io(_prepare_transcription, request, file, language, start_time)
+    if not isinstance(job, dict):
+        return job  # Recusado na validação ou servido do cache
+
+    try:
+        # ✅ NOVO: Inferência só nos workers - a espera não prende thread do processo web
+        if settings.INFERENCE_IN_WORKERS:
+            from .tasks import transcribe_audio_sync
+
+            task = await run_io(transcribe_audio_sync.apply_async, kwargs=job, queue='gpu')
+            return TranscriptionResponse(
+                **await wait_for_task(task, settings.INFERENCE_WORKER_TIMEOUT_SECONDS)
+            )
+
+        # Processar áudio no pool limitado de inferência
+        return await run_inference(TranscriptionService.process_audio_file, **job)
+
+    except Exception as e:
+        logger.error(f"Erro no endpoint /transcribe: {e}", exc_info=True)
+        return TranscriptionResponse(
+            success=False,
+            transcription=None,
+            processing_time=time.time() - start_time,
+            audio_info=None,
+            error=f"Erro interno: {str(e)}"
+        )
+
+    finally:
+        await run_io(_remove_temp_file, job["file_path"])
+
+
+def _prepare_transcription(
+    request: HttpRequest,
+    file: UploadedFile,
+    language: str,
+    start_time: float
+):
+    """
+    ✅ NOVO: Parte rápida de /transcribe - validação, gravação, cache negativo e hit
+
+    Returns:
+        Resposta pronta (erro ou hit do cache) ou os kwargs de
+        process_audio_file - nesse caso o arquivo temporário passa a ser
+        de quem chamou
+    """
     temp_file_path = None
+    job = None
 
-    # Extrair model do form data se presente
+    # Extrair model e engine do form data se presentes
     model = request.POST.get('model', None)
+    engine = request.POST.get('engine', None)
 
     try:
         # ✅ PROTEÇÃO 1: Verificar se memória está crítica
@@ -291,6 +578,15 @@ def transcribe_audio(
                 error=f"Arquivo muito grande: {file_size_mb:.2f}MB (máximo: {settings.MAX_AUDIO_SIZE_MB}MB)"
             )
 
+        if engine and engine not in ENGINES:
+            return TranscriptionResponse(
+                success=False,
+                transcription=None,
+                processing_time=time.time() - start_time,
+                audio_info=None,
+                error=f"Engine '{engine}' não suportada. Engines aceitas: {', '.join(sorted(ENGINES))}"
+            )
+
         # Validar extensão (áudio OU vídeo)
         file_extension = Path(file.name).suffix.lstrip('.').lower()
         supported_formats = settings.ALL_SUPPORTED_FORMATS
@@ -307,23 +603,46 @@ def transcribe_audio(
         # Salvar arquivo temporário
         temp_file_path = os.path.join(
             settings.TEMP_AUDIO_DIR,
-            f"upload_{int(time.time())}_{os.getpid()}.{file_extension}"
+            f"upload_{uuid.uuid4().hex}.{file_extension}"
         )
 
-        with open(temp_file_path, 'wb') as f:
-            for chunk in file.chunks():
-                f.write(chunk)
+        content_hash = _save_upload(file, temp_file_path)
 
         logger.info(f"Arquivo salvo: {temp_file_path} ({file_size_mb:.2f}MB)")
 
-        # Processar áudio (language padrão é português)
-        result = TranscriptionService.process_audio_file(
-            file_path=temp_file_path,
-            language=language if language != "pt" else None,  # None usa o padrão
-            model=model
-        )
+        # ✅ NOVO: Upload anunciado no precheck precisa ter o mesmo conteúdo
+        token_error = _upload_token_error(request.POST.get('upload_token'), content_hash)
+        if token_error:
+            return TranscriptionResponse(
+                success=False,
+                transcription=None,
+                processing_time=time.time() - start_time,
+                audio_info=None,
+                error=token_error
+            )
 
-        return result
+        # ✅ NOVO: Conteúdo já recusado - responde sem ffprobe nem worker
+        invalid_response = TranscriptionService.get_invalid_media_response(
+            content_hash, start_time)
+        if invalid_response:
+            return invalid_response
+
+        # ✅ NOVO: Hit servido direto (também evita a ida ao worker)
+        cached_response = _cached_http_response(
+            temp_file_path, language if language != "pt" else None,
+            model, engine, content_hash, start_time)
+        if cached_response is not None:
+            return cached_response
+
+        # Processar áudio (language padrão é português; None usa o padrão)
+        job = {
+            "file_path": temp_file_path,
+            "language": language if language != "pt" else None,
+            "model": model,
+            "engine": engine,
+            "content_hash": content_hash,
+        }
+        return job
 
     except Exception as e:
         logger.error(f"Erro no endpoint /transcribe: {e}", exc_info=True)
@@ -336,17 +655,155 @@ def transcribe_audio(
         )
 
     finally:
-        # Limpar arquivo temporário
+        # Limpar arquivo temporário (exceto quando segue para a transcrição)
+        if job is None:
+            _remove_temp_file(temp_file_path)
+
+
+def format_sse(event: str, data: dict) -> str:
+    """Formata um evento Server-Sent Events (event + data JSON em uma linha)"""
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+def _sse_response(events) -> StreamingHttpResponse:
+    """Resposta text/event-stream sem buffer em proxies (nginx)"""
+    response = StreamingHttpResponse(events, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@api.post("/transcribe/stream", tags=["Transcription"])
+async def transcribe_audio_stream(
+    request: HttpRequest,
+    file: UploadedFile = File(...),
+    language: str = Form("pt")
+):
+    """
+    ✅ NOVO: Transcreve com streaming dos segmentos via Server-Sent Events
+
+    Mesmos parâmetros e validações de `/transcribe`. Em vez de esperar a
+    transcrição completa, cada segmento é enviado assim que decodificado e
+    pós-processado - útil para áudios longos e legendas ao vivo.
+
+    ### Eventos:
+    - **segment**: `{start, end, text, confidence}` (timestamps do arquivo original)
+    - **summary**: evento final com `text`, `audio_info`, `timing_metrics`,
+      `processing_time` e `cached`
+    - **error**: `{success: false, error}` - encerra o stream
+
+    Com `INFERENCE_IN_WORKERS=true` o stream responde apenas com um evento
+    **error** (o processo web não carrega o modelo).
+
+    ### Exemplo:
+    ```bash
+    curl -N -X POST http://localhost:8000/api/transcribe/stream -F "file=@audio.mp3"
+    ```
+    """
+    events = await run_io(_transcribe_audio_stream_events, request, file, language)
+    if isinstance(request, ASGIRequest):
+        # ✅ NOVO: Sob ASGI cada segmento é produzido no pool de inferência
+        # (o Django leria um gerador síncrono inteiro antes de enviar)
+        events = iterate_in_executor(events)
+    return _sse_response(events)
+
+
+def _transcribe_audio_stream_events(
+    request: HttpRequest,
+    file: UploadedFile,
+    language: str
+):
+    """
+    ✅ NOVO: Validação e gravação de /transcribe/stream
+
+    Returns:
+        Gerador de eventos SSE (a transcrição roda enquanto é consumido)
+    """
+    temp_file_path = None
+
+    model = request.POST.get('model', None)
+    engine = request.POST.get('engine', None)
+
+    def _error(message: str):
+        return iter([format_sse("error", {"success": False, "error": message})])
+
+    if settings.INFERENCE_IN_WORKERS:
+        # ✅ NOVO: O processo web não carrega o modelo; os workers não publicam segmentos
+        return _error(
+            "Streaming indisponível com INFERENCE_IN_WORKERS=true (inferência só nos "
+            "workers GPU). Use /transcribe ou /transcribe/async.")
+
+    try:
+        if MemoryManager.check_memory_critical():
+            logger.warning("🔴 Requisição rejeitada: Servidor com memória/disco crítico")
+            return _error("Servidor com memória/disco crítico. Tente novamente mais tarde.")
+
+        file_size_mb = file.size / (1024 * 1024)
+
+        should_reject, reject_reason = MemoryManager.should_reject_upload(file_size_mb)
+        if should_reject:
+            logger.warning(f"⚠️  Upload rejeitado: {reject_reason}")
+            return _error(reject_reason or "Não há recursos disponíveis. Tente novamente mais tarde.")
+
+        if file_size_mb > settings.MAX_AUDIO_SIZE_MB:
+            return _error(
+                f"Arquivo muito grande: {file_size_mb:.2f}MB (máximo: {settings.MAX_AUDIO_SIZE_MB}MB)")
+
+        if engine and engine not in ENGINES:
+            return _error(
+                f"Engine '{engine}' não suportada. Engines aceitas: {', '.join(sorted(ENGINES))}")
+
+        file_extension = Path(file.name).suffix.lstrip('.').lower()
+        supported_formats = settings.ALL_SUPPORTED_FORMATS
+        if file_extension not in supported_formats:
+            return _error(
+                f"Formato '{file_extension}' não suportado. Formatos aceitos: {', '.join(sorted(supported_formats))}")
+
+        temp_file_path = os.path.join(
+            settings.TEMP_AUDIO_DIR,
+            f"upload_stream_{uuid.uuid4().hex}.{file_extension}"
+        )
+
+        content_hash = _save_upload(file, temp_file_path)
+
+        logger.info(f"Arquivo salvo para streaming: {temp_file_path} ({file_size_mb:.2f}MB)")
+
+        token_error = _upload_token_error(request.POST.get('upload_token'), content_hash)
+        if token_error:
+            os.remove(temp_file_path)
+            return _error(token_error)
+
+    except Exception as e:
+        logger.error(f"Erro no endpoint /transcribe/stream: {e}", exc_info=True)
         if temp_file_path and os.path.exists(temp_file_path):
-            try:
-                os.remove(temp_file_path)
-                logger.info(f"Arquivo temporário removido: {temp_file_path}")
-            except Exception as e:
-                logger.warning(f"Erro ao remover arquivo: {e}")
+            os.remove(temp_file_path)
+        return _error(f"Erro interno: {str(e)}")
+
+    def _events():
+        # O arquivo só pode ser removido quando o cliente terminar de consumir o stream
+        try:
+            for event, data in TranscriptionService.stream_audio_file(
+                file_path=temp_file_path,
+                language=language if language != "pt" else None,
+                model=model,
+                engine=engine,
+                content_hash=content_hash
+            ):
+                yield format_sse(event, data)
+        finally:
+            if os.path.exists(temp_file_path):
+                try:
+                    os.remove(temp_file_path)
+                    logger.info(f"Arquivo temporário removido: {temp_file_path}")
+                except Exception as e:
+                    logger.warning(f"Erro ao remover arquivo: {e}")
+
+    return _events()
 
 
 @api.post("/transcribe/batch", response=BatchTranscriptionResponse, tags=["Transcription"])
-def transcribe_batch(
+async def transcribe_batch(
     request: HttpRequest,
     files: List[UploadedFile] = File(...),
     language: str = Form("pt")
@@ -358,6 +815,7 @@ def transcribe_batch(
     - **files**: Lista de arquivos de áudio
     - **language**: Código do idioma (padrão: pt)
     - **model**: Modelo Whisper a usar - opcional
+    - **engine**: Engine de inferência (openai, faster-whisper) - opcional
 
     ### Retorna:
     - Lista de resultados para cada arquivo
@@ -365,16 +823,89 @@ def transcribe_batch(
     - Tempo total de processamento
 
     ### Nota:
-    Os arquivos são processados sequencialmente. Para grandes volumes,
-    considere usar um sistema de filas (Celery, RQ, etc).
+    Os arquivos são processados sequencialmente. Com `INFERENCE_IN_WORKERS=true`
+    cada arquivo vira uma tarefa na fila `gpu` e os workers os atendem em paralelo.
+    """
+    # ✅ NOVO: Inferência só nos workers - cada arquivo vira uma tarefa na fila 'gpu'
+    if settings.INFERENCE_IN_WORKERS:
+        return await _transcribe_batch_in_workers(request, files, language)
+
+    # ✅ NOVO: O lote inteiro ocupa uma vaga do pool de inferência
+    return await run_inference(_transcribe_batch, request, files, language)
+
+
+def _batch_error(message: str) -> TranscriptionResponse:
+    """Resultado de falha de um arquivo do lote"""
+    return TranscriptionResponse(
+        success=False,
+        transcription=None,
+        processing_time=0,
+        audio_info=None,
+        error=message
+    )
+
+
+def _save_batch_file(file: UploadedFile, idx: int):
     """
+    ✅ NOVO: Valida e grava um arquivo do lote em TEMP_AUDIO_DIR
+
+    Returns:
+        (caminho_temporário, hash_do_conteúdo) ou resposta de erro
+    """
+    # Validar tamanho ANTES de carregar na memória
+    file_size_mb = file.size / (1024 * 1024)
+    if file_size_mb > settings.MAX_AUDIO_SIZE_MB:
+        logger.warning(f"Arquivo {file.name} muito grande: {file_size_mb:.2f}MB")
+        return _batch_error(
+            f"Arquivo muito grande: {file_size_mb:.2f}MB (máximo: {settings.MAX_AUDIO_SIZE_MB}MB)")
+
+    # Salvar arquivo temporário
+    file_extension = Path(file.name).suffix.lstrip('.').lower()
+    temp_file_path = os.path.join(
+        settings.TEMP_AUDIO_DIR,
+        f"batch_{uuid.uuid4().hex}_{idx}.{file_extension}"
+    )
+    try:
+        content_hash = _save_upload(file, temp_file_path)
+    except Exception:
+        _remove_temp_file(temp_file_path)
+        raise
+    return temp_file_path, content_hash
+
+
+def _batch_response(
+    results: List[TranscriptionResponse],
+    start_time: float
+) -> BatchTranscriptionResponse:
+    """Consolida os resultados do lote"""
+    successful = sum(1 for result in results if result.success)
+    failed = len(results) - successful
+
+    total_time = time.time() - start_time
+    logger.info(
+        f"Processamento em lote concluído: {successful} sucesso, {failed} falhas em {total_time:.2f}s")
+
+    return BatchTranscriptionResponse(
+        total_files=len(results),
+        successful=successful,
+        failed=failed,
+        results=results,
+        total_processing_time=round(total_time, 2)
+    )
+
+
+def _transcribe_batch(
+    request: HttpRequest,
+    files: List[UploadedFile],
+    language: str
+) -> BatchTranscriptionResponse:
+    """Processa os arquivos do lote em sequência (bloqueante)"""
     start_time = time.time()
     results = []
-    successful = 0
-    failed = 0
 
-    # Extrair model do form data se presente
+    # Extrair model e engine do form data se presentes
     model = request.POST.get('model', None)
+    engine = request.POST.get('engine', None)
 
     logger.info(f"Processamento em lote iniciado: {len(files)} arquivos")
 
@@ -383,75 +914,86 @@ def transcribe_batch(
 
         temp_file_path = None
         try:
-            # Validar tamanho ANTES de carregar na memória
-            file_size_mb = file.size / (1024 * 1024)
-            if file_size_mb > settings.MAX_AUDIO_SIZE_MB:
-                logger.warning(f"Arquivo {file.name} muito grande: {file_size_mb:.2f}MB")
-                results.append(TranscriptionResponse(
-                    success=False,
-                    transcription=None,
-                    processing_time=0,
-                    audio_info=None,
-                    error=f"Arquivo muito grande: {file_size_mb:.2f}MB (máximo: {settings.MAX_AUDIO_SIZE_MB}MB)"
-                ))
-                failed += 1
+            saved = _save_batch_file(file, idx)
+            if isinstance(saved, TranscriptionResponse):
+                results.append(saved)
                 continue
-            
-            # Salvar arquivo temporário
-            file_extension = Path(file.name).suffix.lstrip('.').lower()
-            temp_file_path = os.path.join(
-                settings.TEMP_AUDIO_DIR,
-                f"batch_{int(time.time())}_{idx}.{file_extension}"
-            )
-
-            with open(temp_file_path, 'wb') as f:
-                for chunk in file.chunks():
-                    f.write(chunk)
+            temp_file_path, content_hash = saved
 
             # Processar
-            result = TranscriptionService.process_audio_file(
+            results.append(TranscriptionService.process_audio_file(
                 file_path=temp_file_path,
                 language=language,
-                model=model
-            )
-
-            results.append(result)
-
-            if result.success:
-                successful += 1
-            else:
-                failed += 1
+                model=model,
+                engine=engine,
+                content_hash=content_hash
+            ))
 
         except Exception as e:
             logger.error(f"Erro ao processar arquivo {file.name}: {e}")
-            results.append(TranscriptionResponse(
-                success=False,
-                transcription=None,
-                processing_time=0,
-                audio_info=None,
-                error=str(e)
-            ))
-            failed += 1
+            results.append(_batch_error(str(e)))
 
         finally:
             # Limpar arquivo temporário
-            if temp_file_path and os.path.exists(temp_file_path):
-                try:
-                    os.remove(temp_file_path)
-                except Exception as e:
-                    logger.warning(f"Erro ao remover arquivo: {e}")
+            _remove_temp_file(temp_file_path)
 
-    total_time = time.time() - start_time
-    logger.info(
-        f"Processamento em lote concluído: {successful} sucesso, {failed} falhas em {total_time:.2f}s")
+    return _batch_response(results, start_time)
 
-    return BatchTranscriptionResponse(
-        total_files=len(files),
-        successful=successful,
-        failed=failed,
-        results=results,
-        total_processing_time=round(total_time, 2)
+
+async def _transcribe_batch_in_workers(
+    request: HttpRequest,
+    files: List[UploadedFile],
+    language: str
+) -> BatchTranscriptionResponse:
+    """
+    ✅ NOVO: Lote com INFERENCE_IN_WORKERS=true
+
+    Cada arquivo é gravado e enviado como transcribe_audio_sync para a fila
+    'gpu', como em /transcribe; o processo web só espera os resultados (sem
+    carregar o modelo) e os workers GPU podem atender os arquivos em paralelo.
+    """
+    from .tasks import transcribe_audio_sync
+
+    start_time = time.time()
+    model = request.POST.get('model', None)
+    engine = request.POST.get('engine', None)
+
+    logger.info(f"Processamento em lote iniciado nos workers: {len(files)} arquivos")
+
+    async def _transcribe_file(idx: int, file: UploadedFile) -> TranscriptionResponse:
+        temp_file_path = None
+        try:
+            saved = await run_io(_save_batch_file, file, idx)
+            if isinstance(saved, TranscriptionResponse):
+                return saved
+            temp_file_path, content_hash = saved
+
+            task = await run_io(
+                transcribe_audio_sync.apply_async,
+                kwargs={
+                    "file_path": temp_file_path,
+                    "language": language,
+                    "model": model,
+                    "engine": engine,
+                    "content_hash": content_hash,
+                },
+                queue='gpu'
+            )
+            return TranscriptionResponse(
+                **await wait_for_task(task, settings.INFERENCE_WORKER_TIMEOUT_SECONDS)
+            )
+
+        except Exception as e:
+            logger.error(f"Erro ao processar arquivo {file.name}: {e}")
+            return _batch_error(str(e))
+
+        finally:
+            await run_io(_remove_temp_file, temp_file_path)
+
+    results = await asyncio.gather(
+        *(_transcribe_file(idx, file) for idx, file in enumerate(files, 1))
     )
+    return _batch_response(list(results), start_time)
 
 
 # Endpoint adicional para listar formatos suportados
@@ -477,7 +1019,7 @@ def list_supported_formats(request: HttpRequest):
 
 # Async endpoints
 @api.post("/transcribe/async", tags=["Async Transcription"])
-def transcribe_audio_async_endpoint(
+async def transcribe_audio_async_endpoint(
     request: HttpRequest,
     file: UploadedFile = File(...),
     language: str = Form("pt"),
@@ -497,7 +1039,9 @@ def transcribe_audio_async_endpoint(
     | **file** | File | ✅ Sim | Arquivo de áudio ou vídeo (até 500MB) |
     | **language** | String | ❌ Não | Código do idioma (padrão: `pt` para português) |
     | **model** | String | ❌ Não | Modelo Whisper: `tiny`, `base`, `small`, `medium`, `large` |
+    | **engine** | String | ❌ Não | Engine de inferência: `openai`, `faster-whisper` |
     | **webhook_url** | String | ❌ Não | URL para receber POST com resultado (opcional) |
+    | **upload_token** | String | ❌ Não | Token de `/transcribe/precheck` (confere o hash do arquivo) |
     
     ### Formatos de Áudio Suportados:
     .opus, .ogg, .m4a, .aac, .mp4, .mp3, .wav, .flac, .webm
@@ -572,14 +1116,33 @@ def transcribe_audio_async_endpoint(
     - 📝 Suporta webhook para aplicações real-time
     - 🔁 Retry automático em caso de falha
     - ✅ Processamento em fila (não sobrecarrega servidor)
+    
+    ### Cache e deduplicação:
+    - Arquivo já transcrito: a resposta já vem com `state: "SUCCESS"`,
+      `cached: true` e `result`, sem passar pela fila (o `task_id` de
+      pseudo-tarefa também funciona no endpoint de status)
+    - Mesmo arquivo já na fila (sem `webhook_url`): devolve o `task_id` da
+      tarefa existente com `deduplicated: true`
     """
+    return await run_io(_transcribe_audio_async, request, file, language, webhook_url)
+
+
+def _transcribe_audio_async(
+    request: HttpRequest,
+    file: UploadedFile,
+    language: str,
+    webhook_url: Optional[str]
+):
+    """Validação, cache, deduplicação e enfileiramento de /transcribe/async (só I/O)"""
+    from celery.result import AsyncResult
     from .tasks import transcribe_audio_async
     
     start_time = time.time()
     temp_file_path = None
     
-    # Extrair model do form data se presente
+    # Extrair model e engine do form data se presentes
     model = request.POST.get('model', None)
+    engine = request.POST.get('engine', None)
     
     try:
         # Validar tamanho ANTES de carregar na memória
@@ -591,6 +1154,12 @@ def transcribe_audio_async_endpoint(
                 "error": f"Arquivo muito grande: {file_size_mb:.2f}MB (máximo: {settings.MAX_AUDIO_SIZE_MB}MB)"
             }
         
+        if engine and engine not in ENGINES:
+            return {
+                "success": False,
+                "error": f"Engine '{engine}' não suportada"
+            }
+        
         # Validar extensão
         file_extension = Path(file.name).suffix.lstrip('.').lower()
         if file_extension not in settings.ALL_SUPPORTED_FORMATS:
@@ -602,22 +1171,83 @@ def transcribe_audio_async_endpoint(
         # Salvar arquivo temporário
         temp_file_path = os.path.join(
             settings.TEMP_AUDIO_DIR,
-            f"upload_async_{int(time.time())}_{os.getpid()}.{file_extension}"
+            f"upload_async_{uuid.uuid4().hex}.{file_extension}"
         )
         
-        with open(temp_file_path, 'wb') as f:
-            for chunk in file.chunks():
-                f.write(chunk)
+        content_hash = _save_upload(file, temp_file_path)
         
         logger.info(f"Arquivo salvo para processamento assíncrono: {temp_file_path}")
         
-        # Enviar para fila Celery
-        task = transcribe_audio_async.delay(
-            file_path=temp_file_path,
-            language=language if language != "pt" else None,
-            model=model,
-            webhook_url=webhook_url
+        # ✅ NOVO: Conteúdo já recusado (ou diferente do anunciado no precheck) - não ocupa a fila
+        invalid_error = (
+            _upload_token_error(request.POST.get('upload_token'), content_hash)
+            or get_cache_manager().get_invalid_media(content_hash)
         )
+        if invalid_error:
+            os.remove(temp_file_path)
+            return {
+                "success": False,
+                "error": invalid_error
+            }
+        
+        # ✅ NOVO: Hit do cache - tarefa já concluída na mesma resposta, sem fila
+        request_language = language if language != "pt" else None
+        cache_key = _request_cache_key(
+            temp_file_path, request_language, model, engine, content_hash)
+        cached_body = _cached_response_body(cache_key, start_time)
+        if cached_body is not None:
+            os.remove(temp_file_path)
+            task_id = CACHED_TASK_PREFIX + cache_key
+            return _json_with_result({
+                "success": True,
+                "task_id": task_id,
+                "state": "SUCCESS",
+                "cached": True,
+                "status_url": f"/api/transcribe/async/status/{task_id}",
+                "message": "Transcrição já disponível no cache.",
+                "submission_time": round(time.time() - start_time, 2)
+            }, cached_body)
+        
+        # ✅ NOVO: Mesmo arquivo já na fila - acompanhar a tarefa existente
+        # (com webhook a submissão precisa da própria tarefa para ser notificada)
+        task_id = str(uuid.uuid4())
+        flight = get_single_flight() if cache_key and not webhook_url else None
+        if flight is not None:
+            existing_id = flight.claim_task(cache_key, task_id)
+            if existing_id is not None and AsyncResult(existing_id).ready():
+                # Tarefa terminou sem liberar o registro (worker perdido)
+                flight.release_task(cache_key, existing_id)
+                existing_id = flight.claim_task(cache_key, task_id)
+            if existing_id is not None:
+                os.remove(temp_file_path)
+                logger.info(f"Transcrição idêntica já na fila: acompanhando tarefa {existing_id}")
+                return {
+                    "success": True,
+                    "task_id": existing_id,
+                    "deduplicated": True,
+                    "status_url": f"/api/transcribe/async/status/{existing_id}",
+                    "message": "Transcrição idêntica já em andamento. Use task_id para consultar o status.",
+                    "submission_time": round(time.time() - start_time, 2)
+                }
+        
+        # Enviar para fila Celery
+        try:
+            task = transcribe_audio_async.apply_async(
+                kwargs={
+                    "file_path": temp_file_path,
+                    "language": request_language,
+                    "model": model,
+                    "webhook_url": webhook_url,
+                    "engine": engine,
+                    "content_hash": content_hash,
+                    "inflight_key": cache_key if flight is not None else None,
+                },
+                task_id=task_id
+            )
+        except Exception:
+            if flight is not None:
+                flight.release_task(cache_key, task_id)
+            raise
         
         return {
             "success": True,
@@ -643,7 +1273,7 @@ def transcribe_audio_async_endpoint(
 
 
 @api.get("/transcribe/async/status/{task_id}", tags=["Async Transcription"])
-def get_async_task_status(request: HttpRequest, task_id: str):
+async def get_async_task_status(request: HttpRequest, task_id: str):
     """
     ✅ Consulta o status de uma tarefa de transcrição assíncrona (POLLING)
     
@@ -785,8 +1415,29 @@ def get_async_task_status(request: HttpRequest, task_id: str):
     - Implemente **timeout máximo** (ex: 30 minutos)
     - Para arquivos grandes (> 500MB), use intervalo maior (10-30s)
     """
+    return await run_io(_async_task_status, task_id)
+
+
+def _async_task_status(task_id: str):
+    """Estado da tarefa no Celery ou no cache (só I/O)"""
     from celery.result import AsyncResult
     
+    # ✅ NOVO: Pseudo-tarefa de um hit do cache (não existe no Celery)
+    if task_id.startswith(CACHED_TASK_PREFIX):
+        cached_body = _cached_response_body(task_id[len(CACHED_TASK_PREFIX):], time.time())
+        if cached_body is None:
+            return {
+                "task_id": task_id,
+                "state": "FAILURE",
+                "error": "Resultado não está mais no cache. Envie o arquivo novamente.",
+                "message": "Transcrição falhou"
+            }
+        return _json_with_result({
+            "task_id": task_id,
+            "state": "SUCCESS",
+            "message": "Transcrição concluída"
+        }, cached_body)
+    
     task = AsyncResult(task_id)
     
     response = {
@@ -813,7 +1464,7 @@ def get_async_task_status(request: HttpRequest, task_id: str):
 
 
 @api.delete("/transcribe/async/{task_id}", tags=["Async Transcription"])
-def cancel_async_task(request: HttpRequest, task_id: str):
+async def cancel_async_task(request: HttpRequest, task_id: str):
     """
     ❌ Cancela uma tarefa de transcrição assíncrona em andamento
     
@@ -855,8 +1506,19 @@ def cancel_async_task(request: HttpRequest, task_id: str):
     # {"success": true, "message": "Tarefa cancelada"}
     ```
     """
+    return await run_io(_cancel_async_task, task_id)
+
+
+def _cancel_async_task(task_id: str):
+    """Revoga a tarefa no Celery (só I/O)"""
     from celery.result import AsyncResult
     
+    if task_id.startswith(CACHED_TASK_PREFIX):
+        return {
+            "success": False,
+            "message": "Tarefa já concluída com estado: SUCCESS"
+        }
+    
     task = AsyncResult(task_id)
     
     if task.state in ['SUCCESS', 'FAILURE']:
@@ -878,3 +1540,147 @@ def cancel_async_task(request: HttpRequest, task_id: str):
             "error": str(e)
         }
 
+
+# ✅ NOVO: Upload retomável (estilo tus) para arquivos grandes
+def _upload_session_response(session: Optional[dict], error: Optional[str] = None) -> dict:
+    """Estado da sessão no formato da API (offset sempre presente se a sessão existe)"""
+    response = {"success": error is None}
+    if session is not None:
+        response.update({
+            "upload_id": session["upload_id"],
+            "offset": session["offset"],
+            "size": session["size"],
+            "expires_at": int(session["expires_at"]),
+            "upload_url": f"/api/uploads/{session['upload_id']}",
+        })
+    if error:
+        response["error"] = error
+    return response
+
+
+@api.post("/uploads", tags=["Resumable Upload"])
+async def create_resumable_upload(
+    request: HttpRequest,
+    filename: str = Form(...),
+    size: int = Form(...)
+):
+    """
+    ✅ NOVO: Abre uma sessão de upload retomável
+
+    Para arquivos grandes ou conexões instáveis: o arquivo é enviado em
+    pedaços (`PATCH /uploads/{upload_id}`) e, se a conexão cair, o envio
+    continua do último offset confirmado em vez de recomeçar do zero.
+
+    ### Fluxo:
+    1. `POST /uploads` com `filename` e `size` (bytes) → `upload_id`
+    2. `PATCH /uploads/{upload_id}` com cada pedaço no corpo e o header
+       `Upload-Offset` (bytes já enviados); opcional `Upload-Checksum: sha256 <base64>`
+    3. Se cair: `GET /uploads/{upload_id}` devolve o `offset` para retomar
+    4. `POST /uploads/{upload_id}/finalize` com `mode` (`async`, `sync` ou `stream`)
+       e os mesmos campos de `/transcribe/async` ou `/transcribe`
+
+    Sessões sem pedaço novo expiram após `RESUMABLE_UPLOAD_EXPIRY_SECONDS` (padrão 24h).
+
+    ### Exemplo:
+    ```bash
+    curl -X POST http://localhost:8000/api/uploads -F "filename=video.mp4" -F "size=419430400"
+    ```
+    """
+    session, error = await run_io(ResumableUploadStore.create, filename, size)
+    return _upload_session_response(session, error)
+
+
+@api.get("/uploads/{upload_id}", tags=["Resumable Upload"])
+async def get_resumable_upload(request: HttpRequest, upload_id: str):
+    """
+    ✅ NOVO: Offset atual de uma sessão de upload (de onde retomar o envio)
+    """
+    session = await run_io(ResumableUploadStore.get, upload_id)
+    if session is None:
+        return _upload_session_response(None, "Upload não encontrado ou expirado")
+    return _upload_session_response(session)
+
+
+@api.patch("/uploads/{upload_id}", tags=["Resumable Upload"])
+async def append_resumable_upload(request: HttpRequest, upload_id: str):
+    """
+    ✅ NOVO: Envia um pedaço do arquivo (corpo binário, gravado direto em disco)
+
+    ### Headers:
+    - **Upload-Offset**: Bytes já confirmados pelo servidor (deve ser igual ao `offset` da sessão)
+    - **Upload-Checksum** (opcional): `<md5|sha1|sha256> <digest em base64>` do pedaço
+
+    Offset divergente, pedaço incompleto ou checksum errado devolvem
+    `success: false` com o `offset` correto - reenvie a partir dele.
+
+    ### Exemplo:
+    ```bash
+    curl -X PATCH http://localhost:8000/api/uploads/$UPLOAD_ID \\
+      -H "Upload-Offset: 0" -H "Content-Type: application/offset+octet-stream" \\
+      --data-binary @pedaco_0.bin
+    ```
+    """
+    try:
+        offset = int(request.headers.get("Upload-Offset", ""))
+        length = int(request.META.get("CONTENT_LENGTH") or 0)
+    except ValueError:
+        return _upload_session_response(
+            await run_io(ResumableUploadStore.get, upload_id), "Header Upload-Offset obrigatório (inteiro)")
+
+    session, error = await run_io(
+        ResumableUploadStore.append, upload_id, offset, request.read, length,
+        checksum=request.headers.get("Upload-Checksum")
+    )
+    return _upload_session_response(session, error)
+
+
+@api.delete("/uploads/{upload_id}", tags=["Resumable Upload"])
+async def delete_resumable_upload(request: HttpRequest, upload_id: str):
+    """
+    ✅ NOVO: Cancela uma sessão de upload e libera o disco
+    """
+    if not await run_io(ResumableUploadStore.delete, upload_id):
+        return {"success": False, "error": "Upload não encontrado ou expirado"}
+    return {"success": True, "message": "Upload cancelado", "upload_id": upload_id}
+
+
+@api.post("/uploads/{upload_id}/finalize", tags=["Resumable Upload"])
+async def finalize_resumable_upload(
+    request: HttpRequest,
+    upload_id: str,
+    language: str = Form("pt"),
+    mode: str = Form("async"),
+    webhook_url: Optional[str] = Form(None)
+):
+    """
+    ✅ NOVO: Conclui o upload e transcreve o arquivo montado
+
+    ### Parâmetros:
+    - **mode**: `async` (padrão, mesma resposta de `/transcribe/async`),
+      `sync` (resposta de `/transcribe`) ou `stream` (SSE de `/transcribe/stream`)
+    - **language**, **model**, **engine**, **upload_token**, **webhook_url**: como nos endpoints de origem
+
+    O arquivo montado não é copiado de novo: segue pelas mesmas validações,
+    cache e fila de um upload normal.
+    """
+    if mode not in ("async", "sync", "stream"):
+        return {"success": False, "error": "mode deve ser 'async', 'sync' ou 'stream'"}
+
+    upload, error = await run_io(ResumableUploadStore.finalize, upload_id)
+    if error:
+        return {"success": False, "error": error}
+
+    try:
+        if mode == "sync":
+            return await transcribe_audio(request, file=upload, language=language)
+        if mode == "stream":
+            return await transcribe_audio_stream(request, file=upload, language=language)
+        return await transcribe_audio_async_endpoint(
+            request, file=upload, language=language, webhook_url=webhook_url)
+    finally:
+        # Remove o arquivo se o endpoint o recusou sem movê-lo
+        await run_io(upload.close)
+
+
+# Fim da inicialização do processo web (exposto em /gpu-status -> web_process)
+mark_process_ready()
@@ -0,0 +1,330 @@
+"""
+Cache de artefatos intermediários (ffprobe e áudio convertido)
+
+Só a transcrição final entra no cache de transcrições: o mesmo arquivo com
+outro `model`/`language`, ou um retry do Celery, rodava ffprobe e a
+conversão remota de novo. Este cache guarda, por hash do arquivo de origem:
+
+- resultados do ffprobe (JSON compacto, dentro do índice SQLite);
+- o áudio já convertido para 16kHz mono, comprimido em FLAC (arquivo).
+
+Tem cota própria em bytes e despejo LRU (último acesso registrado no
+índice), compartilhado entre processos como o tier em disco.
+"""
+import os
+import time
+import uuid
+import zlib
+import sqlite3
+import logging
+import subprocess
+from pathlib import Path
+from threading import Lock, local
+from typing import Any, Dict, Optional
+
+import numpy as np
+from django.conf import settings
+
+from .cache_manager import pack_entry, unpack_entry
+from .pcm_decoder import PCMDecoder, SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+
+class ArtifactCache:
+    """Artefatos endereçados pelo hash do arquivo de origem, com cota LRU"""
+
+    AUDIO_ARTIFACT = "audio.flac"
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS artifacts (
+            source_hash TEXT NOT NULL,
+            name TEXT NOT NULL,
+            value BLOB,
+            size INTEGER NOT NULL,
+            accessed_at REAL NOT NULL,
+            PRIMARY KEY (source_hash, name)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS artifacts_accessed_at ON artifacts (accessed_at);
+        CREATE TABLE IF NOT EXISTS totals (
+            id INTEGER PRIMARY KEY CHECK (id = 0),
+            entries INTEGER NOT NULL,
+            bytes INTEGER NOT NULL
+        );
+        INSERT OR IGNORE INTO totals (id, entries, bytes) VALUES (0, 0, 0);
+        CREATE TRIGGER IF NOT EXISTS artifacts_insert AFTER INSERT ON artifacts BEGIN
+            UPDATE totals SET entries = entries + 1, bytes = bytes + NEW.size WHERE id = 0;
+        END;
+        CREATE TRIGGER IF NOT EXISTS artifacts_delete AFTER DELETE ON artifacts BEGIN
+            UPDATE totals SET entries = entries - 1, bytes = bytes - OLD.size WHERE id = 0;
+        END;
+        CREATE TRIGGER IF NOT EXISTS artifacts_update AFTER UPDATE OF size ON artifacts BEGIN
+            UPDATE totals SET bytes = bytes - OLD.size + NEW.size WHERE id = 0;
+        END;
+    """
+    EVICT_BATCH = 32
+
+    def __init__(self, root: Path, max_bytes: int, encode_timeout: int = 600):
+        """
+        Args:
+            root: Diretório dos artefatos (índice SQLite + arquivos FLAC)
+            max_bytes: Cota total em bytes (probes + áudio)
+            encode_timeout: Tempo máximo da codificação FLAC em segundos
+        """
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.encode_timeout = encode_timeout
+        self.db_path = self.root / "index.sqlite3"
+        self._local = local()
+        self.lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._connection().executescript(self.SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Conexão por thread (sqlite3 não compartilha conexões entre threads)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _audio_path(self, source_hash: str) -> Path:
+        return self.root / source_hash[:2] / f"{source_hash}.flac"
+
+    def _count(self, hit: bool) -> None:
+        with self.lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    def _lookup(self, source_hash: str, name: str) -> Optional[tuple]:
+        """Busca o artefato e registra o acesso (ordem do LRU)"""
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT value, size FROM artifacts WHERE source_hash = ? AND name = ?",
+            (source_hash, name)
+        ).fetchone()
+        if row is not None:
+            conn.execute(
+                "UPDATE artifacts SET accessed_at = ? WHERE source_hash = ? AND name = ?",
+                (time.time(), source_hash, name)
+            )
+        return row
+
+    def _store(self, source_hash: str, name: str, value: Optional[bytes], size: int) -> None:
+        self._connection().execute(
+            """
+            INSERT INTO artifacts (source_hash, name, value, size, accessed_at) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (source_hash, name) DO UPDATE SET
+                value = excluded.value, size = excluded.size, accessed_at = excluded.accessed_at
+            """,
+            (source_hash, name, value, size, time.time())
+        )
+        self._enforce_quota()
+
+    def _delete(self, source_hash: str, name: str) -> None:
+        self._connection().execute(
+            "DELETE FROM artifacts WHERE source_hash = ? AND name = ?", (source_hash, name))
+        if name == self.AUDIO_ARTIFACT:
+            try:
+                self._audio_path(source_hash).unlink()
+            except FileNotFoundError:
+                pass
+
+    def _enforce_quota(self) -> None:
+        """Remove os artefatos acessados há mais tempo até caber na cota"""
+        conn = self._connection()
+        while True:
+            total_bytes = conn.execute("SELECT bytes FROM totals WHERE id = 0").fetchone()[0]
+            if total_bytes <= self.max_bytes:
+                return
+            oldest = conn.execute(
+                "SELECT source_hash, name FROM artifacts ORDER BY accessed_at LIMIT ?",
+                (self.EVICT_BATCH,)
+            ).fetchall()
+            if not oldest:
+                return
+            for source_hash, name in oldest:
+                self._delete(source_hash, name)
+                with self.lock:
+                    self._evictions += 1
+                total_bytes = conn.execute("SELECT bytes FROM totals WHERE id = 0").fetchone()[0]
+                if total_bytes <= self.max_bytes:
+                    return
+
+    def get_probe(self, source_hash: str, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Resultado de ffprobe salvo para o arquivo
+
+        Args:
+            source_hash: Hash do arquivo de origem
+            name: Tipo de probe (ex: "ffprobe", "video_info")
+        """
+        value = None
+        try:
+            row = self._lookup(source_hash, name)
+            if row is not None:
+                try:
+                    value = unpack_entry(row[0])
+                except (zlib.error, ValueError, TypeError) as e:
+                    logger.warning(f"Artefato corrompido, removendo: {source_hash[:16]}.../{name} ({e})")
+                    self._delete(source_hash, name)
+        except sqlite3.Error as e:
+            logger.warning(f"Erro ao ler cache de artefatos: {e}")
+        self._count(value is not None)
+        return value
+
+    def put_probe(self, source_hash: str, name: str, value: Dict[str, Any]) -> None:
+        """Salva resultado de ffprobe para o arquivo"""
+        payload = pack_entry(value)
+        try:
+            self._store(source_hash, name, payload, len(payload))
+        except sqlite3.Error as e:
+            logger.warning(f"Erro ao gravar cache de artefatos: {e}")
+
+    def get_audio(self, source_hash: str) -> Optional[np.ndarray]:
+        """
+        Áudio convertido (float32 16kHz mono) salvo para o arquivo
+
+        Returns:
+            Amostras ou None se não houver artefato (ou se estiver ilegível)
+        """
+        samples = None
+        try:
+            row = self._lookup(source_hash, self.AUDIO_ARTIFACT)
+        except sqlite3.Error as e:
+            logger.warning(f"Erro ao ler cache de artefatos: {e}")
+            row = None
+        if row is not None:
+            path = self._audio_path(source_hash)
+            success, result = PCMDecoder.decode(
+                str(path), timeout=self.encode_timeout,
+                expected_duration=row[1] / SAMPLE_RATE  # FLAC ~2:1 sobre PCM 16-bit
+            ) if path.exists() else (False, "arquivo ausente")
+            if success:
+                samples = result
+            else:
+                logger.warning(f"Áudio em cache ilegível, removendo: {source_hash[:16]}... ({result})")
+                try:
+                    self._delete(source_hash, self.AUDIO_ARTIFACT)
+                except sqlite3.Error:
+                    pass
+        self._count(samples is not None)
+        if samples is not None:
+            logger.info(f"✓ Áudio convertido reaproveitado do cache de artefatos: {source_hash[:16]}...")
+        return samples
+
+    def put_audio(self, source_hash: str, samples: np.ndarray) -> bool:
+        """
+        Comprime o áudio convertido em FLAC e salva para o arquivo
+
+        Returns:
+            True se o artefato foi salvo
+        """
+        path = self._audio_path(source_hash)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.stem}.{uuid.uuid4().hex}.tmp.flac")
+        pcm = np.clip(np.rint(samples * 32768.0), -32768, 32767).astype('<i2')
+
+        try:
+            result = subprocess.run(
+                [
+                    'ffmpeg', '-nostdin',
+                    '-f', 's16le', '-ar', str(SAMPLE_RATE), '-ac', '1', '-i', 'pipe:0',
+                    '-c:a', 'flac',
+                    '-loglevel', 'error',
+                    '-y', str(tmp_path)
+                ],
+                input=pcm.tobytes(),
+                capture_output=True,
+                timeout=self.encode_timeout
+            )
+            if result.returncode != 0:
+                logger.warning(f"Falha ao codificar FLAC: {result.stderr.decode(errors='replace')}")
+                return False
+            # Escrita atômica: outro processo nunca lê um FLAC pela metade
+            os.replace(tmp_path, path)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            logger.warning(f"Erro ao salvar áudio no cache de artefatos: {e}")
+            return False
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+        size = path.stat().st_size
+        try:
+            self._store(source_hash, self.AUDIO_ARTIFACT, None, size)
+        except sqlite3.Error as e:
+            logger.warning(f"Erro ao gravar cache de artefatos: {e}")
+            return False
+        logger.debug(
+            f"Áudio salvo no cache de artefatos: {source_hash[:16]}... "
+            f"({size / (1024 * 1024):.1f}MB, {pcm.nbytes / max(size, 1):.1f}x)")
+        return True
+
+    def clear(self) -> None:
+        """Remove todos os artefatos"""
+        conn = self._connection()
+        for (source_hash,) in conn.execute(
+                "SELECT source_hash FROM artifacts WHERE name = ?", (self.AUDIO_ARTIFACT,)).fetchall():
+            try:
+                self._audio_path(source_hash).unlink()
+            except FileNotFoundError:
+                pass
+        conn.execute("DELETE FROM artifacts")
+        with self.lock:
+            self._hits = 0
+            self._misses = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estatísticas O(1) (contadores mantidos por triggers)"""
+        entries, total_bytes = self._connection().execute(
+            "SELECT entries, bytes FROM totals WHERE id = 0"
+        ).fetchone()
+        with self.lock:
+            total_requests = self._hits + self._misses
+            return {
+                "entries": entries,
+                "bytes": total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total_requests * 100, 2) if total_requests else 0,
+                "evictions": self._evictions,
+                "path": str(self.root),
+            }
+
+
+# Instância global do cache de artefatos
+_artifact_cache: Optional[ArtifactCache] = None
+_artifact_cache_lock = Lock()
+
+
+def get_artifact_cache() -> Optional[ArtifactCache]:
+    """
+    Retorna instância singleton do cache de artefatos
+
+    Returns:
+        ArtifactCache, ou None se ENABLE_ARTIFACT_CACHE=false
+    """
+    global _artifact_cache
+    if not settings.ENABLE_ARTIFACT_CACHE:
+        return None
+
+    with _artifact_cache_lock:
+        if _artifact_cache is None:
+            root = settings.ARTIFACT_CACHE_DIR or os.path.join(settings.TEMP_AUDIO_DIR, "artifacts")
+            _artifact_cache = ArtifactCache(
+                Path(root),
+                max_bytes=settings.ARTIFACT_CACHE_MAX_MB * 1024 * 1024
+            )
+            logger.info(
+                f"Cache de artefatos inicializado: {root} "
+                f"(cota {settings.ARTIFACT_CACHE_MAX_MB}MB)")
+    return _artifact_cache
@@ -0,0 +1,248 @@
+"""
+Handler ASGI com upload em streaming e limite de tamanho antes da leitura
+
+O ASGIHandler do Django lê o corpo inteiro para um SpooledTemporaryFile
+(disco do sistema acima de FILE_UPLOAD_MAX_MEMORY_SIZE) antes de qualquer
+middleware ou upload handler rodar: um áudio de 500MB era gravado duas vezes
+(spool + TEMP_AUDIO_DIR) e o limite só era aplicado depois do envio inteiro.
+
+Aqui:
+- Content-Length acima de MAX_REQUEST_BODY_MB é recusado (413) sem ler o corpo;
+- POST multipart vai do socket direto para o MultiPartParser, numa thread do
+  pool 'upload': o StreamingUploadHandler grava o único arquivo em
+  TEMP_AUDIO_DIR (hash e MAX_AUDIO_SIZE_MB aplicados) conforme os pedaços
+  chegam. A requisição já com POST/FILES montados segue pelo Django normal
+  (middlewares, view, detecção de desconexão);
+- os demais corpos seguem o caminho padrão do Django, com o mesmo limite
+  contado durante a leitura (corpos sem Content-Length).
+"""
+import asyncio
+import logging
+from typing import Optional
+
+from django.conf import settings
+from django.core.exceptions import RequestAborted, RequestDataTooBig, TooManyFilesSent
+from django.core.handlers.asgi import ASGIHandler
+from django.http import HttpResponseBadRequest, JsonResponse
+from django.http.multipartparser import MultiPartParserError
+
+from .async_executors import run_upload
+
+logger = logging.getLogger(__name__)
+
+PARSED_REQUEST_KEY = "daredevil.parsed_request"
+
+
+class RequestBodyTooLarge(Exception):
+    """Corpo passou de MAX_REQUEST_BODY_MB durante o envio"""
+
+
+def _header(scope, name: bytes) -> Optional[bytes]:
+    for key, value in scope.get("headers", []):
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _content_length(scope) -> Optional[int]:
+    value = _header(scope, b"content-length")
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _max_body_bytes() -> int:
+    return settings.MAX_REQUEST_BODY_MB * 1024 * 1024
+
+
+def _too_large_response(size_bytes: int) -> JsonResponse:
+    return JsonResponse(
+        {
+            "success": False,
+            "error": f"Requisição muito grande: {size_bytes / (1024 * 1024):.2f}MB "
+                     f"(máximo: {settings.MAX_REQUEST_BODY_MB}MB)",
+        },
+        status=413
+    )
+
+
+def _limited_receive(receive, max_bytes: int):
+    """`receive` que recusa o corpo ao passar de max_bytes (caminho padrão do Django)"""
+    received = 0
+
+    async def wrapped():
+        nonlocal received
+        message = await receive()
+        received += len(message.get("body", b""))
+        if received > max_bytes:
+            raise RequestBodyTooLarge()
+        return message
+
+    return wrapped
+
+
+def _body_already_read(receive):
+    """`receive` para o Django depois do streaming: corpo vazio, depois o original (desconexão)"""
+    delivered = False
+
+    async def wrapped():
+        nonlocal delivered
+        if not delivered:
+            delivered = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        return await receive()
+
+    return wrapped
+
+
+class ASGIBodyStream:
+    """
+    Corpo da requisição lido sob demanda do `receive` do ASGI
+
+    Usado numa thread fora do event loop: cada read() que precisa de mais
+    dados espera a próxima mensagem http.request no loop. Desconexão ou corpo
+    acima do limite encerram a leitura (EOF) e ficam em `aborted`.
+    """
+
+    def __init__(self, receive, loop: asyncio.AbstractEventLoop, max_bytes: int):
+        self._receive = receive
+        self._loop = loop
+        self._max_bytes = max_bytes
+        self._buffer = bytearray()
+        self.finished = False
+        self.received = 0
+        self.aborted: Optional[Exception] = None
+
+    def _receive_more(self) -> None:
+        message = asyncio.run_coroutine_threadsafe(self._receive(), self._loop).result()
+        if message["type"] == "http.disconnect":
+            self.aborted = RequestAborted()
+            self.finished = True
+            return
+
+        body = message.get("body", b"")
+        self.received += len(body)
+        self.finished = not message.get("more_body", False)
+        if self.received > self._max_bytes:
+            self.aborted = RequestBodyTooLarge()
+            self.finished = True
+            return
+        self._buffer += body
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        while not self.finished and (size is None or size < 0 or len(self._buffer) < size):
+            self._receive_more()
+        if size is None or size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def readline(self, size: Optional[int] = -1) -> bytes:
+        while not self.finished and b"\n" not in self._buffer and (
+                size is None or size < 0 or len(self._buffer) < size):
+            self._receive_more()
+        end = self._buffer.find(b"\n") + 1 or len(self._buffer)
+        if size is not None and size >= 0:
+            end = min(end, size)
+        data = bytes(self._buffer[:end])
+        del self._buffer[:end]
+        return data
+
+    def drain(self) -> None:
+        """Consome o que o parser não leu (o Django espera o corpo todo recebido)"""
+        while not self.finished:
+            self._receive_more()
+            self._buffer.clear()
+
+    def close(self) -> None:
+        self._buffer.clear()
+
+
+class StreamingUploadASGIHandler(ASGIHandler):
+    """ASGIHandler que grava uploads multipart em streaming (sem spool do corpo)"""
+
+    async def handle(self, scope, receive, send):
+        max_bytes = _max_body_bytes()
+        content_length = _content_length(scope)
+
+        if content_length is not None and content_length > max_bytes:
+            logger.warning(
+                f"⚠️  Requisição recusada antes do envio: {content_length / (1024 * 1024):.2f}MB "
+                f"(máximo: {settings.MAX_REQUEST_BODY_MB}MB)"
+            )
+            await self.send_response(_too_large_response(content_length), send)
+            return
+
+        content_type = _header(scope, b"content-type") or b""
+        if not (scope["method"] == "POST" and content_length
+                and content_type.lower().startswith(b"multipart/form-data")):
+            try:
+                return await super().handle(scope, _limited_receive(receive, max_bytes), send)
+            except RequestBodyTooLarge:
+                logger.warning(f"⚠️  Requisição passou de {settings.MAX_REQUEST_BODY_MB}MB durante o envio")
+                await self.send_response(_too_large_response(max_bytes + 1), send)
+                return
+
+        stream = ASGIBodyStream(receive, asyncio.get_running_loop(), max_bytes)
+        request, error_response = await run_upload(self._parse_upload, scope, stream)
+        if request is None:
+            if error_response is not None:
+                await self.send_response(error_response, send)
+            return
+
+        await super().handle({**scope, PARSED_REQUEST_KEY: request}, _body_already_read(receive), send)
+
+    def _parse_upload(self, scope, stream: ASGIBodyStream):
+        """
+        Monta a requisição lendo o multipart direto do socket (bloqueante)
+
+        Returns:
+            (requisição, None) ou (None, resposta_de_erro). Com o cliente
+            desconectado a resposta é None (não há para quem enviar).
+        """
+        request, error_response = self.create_request(scope, stream)
+        if request is None:
+            return None, error_response
+
+        try:
+            request.FILES  # MultiPartParser -> StreamingUploadHandler -> TEMP_AUDIO_DIR
+            stream.drain()
+        except (MultiPartParserError, TooManyFilesSent, RequestDataTooBig) as e:
+            if stream.aborted is None:
+                logger.warning(f"Multipart inválido: {e}")
+                self._discard_upload(request)
+                return None, HttpResponseBadRequest()
+        except Exception:
+            self._discard_upload(request)
+            raise
+
+        if isinstance(stream.aborted, RequestAborted):
+            logger.info("Cliente desconectou durante o upload - arquivos parciais removidos")
+            self._discard_upload(request)
+            return None, None
+
+        if isinstance(stream.aborted, RequestBodyTooLarge):
+            logger.warning(f"⚠️  Upload passou de {settings.MAX_REQUEST_BODY_MB}MB durante o envio")
+            self._discard_upload(request)
+            return None, _too_large_response(stream.received)
+
+        return request, None
+
+    @staticmethod
+    def _discard_upload(request) -> None:
+        """Remove os arquivos já gravados em TEMP_AUDIO_DIR por uma requisição descartada"""
+        files = getattr(request, "_files", None)
+        if files:
+            for _, uploaded_files in files.lists():
+                for uploaded in uploaded_files:
+                    uploaded.close()
+        for handler in request.upload_handlers:
+            handler.upload_interrupted()
+
+    def create_request(self, scope, body_file):
+        parsed = scope.get(PARSED_REQUEST_KEY)
+        if parsed is not None:
+            return parsed, None
+        return super().create_request(scope, body_file)
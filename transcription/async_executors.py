@@ -0,0 +1,127 @@
+"""
+Executores limitados para as views assíncronas (ASGI)
+
+Sob ASGI as views síncronas do Django rodam todas numa única thread, então
+uma transcrição de minutos travaria /health, /cache-stats e o polling de
+status. As views de api.py são async e mandam o trabalho bloqueante para
+pools com tamanho fixo:
+
+- io: Redis, Celery, cache, gravação/renomeação de uploads, ffprobe do
+  precheck - trabalho curto, muitas threads (ASYNC_IO_WORKERS)
+- upload: corpo multipart lido do socket direto para TEMP_AUDIO_DIR
+  (asgi_upload) - uma thread por envio em andamento (ASYNC_UPLOAD_WORKERS),
+  separado de io para clientes lentos não atrasarem Redis e cache
+- inference: conversão e transcrição no processo web - no máximo
+  ASYNC_INFERENCE_WORKERS por processo; o excedente espera na fila do pool
+  sem ocupar thread nem o event loop. As threads compartilham o modelo:
+  conversão e micro-batching correm em paralelo, mas cada chamada ao modelo
+  passa por inference_lock (model_pool), uma por vez por instância
+
+Com INFERENCE_IN_WORKERS a espera pelo worker GPU é feita no event loop
+(wait_for_task), sem thread presa por requisição. Sob WSGI as mesmas views
+funcionam (o Django as executa com async_to_sync).
+"""
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_POOL_SIZE_SETTINGS = {
+    "io": "ASYNC_IO_WORKERS",
+    "upload": "ASYNC_UPLOAD_WORKERS",
+    "inference": "ASYNC_INFERENCE_WORKERS",
+}
+_executors_lock = Lock()
+
+
+def _get_executor(kind: str) -> ThreadPoolExecutor:
+    """Pool do tipo pedido ('io', 'upload' ou 'inference'), criado no primeiro uso"""
+    executor = _executors.get(kind)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(kind)
+            if executor is None:
+                max_workers = getattr(settings, _POOL_SIZE_SETTINGS[kind])
+                executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"async-{kind}")
+                _executors[kind] = executor
+                logger.info(f"Executor assíncrono '{kind}' criado ({max_workers} threads)")
+    return executor
+
+
+async def run_io(func: Callable, *args, **kwargs) -> Any:
+    """Executa I/O bloqueante curto (Redis, disco, Celery) fora do event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor("io"), lambda: func(*args, **kwargs))
+
+
+async def run_upload(func: Callable, *args, **kwargs) -> Any:
+    """Executa a leitura em streaming de um upload (espera pelo cliente) no pool próprio"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor("upload"), lambda: func(*args, **kwargs))
+
+
+async def run_inference(func: Callable, *args, **kwargs) -> Any:
+    """Executa conversão/transcrição no pool limitado de inferência"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor("inference"), lambda: func(*args, **kwargs))
+
+
+async def iterate_in_executor(iterator: Iterable, kind: str = "inference") -> AsyncIterator:
+    """
+    Consome um gerador síncrono no executor, um item por vez
+
+    Para StreamingHttpResponse sob ASGI: o Django leria um iterador síncrono
+    inteiro antes de enviar. Se o cliente desconectar, o gerador é fechado
+    (os blocos finally dele rodam).
+    """
+    loop = asyncio.get_running_loop()
+    executor = _get_executor(kind)
+    iterator = iter(iterator)
+    done = object()
+    try:
+        while True:
+            item = await loop.run_in_executor(executor, next, iterator, done)
+            if item is done:
+                break
+            yield item
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            await loop.run_in_executor(executor, close)
+
+
+async def wait_for_task(task, timeout: float, max_interval: float = 1.0) -> Any:
+    """
+    Espera uma tarefa Celery sem prender thread (polling com backoff)
+
+    Raises:
+        TimeoutError: a tarefa não terminou em `timeout` segundos
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    interval = 0.05
+    while not await run_io(task.ready):
+        if loop.time() >= deadline:
+            raise TimeoutError(f"Tarefa {task.id} não concluiu em {timeout}s")
+        await asyncio.sleep(interval)
+        interval = min(interval * 2, max_interval)
+    return await run_io(task.get, timeout=max_interval)
+
+
+def get_executor_stats() -> Dict[str, Optional[Dict[str, int]]]:
+    """Threads e fila de cada pool (None se ainda não foi usado)"""
+    stats = {}
+    for kind in _POOL_SIZE_SETTINGS:
+        executor = _executors.get(kind)
+        stats[kind] = None if executor is None else {
+            "max_workers": executor._max_workers,
+            "threads": len(executor._threads),
+            "queued": executor._work_queue.qsize(),
+        }
+    return stats
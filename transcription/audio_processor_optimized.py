@@ -15,6 +15,10 @@ from pathlib import Path
 from typing import Optional, Dict, Tuple
 from django.conf import settings
 
+from .pcm_decoder import PCMDecoder, read_wav_samples, write_wav_samples
+from .artifact_cache import get_artifact_cache  # ✅ NOVO: ffprobe/conversão já feitos
+from .cache_manager import get_cache_manager  # ✅ NOVO: Cache negativo de conteúdo inválido
+
 logger = logging.getLogger(__name__)
 
 # Importar cliente remoto (obrigatório)
@@ -41,14 +45,28 @@ class AudioProcessor:
         AudioProcessor.TEMP_DIR.mkdir(parents=True, exist_ok=True)
 
     @staticmethod
-    def validate_audio_file(file_path: str) -> Tuple[bool, Optional[Dict]]:
+    def validate_audio_file(
+        file_path: str,
+        source_hash: Optional[str] = None
+    ) -> Tuple[bool, Optional[Dict]]:
         """
         ✅ OTIMIZADO: Valida integridade do arquivo de áudio com ffprobe.
         Detecta rapidamente arquivos corrompidos.
 
+        Args:
+            file_path: Caminho do arquivo
+            source_hash: Hash do arquivo - reaproveita o ffprobe do cache de artefatos
+                e registra rejeições no cache negativo
+
         Returns:
             Tuple[bool, Optional[Dict]]: (is_valid, metadata)
         """
+        artifacts = get_artifact_cache() if source_hash else None
+        if artifacts is not None:
+            metadata = artifacts.get_probe(source_hash, "ffprobe")
+            if metadata is not None:
+                return True, metadata
+
         try:
             result = subprocess.run(
                 [
@@ -67,6 +85,8 @@ class AudioProcessor:
             if result.returncode != 0:
                 logger.warning(
                     f"ffprobe falhou para {file_path}: {result.stderr}")
+                get_cache_manager().mark_invalid_media(
+                    source_hash, "Arquivo de áudio corrompido ou em formato não reconhecido")
                 return False, None
 
             metadata = json.loads(result.stdout)
@@ -79,8 +99,12 @@ class AudioProcessor:
             if not audio_streams:
                 logger.warning(
                     f"Nenhuma faixa de áudio encontrada em {file_path}")
+                get_cache_manager().mark_invalid_media(
+                    source_hash, "Arquivo não contém faixa de áudio")
                 return False, metadata
 
+            if artifacts is not None:
+                artifacts.put_probe(source_hash, "ffprobe", metadata)
             return True, metadata
 
         except subprocess.TimeoutExpired:
@@ -94,12 +118,12 @@ class AudioProcessor:
             return False, None
 
     @staticmethod
-    def get_audio_info(file_path: str) -> Optional[Dict]:
+    def get_audio_info(file_path: str, source_hash: Optional[str] = None) -> Optional[Dict]:
         """
         ✅ OTIMIZADO: Extrai informações de áudio usando ffprobe.
         Retorna duração, sample rate, canais e codec.
         """
-        is_valid, metadata = AudioProcessor.validate_audio_file(file_path)
+        is_valid, metadata = AudioProcessor.validate_audio_file(file_path, source_hash)
 
         if not is_valid or not metadata:
             return None
@@ -166,7 +190,11 @@ class AudioProcessor:
         return True
 
     @staticmethod
-    def convert_to_wav(input_path: str, output_path: Optional[str] = None) -> Optional[str]:
+    def convert_to_wav(
+        input_path: str,
+        output_path: Optional[str] = None,
+        source_hash: Optional[str] = None
+    ) -> Optional[str]:
         """
         ✅ OTIMIZADO: Converte áudio para WAV 16kHz mono PCM.
         
@@ -187,6 +215,7 @@ class AudioProcessor:
         Args:
             input_path: Caminho do arquivo de entrada
             output_path: Caminho do arquivo de saída (gerado automaticamente se None)
+            source_hash: Hash do arquivo - conversão já feita é lida do cache de artefatos
 
         Returns:
             str: Caminho do arquivo convertido, ou None em erro
@@ -197,7 +226,7 @@ class AudioProcessor:
         AudioProcessor.ensure_temp_dir()
 
         # ✅ OTIMIZADO: Validar arquivo antes de converter
-        is_valid, audio_info = AudioProcessor.validate_audio_file(input_path)
+        is_valid, audio_info = AudioProcessor.validate_audio_file(input_path, source_hash)
         if not is_valid:
             logger.error(f"❌ Arquivo de áudio inválido: {input_path}")
             return None
@@ -214,6 +243,14 @@ class AudioProcessor:
                 AudioProcessor.TEMP_DIR / f"audio_{os.urandom(8).hex()}.wav"
             )
 
+        # ✅ NOVO: Mesmo arquivo já convertido (outro modelo/idioma, retry)
+        artifacts = get_artifact_cache() if source_hash else None
+        if artifacts is not None:
+            samples = artifacts.get_audio(source_hash)
+            if samples is not None:
+                write_wav_samples(output_path, samples)
+                return output_path
+
         # ✨ OBRIGATÓRIO: Usar conversão REMOTA apenas
         if not REMOTE_CONVERTER_AVAILABLE:
             logger.error(
@@ -241,6 +278,10 @@ class AudioProcessor:
         
         if remote_result:
             logger.info(f"✓ Conversão remota concluída: {remote_result}")
+            if artifacts is not None:
+                samples = read_wav_samples(remote_result)
+                if samples is not None:
+                    artifacts.put_audio(source_hash, samples)
             return remote_result
         else:
             logger.error(
@@ -252,6 +293,41 @@ class AudioProcessor:
             )
             return None
 
+    @staticmethod
+    def decode_to_array(
+        file_path: str,
+        expected_duration: Optional[float] = None,
+        timeout: int = 300
+    ) -> Optional["np.ndarray"]:
+        """
+        ✅ NOVO: Decodifica áudio direto para memória (float32 16kHz mono).
+
+        WAV já em PCM 16kHz mono é lido sem ffmpeg; demais formatos passam por
+        um pipe s16le do ffmpeg. O array vai direto ao modelo, evitando que o
+        Whisper decodifique o arquivo novamente.
+
+        Args:
+            file_path: Caminho do arquivo de áudio
+            expected_duration: Duração (ffprobe) para pré-alocar o buffer
+            timeout: Tempo máximo de decodificação em segundos
+
+        Returns:
+            Array de amostras, ou None em erro
+        """
+        samples = read_wav_samples(file_path)
+        if samples is not None:
+            return samples
+
+        success, result = PCMDecoder.decode(
+            file_path,
+            timeout=timeout,
+            expected_duration=expected_duration
+        )
+        if not success:
+            logger.error(f"❌ Falha ao decodificar áudio em memória: {result}")
+            return None
+        return result
+
     @staticmethod
     def cleanup_temp_file(file_path: str):
         """Remove arquivo temporário de forma segura."""
@@ -263,13 +339,18 @@ class AudioProcessor:
             logger.warning(f"Erro ao remover arquivo temporário: {e}")
 
     @staticmethod
-    def extract_audio_from_video(video_path: str, output_path: str) -> str:
+    def extract_audio_from_video(
+        video_path: str,
+        output_path: str,
+        source_hash: Optional[str] = None
+    ) -> str:
         """
         Extrai áudio de arquivo de vídeo (mantém compatibilidade com VideoProcessor).
 
         Args:
             video_path: Caminho do arquivo de vídeo
             output_path: Caminho do arquivo de áudio de saída
+            source_hash: Hash do arquivo (cache de artefatos)
 
         Returns:
             str: Caminho do arquivo de áudio extraído
@@ -281,7 +362,7 @@ class AudioProcessor:
 
             # ✅ Usar VideoProcessor para extração (já otimizado)
             success, msg = VideoProcessor.extract_audio(
-                video_path, output_path)
+                video_path, output_path, source_hash=source_hash)
 
             if not success:
                 raise ValueError(f"Falha na extração de áudio: {msg}")
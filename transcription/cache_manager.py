@@ -5,33 +5,137 @@ Implementa cache baseado em hash com política LRU e TTL configurável
 import os
 import json
 import time
+import zlib
+import heapq
+import sqlite3
 import hashlib
 import logging
 from pathlib import Path
-from typing import Optional, Dict, Any
-from collections import OrderedDict
-from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+from threading import Event, Lock, Thread, local
+import numpy as np
 from django.conf import settings
 
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+    redis = None
+
 logger = logging.getLogger(__name__)
 
 
+# ✅ NOVO: Entradas com resposta pré-serializada ("body") guardam o corpo cru
+# depois de um cabeçalho JSON - o hit não faz parse do corpo
+BODY_FIELD = "body"
+BODY_ENTRY_MAGIC = b"\x00DDB1"
+
+
+def encode_entry(value: Any) -> bytes:
+    """Serializa entrada do cache como JSON compacto (sem indentação)"""
+    if isinstance(value, dict) and isinstance(value.get(BODY_FIELD), (bytes, str)):
+        body = value[BODY_FIELD]
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        header = {k: v for k, v in value.items() if k != BODY_FIELD}
+        # JSON compacto nunca contém quebra de linha crua: separador seguro
+        return (BODY_ENTRY_MAGIC
+                + json.dumps(header, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+                + b"\n" + body)
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def decode_entry(raw: bytes) -> Any:
+    """Inverso de encode_entry ("body" volta como bytes, sem parse)"""
+    if raw.startswith(BODY_ENTRY_MAGIC):
+        header_end = raw.index(b"\n", len(BODY_ENTRY_MAGIC))
+        value = json.loads(raw[len(BODY_ENTRY_MAGIC):header_end])
+        value[BODY_FIELD] = raw[header_end + 1:]
+        return value
+    return json.loads(raw)
+
+
+def pack_entry(value: Any, compression_level: int = 6) -> bytes:
+    """Serializa entrada do cache em forma compacta (JSON sem indentação + zlib)"""
+    return zlib.compress(encode_entry(value), compression_level)
+
+
+def unpack_entry(raw: bytes) -> Any:
+    """Inverso de pack_entry (levanta zlib.error/ValueError se corrompido)"""
+    return decode_entry(zlib.decompress(raw))
+
+
 class LRUCache:
-    """Cache LRU thread-safe com TTL configurável"""
+    """
+    Cache thread-safe com orçamento em bytes, TTL e despejo cost-aware
+
+    As entradas ficam comprimidas (pack_entry) e o orçamento é medido nesse
+    tamanho. O despejo segue GreedyDual-Size: cada entrada tem prioridade
+    L + custo/tamanho, onde custo é quanto ela levou para ser calculada
+    (processing_time) e L sobe para a prioridade da última entrada
+    despejada. Entradas grandes e baratas saem primeiro; acessos renovam a
+    prioridade, então entre entradas equivalentes o comportamento é LRU.
+    """
+    
+    MIN_COST = 0.01  # Evita prioridade zero para entradas sem custo conhecido
     
-    def __init__(self, max_size: int = 100, ttl_seconds: int = 3600):
+    def __init__(
+        self,
+        max_size: int = 0,
+        ttl_seconds: int = 3600,
+        max_bytes: int = 256 * 1024 * 1024,
+        compression_level: int = 6
+    ):
         """
         Args:
-            max_size: Número máximo de itens no cache
+            max_size: Número máximo de itens no cache (0 = limitado apenas por bytes)
             ttl_seconds: Tempo de vida dos itens em segundos (padrão: 1 hora)
+            max_bytes: Orçamento em bytes das entradas comprimidas
+            compression_level: Nível de compressão zlib (1-9)
         """
         self.max_size = max_size
+        self.max_bytes = max_bytes
         self.ttl_seconds = ttl_seconds
-        self.cache: OrderedDict = OrderedDict()
+        self.compression_level = compression_level
+        self.cache: Dict[str, bytes] = {}
         self.timestamps: Dict[str, float] = {}
+        self.raw_sizes: Dict[str, int] = {}
+        self.costs: Dict[str, float] = {}
+        self.priorities: Dict[str, Tuple[float, int]] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._sequence = 0
+        self._inflation = 0.0  # L do GreedyDual-Size
+        self._bytes = 0
+        self._raw_bytes = 0
         self.lock = Lock()
         self._hits = 0
         self._misses = 0
+        self._evictions = 0
+        
+    def _touch(self, key: str) -> None:
+        """Recalcula a prioridade da entrada (inserção ou acesso)"""
+        priority = self._inflation + self.costs[key] / len(self.cache[key])
+        self._sequence += 1
+        self.priorities[key] = (priority, self._sequence)
+        heapq.heappush(self._heap, (priority, self._sequence, key))
+        
+        # Heap acumula prioridades antigas (remoção preguiçosa): reconstruir
+        if len(self._heap) > 2 * len(self.cache) + 64:
+            self._heap = [(p, seq, k) for k, (p, seq) in self.priorities.items()]
+            heapq.heapify(self._heap)
+    
+    def _evict_one(self) -> None:
+        """Remove a entrada de menor prioridade"""
+        while self._heap:
+            priority, sequence, key = heapq.heappop(self._heap)
+            if self.priorities.get(key) != (priority, sequence):
+                continue  # Prioridade desatualizada
+            self._inflation = priority
+            logger.debug(f"Cache cheio, removendo item de menor prioridade: {key[:16]}...")
+            self._remove(key)
+            self._evictions += 1
+            return
         
     def get(self, key: str) -> Optional[Any]:
         """
@@ -55,50 +159,77 @@ class LRUCache:
                 self._misses += 1
                 return None
             
-            # Mover para o final (mais recente)
-            self.cache.move_to_end(key)
+            self._touch(key)
             self._hits += 1
             logger.debug(f"Cache HIT para chave: {key[:16]}...")
-            return self.cache[key]
+            raw = self.cache[key]
+        
+        # Descomprimir fora do lock
+        return unpack_entry(raw)
     
-    def set(self, key: str, value: Any) -> None:
+    def set(self, key: str, value: Any, cost: Optional[float] = None) -> None:
         """
         Adiciona ou atualiza item no cache
         
         Args:
             key: Chave do cache
-            value: Valor a ser cacheado
+            value: Valor a ser cacheado (serializável em JSON)
+            cost: Custo de recalcular a entrada (ex: segundos de processamento)
         """
+        encoded = encode_entry(value)
+        packed = zlib.compress(encoded, self.compression_level)
+        
+        if len(packed) > self.max_bytes:
+            logger.debug(f"Entrada maior que o orçamento do cache, ignorando: {key[:16]}...")
+            return
+        
         with self.lock:
-            # Se já existe, remover para atualizar posição
+            # Se já existe, remover para atualizar tamanho e prioridade
             if key in self.cache:
                 self._remove(key)
             
             # Adicionar novo item
-            self.cache[key] = value
+            self.cache[key] = packed
             self.timestamps[key] = time.time()
+            self.raw_sizes[key] = len(encoded)
+            self.costs[key] = max(cost or 0.0, self.MIN_COST)
+            self._bytes += len(packed)
+            self._raw_bytes += len(encoded)
+            self._touch(key)
             
-            # Remover item mais antigo se exceder tamanho máximo
-            if len(self.cache) > self.max_size:
-                oldest_key = next(iter(self.cache))
-                logger.debug(f"Cache cheio, removendo item mais antigo: {oldest_key[:16]}...")
-                self._remove(oldest_key)
+            # Despejar até caber no orçamento (bytes e, se definido, itens)
+            while self._bytes > self.max_bytes or \
+                    (self.max_size and len(self.cache) > self.max_size):
+                self._evict_one()
             
-            logger.debug(f"Cache SET para chave: {key[:16]}...")
+            logger.debug(f"Cache SET para chave: {key[:16]}... ({len(packed)} bytes)")
     
     def _remove(self, key: str) -> None:
         """Remove item do cache (internal use)"""
         if key in self.cache:
+            self._bytes -= len(self.cache[key])
+            self._raw_bytes -= self.raw_sizes[key]
             del self.cache[key]
             del self.timestamps[key]
+            del self.raw_sizes[key]
+            del self.costs[key]
+            del self.priorities[key]
     
     def clear(self) -> None:
         """Limpa todo o cache"""
         with self.lock:
             self.cache.clear()
             self.timestamps.clear()
+            self.raw_sizes.clear()
+            self.costs.clear()
+            self.priorities.clear()
+            self._heap.clear()
+            self._inflation = 0.0
+            self._bytes = 0
+            self._raw_bytes = 0
             self._hits = 0
             self._misses = 0
+            self._evictions = 0
             logger.info("Cache limpo completamente")
     
     def get_stats(self) -> Dict[str, Any]:
@@ -115,6 +246,11 @@ class LRUCache:
             return {
                 "size": len(self.cache),
                 "max_size": self.max_size,
+                "bytes_used": self._bytes,
+                "max_bytes": self.max_bytes,
+                "uncompressed_bytes": self._raw_bytes,
+                "compression_ratio": round(self._raw_bytes / self._bytes, 2) if self._bytes else 0,
+                "evictions": self._evictions,
                 "hits": self._hits,
                 "misses": self._misses,
                 "hit_rate": round(hit_rate, 2),
@@ -122,6 +258,510 @@ class LRUCache:
             }
 
 
+class RedisCache:
+    """
+    Tier compartilhado no Redis, com TTL e valores JSON comprimidos (zlib)
+
+    Todos os processos (web e workers Celery) enxergam as mesmas entradas.
+    Hits e misses também são contados no Redis, de forma que o hit rate
+    reflete o cluster inteiro. Falhas de conexão viram miss e desativam o
+    tier por alguns segundos para não atrasar as requisições.
+    """
+
+    KEY_PREFIX = "daredevil:transcription_cache:"
+    STATS_KEY = "daredevil:transcription_cache_stats"
+    RETRY_AFTER_SECONDS = 30
+
+    def __init__(self, url: str, ttl_seconds: int, compression_level: int = 6):
+        """
+        Args:
+            url: URL do Redis
+            ttl_seconds: Tempo de vida das entradas no Redis
+            compression_level: Nível de compressão zlib (1-9)
+        """
+        self.url = url
+        self.ttl_seconds = ttl_seconds
+        self.compression_level = compression_level
+        self.client = redis.Redis.from_url(
+            url, socket_timeout=1, socket_connect_timeout=1
+        )
+        self._unavailable_until = 0.0
+        self._hits = 0
+        self._misses = 0
+        self._errors = 0
+        self.lock = Lock()
+
+    def _available(self) -> bool:
+        return time.time() >= self._unavailable_until
+
+    def _on_error(self, action: str, error: Exception) -> None:
+        with self.lock:
+            self._errors += 1
+        self._unavailable_until = time.time() + self.RETRY_AFTER_SECONDS
+        logger.warning(
+            f"Cache Redis indisponível ({action}): {error} - "
+            f"tentando novamente em {self.RETRY_AFTER_SECONDS}s"
+        )
+
+    def _count(self, field: str) -> None:
+        with self.lock:
+            if field == "hits":
+                self._hits += 1
+            else:
+                self._misses += 1
+        try:
+            self.client.hincrby(self.STATS_KEY, field, 1)
+        except redis.RedisError:
+            pass
+
+    def get(self, key: str) -> Optional[Any]:
+        """Obtém e descomprime a entrada; None se ausente ou Redis indisponível"""
+        if not self._available():
+            return None
+
+        try:
+            raw = self.client.get(self.KEY_PREFIX + key)
+        except redis.RedisError as e:
+            self._on_error("get", e)
+            return None
+
+        if raw is None:
+            self._count("misses")
+            return None
+
+        try:
+            value = unpack_entry(raw)
+        except (zlib.error, ValueError) as e:
+            logger.warning(f"Entrada corrompida no Redis, removendo: {key[:16]}... ({e})")
+            self.delete(key)
+            self._count("misses")
+            return None
+
+        self._count("hits")
+        logger.debug(f"Cache Redis HIT para chave: {key[:16]}...")
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Comprime e grava a entrada com TTL"""
+        if not self._available():
+            return
+
+        payload = pack_entry(value, self.compression_level)
+        try:
+            self.client.set(self.KEY_PREFIX + key, payload, ex=self.ttl_seconds)
+        except redis.RedisError as e:
+            self._on_error("set", e)
+
+    def delete(self, key: str) -> None:
+        """Remove a entrada"""
+        try:
+            self.client.delete(self.KEY_PREFIX + key)
+        except redis.RedisError as e:
+            self._on_error("delete", e)
+
+    def clear(self) -> None:
+        """Remove todas as entradas de transcrição e as estatísticas do cluster"""
+        try:
+            batch = []
+            for key in self.client.scan_iter(match=f"{self.KEY_PREFIX}*", count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    self.client.unlink(*batch)
+                    batch = []
+            if batch:
+                self.client.unlink(*batch)
+            self.client.delete(self.STATS_KEY)
+        except redis.RedisError as e:
+            self._on_error("clear", e)
+
+        with self.lock:
+            self._hits = 0
+            self._misses = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Estatísticas do tier: do processo atual e do cluster (contadores no Redis)
+        """
+        with self.lock:
+            local_total = self._hits + self._misses
+            stats = {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / local_total * 100, 2) if local_total else 0,
+                "errors": self._errors,
+                "ttl_seconds": self.ttl_seconds,
+                "available": self._available(),
+            }
+
+        try:
+            cluster = self.client.hgetall(self.STATS_KEY)
+            hits = int(cluster.get(b"hits", 0))
+            misses = int(cluster.get(b"misses", 0))
+            stats["cluster_hits"] = hits
+            stats["cluster_misses"] = misses
+            stats["cluster_hit_rate"] = round(hits / (hits + misses) * 100, 2) if hits + misses else 0
+        except redis.RedisError as e:
+            stats["cluster_error"] = str(e)
+
+        return stats
+
+
+class RedisFingerprintIndex(RedisCache):
+    """Índice de fingerprints no Redis (mesmo mecanismo do tier de transcrições)"""
+
+    KEY_PREFIX = "daredevil:pcm_index:"
+    STATS_KEY = "daredevil:pcm_index_stats"
+
+
+class FingerprintIndex:
+    """
+    Índice de chaves equivalentes -> chave do resultado no cache
+
+    O mesmo áudio chega em containers diferentes (nota de voz reencaminhada,
+    faixa igual em .mp4 e .mkv) e o hash dos bytes muda. O fingerprint do PCM
+    decodificado não muda: cada fingerprint aponta para a chave onde o
+    resultado já está, sem duplicar a transcrição nos tiers.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10000,
+        ttl_seconds: int = 3600,
+        redis_index: Optional[RedisFingerprintIndex] = None
+    ):
+        """
+        Args:
+            max_size: Máximo de entradas do índice em memória
+            ttl_seconds: Tempo de vida das entradas em memória
+            redis_index: Índice compartilhado no Redis (opcional)
+        """
+        # Cada entrada é uma chave de 32 caracteres (~100 bytes empacotada)
+        self.local = LRUCache(max_size=max_size, ttl_seconds=ttl_seconds, max_bytes=max_size * 128)
+        self.redis_index = redis_index
+
+    def resolve(self, alias_key: str) -> Optional[str]:
+        """Chave do resultado para a chave equivalente, se indexada"""
+        cache_key = self.local.get(alias_key)
+        if cache_key is None and self.redis_index is not None:
+            cache_key = self.redis_index.get(alias_key)
+            if cache_key is not None:
+                self.local.set(alias_key, cache_key)
+        return cache_key
+
+    def link(self, alias_key: str, cache_key: str) -> None:
+        """Registra alias_key como equivalente a cache_key"""
+        if alias_key == cache_key:
+            return
+        self.local.set(alias_key, cache_key)
+        if self.redis_index is not None:
+            self.redis_index.set(alias_key, cache_key)
+
+    def clear(self) -> None:
+        """Limpa o índice (memória e Redis)"""
+        self.local.clear()
+        if self.redis_index is not None:
+            self.redis_index.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estatísticas do índice"""
+        local_stats = self.local.get_stats()
+        stats = {
+            "size": local_stats["size"],
+            "max_size": local_stats["max_size"],
+            "hits": local_stats["hits"],
+            "misses": local_stats["misses"],
+            "hit_rate": local_stats["hit_rate"],
+        }
+        if self.redis_index is not None:
+            stats["redis"] = self.redis_index.get_stats()
+        return stats
+
+
+class RedisInvalidMediaCache(RedisCache):
+    """Mídias inválidas no Redis (mesmo mecanismo do tier de transcrições)"""
+
+    KEY_PREFIX = "daredevil:invalid_media:"
+    STATS_KEY = "daredevil:invalid_media_stats"
+
+
+class InvalidMediaCache:
+    """
+    ✅ NOVO: Cache negativo - hash do conteúdo -> motivo da rejeição
+
+    Clientes e o retry do Celery reenviam o mesmo arquivo corrompido ou sem
+    faixa de áudio, e cada tentativa rodaria ffprobe (e a conversão remota)
+    de novo. Falhas que dependem só do conteúdo ficam registradas com TTL
+    curto e o reenvio é recusado sem subprocessos nem chamadas de rede.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10000,
+        ttl_seconds: int = 600,
+        redis_cache: Optional[RedisInvalidMediaCache] = None
+    ):
+        """
+        Args:
+            max_size: Máximo de entradas em memória
+            ttl_seconds: Tempo de vida das entradas em memória
+            redis_cache: Registro compartilhado no Redis (opcional)
+        """
+        # Cada entrada é uma mensagem curta (~200 bytes empacotada)
+        self.local = LRUCache(max_size=max_size, ttl_seconds=ttl_seconds, max_bytes=max_size * 512)
+        self.redis_cache = redis_cache
+
+    def get(self, content_hash: str) -> Optional[str]:
+        """Motivo da rejeição, se o conteúdo já foi recusado"""
+        error = self.local.get(content_hash)
+        if error is None and self.redis_cache is not None:
+            error = self.redis_cache.get(content_hash)
+            if error is not None:
+                self.local.set(content_hash, error)
+        return error
+
+    def add(self, content_hash: str, error: str) -> None:
+        """Registra o conteúdo como inválido"""
+        self.local.set(content_hash, error)
+        if self.redis_cache is not None:
+            self.redis_cache.set(content_hash, error)
+
+    def clear(self) -> None:
+        """Limpa o registro (memória e Redis)"""
+        self.local.clear()
+        if self.redis_cache is not None:
+            self.redis_cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estatísticas do cache negativo (hits = reenvios recusados)"""
+        local_stats = self.local.get_stats()
+        stats = {
+            "size": local_stats["size"],
+            "max_size": local_stats["max_size"],
+            "ttl_seconds": local_stats["ttl_seconds"],
+            "hits": local_stats["hits"],
+            "misses": local_stats["misses"],
+        }
+        if self.redis_cache is not None:
+            stats["redis"] = self.redis_cache.get_stats()
+        return stats
+
+
+class DiskCache:
+    """
+    Tier em disco em um único arquivo SQLite (modo WAL)
+
+    Valores compactos (pack_entry), índice por expiração varrido por uma
+    thread em segundo plano e contadores de entradas/bytes mantidos por
+    triggers - get_stats é O(1), sem listar diretórios. O modo WAL permite
+    leituras concorrentes de vários processos enquanto um escreve.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            key TEXT PRIMARY KEY,
+            value BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            expires_at REAL NOT NULL
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at);
+        CREATE TABLE IF NOT EXISTS totals (
+            id INTEGER PRIMARY KEY CHECK (id = 0),
+            entries INTEGER NOT NULL,
+            bytes INTEGER NOT NULL
+        );
+        INSERT OR IGNORE INTO totals (id, entries, bytes) VALUES (0, 0, 0);
+        CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+            UPDATE totals SET entries = entries + 1, bytes = bytes + NEW.size WHERE id = 0;
+        END;
+        CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+            UPDATE totals SET entries = entries - 1, bytes = bytes - OLD.size WHERE id = 0;
+        END;
+        CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE ON entries BEGIN
+            UPDATE totals SET bytes = bytes - OLD.size + NEW.size WHERE id = 0;
+        END;
+    """
+    SWEEP_BATCH = 1000
+
+    def __init__(
+        self,
+        db_path: Path,
+        ttl_seconds: int,
+        compression_level: int = 6,
+        sweep_interval: float = 300
+    ):
+        """
+        Args:
+            db_path: Arquivo SQLite
+            ttl_seconds: Tempo de vida das entradas
+            compression_level: Nível de compressão zlib (1-9)
+            sweep_interval: Segundos entre varreduras de entradas expiradas (0 = sem thread)
+        """
+        self.db_path = Path(db_path)
+        self.ttl_seconds = ttl_seconds
+        self.compression_level = compression_level
+        self._local = local()
+        self.lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._swept = 0
+        self._stop = Event()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection().executescript(self.SCHEMA)
+
+        if sweep_interval > 0:
+            Thread(
+                target=self._sweep_loop, args=(sweep_interval,),
+                name="disk-cache-sweeper", daemon=True
+            ).start()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Conexão por thread (sqlite3 não compartilha conexões entre threads)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        """Obtém a entrada se existir e não tiver expirado"""
+        row = self._connection().execute(
+            "SELECT value FROM entries WHERE key = ? AND expires_at > ?",
+            (key, time.time())
+        ).fetchone()
+
+        value = None
+        if row is not None:
+            try:
+                value = unpack_entry(row[0])
+            except (zlib.error, ValueError) as e:
+                logger.warning(f"Entrada corrompida no disco, removendo: {key[:16]}... ({e})")
+                self.delete(key)
+
+        with self.lock:
+            if value is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Grava (ou substitui) a entrada com TTL"""
+        payload = pack_entry(value, self.compression_level)
+        self._connection().execute(
+            """
+            INSERT INTO entries (key, value, size, expires_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT (key) DO UPDATE SET
+                value = excluded.value, size = excluded.size, expires_at = excluded.expires_at
+            """,
+            (key, payload, len(payload), time.time() + self.ttl_seconds)
+        )
+
+    def delete(self, key: str) -> None:
+        """Remove a entrada"""
+        self._connection().execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def sweep(self) -> int:
+        """
+        Remove entradas expiradas em lotes (sem travar o banco por muito tempo)
+
+        Returns:
+            Número de entradas removidas
+        """
+        conn = self._connection()
+        removed = 0
+        while True:
+            cursor = conn.execute(
+                "DELETE FROM entries WHERE key IN "
+                "(SELECT key FROM entries WHERE expires_at <= ? LIMIT ?)",
+                (time.time(), self.SWEEP_BATCH)
+            )
+            removed += cursor.rowcount
+            if cursor.rowcount < self.SWEEP_BATCH:
+                break
+
+        if removed:
+            with self.lock:
+                self._swept += removed
+            logger.debug(f"Cache em disco: {removed} entrada(s) expirada(s) removida(s)")
+        return removed
+
+    def _sweep_loop(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.sweep()
+            except sqlite3.Error as e:
+                logger.warning(f"Erro na varredura do cache em disco: {e}")
+
+    def clear(self) -> None:
+        """Remove todas as entradas"""
+        self._connection().execute("DELETE FROM entries")
+        with self.lock:
+            self._hits = 0
+            self._misses = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estatísticas O(1) (contadores mantidos por triggers)"""
+        entries, total_bytes = self._connection().execute(
+            "SELECT entries, bytes FROM totals WHERE id = 0"
+        ).fetchone()
+        with self.lock:
+            total_requests = self._hits + self._misses
+            return {
+                "entries": entries,
+                "bytes": total_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total_requests * 100, 2) if total_requests else 0,
+                "expired_swept": self._swept,
+                "ttl_seconds": self.ttl_seconds,
+                "path": str(self.db_path),
+            }
+
+
+def new_content_hasher() -> "hashlib._Hash":
+    """
+    Hash de conteúdo usado nas chaves de cache (BLAKE2b, 128 bits)
+
+    Pode ser alimentado incrementalmente (ex: enquanto o upload é gravado),
+    sem manter o arquivo inteiro em memória.
+    """
+    return hashlib.blake2b(digest_size=16)
+
+
+def hash_pcm(samples: np.ndarray) -> str:
+    """
+    ✅ NOVO: Fingerprint do áudio decodificado (PCM 16kHz mono)
+
+    As amostras são quantizadas para int16 e o silêncio digital das bordas é
+    descartado (remux pode mudar o preenchimento do codec), então o mesmo
+    áudio em containers diferentes gera o mesmo fingerprint.
+
+    Args:
+        samples: Amostras float32 em [-1, 1]
+
+    Returns:
+        Hash BLAKE2b (32 caracteres hex) do PCM
+    """
+    pcm = np.clip(np.rint(np.asarray(samples, dtype=np.float32) * 32768.0), -32768, 32767)
+    pcm = pcm.astype('<i2')
+    nonzero = np.flatnonzero(pcm)
+    if nonzero.size:
+        pcm = pcm[nonzero[0]:nonzero[-1] + 1]
+    hasher = new_content_hasher()
+    hasher.update(b"pcm16k:")
+    hasher.update(pcm.tobytes())
+    return hasher.hexdigest()
+
+
+def hash_file(file_path: str) -> str:
+    """Hash do conteúdo do arquivo lido em blocos (memória constante)"""
+    with open(file_path, 'rb') as f:
+        return hashlib.file_digest(f, new_content_hasher).hexdigest()
+
+
 class TranscriptionCacheManager:
     """Gerenciador de cache para transcrições com persistência opcional"""
     
@@ -130,24 +770,58 @@ class TranscriptionCacheManager:
         cache_dir: Optional[str] = None,
         memory_cache_size: int = 100,
         ttl_seconds: int = 3600,
-        enable_disk_cache: bool = False
+        enable_disk_cache: bool = False,
+        redis_cache: Optional[RedisCache] = None,
+        disk_ttl_seconds: Optional[int] = None,
+        memory_max_bytes: int = 256 * 1024 * 1024,
+        fingerprint_index: Optional[FingerprintIndex] = None,
+        invalid_media: Optional[InvalidMediaCache] = None
     ):
         """
         Args:
             cache_dir: Diretório para cache em disco (opcional)
-            memory_cache_size: Tamanho do cache em memória
+            memory_cache_size: Máximo de itens em memória (0 = limitado apenas por bytes)
             ttl_seconds: TTL para itens do cache
             enable_disk_cache: Se True, persiste cache em disco
+            redis_cache: Tier compartilhado no Redis (opcional)
+            disk_ttl_seconds: TTL do tier em disco (padrão: ttl_seconds)
+            memory_max_bytes: Orçamento em bytes (comprimidos) do cache em memória
+            fingerprint_index: Índice de chaves equivalentes (padrão: só em memória)
+            invalid_media: Cache negativo de conteúdos inválidos (None = desabilitado)
         """
         self.cache_dir = Path(cache_dir) if cache_dir else Path(settings.TEMP_AUDIO_DIR) / "cache"
         self.enable_disk_cache = enable_disk_cache
-        self.memory_cache = LRUCache(max_size=memory_cache_size, ttl_seconds=ttl_seconds)
+        self.memory_cache = LRUCache(
+            max_size=memory_cache_size,
+            ttl_seconds=ttl_seconds,
+            max_bytes=memory_max_bytes,
+            compression_level=settings.CACHE_COMPRESSION_LEVEL
+        )
+        self.redis_cache = redis_cache
+        self.fingerprint_index = fingerprint_index or FingerprintIndex(ttl_seconds=ttl_seconds)
+        self.invalid_media = invalid_media
+        self._stats_lock = Lock()
+        self._requests = 0
+        self._hits = 0
         
+        self.disk_cache: Optional[DiskCache] = None
         if self.enable_disk_cache:
-            self.cache_dir.mkdir(parents=True, exist_ok=True)
-            logger.info(f"Cache em disco habilitado: {self.cache_dir}")
+            self.disk_cache = DiskCache(
+                self.cache_dir / "transcriptions.sqlite3",
+                ttl_seconds=disk_ttl_seconds or ttl_seconds,
+                compression_level=settings.CACHE_COMPRESSION_LEVEL,
+                sweep_interval=settings.CACHE_DISK_SWEEP_SECONDS
+            )
+            logger.info(f"Cache em disco habilitado: {self.disk_cache.db_path}")
     
-    def generate_cache_key(self, file_path: str, model: Optional[str] = None, language: Optional[str] = None) -> str:
+    def generate_cache_key(
+        self,
+        file_path: str,
+        model: Optional[str] = None,
+        language: Optional[str] = None,
+        engine: Optional[str] = None,
+        content_hash: Optional[str] = None
+    ) -> str:
         """
         Gera chave única de cache baseada no conteúdo do arquivo e parâmetros
         
@@ -155,19 +829,61 @@ class TranscriptionCacheManager:
             file_path: Caminho do arquivo
             model: Modelo Whisper usado
             language: Idioma da transcrição
+            engine: Engine de inferência usada (resultados diferem entre engines)
+            content_hash: Hash do conteúdo já calculado (ex: durante o upload);
+                evita ler o arquivo novamente
             
         Returns:
-            Hash MD5 como chave do cache
+            Hash BLAKE2b (32 caracteres hex) como chave do cache
         """
-        # Hash do conteúdo do arquivo
-        with open(file_path, 'rb') as f:
-            file_hash = hashlib.md5(f.read()).hexdigest()
+        # Hash do conteúdo do arquivo (lido em blocos se não foi informado)
+        if content_hash is None:
+            content_hash = hash_file(file_path)
         
-        # Incluir modelo e idioma na chave
-        cache_key_data = f"{file_hash}_{model or settings.WHISPER_MODEL}_{language or settings.WHISPER_LANGUAGE}"
-        cache_key = hashlib.md5(cache_key_data.encode()).hexdigest()
+        return self._key_for(content_hash, model, language, engine)
+    
+    def generate_fingerprint_key(
+        self,
+        fingerprint: str,
+        model: Optional[str] = None,
+        language: Optional[str] = None,
+        engine: Optional[str] = None
+    ) -> str:
+        """
+        ✅ NOVO: Chave secundária a partir do fingerprint do PCM (hash_pcm)
         
-        return cache_key
+        Returns:
+            Hash BLAKE2b (32 caracteres hex), em espaço separado das chaves de conteúdo
+        """
+        return self._key_for(f"pcm:{fingerprint}", model, language, engine)
+    
+    @staticmethod
+    def generate_view_key(cache_key: str, view: str) -> str:
+        """
+        ✅ NOVO: Chave de uma versão derivada do resultado em cache_key
+        
+        Args:
+            cache_key: Chave do resultado bruto
+            view: Identificador da derivação (ex: idioma + versão do pós-processamento)
+        
+        Returns:
+            Hash BLAKE2b (32 caracteres hex)
+        """
+        return hashlib.blake2b(f"view:{cache_key}:{view}".encode(), digest_size=16).hexdigest()
+    
+    @staticmethod
+    def _key_for(
+        content_id: str,
+        model: Optional[str],
+        language: Optional[str],
+        engine: Optional[str]
+    ) -> str:
+        # Incluir modelo, idioma e engine na chave
+        cache_key_data = (
+            f"{content_id}_{model or settings.WHISPER_MODEL}_"
+            f"{language or settings.WHISPER_LANGUAGE}_{engine or settings.WHISPER_ENGINE}"
+        )
+        return hashlib.blake2b(cache_key_data.encode(), digest_size=16).hexdigest()
     
     def _validate_cache_data(self, cache_data: Any) -> bool:
         """
@@ -201,6 +917,15 @@ class TranscriptionCacheManager:
                 logger.warning("Cache inválido: 'processing_time' não é numérico")
                 return False
             
+            # ✅ NOVO: Resposta pré-serializada (objeto JSON sem cached/processing_time)
+            if BODY_FIELD in cache_data:
+                body = cache_data[BODY_FIELD]
+                if isinstance(body, str):
+                    body = body.encode('utf-8')
+                if not isinstance(body, bytes) or not body.startswith(b'{') or not body.endswith(b'}'):
+                    logger.warning("Cache inválido: 'body' não é um objeto JSON")
+                    return False
+            
             # Se tem transcrição, validar estrutura
             if cache_data.get('transcription'):
                 transcription = cache_data['transcription']
@@ -219,17 +944,36 @@ class TranscriptionCacheManager:
             logger.error(f"Erro ao validar cache: {e}")
             return False
     
-    def get(self, cache_key: str) -> Optional[Dict[str, Any]]:
+    def get(self, cache_key: str, track_stats: bool = True) -> Optional[Dict[str, Any]]:
         """
-        Busca transcrição no cache (memória primeiro, depois disco)
-        Com validação de dados para evitar corrupção
+        Busca transcrição no cache (memória, depois Redis, depois disco)
+        Com validação de dados para evitar corrupção. Chaves sem entrada
+        própria são resolvidas pelo índice de fingerprints.
         
         Args:
             cache_key: Chave do cache
+            track_stats: Contar na taxa de acerto (False para entradas derivadas
+                de um hit já contado)
             
         Returns:
             Dados da transcrição cacheada ou None
         """
+        data = self._get_from_tiers(cache_key)
+        if data is None:
+            # ✅ NOVO: Chave equivalente (fingerprint) apontando para outro resultado
+            target_key = self.fingerprint_index.resolve(cache_key)
+            if target_key is not None:
+                data = self._get_from_tiers(target_key)
+        if not track_stats:
+            return data
+        with self._stats_lock:
+            self._requests += 1
+            if data is not None:
+                self._hits += 1
+        return data
+    
+    def _get_from_tiers(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Consulta os tiers em ordem, promovendo o resultado para a memória"""
         # Tentar cache em memória primeiro
         cached_data = self.memory_cache.get(cache_key)
         if cached_data:
@@ -243,8 +987,19 @@ class TranscriptionCacheManager:
                     self.memory_cache._remove(cache_key)
                 return None
         
+        # ✅ NOVO: Tier compartilhado (Redis) - entradas gravadas por outros processos
+        if self.redis_cache is not None:
+            redis_data = self.redis_cache.get(cache_key)
+            if redis_data:
+                if self._validate_cache_data(redis_data):
+                    self.memory_cache.set(
+                        cache_key, redis_data, cost=redis_data.get("processing_time"))
+                    return redis_data
+                logger.warning(f"Cache corrompido detectado (Redis), removendo: {cache_key[:16]}...")
+                self.redis_cache.delete(cache_key)
+        
         # Se habilitado, tentar cache em disco
-        if self.enable_disk_cache:
+        if self.disk_cache is not None:
             disk_data = self._load_from_disk(cache_key)
             if disk_data:
                 # Validar dados do disco
@@ -252,13 +1007,7 @@ class TranscriptionCacheManager:
                     return disk_data
                 else:
                     logger.warning(f"Cache corrompido detectado (disco), removendo: {cache_key[:16]}...")
-                    # Remover arquivo corrompido
-                    try:
-                        cache_file = self.cache_dir / f"{cache_key}.json"
-                        if cache_file.exists():
-                            cache_file.unlink()
-                    except Exception as e:
-                        logger.error(f"Erro ao remover cache corrompido: {e}")
+                    self.disk_cache.delete(cache_key)
                     return None
             
         return None
@@ -274,59 +1023,96 @@ class TranscriptionCacheManager:
         # Adicionar timestamp ao dado
         transcription_data["cached_at"] = time.time()
         
-        # Salvar em memória
-        self.memory_cache.set(cache_key, transcription_data)
+        # Salvar em memória (custo = tempo gasto para calcular a transcrição)
+        self.memory_cache.set(
+            cache_key, transcription_data, cost=transcription_data.get("processing_time"))
+        
+        # Salvar no tier compartilhado
+        if self.redis_cache is not None:
+            self.redis_cache.set(cache_key, transcription_data)
         
         # Salvar em disco se habilitado
-        if self.enable_disk_cache:
+        if self.disk_cache is not None:
             self._save_to_disk(cache_key, transcription_data)
     
+    def add_alias(self, alias_key: str, cache_key: str) -> None:
+        """
+        ✅ NOVO: Registra alias_key (ex: chave do fingerprint) como equivalente a cache_key
+        
+        Se cache_key já é um alias, o registro aponta direto para o resultado.
+        """
+        target_key = self.fingerprint_index.resolve(cache_key) or cache_key
+        self.fingerprint_index.link(alias_key, target_key)
+    
+    def get_invalid_media(self, content_hash: Optional[str]) -> Optional[str]:
+        """
+        ✅ NOVO: Motivo da rejeição se o conteúdo já foi recusado (cache negativo)
+        
+        Args:
+            content_hash: Hash do arquivo (hash_file)
+            
+        Returns:
+            Mensagem de erro registrada ou None
+        """
+        if self.invalid_media is None or not content_hash:
+            return None
+        return self.invalid_media.get(content_hash)
+    
+    def mark_invalid_media(self, content_hash: Optional[str], error: str) -> None:
+        """
+        ✅ NOVO: Registra falha determinística para o conteúdo (corrompido, sem áudio)
+        
+        Usar apenas para falhas que se repetiriam com o mesmo arquivo - nunca
+        para timeouts ou erros de rede.
+        """
+        if self.invalid_media is None or not content_hash:
+            return
+        self.invalid_media.add(content_hash, error)
+        logger.info(f"Conteúdo marcado como inválido ({content_hash[:16]}...): {error}")
+    
     def _save_to_disk(self, cache_key: str, data: Dict[str, Any]) -> None:
         """Salva dados no cache em disco"""
         try:
-            cache_file = self.cache_dir / f"{cache_key}.json"
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self.disk_cache.set(cache_key, data)
             logger.debug(f"Cache salvo em disco: {cache_key[:16]}...")
-        except Exception as e:
+        except sqlite3.Error as e:
             logger.error(f"Erro ao salvar cache em disco: {e}")
     
     def _load_from_disk(self, cache_key: str) -> Optional[Dict[str, Any]]:
-        """Carrega dados do cache em disco"""
+        """Carrega dados do cache em disco (expiradas nunca são retornadas)"""
         try:
-            cache_file = self.cache_dir / f"{cache_key}.json"
-            if not cache_file.exists():
-                return None
-            
-            # Verificar idade do arquivo
-            file_age = time.time() - cache_file.stat().st_mtime
-            if file_age > self.memory_cache.ttl_seconds:
-                logger.debug(f"Cache em disco expirado: {cache_key[:16]}...")
-                cache_file.unlink()  # Remover arquivo expirado
+            data = self.disk_cache.get(cache_key)
+            if data is None:
                 return None
             
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
             # Carregar de volta na memória para acesso rápido
-            self.memory_cache.set(cache_key, data)
+            self.memory_cache.set(cache_key, data, cost=data.get("processing_time"))
             logger.debug(f"Cache carregado do disco: {cache_key[:16]}...")
             return data
             
-        except Exception as e:
+        except sqlite3.Error as e:
             logger.error(f"Erro ao carregar cache do disco: {e}")
             return None
     
     def clear(self) -> None:
-        """Limpa todo o cache (memória e disco)"""
+        """Limpa todo o cache (memória, Redis e disco) e o índice de fingerprints"""
         self.memory_cache.clear()
+        self.fingerprint_index.clear()
+        if self.invalid_media is not None:
+            self.invalid_media.clear()
         
-        if self.enable_disk_cache:
+        if self.redis_cache is not None:
+            self.redis_cache.clear()
+        
+        with self._stats_lock:
+            self._requests = 0
+            self._hits = 0
+        
+        if self.disk_cache is not None:
             try:
-                for cache_file in self.cache_dir.glob("*.json"):
-                    cache_file.unlink()
+                self.disk_cache.clear()
                 logger.info("Cache em disco limpo")
-            except Exception as e:
+            except sqlite3.Error as e:
                 logger.error(f"Erro ao limpar cache em disco: {e}")
     
     def get_stats(self) -> Dict[str, Any]:
@@ -338,18 +1124,32 @@ class TranscriptionCacheManager:
         """
         stats = self.memory_cache.get_stats()
         
-        if self.enable_disk_cache:
+        disk_stats = None
+        if self.disk_cache is not None:
             try:
-                disk_files = list(self.cache_dir.glob("*.json"))
-                stats["disk_cache_size"] = len(disk_files)
+                disk_stats = self.disk_cache.get_stats()
+                stats["disk_cache_size"] = disk_stats["entries"]
                 stats["disk_cache_enabled"] = True
-            except Exception:
+            except sqlite3.Error:
                 stats["disk_cache_size"] = 0
                 stats["disk_cache_enabled"] = False
         else:
             stats["disk_cache_enabled"] = False
             stats["disk_cache_size"] = 0
         
+        # ✅ NOVO: Hit rate por tier e geral (qualquer tier)
+        with self._stats_lock:
+            stats["overall_hit_rate"] = round(
+                self._hits / self._requests * 100, 2) if self._requests else 0
+        stats["tiers"] = {
+            "memory": self.memory_cache.get_stats(),
+            "redis": self.redis_cache.get_stats() if self.redis_cache else {"enabled": False},
+            "disk": disk_stats or {"enabled": False},
+        }
+        stats["fingerprint_index"] = self.fingerprint_index.get_stats()
+        stats["invalid_media"] = (
+            self.invalid_media.get_stats() if self.invalid_media else {"enabled": False})
+        
         return stats
 
 
@@ -368,19 +1168,65 @@ def get_cache_manager() -> TranscriptionCacheManager:
     
     if _cache_manager is None:
         # Configurar cache baseado em variáveis de ambiente
-        cache_size = int(os.getenv('CACHE_SIZE', 100))
+        cache_size = int(os.getenv('CACHE_SIZE', 0))  # 0 = limitado apenas por bytes
         cache_ttl = int(os.getenv('CACHE_TTL_SECONDS', 3600))  # 1 hora padrão
         enable_disk = os.getenv('ENABLE_DISK_CACHE', 'false').lower() == 'true'
         
+        # ✅ NOVO: Tier compartilhado entre processos (web e workers)
+        redis_cache = None
+        if settings.ENABLE_REDIS_CACHE:
+            if REDIS_AVAILABLE:
+                redis_cache = RedisCache(
+                    url=settings.CACHE_REDIS_URL,
+                    ttl_seconds=settings.CACHE_REDIS_TTL_SECONDS,
+                    compression_level=settings.CACHE_COMPRESSION_LEVEL
+                )
+            else:
+                logger.warning("ENABLE_REDIS_CACHE=true mas redis não está instalado")
+        
+        redis_index = None
+        if redis_cache is not None:
+            redis_index = RedisFingerprintIndex(
+                url=settings.CACHE_REDIS_URL,
+                ttl_seconds=settings.CACHE_REDIS_TTL_SECONDS,
+                compression_level=settings.CACHE_COMPRESSION_LEVEL
+            )
+        fingerprint_index = FingerprintIndex(
+            max_size=settings.FINGERPRINT_INDEX_SIZE,
+            ttl_seconds=max(cache_ttl, settings.CACHE_DISK_TTL_SECONDS),
+            redis_index=redis_index
+        )
+        
+        # ✅ NOVO: Cache negativo (compartilhado pelo Redis quando disponível)
+        invalid_media = None
+        if settings.ENABLE_NEGATIVE_CACHE:
+            redis_invalid = None
+            if redis_cache is not None:
+                redis_invalid = RedisInvalidMediaCache(
+                    url=settings.CACHE_REDIS_URL,
+                    ttl_seconds=settings.NEGATIVE_CACHE_TTL_SECONDS,
+                    compression_level=settings.CACHE_COMPRESSION_LEVEL
+                )
+            invalid_media = InvalidMediaCache(
+                ttl_seconds=settings.NEGATIVE_CACHE_TTL_SECONDS,
+                redis_cache=redis_invalid
+            )
+        
         _cache_manager = TranscriptionCacheManager(
             memory_cache_size=cache_size,
             ttl_seconds=cache_ttl,
-            enable_disk_cache=enable_disk
+            enable_disk_cache=enable_disk,
+            redis_cache=redis_cache,
+            disk_ttl_seconds=settings.CACHE_DISK_TTL_SECONDS,
+            memory_max_bytes=settings.CACHE_MEMORY_MAX_MB * 1024 * 1024,
+            fingerprint_index=fingerprint_index,
+            invalid_media=invalid_media
         )
         
         logger.info(
             f"Cache manager inicializado: size={cache_size}, "
-            f"ttl={cache_ttl}s, disk={enable_disk}"
+            f"memory={settings.CACHE_MEMORY_MAX_MB}MB, "
+            f"ttl={cache_ttl}s, disk={enable_disk}, redis={redis_cache is not None}"
         )
     
     return _cache_manager
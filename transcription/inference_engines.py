@@ -0,0 +1,309 @@
+"""
+Engines de inferência para o Whisper
+
+Abstrai o backend usado por WhisperTranscriber para carregar modelos e
+transcrever áudio. Cada engine devolve o resultado em um formato normalizado
+(dict com text, segments, language, duration), de forma que o restante do
+pipeline continue produzindo o mesmo TranscriptionResult.
+
+Engines disponíveis:
+    - openai: openai-whisper (PyTorch) - comportamento original
+    - faster-whisper: CTranslate2 com quantização int8 (ideal para CPU)
+"""
+import os
+import logging
+from importlib.util import find_spec
+from typing import Any, Dict, Iterator, Optional, Union
+
+import numpy as np
+from django.conf import settings
+
+from .long_audio import find_silences, plan_chunks, stitch_segments
+from .pcm_decoder import read_wav_samples
+
+logger = logging.getLogger(__name__)
+
+# faster-whisper é opcional: só é necessário quando WHISPER_ENGINE=faster-whisper.
+# Apenas verificar se está instalado - o import (CTranslate2) fica para
+# load_model, para o processo web não carregar a engine.
+FASTER_WHISPER_AVAILABLE = find_spec("faster_whisper") is not None
+
+
+# Número aproximado de parâmetros por modelo (usado para estimar memória)
+MODEL_PARAMETERS = {
+    "tiny": 39_000_000,
+    "base": 74_000_000,
+    "small": 244_000_000,
+    "medium": 769_000_000,
+    "large": 1_550_000_000,
+    "turbo": 809_000_000,
+}
+
+# Bytes por parâmetro para cada precisão
+BYTES_PER_PARAMETER = {
+    "fp32": 4,
+    "float32": 4,
+    "fp16": 2,
+    "float16": 2,
+    "int8_float16": 1,
+    "int8_float32": 1,
+    "int8": 1,
+}
+
+
+class InferenceEngine:
+    """Interface comum para backends de inferência do Whisper"""
+
+    name: str = ""
+
+    def precision(self, device: str) -> str:
+        """Retorna a precisão numérica usada pela engine no dispositivo"""
+        raise NotImplementedError
+
+    def estimate_model_bytes(self, model_name: str, device: str, model: Any = None) -> int:
+        """
+        Estima a memória ocupada pelo modelo
+
+        Args:
+            model_name: Nome do modelo
+            device: 'cuda' ou 'cpu'
+            model: Modelo já carregado (permite medição exata quando suportado)
+
+        Returns:
+            Tamanho estimado em bytes
+        """
+        # "large-v3" -> "large", "medium.en" -> "medium"
+        base_name = model_name.split("-")[0].split(".")[0]
+        parameters = MODEL_PARAMETERS.get(base_name, MODEL_PARAMETERS["large"])
+        return parameters * BYTES_PER_PARAMETER.get(self.precision(device), 4)
+
+    def load_model(self, model_name: str, device: str) -> Any:
+        """
+        Carrega o modelo no dispositivo informado
+
+        Args:
+            model_name: Nome do modelo (tiny, base, small, medium, large)
+            device: 'cuda' ou 'cpu'
+
+        Returns:
+            Objeto de modelo específico da engine
+        """
+        raise NotImplementedError
+
+    def model_device(self, model: Any) -> str:
+        """Retorna o dispositivo em que o modelo está carregado"""
+        raise NotImplementedError
+
+    def transcribe(self, model: Any, audio: Union[str, Any], language: str) -> Dict[str, Any]:
+        """
+        Transcreve áudio e retorna resultado normalizado
+
+        Args:
+            model: Modelo retornado por load_model
+            audio: Caminho do arquivo de áudio (WAV 16kHz)
+            language: Código do idioma
+
+        Returns:
+            Dict com text, segments (start, end, text, no_speech_prob),
+            language e duration
+        """
+        raise NotImplementedError
+
+    def transcribe_stream(self, model: Any, audio: Union[str, Any], language: str) -> Iterator[Dict[str, Any]]:
+        """
+        Transcreve áudio entregando os segmentos à medida que são decodificados
+
+        Implementação padrão: divide o áudio em trechos de ~STREAM_CHUNK_SECONDS
+        cortados em silêncios e transcreve um trecho por vez, entregando os
+        segmentos de cada trecho com timestamps absolutos.
+
+        Yields:
+            Dict com start, end, text e no_speech_prob
+        """
+        samples = audio if isinstance(audio, np.ndarray) else read_wav_samples(audio)
+        if samples is None:
+            # WAV fora de PCM 16kHz mono: sem como cortar, transcrição única
+            yield from self.transcribe(model, audio, language)["segments"]
+            return
+
+        silences = find_silences(
+            samples,
+            threshold_db=settings.LONG_AUDIO_SILENCE_THRESHOLD_DB,
+            min_silence_ms=settings.LONG_AUDIO_MIN_SILENCE_MS
+        )
+        chunks = plan_chunks(
+            len(samples),
+            silences,
+            chunk_seconds=settings.STREAM_CHUNK_SECONDS,
+            overlap_seconds=settings.LONG_AUDIO_OVERLAP_SECONDS,
+            search_seconds=settings.LONG_AUDIO_SEARCH_SECONDS
+        )
+
+        for chunk in chunks:
+            result = self.transcribe(model, samples[chunk.start:chunk.end], language)
+            yield from stitch_segments([(chunk, result)])
+
+
+class OpenAIWhisperEngine(InferenceEngine):
+    """Engine original baseada em openai-whisper (PyTorch)"""
+
+    name = "openai"
+
+    def precision(self, device: str) -> str:
+        # Pesos ficam em FP32; FP16 é usado na inferência apenas em GPU
+        return "fp16" if device == "cuda" else "fp32"
+
+    def estimate_model_bytes(self, model_name: str, device: str, model: Any = None) -> int:
+        if model is None:
+            # Os pesos são carregados em FP32 mesmo em GPU
+            return super().estimate_model_bytes(model_name, "cpu")
+        return sum(p.numel() * p.element_size() for p in model.parameters())
+
+    def load_model(self, model_name: str, device: str) -> Any:
+        import whisper
+        return whisper.load_model(model_name, device=device)
+
+    def model_device(self, model: Any) -> str:
+        return str(next(model.parameters()).device)
+
+    def transcribe(self, model: Any, audio: Union[str, Any], language: str) -> Dict[str, Any]:
+        # Usar FP16 apenas em GPU
+        use_fp16 = "cuda" in self.model_device(model)
+        result = model.transcribe(
+            audio,
+            language=language,
+            verbose=False,
+            fp16=use_fp16
+        )
+
+        return {
+            "text": result.get("text", ""),
+            "segments": [
+                {
+                    "start": seg["start"],
+                    "end": seg["end"],
+                    "text": seg["text"],
+                    "no_speech_prob": seg.get("no_speech_prob"),
+                }
+                for seg in result.get("segments", [])
+            ],
+            "language": result.get("language", language),
+            "duration": result.get("duration", 0),
+        }
+
+
+class FasterWhisperEngine(InferenceEngine):
+    """
+    Engine baseada em faster-whisper (CTranslate2)
+
+    Em CPU usa quantização int8 por padrão, que é várias vezes mais rápida que
+    o PyTorch em FP32 com qualidade equivalente.
+    """
+
+    name = "faster-whisper"
+
+    def precision(self, device: str) -> str:
+        if device == "cuda":
+            return settings.FASTER_WHISPER_COMPUTE_TYPE_GPU
+        return settings.FASTER_WHISPER_COMPUTE_TYPE_CPU
+
+    def load_model(self, model_name: str, device: str) -> Any:
+        if not FASTER_WHISPER_AVAILABLE:
+            raise RuntimeError(
+                "faster-whisper não instalado. Instale com: uv add faster-whisper"
+            )
+
+        from faster_whisper import WhisperModel as FasterWhisperModel
+
+        compute_type = self.precision(device)
+
+        cpu_threads = settings.FASTER_WHISPER_CPU_THREADS or (os.cpu_count() or 1)
+
+        logger.info(
+            f"faster-whisper: compute_type={compute_type}, cpu_threads={cpu_threads}"
+        )
+        return FasterWhisperModel(
+            model_name,
+            device=device,
+            compute_type=compute_type,
+            cpu_threads=cpu_threads
+        )
+
+    def model_device(self, model: Any) -> str:
+        return str(model.model.device)
+
+    def transcribe(self, model: Any, audio: Union[str, Any], language: str) -> Dict[str, Any]:
+        segments_iter, info = model.transcribe(
+            audio,
+            language=language,
+            beam_size=settings.FASTER_WHISPER_BEAM_SIZE
+        )
+
+        # O iterador é preguiçoso: a decodificação acontece aqui
+        segments = [
+            {
+                "start": seg.start,
+                "end": seg.end,
+                "text": seg.text,
+                "no_speech_prob": seg.no_speech_prob,
+            }
+            for seg in segments_iter
+        ]
+
+        return {
+            "text": "".join(seg["text"] for seg in segments),
+            "segments": segments,
+            "language": info.language or language,
+            "duration": info.duration,
+        }
+
+    def transcribe_stream(self, model: Any, audio: Union[str, Any], language: str) -> Iterator[Dict[str, Any]]:
+        # O gerador nativo já decodifica um segmento por vez
+        segments_iter, _ = model.transcribe(
+            audio,
+            language=language,
+            beam_size=settings.FASTER_WHISPER_BEAM_SIZE
+        )
+        for seg in segments_iter:
+            yield {
+                "start": seg.start,
+                "end": seg.end,
+                "text": seg.text,
+                "no_speech_prob": seg.no_speech_prob,
+            }
+
+
+ENGINES = {
+    OpenAIWhisperEngine.name: OpenAIWhisperEngine,
+    FasterWhisperEngine.name: FasterWhisperEngine,
+}
+
+# Instâncias singleton por nome de engine
+_engine_instances: Dict[str, InferenceEngine] = {}
+
+
+def get_engine(name: Optional[str] = None) -> InferenceEngine:
+    """
+    Retorna a engine de inferência pelo nome (singleton)
+
+    Args:
+        name: Nome da engine (openai, faster-whisper). None usa WHISPER_ENGINE
+
+    Returns:
+        InferenceEngine correspondente
+
+    Raises:
+        ValueError: Se a engine não existir
+    """
+    if name is None:
+        name = settings.WHISPER_ENGINE
+
+    if name not in ENGINES:
+        raise ValueError(
+            f"Engine '{name}' não suportada. Use: {', '.join(sorted(ENGINES))}"
+        )
+
+    if name not in _engine_instances:
+        _engine_instances[name] = ENGINES[name]()
+
+    return _engine_instances[name]
@@ -0,0 +1,441 @@
+"""
+Transcrição paralela de áudios longos
+
+Áudios longos (30-60 min) são divididos em trechos nos pontos de silêncio
+(detecção por energia), transcritos em paralelo por um pool de processos -
+cada processo com o modelo já carregado - e os segmentos são costurados de
+volta com timestamps corrigidos em um único TranscriptionResult.
+
+Fluxo:
+    WAV 16kHz -> detectar silêncios -> planejar trechos (com sobreposição)
+    -> transcrever trechos no pool -> corrigir offsets -> descartar duplicatas
+    da sobreposição -> TranscriptionResult
+"""
+import os
+import atexit
+import logging
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from django.conf import settings
+
+from .pcm_decoder import SAMPLE_RATE, get_audio_duration, read_wav_samples
+
+logger = logging.getLogger(__name__)
+
+
+class AudioChunk:
+    """Trecho de áudio a ser transcrito isoladamente"""
+
+    def __init__(self, index: int, start: int, end: int, keep_start: int, keep_end: int):
+        """
+        Args:
+            index: Posição do trecho no áudio
+            start: Primeira amostra enviada ao modelo (inclui sobreposição)
+            end: Última amostra enviada ao modelo (exclusiva, inclui sobreposição)
+            keep_start: Início da região pela qual o trecho é responsável
+            keep_end: Fim da região pela qual o trecho é responsável
+        """
+        self.index = index
+        self.start = start
+        self.end = end
+        self.keep_start = keep_start
+        self.keep_end = keep_end
+
+    def __repr__(self) -> str:
+        return (
+            f"AudioChunk({self.index}, {self.start / SAMPLE_RATE:.1f}s-"
+            f"{self.end / SAMPLE_RATE:.1f}s)"
+        )
+
+
+def find_silences(
+    samples: np.ndarray,
+    threshold_db: float,
+    min_silence_ms: int,
+    frame_ms: int = 30
+) -> List[Tuple[int, int]]:
+    """
+    Encontra regiões de silêncio por energia (RMS por quadro)
+
+    O limiar é relativo ao pico do áudio, de forma que o resultado não depende
+    do volume de gravação.
+
+    Args:
+        samples: Amostras float32
+        threshold_db: Quadros abaixo de (pico + threshold_db) são silêncio
+        min_silence_ms: Duração mínima de uma região de silêncio
+        frame_ms: Tamanho do quadro de análise
+
+    Returns:
+        Lista de (amostra_inicial, amostra_final) de cada silêncio
+    """
+    frame = int(SAMPLE_RATE * frame_ms / 1000)
+    n_frames = len(samples) // frame
+    if n_frames == 0:
+        return []
+
+    frames = samples[:n_frames * frame].reshape(n_frames, frame)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1)) + 1e-10
+    db = 20 * np.log10(rms / rms.max())
+    silent = db < threshold_db
+
+    min_frames = max(1, int(min_silence_ms / frame_ms))
+    silences = []
+    run_start = None
+    for i, is_silent in enumerate(silent):
+        if is_silent and run_start is None:
+            run_start = i
+        elif not is_silent and run_start is not None:
+            if i - run_start >= min_frames:
+                silences.append((run_start * frame, i * frame))
+            run_start = None
+    if run_start is not None and n_frames - run_start >= min_frames:
+        silences.append((run_start * frame, n_frames * frame))
+
+    return silences
+
+
+def plan_chunks(
+    total_samples: int,
+    silences: List[Tuple[int, int]],
+    chunk_seconds: float,
+    overlap_seconds: float,
+    search_seconds: float
+) -> List[AudioChunk]:
+    """
+    Divide o áudio em trechos de ~chunk_seconds cortando no meio de silêncios
+
+    Cada corte procura o silêncio mais próximo do tamanho alvo dentro de
+    ±search_seconds; sem silêncio na janela, corta no tamanho alvo. Os trechos
+    são estendidos em overlap_seconds para os dois lados para dar contexto ao
+    modelo; na costura, cada trecho só mantém os segmentos da sua região.
+    """
+    chunk_len = int(chunk_seconds * SAMPLE_RATE)
+    search = int(search_seconds * SAMPLE_RATE)
+    overlap = int(overlap_seconds * SAMPLE_RATE)
+    midpoints = [(s + e) // 2 for s, e in silences]
+
+    cuts = [0]
+    # Evitar último trecho muito curto: só cortar se sobrar mais que 1,5 trecho
+    while total_samples - cuts[-1] > int(chunk_len * 1.5):
+        target = cuts[-1] + chunk_len
+        candidates = [m for m in midpoints if abs(m - target) <= search and m > cuts[-1]]
+        cut = min(candidates, key=lambda m: abs(m - target)) if candidates else target
+        cuts.append(cut)
+    cuts.append(total_samples)
+
+    return [
+        AudioChunk(
+            index=i,
+            start=max(0, cuts[i] - overlap),
+            end=min(total_samples, cuts[i + 1] + overlap),
+            keep_start=cuts[i],
+            keep_end=cuts[i + 1],
+        )
+        for i in range(len(cuts) - 1)
+    ]
+
+
+def stitch_segments(chunk_results: List[Tuple[AudioChunk, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Costura segmentos dos trechos com timestamps absolutos
+
+    Segmentos cujo ponto médio cai fora da região do trecho pertencem ao
+    trecho vizinho (vieram da sobreposição) e são descartados.
+    """
+    segments = []
+    for chunk, result in sorted(chunk_results, key=lambda item: item[0].index):
+        offset = chunk.start / SAMPLE_RATE
+        keep_start = chunk.keep_start / SAMPLE_RATE
+        keep_end = chunk.keep_end / SAMPLE_RATE
+
+        for seg in result.get("segments", []):
+            start = seg["start"] + offset
+            end = seg["end"] + offset
+            midpoint = (start + end) / 2
+            if not (keep_start <= midpoint < keep_end):
+                continue
+            segments.append({**seg, "start": round(start, 3), "end": round(end, 3)})
+
+    return segments
+
+
+# ==================== Processos do pool ====================
+
+def _init_worker(model_name: Optional[str], engine: Optional[str], force_cpu: bool, threads: int) -> None:
+    """Inicializa processo do pool: configura Django e pré-carrega o modelo"""
+    # Limitar threads por processo para não disputar núcleos entre workers
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["FASTER_WHISPER_CPU_THREADS"] = str(threads)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+    import django
+    django.setup()
+
+    import torch
+    torch.set_num_threads(threads)
+
+    from .services import WhisperTranscriber
+    WhisperTranscriber.load_model(model_name, force_cpu=force_cpu, engine=engine)
+
+
+def _transcribe_chunk(
+    samples: np.ndarray,
+    language: str,
+    model_name: Optional[str],
+    engine: Optional[str],
+    force_cpu: bool
+) -> Dict[str, Any]:
+    """Transcreve um trecho com o modelo residente do processo (resultado bruto)"""
+    from .services import WhisperTranscriber
+    from .inference_engines import get_engine
+    from .model_pool import inference_lock
+
+    model = WhisperTranscriber.load_model(model_name, force_cpu=force_cpu, engine=engine)
+    # Em série no processo principal o modelo é o mesmo das outras requisições
+    with inference_lock(model):
+        return get_engine(engine).transcribe(model, samples, language)
+
+
+class LongAudioTranscriber:
+    """Transcrição de áudios longos em trechos paralelos"""
+
+    _executor: Optional[ProcessPoolExecutor] = None
+    _executor_config: Optional[Tuple] = None
+    _lock = Lock()
+
+    # Reserva no orçamento do pool de modelos para as cópias dos processos
+    BUDGET_NAME = "long_audio"
+
+    @staticmethod
+    def get_workers() -> int:
+        """Número de processos do pool (LONG_AUDIO_WORKERS, 0 = automático)"""
+        if settings.LONG_AUDIO_WORKERS > 0:
+            return settings.LONG_AUDIO_WORKERS
+        return min(4, os.cpu_count() or 1)
+
+    @staticmethod
+    def should_chunk(audio: Union[str, np.ndarray]) -> bool:
+        """
+        Indica se o áudio (WAV ou amostras) é longo o suficiente para o modo em trechos
+
+        Em GPU o modo fica desligado a menos que LONG_AUDIO_CHUNKING_ON_GPU
+        esteja ativo: a chamada única já ocupa a GPU e os processos do pool
+        rodam em CPU.
+        """
+        if not settings.ENABLE_LONG_AUDIO_CHUNKING:
+            return False
+        if get_audio_duration(audio) < settings.LONG_AUDIO_MIN_DURATION:
+            return False
+        if settings.LONG_AUDIO_CHUNKING_ON_GPU:
+            return True
+
+        from .services import WhisperTranscriber
+        return WhisperTranscriber.should_use_cpu_fallback()
+
+    @classmethod
+    def _get_executor(
+        cls,
+        model_name: Optional[str],
+        engine: Optional[str],
+        workers: int
+    ) -> ProcessPoolExecutor:
+        """
+        Retorna pool de processos com o modelo pré-carregado (reutilizado entre chamadas)
+
+        Os processos carregam o modelo sempre em CPU: em GPU cada um teria
+        sua própria cópia CUDA fora do orçamento de VRAM. As cópias são
+        contadas no orçamento de RAM do pool de modelos do processo.
+        """
+        config = (model_name, engine, workers)
+        with cls._lock:
+            if cls._executor is not None and cls._executor_config == config:
+                return cls._executor
+
+            # Pool anterior termina o trabalho já enviado por outras requisições
+            previous = cls._executor
+
+            threads = max(1, (os.cpu_count() or 1) // workers)
+            logger.info(
+                f"Iniciando pool de áudio longo: {workers} processo(s), "
+                f"{threads} thread(s) cada, modelo={model_name or settings.WHISPER_MODEL}"
+            )
+            cls._reserve_budget(model_name, engine, workers)
+            # spawn: fork não é seguro com CUDA/threads já iniciadas
+            cls._executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(model_name, engine, True, threads),
+            )
+            cls._executor_config = config
+            executor = cls._executor
+
+        if previous is not None:
+            previous.shutdown(wait=False)
+        return executor
+
+    @classmethod
+    def _reserve_budget(cls, model_name: Optional[str], engine: Optional[str], workers: int) -> None:
+        """Conta as cópias do modelo nos processos no orçamento de RAM do pool de modelos"""
+        from .services import WhisperTranscriber
+        from .inference_engines import get_engine
+
+        size_bytes = get_engine(engine).estimate_model_bytes(
+            model_name or settings.WHISPER_MODEL, "cpu"
+        )
+        WhisperTranscriber.get_model_pool().reserve_external(
+            cls.BUDGET_NAME, "cpu", size_bytes * workers,
+            on_evict=WhisperTranscriber._release_model
+        )
+
+    @classmethod
+    def _release_budget(cls) -> None:
+        from .services import WhisperTranscriber
+
+        if WhisperTranscriber._model_pool is not None:
+            WhisperTranscriber._model_pool.release_external(cls.BUDGET_NAME)
+
+    @classmethod
+    def _discard(cls, executor: Optional[ProcessPoolExecutor]) -> None:
+        """Descarta um pool quebrado (se ainda for o atual) sem cancelar trabalho alheio"""
+        if executor is None:
+            return
+        with cls._lock:
+            if cls._executor is executor:
+                cls._executor = None
+                cls._executor_config = None
+                cls._release_budget()
+        executor.shutdown(wait=False)
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """Encerra o pool de processos"""
+        with cls._lock:
+            if cls._executor is not None:
+                cls._executor.shutdown(wait=False, cancel_futures=True)
+                cls._executor = None
+                cls._executor_config = None
+                cls._release_budget()
+
+    @classmethod
+    def _transcribe_in_pool(
+        cls,
+        samples: np.ndarray,
+        chunks: List[AudioChunk],
+        language: str,
+        model_name: Optional[str],
+        engine: Optional[str],
+        workers: int
+    ) -> Optional[List[Tuple[AudioChunk, Dict[str, Any]]]]:
+        """
+        Transcreve os trechos no pool de processos
+
+        Returns:
+            Resultados por trecho ou None quando o pool não pode ser usado
+            (o chamador transcreve em série)
+        """
+        executor = None
+        try:
+            executor = cls._get_executor(model_name, engine, workers)
+            futures = [
+                (chunk, executor.submit(
+                    _transcribe_chunk,
+                    samples[chunk.start:chunk.end],
+                    language, model_name, engine, True
+                ))
+                for chunk in chunks
+            ]
+            return [(chunk, future.result()) for chunk, future in futures]
+        except (OSError, AssertionError, BrokenProcessPool) as e:
+            # Ex: processo daemon (worker Celery prefork) não pode criar filhos
+            logger.warning(f"Pool de processos indisponível ({e}), transcrevendo trechos em série")
+            cls._discard(executor)
+        except (RuntimeError, CancelledError) as e:
+            # Pool substituído ou encerrado por outra requisição no meio desta
+            logger.warning(f"Pool de processos encerrado durante a transcrição ({e!r}), "
+                           f"transcrevendo trechos em série")
+        return None
+
+    @classmethod
+    def transcribe_raw(
+        cls,
+        audio: Union[str, np.ndarray],
+        language: str,
+        model_name: Optional[str] = None,
+        engine: Optional[str] = None,
+        force_cpu: bool = False,
+        workers: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Transcreve áudio longo em trechos e retorna resultado bruto costurado
+
+        Args:
+            audio: Caminho do WAV 16kHz ou amostras float32 já decodificadas
+            force_cpu: Forçar CPU na transcrição em série (os processos do pool
+                usam sempre CPU)
+
+        Returns:
+            Dict no formato das engines (text, segments, language, duration)
+            ou None se o WAV não estiver em PCM 16kHz mono
+        """
+        if isinstance(audio, np.ndarray):
+            samples = audio
+        else:
+            samples = read_wav_samples(audio)
+        if samples is None:
+            return None
+
+        silences = find_silences(
+            samples,
+            threshold_db=settings.LONG_AUDIO_SILENCE_THRESHOLD_DB,
+            min_silence_ms=settings.LONG_AUDIO_MIN_SILENCE_MS
+        )
+        chunks = plan_chunks(
+            len(samples),
+            silences,
+            chunk_seconds=settings.LONG_AUDIO_CHUNK_SECONDS,
+            overlap_seconds=settings.LONG_AUDIO_OVERLAP_SECONDS,
+            search_seconds=settings.LONG_AUDIO_SEARCH_SECONDS
+        )
+
+        # O tamanho do pool não depende do número de trechos: o pool é
+        # compartilhado e recriá-lo recarregaria o modelo em cada processo
+        if workers is None:
+            workers = cls.get_workers()
+        workers = max(1, workers)
+
+        logger.info(
+            f"Áudio longo: {len(samples) / SAMPLE_RATE:.0f}s em {len(chunks)} trecho(s), "
+            f"{len(silences)} silêncio(s) detectado(s), {min(workers, len(chunks))} processo(s)"
+        )
+
+        chunk_results = None
+        if workers > 1 and len(chunks) > 1:
+            chunk_results = cls._transcribe_in_pool(
+                samples, chunks, language, model_name, engine, workers
+            )
+
+        if chunk_results is None:
+            chunk_results = [
+                (chunk, _transcribe_chunk(
+                    samples[chunk.start:chunk.end], language, model_name, engine, force_cpu
+                ))
+                for chunk in chunks
+            ]
+
+        segments = stitch_segments(chunk_results)
+        return {
+            "text": " ".join(seg["text"].strip() for seg in segments),
+            "segments": segments,
+            "language": chunk_results[0][1].get("language", language) if chunk_results else language,
+            "duration": len(samples) / SAMPLE_RATE,
+        }
+
+
+atexit.register(LongAudioTranscriber.shutdown)
@@ -152,6 +152,9 @@ class MemoryManager:
         
         try:
             for file in temp_dir.glob("*"):
+                # Subdiretórios (ex.: resumable/) têm expiração própria
+                if not file.is_file():
+                    continue
                 try:
                     age_hours = (now - file.stat().st_mtime) / 3600
                     
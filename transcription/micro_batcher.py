@@ -0,0 +1,288 @@
+"""
+Micro-batching de janelas de 30s entre requisições concorrentes
+
+Áudios curtos (até 30s, ex: mensagens de voz do WhatsApp) cabem em uma única
+janela mel do Whisper. Em vez de cada requisição rodar seu próprio
+model.transcribe, as requisições entregam a janela a um agendador que, dentro
+de uma pequena janela de latência, empilha as janelas de todas as requisições
+em andamento e roda encoder + decoder em um único lote (whisper.decode com
+tensor [N, n_mels, 3000]). O resultado de cada item volta para a requisição
+de origem.
+
+Apenas a engine openai (PyTorch) é suportada; as demais seguem pelo caminho
+normal. Itens que falham nos limiares de qualidade do Whisper (taxa de
+compressão / logprob) são retranscritos individualmente com o fallback de
+temperatura completo.
+"""
+import time
+import queue
+import logging
+from concurrent.futures import Future
+from threading import Lock, Thread
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+from django.conf import settings
+
+from .model_pool import inference_lock
+from .pcm_decoder import SAMPLE_RATE, get_audio_duration, read_wav_samples
+
+logger = logging.getLogger(__name__)
+
+# Limiares usados por whisper.transcribe
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+MAX_WINDOW_SECONDS = 30.0
+TIME_PRECISION = 0.02  # segundos por token de timestamp
+
+
+class BatchItem:
+    """Janela mel de uma requisição aguardando o lote"""
+
+    def __init__(self, model: Any, mel: Any, language: str, duration: float):
+        self.model = model
+        self.mel = mel
+        self.language = language
+        self.duration = duration
+        self.future: Future = Future()
+
+
+class MicroBatcher:
+    """Agendador que agrupa janelas de várias requisições em um lote"""
+
+    def __init__(self, max_batch_size: int, window_ms: int):
+        """
+        Args:
+            max_batch_size: Máximo de janelas por lote
+            window_ms: Tempo máximo aguardando outras requisições após a primeira
+        """
+        self.max_batch_size = max_batch_size
+        self.window = window_ms / 1000.0
+        self._queue: "queue.Queue[BatchItem]" = queue.Queue()
+        self._thread: Optional[Thread] = None
+        self._lock = Lock()
+        self._batches = 0
+        self._items = 0
+        self._largest_batch = 0
+        self._fallbacks = 0
+
+    @staticmethod
+    def accepts(engine_name: str, audio: Union[str, np.ndarray]) -> bool:
+        """Indica se a requisição (WAV ou amostras) pode entrar no micro-batching"""
+        if not settings.ENABLE_MICRO_BATCHING or engine_name != "openai":
+            return False
+        duration = get_audio_duration(audio)
+        return 0 < duration <= MAX_WINDOW_SECONDS
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = Thread(
+                    target=self._run, name="whisper-micro-batcher", daemon=True
+                )
+                self._thread.start()
+
+    def transcribe(
+        self,
+        model: Any,
+        audio: Union[str, np.ndarray],
+        language: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Transcreve áudio curto através do lote compartilhado
+
+        Bloqueia até o lote que contém esta requisição terminar.
+
+        Returns:
+            Resultado no formato das engines (text, segments, language,
+            duration) ou None quando a requisição deve seguir pelo caminho
+            normal (WAV fora de PCM 16kHz mono ou falha nos limiares de qualidade)
+        """
+        import whisper
+
+        if not isinstance(audio, np.ndarray):
+            audio = read_wav_samples(audio)
+        if audio is None:
+            return None
+
+        # Mel calculado na thread da requisição: o agendador só roda o modelo
+        mel = whisper.log_mel_spectrogram(audio, model.dims.n_mels)
+        mel = whisper.pad_or_trim(mel, whisper.audio.N_FRAMES)
+
+        item = BatchItem(model, mel, language, len(audio) / SAMPLE_RATE)
+        self._ensure_started()
+        self._queue.put(item)
+        return item.future.result()
+
+    def _run(self) -> None:
+        """Loop do agendador: coleta janelas até encher o lote ou expirar a janela"""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            # Um lote por (modelo, idioma): DecodingOptions aceita um só idioma
+            groups: Dict[tuple, List[BatchItem]] = {}
+            for item in batch:
+                groups.setdefault((id(item.model), item.language), []).append(item)
+
+            for items in groups.values():
+                self._decode_group(items)
+
+    def _decode_group(self, items: List[BatchItem]) -> None:
+        """Roda encoder + decoder em lote e entrega o resultado de cada item"""
+        import torch
+        import whisper
+
+        model = items[0].model
+        language = items[0].language
+        device = next(model.parameters()).device
+        use_fp16 = device.type == "cuda"
+
+        try:
+            mel_batch = torch.stack([item.mel for item in items]).to(device)
+            if use_fp16:
+                mel_batch = mel_batch.half()
+
+            options = whisper.DecodingOptions(
+                task="transcribe",
+                language=language,
+                temperature=0.0,
+                fp16=use_fp16,
+            )
+            # Mesmo lock das chamadas individuais: o modelo é compartilhado
+            with inference_lock(model):
+                start = time.time()
+                results = whisper.decode(model, mel_batch, options)
+                elapsed = time.time() - start
+
+            with self._lock:
+                self._batches += 1
+                self._items += len(items)
+                self._largest_batch = max(self._largest_batch, len(items))
+
+            logger.info(f"Micro-batch: {len(items)} janela(s) decodificada(s) em {elapsed:.2f}s")
+
+        except Exception as e:
+            logger.error(f"Erro no micro-batch: {e}")
+            for item in items:
+                item.future.set_exception(e)
+            return
+
+        tokenizer = whisper.tokenizer.get_tokenizer(
+            model.is_multilingual,
+            num_languages=model.num_languages,
+            language=language,
+            task="transcribe",
+        )
+
+        for item, result in zip(items, results):
+            try:
+                item.future.set_result(self._to_engine_result(item, result, tokenizer))
+            except Exception as e:
+                item.future.set_exception(e)
+
+    def _to_engine_result(self, item: BatchItem, result: Any, tokenizer: Any) -> Optional[Dict[str, Any]]:
+        """Converte DecodingResult no formato normalizado das engines"""
+        is_silent = (
+            result.no_speech_prob > NO_SPEECH_THRESHOLD
+            and result.avg_logprob < LOGPROB_THRESHOLD
+        )
+        if is_silent:
+            return {"text": "", "segments": [], "language": item.language, "duration": item.duration}
+
+        needs_fallback = (
+            result.compression_ratio > COMPRESSION_RATIO_THRESHOLD
+            or result.avg_logprob < LOGPROB_THRESHOLD
+        )
+        if needs_fallback:
+            # A requisição retranscreve sozinha (fallback de temperatura do
+            # Whisper) na própria thread, sem bloquear o agendador
+            with self._lock:
+                self._fallbacks += 1
+            return None
+
+        segments = self._split_segments(result.tokens, tokenizer, item.duration)
+        for seg in segments:
+            seg["no_speech_prob"] = result.no_speech_prob
+
+        return {
+            "text": result.text,
+            "segments": segments,
+            "language": item.language,
+            "duration": item.duration,
+        }
+
+    @staticmethod
+    def _split_segments(tokens: List[int], tokenizer: Any, duration: float) -> List[Dict[str, Any]]:
+        """Separa segmentos pelos tokens de timestamp (<|0.00|> texto <|2.40|>)"""
+        timestamp_begin = tokenizer.timestamp_begin
+        segments = []
+        start = None
+        text_tokens: List[int] = []
+
+        for token in tokens:
+            if token >= timestamp_begin:
+                timestamp = (token - timestamp_begin) * TIME_PRECISION
+                if start is not None and text_tokens:
+                    segments.append({
+                        "start": start,
+                        "end": min(timestamp, duration),
+                        "text": tokenizer.decode(text_tokens),
+                    })
+                    text_tokens = []
+                    start = None
+                else:
+                    start = timestamp
+            else:
+                if start is None:
+                    start = segments[-1]["end"] if segments else 0.0
+                text_tokens.append(token)
+
+        if text_tokens:
+            segments.append({
+                "start": start or 0.0,
+                "end": duration,
+                "text": tokenizer.decode(text_tokens),
+            })
+
+        return segments
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estatísticas do agendador"""
+        with self._lock:
+            return {
+                "enabled": settings.ENABLE_MICRO_BATCHING,
+                "batches": self._batches,
+                "items": self._items,
+                "avg_batch_size": round(self._items / self._batches, 2) if self._batches else 0,
+                "largest_batch": self._largest_batch,
+                "quality_fallbacks": self._fallbacks,
+                "queued": self._queue.qsize(),
+                "max_batch_size": self.max_batch_size,
+                "window_ms": int(self.window * 1000),
+            }
+
+
+# Instância global
+_micro_batcher: Optional[MicroBatcher] = None
+
+
+def get_micro_batcher() -> MicroBatcher:
+    """Retorna instância global do micro-batcher"""
+    global _micro_batcher
+    if _micro_batcher is None:
+        _micro_batcher = MicroBatcher(
+            max_batch_size=settings.MICRO_BATCH_MAX_SIZE,
+            window_ms=settings.MICRO_BATCH_WINDOW_MS
+        )
+    return _micro_batcher
@@ -0,0 +1,33 @@
+"""
+Middlewares do app de transcrição
+"""
+from asgiref.sync import iscoroutinefunction
+from django.utils.decorators import sync_and_async_middleware
+
+from .async_executors import run_io
+
+UPLOAD_METHODS = ("POST", "PUT", "PATCH")
+
+
+@sync_and_async_middleware
+def upload_parsing_middleware(get_response):
+    """
+    ✅ NOVO: Sob ASGI, lê o multipart (request.FILES) no executor de I/O
+
+    O Django Ninja monta os parâmetros File/Form de views async no próprio
+    event loop; com uploads de centenas de MB, copiar o corpo para
+    TEMP_AUDIO_DIR (StreamingUploadHandler) travaria as outras requisições.
+    O resultado fica em cache no request, então a view não relê nada.
+    Com o handler de config/asgi.py (asgi_upload) o multipart já chega lido
+    e aqui não há trabalho; sob WSGI não faz nada.
+    """
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            if request.method in UPLOAD_METHODS and request.content_type == "multipart/form-data":
+                await run_io(lambda: request.FILES)
+            return await get_response(request)
+    else:
+        def middleware(request):
+            return get_response(request)
+
+    return middleware
@@ -0,0 +1,491 @@
+"""
+Pool de modelos Whisper residentes em memória
+
+Mantém várias instâncias (engine, modelo, dispositivo, precisão) carregadas ao
+mesmo tempo, limitadas por um orçamento de bytes em RAM e em VRAM. Quando um
+novo modelo não cabe no orçamento, os modelos menos usados recentemente (LRU)
+no mesmo tipo de memória são descarregados.
+
+Tráfego alternando entre modelos (ex: small e medium) deixa de pagar o tempo
+de carregamento a cada troca.
+
+Carregamentos são single-flight: chamadas concorrentes pedindo o mesmo modelo
+aguardam um único carregamento em andamento e recebem a mesma instância.
+
+A inferência em cada instância é serializada por inference_lock(): o mesmo
+modelo é compartilhado por todas as threads do processo.
+"""
+import time
+import logging
+from collections import OrderedDict
+from threading import Condition, Event, Lock
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+logger = logging.getLogger(__name__)
+
+# (engine, modelo, dispositivo, precisão)
+ModelKey = Tuple[str, str, str, str]
+
+
+_inference_locks: "WeakKeyDictionary[Any, Lock]" = WeakKeyDictionary()
+_inference_locks_guard = Lock()
+
+
+def inference_lock(model: Any) -> Lock:
+    """
+    Lock de inferência de uma instância de modelo
+
+    O openai-whisper instala hooks de KV-cache nos módulos do modelo a cada
+    decodificação; duas threads no mesmo modelo escrevem no cache uma da outra
+    (erros de shape ou transcrição corrompida). Toda chamada à engine e cada
+    lote do micro-batcher rodam com este lock.
+    """
+    with _inference_locks_guard:
+        lock = _inference_locks.get(model)
+        if lock is None:
+            lock = Lock()
+            _inference_locks[model] = lock
+        return lock
+
+
+def iterate_locked(iterator: Iterable, lock: Lock) -> Iterator:
+    """
+    Consome um gerador de inferência segurando o lock só durante cada next()
+
+    Entre um segmento e outro o modelo fica livre para outras requisições
+    (o cliente do streaming pode demorar a ler).
+    """
+    iterator = iter(iterator)
+    try:
+        while True:
+            with lock:
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            with lock:
+                close()
+
+
+class PooledModel:
+    """Modelo residente no pool com metadados de uso"""
+
+    def __init__(self, key: ModelKey, model: Any, size_bytes: int, load_time: float):
+        self.key = key
+        self.model = model
+        self.size_bytes = size_bytes
+        self.load_time = load_time
+        self.loaded_at = time.time()
+        self.last_used = self.loaded_at
+        self.uses = 1
+
+    @property
+    def memory_kind(self) -> str:
+        """'vram' para modelos em GPU, 'ram' para CPU"""
+        return "vram" if "cuda" in self.key[2] else "ram"
+
+
+class PendingLoad:
+    """Carregamento em andamento compartilhado entre chamadas concorrentes"""
+
+    def __init__(self):
+        self.event = Event()
+        self.model: Any = None
+        self.error: Optional[BaseException] = None
+        self.started_at = time.time()
+        self.waiters = 0
+
+
+class ModelLoadTimeout(RuntimeError):
+    """Tempo esgotado aguardando carregamento de modelo em andamento"""
+
+
+class ModelPool:
+    """Pool LRU thread-safe de modelos com orçamento de memória"""
+
+    def __init__(self, ram_budget_bytes: int, vram_budget_bytes: int):
+        """
+        Args:
+            ram_budget_bytes: Orçamento total para modelos em CPU
+            vram_budget_bytes: Orçamento total para modelos em GPU
+        """
+        self.budgets = {
+            "ram": ram_budget_bytes,
+            "vram": vram_budget_bytes,
+        }
+        self._models: "OrderedDict[ModelKey, PooledModel]" = OrderedDict()
+        self._loading: Dict[ModelKey, PendingLoad] = {}
+        # Memória de modelos fora do pool (ex: processos do áudio longo): nome -> (tipo, bytes)
+        self._external: Dict[str, Tuple[str, int]] = {}
+        # Orçamento reservado por carregamentos em andamento: chave -> (tipo, bytes)
+        self._reserved: Dict[ModelKey, Tuple[str, int]] = {}
+        self.lock = Lock()
+        # Sinaliza o fim de carregamentos (reservas devolvidas)
+        self._capacity = Condition(self.lock)
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._loads = 0
+        self._evictions = 0
+        self._total_load_time = 0.0
+
+    @staticmethod
+    def memory_kind_for(device: str) -> str:
+        """Tipo de memória usado por um dispositivo"""
+        return "vram" if "cuda" in device else "ram"
+
+    def get(self, key: ModelKey) -> Optional[Any]:
+        """
+        Retorna modelo residente e marca como usado recentemente
+
+        Args:
+            key: Chave (engine, modelo, dispositivo, precisão)
+
+        Returns:
+            Modelo ou None se não estiver no pool
+        """
+        with self.lock:
+            entry = self._models.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            self._models.move_to_end(key)
+            entry.last_used = time.time()
+            entry.uses += 1
+            self._hits += 1
+            return entry.model
+
+    def get_or_load(
+        self,
+        key: ModelKey,
+        loader: Callable[[], Tuple[Any, int, float]],
+        timeout: Optional[float] = None
+    ) -> Any:
+        """
+        Retorna modelo residente ou carrega uma única vez (single-flight)
+
+        Se outra thread já está carregando o mesmo modelo, aguarda esse
+        carregamento em vez de iniciar outro, e recebe a mesma instância.
+
+        Args:
+            key: Chave (engine, modelo, dispositivo, precisão)
+            loader: Função que carrega o modelo e retorna (modelo, bytes, tempo_de_carga)
+            timeout: Tempo máximo aguardando carregamento alheio (None = sem limite)
+
+        Returns:
+            Modelo carregado
+
+        Raises:
+            ModelLoadTimeout: Se o carregamento em andamento não terminar a tempo
+            Exception: O mesmo erro levantado pelo carregamento
+        """
+        with self.lock:
+            entry = self._models.get(key)
+            if entry is not None:
+                self._models.move_to_end(key)
+                entry.last_used = time.time()
+                entry.uses += 1
+                self._hits += 1
+                return entry.model
+
+            pending = self._loading.get(key)
+            is_leader = pending is None
+            if is_leader:
+                pending = PendingLoad()
+                self._loading[key] = pending
+                self._misses += 1
+            else:
+                pending.waiters += 1
+                self._coalesced += 1
+
+        if not is_leader:
+            logger.info(f"Aguardando carregamento em andamento: {key}")
+            if not pending.event.wait(timeout):
+                raise ModelLoadTimeout(
+                    f"Timeout aguardando carregamento do modelo {key[1]} ({timeout}s)"
+                )
+            if pending.error is not None:
+                raise pending.error
+            return pending.model
+
+        try:
+            model, size_bytes, load_time = loader()
+            self.put(key, model, size_bytes, load_time)
+            pending.model = model
+            return model
+        except BaseException as e:
+            pending.error = e
+            raise
+        finally:
+            with self.lock:
+                self._loading.pop(key, None)
+                # Modelo carregado já conta como residente; falha devolve a reserva
+                self._reserved.pop(key, None)
+                self._capacity.notify_all()
+            pending.event.set()
+
+    def is_loading(self, key: Optional[ModelKey] = None) -> bool:
+        """
+        Indica se há carregamento em andamento
+
+        Args:
+            key: Chave específica; None verifica qualquer carregamento
+        """
+        with self.lock:
+            if key is None:
+                return bool(self._loading)
+            return key in self._loading
+
+    def loading_keys(self) -> List[ModelKey]:
+        """Chaves dos modelos sendo carregados no momento"""
+        with self.lock:
+            return list(self._loading.keys())
+
+    def used_bytes(self, memory_kind: str) -> int:
+        """Bytes ocupados por modelos de um tipo de memória"""
+        with self.lock:
+            return self._used_bytes(memory_kind)
+
+    def _used_bytes(self, memory_kind: str) -> int:
+        resident = sum(
+            e.size_bytes for e in self._models.values() if e.memory_kind == memory_kind
+        )
+        external = sum(size for kind, size in self._external.values() if kind == memory_kind)
+        reserved = sum(size for kind, size in self._reserved.values() if kind == memory_kind)
+        return resident + external + reserved
+
+    def reserve(
+        self,
+        device: str,
+        size_bytes: int,
+        on_evict: Optional[Callable[[PooledModel], None]] = None,
+        key: Optional[ModelKey] = None,
+        timeout: Optional[float] = None
+    ) -> List[ModelKey]:
+        """
+        Libera espaço no orçamento do dispositivo despejando modelos LRU
+
+        Com `key` (chamado de dentro do loader de get_or_load), o tamanho fica
+        reservado enquanto o carregamento roda e é devolvido ao terminar. Se
+        o espaço só existir depois de outros carregamentos em andamento,
+        aguarda eles terminarem em vez de estourar o orçamento junto com eles.
+
+        Args:
+            device: Dispositivo onde o novo modelo será carregado
+            size_bytes: Tamanho estimado do novo modelo
+            on_evict: Callback chamado para cada modelo despejado
+            key: Carregamento que fica com a reserva
+            timeout: Espera máxima por outros carregamentos (None = sem limite)
+
+        Returns:
+            Lista de chaves despejadas
+        """
+        memory_kind = self.memory_kind_for(device)
+        budget = self.budgets[memory_kind]
+        evicted = []
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self.lock:
+            while True:
+                # Percorrer do menos para o mais recentemente usado
+                for model_key in list(self._models.keys()):
+                    if self._used_bytes(memory_kind) + size_bytes <= budget:
+                        break
+                    entry = self._models[model_key]
+                    if entry.memory_kind != memory_kind:
+                        continue
+                    del self._models[model_key]
+                    self._evictions += 1
+                    evicted.append(entry)
+
+                if self._used_bytes(memory_kind) + size_bytes <= budget:
+                    break
+                others_loading = any(
+                    kind == memory_kind
+                    for reserved_key, (kind, _) in self._reserved.items()
+                    if reserved_key != key
+                )
+                if not others_loading:
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    logger.warning("Timeout aguardando outros carregamentos liberarem o orçamento")
+                    break
+                logger.info(f"Aguardando carregamentos em andamento liberarem {memory_kind}")
+                self._capacity.wait(remaining)
+
+            if key is not None:
+                self._reserved[key] = (memory_kind, size_bytes)
+
+            if size_bytes > budget:
+                logger.warning(
+                    f"Modelo de {size_bytes / (1024**2):.0f}MB excede o orçamento de "
+                    f"{memory_kind} ({budget / (1024**2):.0f}MB); carregando mesmo assim"
+                )
+
+        for entry in evicted:
+            logger.info(
+                f"Despejando modelo LRU do pool: {entry.key} "
+                f"({entry.size_bytes / (1024**2):.0f}MB)"
+            )
+            if on_evict:
+                on_evict(entry)
+
+        return [entry.key for entry in evicted]
+
+    def reserve_external(
+        self,
+        name: str,
+        device: str,
+        size_bytes: int,
+        on_evict: Optional[Callable[[PooledModel], None]] = None
+    ) -> List[ModelKey]:
+        """
+        Conta no orçamento modelos carregados fora do pool
+
+        Usado pelos processos do áudio longo: cada um carrega sua cópia do
+        modelo, que passa a ocupar o mesmo orçamento dos modelos residentes.
+        Modelos LRU são despejados para abrir espaço.
+
+        Args:
+            name: Identificador da reserva (substitui reserva anterior com o mesmo nome)
+            device: Dispositivo onde os modelos externos estão
+            size_bytes: Memória total ocupada por eles
+            on_evict: Callback chamado para cada modelo despejado
+
+        Returns:
+            Lista de chaves despejadas
+        """
+        self.release_external(name)
+        evicted = self.reserve(device, size_bytes, on_evict=on_evict)
+        with self.lock:
+            self._external[name] = (self.memory_kind_for(device), size_bytes)
+        return evicted
+
+    def release_external(self, name: str) -> None:
+        """Devolve ao orçamento a memória de uma reserva externa"""
+        with self.lock:
+            self._external.pop(name, None)
+            self._capacity.notify_all()
+
+    def put(self, key: ModelKey, model: Any, size_bytes: int, load_time: float) -> None:
+        """
+        Registra modelo recém-carregado no pool
+
+        Args:
+            key: Chave (engine, modelo, dispositivo, precisão)
+            model: Modelo carregado
+            size_bytes: Tamanho do modelo em bytes
+            load_time: Tempo de carregamento em segundos
+        """
+        with self.lock:
+            self._models[key] = PooledModel(
+                key=key,
+                model=model,
+                size_bytes=size_bytes,
+                load_time=load_time
+            )
+            self._models.move_to_end(key)
+            self._loads += 1
+            self._total_load_time += load_time
+
+    def remove(self, key: ModelKey) -> Optional[PooledModel]:
+        """Remove modelo do pool (sem contar como despejo)"""
+        with self.lock:
+            return self._models.pop(key, None)
+
+    def evict_idle(self, max_idle_seconds: float) -> List[PooledModel]:
+        """
+        Remove modelos sem uso há mais de max_idle_seconds
+
+        Args:
+            max_idle_seconds: Tempo máximo ocioso em segundos
+
+        Returns:
+            Entradas removidas
+        """
+        now = time.time()
+        with self.lock:
+            idle = [
+                e for e in self._models.values()
+                if now - e.last_used > max_idle_seconds
+            ]
+            for entry in idle:
+                del self._models[entry.key]
+                self._evictions += 1
+            return idle
+
+    def clear(self) -> List[PooledModel]:
+        """Remove todos os modelos do pool e retorna as entradas removidas"""
+        with self.lock:
+            entries = list(self._models.values())
+            self._models.clear()
+            return entries
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self._models)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retorna estatísticas do pool
+
+        Returns:
+            Dicionário com hits, misses, tempo de carga e modelos residentes
+        """
+        with self.lock:
+            total_requests = self._hits + self._misses
+            hit_rate = (self._hits / total_requests * 100) if total_requests > 0 else 0
+            avg_load_time = (self._total_load_time / self._loads) if self._loads > 0 else 0
+
+            return {
+                "resident_models": len(self._models),
+                "hits": self._hits,
+                "misses": self._misses,
+                "coalesced_loads": self._coalesced,
+                "hit_rate": round(hit_rate, 2),
+                "loads": self._loads,
+                "evictions": self._evictions,
+                "total_load_time_s": round(self._total_load_time, 2),
+                "avg_load_time_s": round(avg_load_time, 2),
+                "ram_used_mb": round(self._used_bytes("ram") / (1024**2), 1),
+                "ram_budget_mb": round(self.budgets["ram"] / (1024**2), 1),
+                "vram_used_mb": round(self._used_bytes("vram") / (1024**2), 1),
+                "vram_budget_mb": round(self.budgets["vram"] / (1024**2), 1),
+                "external": {
+                    name: {"memory": kind, "size_mb": round(size / (1024**2), 1)}
+                    for name, (kind, size) in self._external.items()
+                },
+                "loading": [
+                    {
+                        "engine": k[0],
+                        "model": k[1],
+                        "device": k[2],
+                        "precision": k[3],
+                        "elapsed_s": round(time.time() - p.started_at, 1),
+                        "waiters": p.waiters,
+                        "reserved_mb": round(self._reserved.get(k, ("", 0))[1] / (1024**2), 1),
+                    }
+                    for k, p in self._loading.items()
+                ],
+                "models": [
+                    {
+                        "engine": e.key[0],
+                        "model": e.key[1],
+                        "device": e.key[2],
+                        "precision": e.key[3],
+                        "size_mb": round(e.size_bytes / (1024**2), 1),
+                        "load_time_s": round(e.load_time, 2),
+                        "uses": e.uses,
+                        "idle_s": round(time.time() - e.last_used, 1),
+                    }
+                    # Do mais para o menos recentemente usado
+                    for e in reversed(self._models.values())
+                ],
+            }
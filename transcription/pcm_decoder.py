@@ -0,0 +1,195 @@
+"""
+Decodificação de áudio direto para memória (NumPy)
+
+Em vez de gravar um WAV temporário e deixar o Whisper decodificá-lo de novo
+com seu próprio ffmpeg, o ffmpeg escreve PCM s16le 16kHz mono no stdout e as
+amostras são convertidas para float32 em um buffer pré-alocado pela duração
+esperada. O array resultante é passado direto ao modelo.
+
+WAVs que já estão em PCM 16-bit 16kHz mono são lidos sem ffmpeg.
+"""
+import wave
+import logging
+import subprocess
+from threading import Thread, Timer
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+INT16_SCALE = 1.0 / 32768.0
+
+
+def read_wav_samples(wav_path: str) -> Optional[np.ndarray]:
+    """
+    Lê WAV PCM 16-bit mono 16kHz como float32 normalizado em [-1, 1]
+
+    Returns:
+        Array de amostras ou None se o formato não for o esperado
+    """
+    try:
+        with wave.open(wav_path, "rb") as wav:
+            if (wav.getframerate() != SAMPLE_RATE or wav.getnchannels() != 1
+                    or wav.getsampwidth() != 2):
+                return None
+            raw = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError, OSError) as e:
+        logger.debug(f"Não foi possível ler WAV {wav_path}: {e}")
+        return None
+
+    return np.frombuffer(raw, dtype=np.int16).astype(np.float32) * INT16_SCALE
+
+
+def write_wav_samples(wav_path: str, samples: np.ndarray) -> None:
+    """Grava amostras float32 como WAV PCM 16-bit mono 16kHz (inverso de read_wav_samples)"""
+    pcm = np.clip(np.rint(samples * 32768.0), -32768, 32767).astype('<i2')
+    with wave.open(wav_path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(pcm.tobytes())
+
+
+def get_wav_duration(wav_path: str) -> float:
+    """Duração do WAV em segundos lida do cabeçalho (0 se ilegível)"""
+    try:
+        with wave.open(wav_path, "rb") as wav:
+            return wav.getnframes() / float(wav.getframerate())
+    except (wave.Error, EOFError, OSError):
+        return 0.0
+
+
+def get_audio_duration(audio: Union[str, np.ndarray]) -> float:
+    """Duração em segundos de um array de amostras ou de um WAV"""
+    if isinstance(audio, np.ndarray):
+        return len(audio) / SAMPLE_RATE
+    return get_wav_duration(audio)
+
+
+class PCMDecoder:
+    """Decodifica qualquer mídia suportada pelo ffmpeg para float32 em memória"""
+
+    READ_CHUNK_BYTES = 1024 * 1024
+    MAX_STDERR_BYTES = 64 * 1024  # Final do log de erros mantido para a mensagem
+    DEFAULT_DURATION = 60.0  # Usado para pré-alocar quando a duração é desconhecida
+
+    @staticmethod
+    def decode(
+        input_path: str,
+        timeout: Optional[int] = None,
+        expected_duration: Optional[float] = None,
+        input_args: Optional[List[str]] = None
+    ) -> Tuple[bool, Union[np.ndarray, str]]:
+        """
+        Decodifica mídia para PCM 16kHz mono float32 via pipe do ffmpeg
+
+        Args:
+            input_path: Arquivo de áudio ou vídeo
+            timeout: Tempo máximo de execução em segundos (None = sem limite)
+            expected_duration: Duração esperada (ffprobe) para pré-alocar o buffer
+            input_args: Argumentos extras do ffmpeg antes de -i
+
+        Returns:
+            Tuple[bool, array | str]: (sucesso, amostras_ou_mensagem_de_erro)
+        """
+        command = [
+            'ffmpeg',
+            '-nostdin',
+            *(input_args or []),
+            '-i', input_path,
+            '-vn',                      # Sem vídeo
+            '-f', 's16le',              # PCM cru no stdout
+            '-acodec', 'pcm_s16le',
+            '-ar', str(SAMPLE_RATE),
+            '-ac', '1',
+            '-loglevel', 'error',
+            'pipe:1'
+        ]
+
+        duration = expected_duration or PCMDecoder.DEFAULT_DURATION
+        # Margem de 1s para diferenças de arredondamento do ffprobe
+        buffer = np.empty(int(duration * SAMPLE_RATE) + SAMPLE_RATE, dtype=np.float32)
+        filled = 0
+        leftover = b''
+        timed_out = []
+
+        try:
+            process = subprocess.Popen(
+                command, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            )
+        except FileNotFoundError:
+            return False, "ffmpeg não encontrado. Instale ffmpeg."
+
+        def _kill():
+            timed_out.append(True)
+            process.kill()
+
+        # stderr lido em paralelo: um arquivo corrompido pode gerar mais log de
+        # erro que o buffer do pipe (~64KB) e travar o ffmpeg antes do EOF do stdout
+        stderr_tail = bytearray()
+
+        def _drain_stderr():
+            for chunk in iter(lambda: process.stderr.read(8192), b''):
+                stderr_tail.extend(chunk)
+                if len(stderr_tail) > PCMDecoder.MAX_STDERR_BYTES:
+                    del stderr_tail[:-PCMDecoder.MAX_STDERR_BYTES]
+
+        stderr_reader = Thread(target=_drain_stderr, name="ffmpeg-stderr", daemon=True)
+        stderr_reader.start()
+
+        timer = Timer(timeout, _kill) if timeout else None
+        if timer:
+            timer.start()
+
+        try:
+            while True:
+                data = process.stdout.read(PCMDecoder.READ_CHUNK_BYTES)
+                if not data:
+                    break
+                if leftover:
+                    data = leftover + data
+                    leftover = b''
+                # Amostra de 2 bytes pode chegar dividida entre leituras
+                if len(data) % 2:
+                    leftover = data[-1:]
+                    data = data[:-1]
+
+                samples = np.frombuffer(data, dtype=np.int16)
+                end = filled + len(samples)
+                if end > len(buffer):
+                    # Duração maior que a esperada: dobrar o buffer
+                    grown = np.empty(max(end, 2 * len(buffer)), dtype=np.float32)
+                    grown[:filled] = buffer[:filled]
+                    buffer = grown
+
+                buffer[filled:end] = samples
+                buffer[filled:end] *= INT16_SCALE
+                filled = end
+
+            returncode = process.wait()
+        finally:
+            if timer:
+                timer.cancel()
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            stderr_reader.join()
+
+        if timed_out:
+            return False, f"Timeout ao decodificar áudio (limite: {timeout}s)"
+
+        if returncode != 0:
+            error_msg = bytes(stderr_tail).decode(errors='replace').strip()
+            return False, error_msg or "Erro desconhecido ao decodificar áudio"
+
+        logger.info(
+            f"Áudio decodificado em memória: {filled / SAMPLE_RATE:.1f}s "
+            f"({filled * 4 / (1024 * 1024):.1f}MB float32)"
+        )
+        if filled < len(buffer) * 0.75:
+            # Buffer superdimensionado (duração superestimada ou após dobrar):
+            # copiar para não manter a sobra viva junto com as amostras
+            return True, buffer[:filled].copy()
+        return True, buffer[:filled]
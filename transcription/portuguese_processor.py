@@ -3,6 +3,8 @@ Pós-processamento de texto em português brasileiro
 Melhora a qualidade da transcrição com correções específicas do idioma
 """
 import re
+import json
+import hashlib
 import logging
 from typing import List, Tuple
 from django.conf import settings
@@ -12,6 +14,10 @@ logger = logging.getLogger(__name__)
 # Configuração português BR
 PT_BR_CONFIG = settings.PORTUGUESE_BR_CONFIG
 
+# ✅ NOVO: Revisão das regras abaixo - incrementar ao mudar o código do
+# processador (mudanças em PORTUGUESE_BR_CONFIG já mudam a versão)
+PROCESSOR_REVISION = 1
+
 
 class PortugueseBRTextProcessor:
     """Processa e melhora texto em português brasileiro"""
@@ -147,6 +153,20 @@ class PortugueseBRTextProcessor:
         
         return text
 
+    @staticmethod
+    def version() -> str:
+        """
+        ✅ NOVO: Identificador do pós-processamento (revisão das regras + configuração)
+
+        O cache guarda a transcrição bruta do modelo e memoriza o texto
+        processado por esta versão: mudar as regras só refaz o processamento
+        de texto, nunca a inferência.
+        """
+        config = json.dumps(PT_BR_CONFIG, sort_keys=True, ensure_ascii=False)
+        return hashlib.blake2b(
+            f"{PROCESSOR_REVISION}:{config}".encode('utf-8'), digest_size=8
+        ).hexdigest()
+
     @classmethod
     def process(cls, text: str, remove_hesitations: bool = True,
                 expand_abbreviations: bool = True) -> str:
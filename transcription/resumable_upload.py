@@ -0,0 +1,268 @@
+"""
+Uploads retomáveis (estilo tus): criar sessão, enviar pedaços por offset, finalizar
+
+Um vídeo de 400MB que cai em 90% do envio não precisa recomeçar do zero:
+o cliente consulta o offset da sessão e continua dali. Cada pedaço é uma
+requisição curta (não prende um worker web pelo upload inteiro) e é
+acrescentado direto ao arquivo da sessão em disco, sem passar pela RAM.
+
+- Sessões ficam em $TEMP_AUDIO_DIR/resumable/<id>.part (+ <id>.json com metadados)
+- O offset é o tamanho do .part - não há estado a sincronizar entre processos
+- Upload-Checksum ("<algoritmo> <base64>", como no tus) é conferido por pedaço;
+  pedaço divergente é descartado e o offset volta ao anterior
+- Sessões sem pedaço novo há RESUMABLE_UPLOAD_EXPIRY_SECONDS expiram
+- Na finalização o arquivo montado vira um StreamedUploadedFile, então segue
+  pelos mesmos caminhos (/transcribe, /transcribe/async) sem nova cópia
+"""
+import os
+import re
+import json
+import time
+import uuid
+import fcntl
+import base64
+import hashlib
+import logging
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from django.conf import settings
+
+from .cache_manager import new_content_hasher
+from .upload_handler import PART_PREFIX, StreamedUploadedFile
+
+logger = logging.getLogger(__name__)
+
+SESSION_DIR_NAME = "resumable"
+UPLOAD_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+CHECKSUM_ALGORITHMS = ("md5", "sha1", "sha256")
+READ_CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+
+class ResumableUploadStore:
+    """Sessões de upload retomável em disco (compartilhadas entre processos web)"""
+
+    @staticmethod
+    def session_dir() -> Path:
+        path = Path(settings.TEMP_AUDIO_DIR) / SESSION_DIR_NAME
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    @classmethod
+    def _paths(cls, upload_id: str) -> Tuple[Path, Path]:
+        base = cls.session_dir() / upload_id
+        return base.with_suffix(".part"), base.with_suffix(".json")
+
+    @staticmethod
+    def _expired(part_path: Path, now: float) -> bool:
+        return now - part_path.stat().st_mtime > settings.RESUMABLE_UPLOAD_EXPIRY_SECONDS
+
+    @classmethod
+    def _remove(cls, upload_id: str) -> None:
+        for path in cls._paths(upload_id):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    @classmethod
+    def create(cls, filename: str, size: int) -> Tuple[Optional[Dict], Optional[str]]:
+        """
+        Abre uma sessão para um arquivo de `size` bytes
+
+        Returns:
+            (estado da sessão, None) ou (None, erro)
+        """
+        max_bytes = settings.MAX_AUDIO_SIZE_MB * 1024 * 1024
+        if size <= 0:
+            return None, "size deve ser o tamanho do arquivo em bytes"
+        if size > max_bytes:
+            return None, (f"Arquivo muito grande: {size / (1024 * 1024):.2f}MB "
+                          f"(máximo: {settings.MAX_AUDIO_SIZE_MB}MB)")
+
+        filename = os.path.basename(filename or "")
+        extension = Path(filename).suffix.lstrip('.').lower()
+        if extension not in settings.ALL_SUPPORTED_FORMATS:
+            return None, f"Formato '{extension}' não suportado"
+
+        cls.cleanup_expired()
+
+        upload_id = uuid.uuid4().hex
+        part_path, meta_path = cls._paths(upload_id)
+        part_path.touch()
+        meta_path.write_text(json.dumps({"filename": filename, "size": size, "created_at": time.time()}))
+
+        logger.info(f"Upload retomável criado: {upload_id} ({filename}, {size / (1024 * 1024):.2f}MB)")
+        return cls.get(upload_id), None
+
+    @classmethod
+    def get(cls, upload_id: str) -> Optional[Dict]:
+        """Estado da sessão (offset atual, tamanho, expiração) ou None se não existe/expirou"""
+        if not UPLOAD_ID_RE.match(upload_id):
+            return None
+
+        part_path, meta_path = cls._paths(upload_id)
+        try:
+            meta = json.loads(meta_path.read_text())
+            stat = part_path.stat()
+        except (FileNotFoundError, ValueError):
+            return None
+
+        now = time.time()
+        if cls._expired(part_path, now):
+            cls._remove(upload_id)
+            return None
+
+        return {
+            "upload_id": upload_id,
+            "filename": meta["filename"],
+            "size": meta["size"],
+            "offset": stat.st_size,
+            "expires_at": stat.st_mtime + settings.RESUMABLE_UPLOAD_EXPIRY_SECONDS,
+        }
+
+    @classmethod
+    def append(
+        cls,
+        upload_id: str,
+        offset: int,
+        read: Callable[[int], bytes],
+        length: int,
+        checksum: Optional[str] = None
+    ) -> Tuple[Optional[Dict], Optional[str]]:
+        """
+        Acrescenta `length` bytes lidos de `read` a partir de `offset`
+
+        Args:
+            read: Função que lê até n bytes do corpo (request.read)
+            checksum: Upload-Checksum "<algoritmo> <base64>" do pedaço (opcional)
+
+        Returns:
+            (estado da sessão, None) ou (estado ou None, erro) - com erro de
+            offset o estado traz o offset correto para o cliente retomar
+        """
+        hasher, expected_digest = None, None
+        if checksum:
+            algorithm, _, encoded = checksum.strip().partition(" ")
+            if algorithm.lower() not in CHECKSUM_ALGORITHMS:
+                return None, f"Algoritmo de checksum não suportado. Aceitos: {', '.join(CHECKSUM_ALGORITHMS)}"
+            try:
+                expected_digest = base64.b64decode(encoded.strip(), validate=True)
+            except ValueError:
+                return None, "Upload-Checksum inválido (esperado '<algoritmo> <base64>')"
+            hasher = hashlib.new(algorithm.lower())
+
+        if length <= 0 or length > settings.RESUMABLE_UPLOAD_MAX_CHUNK_MB * 1024 * 1024:
+            return None, f"Pedaço deve ter entre 1 byte e {settings.RESUMABLE_UPLOAD_MAX_CHUNK_MB}MB"
+
+        session = cls.get(upload_id)
+        if session is None:
+            return None, "Upload não encontrado ou expirado"
+
+        part_path, _ = cls._paths(upload_id)
+        with open(part_path, 'r+b') as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return session, "Outro pedaço deste upload está sendo enviado"
+
+            current = f.seek(0, os.SEEK_END)
+            session["offset"] = current
+            if offset != current:
+                return session, f"Upload-Offset {offset} não confere com o servidor ({current})"
+            if current + length > session["size"]:
+                return session, "Pedaço ultrapassa o tamanho declarado do arquivo"
+
+            received = 0
+            while received < length:
+                data = read(min(READ_CHUNK_SIZE, length - received))
+                if not data:
+                    break
+                if hasher:
+                    hasher.update(data)
+                f.write(data)
+                received += len(data)
+
+            error = None
+            if hasher and received < length:
+                error = "Pedaço incompleto - reenvie a partir do offset"
+            elif hasher and hasher.digest() != expected_digest:
+                error = "Checksum do pedaço não confere - reenvie a partir do offset"
+
+            if error:
+                # Pedaço com checksum só entra inteiro e verificado
+                f.truncate(current)
+                received = 0
+
+            session["offset"] = current + received
+
+        return session, error
+
+    @classmethod
+    def finalize(cls, upload_id: str) -> Tuple[Optional[StreamedUploadedFile], Optional[str]]:
+        """
+        Encerra a sessão completa e devolve o arquivo montado com o hash calculado
+
+        O arquivo vai para TEMP_AUDIO_DIR como um upload normal: a view o
+        renomeia (ou o remove no close(), se recusar).
+        """
+        session = cls.get(upload_id)
+        if session is None:
+            return None, "Upload não encontrado ou expirado"
+
+        part_path, meta_path = cls._paths(upload_id)
+        with open(part_path, 'rb') as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return None, "Upload ainda recebendo pedaços"
+            if not meta_path.exists():
+                return None, "Upload já finalizado"
+
+            offset = f.seek(0, os.SEEK_END)
+            if offset != session["size"]:
+                return None, f"Upload incompleto: {offset} de {session['size']} bytes"
+
+            f.seek(0)
+            hasher = new_content_hasher()
+            for chunk in iter(lambda: f.read(READ_CHUNK_SIZE), b''):
+                hasher.update(chunk)
+
+            assembled_path = os.path.join(settings.TEMP_AUDIO_DIR, f"{PART_PREFIX}{upload_id}.part")
+            meta_path.unlink()
+            os.replace(part_path, assembled_path)
+
+        logger.info(f"Upload retomável finalizado: {upload_id} ({session['filename']})")
+        return StreamedUploadedFile(
+            file=open(assembled_path, 'rb'),
+            name=session["filename"],
+            content_type="application/octet-stream",
+            size=session["size"],
+            charset=None,
+            content_hash=hasher.hexdigest()
+        ), None
+
+    @classmethod
+    def delete(cls, upload_id: str) -> bool:
+        """Cancela a sessão e libera o disco"""
+        if cls.get(upload_id) is None:
+            return False
+        cls._remove(upload_id)
+        logger.info(f"Upload retomável cancelado: {upload_id}")
+        return True
+
+    @classmethod
+    def cleanup_expired(cls) -> int:
+        """Remove sessões abandonadas (sem pedaço novo dentro da expiração)"""
+        now = time.time()
+        removed = 0
+        for part_path in cls.session_dir().glob("*.part"):
+            try:
+                if cls._expired(part_path, now):
+                    cls._remove(part_path.stem)
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        if removed:
+            logger.info(f"Uploads retomáveis expirados removidos: {removed}")
+        return removed
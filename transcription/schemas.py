@@ -44,6 +44,12 @@ class TimingMetrics(BaseModel):
     post_processing_time: Optional[float] = Field(
         None, description="Tempo gasto no pós-processamento de português (segundos)")
     total_time: float = Field(..., description="Tempo total de processamento (segundos)")
+    vad_time: Optional[float] = Field(
+        None, description="Tempo gasto na detecção de fala (VAD) (segundos)")
+    skipped_audio_seconds: Optional[float] = Field(
+        None, description="Áudio sem fala descartado antes da inferência (segundos)")
+    skipped_audio_percent: Optional[float] = Field(
+        None, description="Percentual do áudio descartado pelo VAD")
 
 
 class TranscriptionResponse(BaseModel):
@@ -68,11 +74,13 @@ class TranscriptionResponse(BaseModel):
 
 class HealthResponse(BaseModel):
     """Resposta do endpoint de health check"""
-    status: str = Field(..., description="Status do serviço (healthy/unhealthy)")
+    status: str = Field(..., description="Status do serviço (healthy/loading/unhealthy)")
     whisper_model: str = Field(..., description="Modelo Whisper carregado")
+    inference_engine: Optional[str] = Field(None, description="Engine de inferência padrão (openai, faster-whisper)")
     supported_formats: List[str] = Field(..., description="Formatos de áudio suportados")
     max_file_size_mb: int = Field(..., description="Tamanho máximo de arquivo permitido")
     temp_dir: str = Field(..., description="Diretório temporário para processamento")
+    workers: Optional[int] = Field(None, description="Workers de inferência ativos (estado publicado no Redis)")
 
 
 class BatchTranscriptionResponse(BaseModel):
@@ -91,6 +99,7 @@ class TranscribeRequest(BaseModel):
     """Parâmetros opcionais para transcrição"""
     language: str = Field(default="pt", description="Código do idioma (pt, en, es, etc)")
     model: Optional[str] = Field(None, description="Modelo Whisper a usar (sobrescreve padrão)")
+    engine: Optional[str] = Field(None, description="Engine de inferência (openai, faster-whisper)")
     
     @field_validator('language')
     @classmethod
@@ -111,3 +120,14 @@ class TranscribeRequest(BaseModel):
         if v not in valid_models:
             raise ValueError(f"Modelo '{v}' não suportado. Use: {', '.join(valid_models)}")
         return v
+
+    @field_validator('engine')
+    @classmethod
+    def validate_engine(cls, v: Optional[str]) -> Optional[str]:
+        """Valida engine de inferência"""
+        if v is None:
+            return v
+        valid_engines = ['openai', 'faster-whisper']
+        if v not in valid_engines:
+            raise ValueError(f"Engine '{v}' não suportada. Use: {', '.join(valid_engines)}")
+        return v
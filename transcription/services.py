@@ -3,14 +3,16 @@ Serviço de processamento de áudio e transcrição usando Whisper
 """
 import os
 import gc
+import sys
+import json
 import time
+import uuid
 import logging
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Any, Optional, Dict, Iterator, Tuple, Union
 from contextlib import contextmanager
 
-import whisper
-import torch
+import numpy as np
 from django.conf import settings
 
 from .schemas import (
@@ -22,13 +24,29 @@ from .schemas import (
 )
 from .portuguese_processor import PortugueseBRTextProcessor
 from .video_processor import VideoProcessor
-from .cache_manager import get_cache_manager
+from .cache_manager import get_cache_manager, hash_file, hash_pcm
 # ✅ NOVO: AudioProcessor otimizado
 from .audio_processor_optimized import AudioProcessor
 from .batch_processor import BatchAudioProcessor  # ✅ NOVO: Batch processor
+from .inference_engines import get_engine  # ✅ NOVO: Engines plugáveis
+from .model_pool import (  # ✅ NOVO: Pool multi-modelo
+    ModelLoadTimeout, ModelPool, PooledModel, inference_lock, iterate_locked
+)
+from .long_audio import LongAudioTranscriber  # ✅ NOVO: Áudio longo em trechos paralelos
+from .micro_batcher import MicroBatcher, get_micro_batcher  # ✅ NOVO: Lotes entre requisições
+from .vad import filter_speech, is_silent  # ✅ NOVO: Pré-filtro de fala e early-exit
+from .single_flight import Lease, get_single_flight  # ✅ NOVO: Uma inferência por chave
 
 logger = logging.getLogger(__name__)
 
+# Campos da resposta preenchidos a cada hit (fora do corpo guardado no cache)
+RESPONSE_BODY_PATCHED_FIELDS = {"cached", "processing_time"}
+
+# Entrada com a transcrição bruta do modelo: idioma do pós-processamento e
+# chave do resultado (aliases de fingerprint compartilham a versão processada)
+POSTPROCESS_FIELD = "postprocess"
+RAW_KEY_FIELD = "raw_key"
+
 
 @contextmanager
 def temporary_file(file_path: str):
@@ -61,10 +79,9 @@ def temporary_file(file_path: str):
 class WhisperTranscriber:
     """Gerencia carregamento do modelo Whisper e transcrição"""
 
-    _model = None
-    _current_model_name = None
+    _model_pool: Optional[ModelPool] = None
     _device = None
-    _gpu_memory_threshold = 0.9  # 90% de uso antes de fallback para CPU
+    _gpu_memory_threshold = settings.GPU_MEMORY_THRESHOLD  # 90% de uso antes de fallback para CPU
 
     @classmethod
     def get_device(cls) -> str:
@@ -75,6 +92,8 @@ class WhisperTranscriber:
             str: 'cuda' se GPU disponível, 'cpu' caso contrário
         """
         if cls._device is None:
+            import torch
+
             cls._device = "cuda" if torch.cuda.is_available() else "cpu"
 
             if cls._device == "cuda":
@@ -88,6 +107,100 @@ class WhisperTranscriber:
 
         return cls._device
 
+    @classmethod
+    def get_model_pool(cls) -> ModelPool:
+        """
+        Retorna o pool de modelos residentes (criado sob demanda)
+
+        O orçamento de VRAM padrão é GPU_MEMORY_THRESHOLD da memória total da GPU.
+
+        Returns:
+            ModelPool: Pool compartilhado pelo processo
+        """
+        if cls._model_pool is None:
+            ram_budget = settings.MODEL_POOL_RAM_BUDGET_MB * 1024 * 1024
+            vram_budget = settings.MODEL_POOL_VRAM_BUDGET_MB * 1024 * 1024
+
+            if vram_budget <= 0 and cls.get_device() == "cuda":
+                import torch
+
+                total_vram = torch.cuda.get_device_properties(0).total_memory
+                vram_budget = int(total_vram * cls._gpu_memory_threshold)
+
+            cls._model_pool = ModelPool(
+                ram_budget_bytes=ram_budget,
+                vram_budget_bytes=vram_budget
+            )
+            logger.info(
+                f"Pool de modelos inicializado: RAM={ram_budget / (1024**2):.0f}MB, "
+                f"VRAM={vram_budget / (1024**2):.0f}MB"
+            )
+
+        return cls._model_pool
+
+    @classmethod
+    def get_model_pool_stats(cls) -> Dict[str, Any]:
+        """Estatísticas do pool de modelos (hits, misses, tempo de carga)"""
+        return cls.get_model_pool().get_stats()
+
+    @classmethod
+    def is_model_loading(cls, model_name: Optional[str] = None, engine: Optional[str] = None) -> bool:
+        """
+        Indica se um modelo está sendo carregado no momento
+
+        Permite que chamadores (ex: health check) não fiquem presos atrás
+        de um carregamento em andamento.
+
+        Args:
+            model_name: Nome do modelo; None verifica qualquer modelo
+            engine: Engine de inferência; None verifica qualquer engine
+        """
+        if cls._model_pool is None:
+            return False
+
+        for key in cls._model_pool.loading_keys():
+            if (engine is None or key[0] == engine) and \
+                    (model_name is None or key[1] == model_name):
+                return True
+        return False
+
+    @classmethod
+    def get_status_snapshot(cls) -> Dict[str, Any]:
+        """
+        ✅ NOVO: Estado do processo de inferência publicado para o processo web
+
+        Inclui dispositivo, GPUs visíveis, pool de modelos e micro-batching.
+        Lido por /health e /gpu-status via worker_status.read_worker_status.
+        """
+        device = cls.get_device()
+        snapshot: Dict[str, Any] = {
+            "device": device,
+            "gpus": [],
+            "model_pool": cls.get_model_pool_stats(),
+            "micro_batching": get_micro_batcher().get_stats(),
+        }
+
+        if device == "cuda":
+            import torch
+
+            for i in range(torch.cuda.device_count()):
+                memory_allocated = torch.cuda.memory_allocated(i) / (1024**3)
+                memory_reserved = torch.cuda.memory_reserved(i) / (1024**3)
+                memory_total = torch.cuda.get_device_properties(i).total_memory / (1024**3)
+                capability = torch.cuda.get_device_capability(i)
+
+                snapshot["gpus"].append({
+                    "id": i,
+                    "name": torch.cuda.get_device_name(i),
+                    "memory_allocated_gb": round(memory_allocated, 2),
+                    "memory_reserved_gb": round(memory_reserved, 2),
+                    "memory_total_gb": round(memory_total, 2),
+                    "memory_free_gb": round(memory_total - memory_reserved, 2),
+                    "compute_capability": f"{capability[0]}.{capability[1]}"
+                })
+
+        return snapshot
+
     @classmethod
     def check_gpu_memory(cls) -> Dict[str, float]:
         """
@@ -96,9 +209,11 @@ class WhisperTranscriber:
         Returns:
             Dict com informações de memória (allocated, reserved, total, free)
         """
-        if not torch.cuda.is_available():
+        if cls.get_device() != "cuda":
             return {}
 
+        import torch
+
         try:
             allocated = torch.cuda.memory_allocated(0) / (1024**3)
             reserved = torch.cuda.memory_reserved(0) / (1024**3)
@@ -121,7 +236,14 @@ class WhisperTranscriber:
     @classmethod
     def clear_gpu_memory(cls) -> None:
         """Limpa memória GPU não utilizada"""
-        if torch.cuda.is_available():
+        # Sem torch importado não há memória de GPU a liberar - evita importar
+        # torch no processo web só para limpar cache
+        if "torch" not in sys.modules:
+            return
+
+        if cls.get_device() == "cuda":
+            import torch
+
             try:
                 torch.cuda.empty_cache()
                 gc.collect()
@@ -129,36 +251,61 @@ class WhisperTranscriber:
             except Exception as e:
                 logger.error(f"Erro ao limpar cache GPU: {e}")
 
+    @classmethod
+    def _release_model(cls, entry: PooledModel) -> None:
+        """Libera memória de um modelo removido do pool"""
+        entry.model = None
+        gc.collect()
+        if "cuda" in entry.key[2]:
+            cls.clear_gpu_memory()
+
     @classmethod
     def unload_model(cls) -> None:
         """
-        Descarrega o modelo Whisper de memória (GPU ou CPU)
+        Descarrega todos os modelos Whisper de memória (GPU ou CPU)
         ✅ PROTEÇÃO CRÍTICA: Libera memória para evitar travamento
         
         Deve ser chamado após processar requisições para evitar acúmulo de memória.
         """
-        if cls._model is not None:
-            try:
-                logger.info(f"Descarregando modelo Whisper: {cls._current_model_name}")
-                
-                # Remover referência para permitir coleta de lixo
-                del cls._model
-                cls._model = None
-                cls._current_model_name = None
-                
-                # Forçar coleta de lixo
-                gc.collect()
-                
-                # Se estava em GPU, limpar também
-                if torch.cuda.is_available():
-                    cls.clear_gpu_memory()
-                
-                logger.info("Modelo Whisper descarregado com sucesso")
-            except Exception as e:
-                logger.error(f"Erro ao descarregar modelo: {e}")
-                # Tentar mesmo assim
-                cls._model = None
-                cls._current_model_name = None
+        if cls._model_pool is None:
+            return
+
+        try:
+            entries = cls._model_pool.clear()
+            for entry in entries:
+                logger.info(f"Descarregando modelo Whisper: {entry.key}")
+                cls._release_model(entry)
+
+            # Forçar coleta de lixo
+            gc.collect()
+
+            # Se estava em GPU, limpar também
+            cls.clear_gpu_memory()
+
+            if entries:
+                logger.info(f"{len(entries)} modelo(s) Whisper descarregado(s) com sucesso")
+        except Exception as e:
+            logger.error(f"Erro ao descarregar modelo: {e}")
+
+    @classmethod
+    def unload_idle_models(cls, max_idle_seconds: float) -> int:
+        """
+        Descarrega apenas modelos ociosos, mantendo residentes os que estão em uso
+
+        Args:
+            max_idle_seconds: Tempo sem uso a partir do qual o modelo é descarregado
+
+        Returns:
+            Número de modelos descarregados
+        """
+        if cls._model_pool is None:
+            return 0
+
+        entries = cls._model_pool.evict_idle(max_idle_seconds)
+        for entry in entries:
+            logger.info(f"Descarregando modelo ocioso: {entry.key}")
+            cls._release_model(entry)
+        return len(entries)
 
     @classmethod
     def should_use_cpu_fallback(cls) -> bool:
@@ -168,7 +315,7 @@ class WhisperTranscriber:
         Returns:
             True se deve usar CPU, False se pode usar GPU
         """
-        if not torch.cuda.is_available():
+        if cls.get_device() != "cuda":
             return True
 
         memory_info = cls.check_gpu_memory()
@@ -186,45 +333,55 @@ class WhisperTranscriber:
         return False
 
     @classmethod
-    def load_model(cls, model_name: Optional[str] = None, force_cpu: bool = False) -> whisper.Whisper:
+    def load_model(
+        cls,
+        model_name: Optional[str] = None,
+        force_cpu: bool = False,
+        engine: Optional[str] = None
+    ) -> Any:
         """
-        Carrega modelo Whisper (singleton) no dispositivo apropriado
-        Com cache persistente em GPU para evitar recarregamento
+        Carrega modelo Whisper no dispositivo apropriado
+        Modelos ficam residentes no pool (LRU com orçamento de memória) para
+        evitar recarregamento ao alternar entre modelos. Chamadas concorrentes
+        para o mesmo modelo compartilham um único carregamento.
 
         Args:
             model_name: Nome do modelo (tiny, base, small, medium, large)
             force_cpu: Forçar uso de CPU mesmo se GPU disponível
+            engine: Engine de inferência (openai, faster-whisper). None usa WHISPER_ENGINE
 
         Returns:
-            whisper.Whisper: Modelo carregado
+            Modelo carregado (tipo depende da engine)
         """
         if model_name is None:
             model_name = settings.WHISPER_MODEL
 
+        inference_engine = get_engine(engine)
+        pool = cls.get_model_pool()
+
         # Determinar dispositivo
         if force_cpu or cls.should_use_cpu_fallback():
             device = "cpu"
         else:
             device = cls.get_device()
 
-        # Reutilizar modelo se já estiver carregado no mesmo dispositivo
-        if cls._model is not None and cls._current_model_name == model_name:
-            # Verificar se está no dispositivo correto
-            model_device = str(next(cls._model.parameters()).device)
-            if device in model_device or (device == "cpu" and "cuda" not in model_device):
-                logger.info(
-                    f"Reutilizando modelo Whisper em cache: {model_name} ({device})")
-                return cls._model
-            else:
-                logger.info("Modelo em dispositivo diferente, recarregando...")
-                cls._model = None
-                cls.clear_gpu_memory()
+        key = (inference_engine.name, model_name, device, inference_engine.precision(device))
 
-        logger.info(
-            f"Carregando modelo Whisper: {model_name} no dispositivo: {device}")
-        start_time = time.time()
+        def _load():
+            logger.info(
+                f"Carregando modelo Whisper: {model_name} no dispositivo: {device} "
+                f"(engine: {inference_engine.name})")
+
+            # Abrir espaço no orçamento antes de carregar (despeja modelos LRU);
+            # o tamanho fica reservado até o fim, somando com cargas simultâneas
+            estimated_bytes = inference_engine.estimate_model_bytes(model_name, device)
+            pool.reserve(
+                device, estimated_bytes, on_evict=cls._release_model,
+                key=key, timeout=settings.MODEL_LOAD_WAIT_TIMEOUT or None
+            )
+
+            start_time = time.time()
 
-        try:
             # Limpar memória antes de carregar modelo grande
             if device == "cuda":
                 cls.clear_gpu_memory()
@@ -232,11 +389,13 @@ class WhisperTranscriber:
                 logger.info(
                     f"Memória GPU antes do carregamento: {memory_before}")
 
-            cls._model = whisper.load_model(model_name, device=device)
-            cls._current_model_name = model_name
+            model = inference_engine.load_model(model_name, device)
 
             load_time = time.time() - start_time
-            logger.info(f"Modelo carregado em {load_time:.2f}s")
+            size_bytes = inference_engine.estimate_model_bytes(model_name, device, model)
+            logger.info(
+                f"Modelo carregado em {load_time:.2f}s "
+                f"({size_bytes / (1024**2):.0f}MB, {len(pool) + 1} modelo(s) residente(s))")
 
             # Log de memória GPU após carregamento
             if device == "cuda":
@@ -247,7 +406,14 @@ class WhisperTranscriber:
                 logger.info(
                     f"Memória GPU usada pelo modelo: {memory_used:.2f}GB")
 
-            return cls._model
+            return model, size_bytes, load_time
+
+        try:
+            # ✅ NOVO: Single-flight - chamadas concorrentes para o mesmo modelo
+            # aguardam um único carregamento e recebem a mesma instância
+            return pool.get_or_load(
+                key, _load, timeout=settings.MODEL_LOAD_WAIT_TIMEOUT or None
+            )
 
         except RuntimeError as e:
             error_str = str(e)
@@ -256,7 +422,10 @@ class WhisperTranscriber:
                     "GPU sem memória suficiente, tentando fallback para CPU...")
                 cls.clear_gpu_memory()
                 # Tentar novamente em CPU
-                return cls.load_model(model_name, force_cpu=True)
+                return cls.load_model(model_name, force_cpu=True, engine=engine)
+            elif isinstance(e, ModelLoadTimeout):
+                logger.error(f"Timeout aguardando carregamento do modelo: {e}")
+                raise
             else:
                 logger.error(f"Erro ao carregar modelo Whisper: {e}")
                 raise RuntimeError(f"Falha ao carregar modelo: {str(e)}")
@@ -264,20 +433,109 @@ class WhisperTranscriber:
             logger.error(f"Erro ao carregar modelo Whisper: {e}")
             raise RuntimeError(f"Falha ao carregar modelo: {str(e)}")
 
+    @staticmethod
+    def _describe_audio(audio: Union[str, np.ndarray]) -> str:
+        """Descrição curta para logs (caminho ou duração das amostras em memória)"""
+        if isinstance(audio, np.ndarray):
+            return f"<memória: {len(audio) / 16000:.1f}s>"
+        return audio
+
+    @staticmethod
+    def has_postprocessing(language: str) -> bool:
+        """Idioma com pós-processamento de texto (hoje apenas português)"""
+        return language == 'pt'
+
+    @classmethod
+    def _segment_from_raw(
+        cls,
+        seg: Dict[str, Any],
+        language: str,
+        postprocess: bool = True
+    ) -> TranscriptionSegment:
+        """Converte segmento bruto da engine, com pós-processamento de português"""
+        text = seg['text'].strip()
+
+        # Aplicar pós-processamento de português se idioma é português
+        if postprocess and cls.has_postprocessing(language):
+            text = PortugueseBRTextProcessor.process(text)
+
+        return TranscriptionSegment(
+            start=seg['start'],
+            end=seg['end'],
+            text=text,
+            confidence=seg.get('no_speech_prob', None)
+        )
+
+    @classmethod
+    def _build_result(
+        cls,
+        result: Dict[str, Any],
+        language: str,
+        postprocess: bool = True
+    ) -> TranscriptionResult:
+        """
+        Converte resultado bruto da engine em TranscriptionResult
+
+        Aplica o pós-processamento de português quando o idioma é 'pt'
+        (postprocess=False mantém o texto do modelo, ver postprocess()).
+        """
+        # Processar segmentos
+        segments = [
+            cls._segment_from_raw(seg, language, postprocess)
+            for seg in result.get('segments', [])
+        ]
+
+        # Processar texto completo
+        full_text = result['text'].strip()
+        if postprocess and cls.has_postprocessing(language):
+            full_text = PortugueseBRTextProcessor.process(full_text)
+
+        return TranscriptionResult(
+            text=full_text,
+            segments=segments,
+            language=str(result.get('language', language)),
+            duration=result.get('duration', 0)
+        )
+
+    @classmethod
+    def postprocess(cls, transcription: TranscriptionResult, language: str) -> TranscriptionResult:
+        """
+        ✅ NOVO: Aplica o pós-processamento de português a uma transcrição bruta
+
+        Mesmo texto de _build_result com postprocess=True. O cache guarda a
+        saída bruta do modelo e deriva a versão servida com este método.
+        """
+        if not cls.has_postprocessing(language):
+            return transcription
+
+        return transcription.model_copy(update={
+            "text": PortugueseBRTextProcessor.process(transcription.text),
+            "segments": [
+                seg.model_copy(update={"text": PortugueseBRTextProcessor.process(seg.text)})
+                for seg in transcription.segments
+            ],
+        })
+
     @classmethod
     def transcribe(
         cls,
-        audio_path: str,
+        audio_path: Union[str, np.ndarray],
         language: Optional[str] = None,
-        model_name: Optional[str] = None
+        model_name: Optional[str] = None,
+        engine: Optional[str] = None,
+        force_cpu: bool = False,
+        postprocess: bool = True
     ) -> TranscriptionResult:
         """
         Transcreve arquivo de áudio com otimizações de GPU
 
         Args:
-            audio_path: Caminho do arquivo de áudio (WAV 16kHz)
+            audio_path: Caminho do arquivo de áudio (WAV 16kHz) ou amostras float32 16kHz
             language: Código do idioma (padrão: português brasileiro)
             model_name: Nome do modelo Whisper (opcional)
+            engine: Engine de inferência (openai, faster-whisper) - opcional
+            force_cpu: Forçar uso de CPU (usado no fallback de falta de memória)
+            postprocess: Aplicar pós-processamento de português (False = texto do modelo)
 
         Returns:
             TranscriptionResult: Resultado da transcrição
@@ -286,11 +544,13 @@ class WhisperTranscriber:
         if language is None:
             language = settings.WHISPER_LANGUAGE
 
-        model = cls.load_model(model_name)
-        device = str(next(model.parameters()).device)
+        inference_engine = get_engine(engine)
+        model = cls.load_model(model_name, force_cpu=force_cpu, engine=engine)
+        device = inference_engine.model_device(model)
 
         logger.info(
-            f"Transcrevendo áudio: {audio_path} (idioma: {language}, device: {device})")
+            f"Transcrevendo áudio: {cls._describe_audio(audio_path)} (idioma: {language}, device: {device}, "
+            f"engine: {inference_engine.name})")
         start_time = time.time()
 
         # Log memória antes da transcrição
@@ -299,35 +559,17 @@ class WhisperTranscriber:
             logger.debug(f"Memória GPU antes da transcrição: {memory_before}")
 
         try:
-            # Transcrever com Whisper
-            use_fp16 = "cuda" in device  # Usar FP16 apenas em GPU
-            result = model.transcribe(
-                audio_path,
-                language=language,
-                verbose=False,
-                fp16=use_fp16
-            )
-
-            # Processar segmentos
-            segments = []
-            for seg in result.get('segments', []):
-                text = seg['text'].strip()
-
-                # Aplicar pós-processamento de português se idioma é português
-                if language == 'pt':
-                    text = PortugueseBRTextProcessor.process(text)
+            # ✅ NOVO: Áudios curtos compartilham lote com requisições concorrentes
+            result = None
+            if MicroBatcher.accepts(inference_engine.name, audio_path):
+                result = get_micro_batcher().transcribe(model, audio_path, language)
 
-                segments.append(TranscriptionSegment(
-                    start=seg['start'],
-                    end=seg['end'],
-                    text=text,
-                    confidence=seg.get('no_speech_prob', None)
-                ))
+            # Transcrever com a engine selecionada (um por vez no modelo compartilhado)
+            if result is None:
+                with inference_lock(model):
+                    result = inference_engine.transcribe(model, audio_path, language)
 
-            # Processar texto completo
-            full_text = result['text'].strip()
-            if language == 'pt':
-                full_text = PortugueseBRTextProcessor.process(full_text)
+            transcription = cls._build_result(result, language, postprocess)
 
             transcription_time = time.time() - start_time
             logger.info(f"Transcrição concluída em {transcription_time:.2f}s")
@@ -338,23 +580,19 @@ class WhisperTranscriber:
                 logger.debug(f"Memória GPU após transcrição: {memory_after}")
                 cls.clear_gpu_memory()
 
-            return TranscriptionResult(
-                text=full_text,
-                segments=segments,
-                language=str(result.get('language', language)),
-                duration=result.get('duration', 0)
-            )
+            return transcription
 
         except RuntimeError as e:
             error_str = str(e)
 
             # Tratamento de erro de memória GPU
-            if "out of memory" in error_str.lower():
+            if "out of memory" in error_str.lower() and not force_cpu:
                 logger.error("GPU sem memória, tentando novamente com CPU...")
                 cls.clear_gpu_memory()
                 # Recarregar modelo em CPU e tentar novamente
-                model = cls.load_model(model_name, force_cpu=True)
-                return cls.transcribe(audio_path, language, model_name)
+                return cls.transcribe(
+                    audio_path, language, model_name, engine=engine, force_cpu=True,
+                    postprocess=postprocess)
 
             # Erro específico de tensor vazio do Whisper
             if "cannot reshape tensor of 0 elements" in error_str:
@@ -381,32 +619,176 @@ class WhisperTranscriber:
     @classmethod
     def transcribe_with_timing(
         cls,
-        audio_path: str,
+        audio_path: Union[str, np.ndarray],
         language: Optional[str] = None,
-        model_name: Optional[str] = None
+        model_name: Optional[str] = None,
+        engine: Optional[str] = None,
+        postprocess: bool = True
     ) -> tuple[TranscriptionResult, float]:
         """
         Transcreve arquivo de áudio e retorna o tempo gasto
 
         Args:
-            audio_path: Caminho do arquivo de áudio (WAV 16kHz)
+            audio_path: Caminho do arquivo de áudio (WAV 16kHz) ou amostras float32 16kHz
             language: Código do idioma (padrão: português brasileiro)
             model_name: Nome do modelo Whisper (opcional)
+            engine: Engine de inferência (opcional)
+            postprocess: Aplicar pós-processamento de português (False = texto do modelo)
 
         Returns:
             tuple: (TranscriptionResult, tempo_de_transcrição_em_segundos)
         """
         start_time = time.time()
-        result = cls.transcribe(audio_path, language, model_name)
+        result = cls.transcribe(
+            audio_path, language, model_name, engine=engine, postprocess=postprocess)
         elapsed_time = time.time() - start_time
         return result, elapsed_time
 
+    @classmethod
+    def stream_segments(
+        cls,
+        audio_path: Union[str, np.ndarray],
+        language: Optional[str] = None,
+        model_name: Optional[str] = None,
+        engine: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        ✅ NOVO: Transcreve áudio entregando cada segmento bruto assim que decodificado
+
+        Sem retry em CPU: segmentos já entregues ao cliente não podem ser
+        refeitos. O pós-processamento fica a cargo do chamador
+        (_segment_from_raw / _build_result).
+
+        Args:
+            audio_path: Caminho do arquivo de áudio (WAV 16kHz) ou amostras float32 16kHz
+            language: Código do idioma (padrão: português brasileiro)
+            model_name: Nome do modelo Whisper (opcional)
+            engine: Engine de inferência (opcional)
+
+        Yields:
+            Dict com start, end, text e no_speech_prob
+        """
+        if language is None:
+            language = settings.WHISPER_LANGUAGE
+
+        inference_engine = get_engine(engine)
+        model = cls.load_model(
+            model_name, force_cpu=cls.should_use_cpu_fallback(), engine=engine)
+        device = inference_engine.model_device(model)
+
+        logger.info(
+            f"Transcrevendo em streaming: {cls._describe_audio(audio_path)} (idioma: {language}, "
+            f"device: {device}, engine: {inference_engine.name})")
+
+        try:
+            yield from iterate_locked(
+                inference_engine.transcribe_stream(model, audio_path, language),
+                inference_lock(model)
+            )
+        finally:
+            if "cuda" in device:
+                cls.clear_gpu_memory()
+
+    @classmethod
+    def transcribe_long(
+        cls,
+        audio_path: Union[str, np.ndarray],
+        language: Optional[str] = None,
+        model_name: Optional[str] = None,
+        engine: Optional[str] = None,
+        workers: Optional[int] = None,
+        postprocess: bool = True
+    ) -> tuple[TranscriptionResult, float]:
+        """
+        ✅ NOVO: Transcreve áudio longo em trechos paralelos (cortes em silêncio)
+
+        Cai para a transcrição em chamada única se o WAV não estiver em
+        PCM 16kHz mono.
+
+        Args:
+            audio_path: Caminho do arquivo de áudio (WAV 16kHz) ou amostras float32 16kHz
+            language: Código do idioma (padrão: português brasileiro)
+            model_name: Nome do modelo Whisper (opcional)
+            engine: Engine de inferência (opcional)
+            workers: Número de processos em CPU (padrão: LONG_AUDIO_WORKERS)
+            postprocess: Aplicar pós-processamento de português (False = texto do modelo)
+
+        Returns:
+            tuple: (TranscriptionResult, tempo_de_transcrição_em_segundos)
+        """
+        if language is None:
+            language = settings.WHISPER_LANGUAGE
+
+        start_time = time.time()
+        force_cpu = cls.should_use_cpu_fallback()
+        result = LongAudioTranscriber.transcribe_raw(
+            audio_path,
+            language,
+            model_name=model_name,
+            engine=engine,
+            force_cpu=force_cpu,
+            workers=workers
+        )
+        if result is None:
+            logger.info("WAV fora do formato esperado para trechos, usando chamada única")
+            return cls.transcribe_with_timing(
+                audio_path, language, model_name, engine=engine, postprocess=postprocess)
+
+        transcription = cls._build_result(result, language, postprocess)
+        elapsed_time = time.time() - start_time
+        logger.info(
+            f"Áudio longo transcrito em {elapsed_time:.2f}s "
+            f"({len(transcription.segments)} segmentos)")
+        return transcription, elapsed_time
+
+
+class PreparedAudio:
+    """Áudio validado e convertido, pronto para transcrição"""
+
+    def __init__(self):
+        self.samples: Optional[np.ndarray] = None  # Amostras float32 16kHz em memória
+        self.path: Optional[str] = None  # WAV 16kHz quando não está em memória
+        self.temp_wav_path: Optional[str] = None  # Arquivo temporário a remover
+        self.audio_info: Optional[AudioInfo] = None
+        self.conversion_time: Optional[float] = None
+        self.error: Optional[str] = None
+
+    @property
+    def input(self) -> Union[str, np.ndarray]:
+        """Entrada para o modelo: amostras em memória ou caminho do WAV"""
+        return self.samples if self.samples is not None else self.path
+
+    @property
+    def duration(self) -> float:
+        """Duração do áudio preparado em segundos"""
+        if self.samples is not None:
+            return len(self.samples) / 16000
+        if self.audio_info:
+            return self.audio_info.duration
+        return 0.0
+
+    def cleanup(self) -> None:
+        """Remove o arquivo temporário, se houver"""
+        if self.temp_wav_path and os.path.exists(self.temp_wav_path):
+            try:
+                os.remove(self.temp_wav_path)
+                logger.info(
+                    f"Arquivo temporário removido: {self.temp_wav_path}")
+            except Exception as e:
+                logger.warning(f"Erro ao remover arquivo temporário: {e}")
+
 
 class TranscriptionService:
     """Serviço principal de transcrição - orquestra todo o processo"""
 
     @staticmethod
-    def generate_cache_key(file_path: str, model: Optional[str] = None, language: Optional[str] = None) -> str:
+    def generate_cache_key(
+        file_path: str,
+        model: Optional[str] = None,
+        language: Optional[str] = None,
+        engine: Optional[str] = None,
+        content_hash: Optional[str] = None
+    ) -> str:
         """
         Gera chave de cache baseada no hash do arquivo e parâmetros
 
@@ -414,19 +796,591 @@ class TranscriptionService:
             file_path: Caminho do arquivo
             model: Modelo usado
             language: Idioma usado
+            engine: Engine de inferência usada
+            content_hash: Hash do conteúdo calculado durante o upload (opcional)
 
         Returns:
             Chave de cache
         """
         cache_manager = get_cache_manager()
-        return cache_manager.generate_cache_key(file_path, model, language)
+        return cache_manager.generate_cache_key(
+            file_path, model, language, engine, content_hash=content_hash)
+
+    @staticmethod
+    def _save_to_cache(
+        cache_key: str,
+        result: TranscriptionResponse,
+        fingerprint_key: Optional[str] = None,
+        language: Optional[str] = None
+    ) -> None:
+        """
+        Salva resposta bem-sucedida no cache
+
+        Args:
+            cache_key: Chave de cache da requisição
+            result: Resposta a ser armazenada (com language: texto bruto do modelo)
+            fingerprint_key: Chave do fingerprint do PCM, indexada para cache_key
+            language: Idioma da requisição - o pós-processamento de texto é
+                aplicado na leitura (ver _cached_entry)
+        """
+        try:
+            cache_manager = get_cache_manager()
+            # ✅ NOVO: Resposta já serializada - hits não reconstroem objetos
+            cache_data = {
+                "success": result.success,
+                "processing_time": result.processing_time,
+                "body": result.model_dump_json(exclude=RESPONSE_BODY_PATCHED_FIELDS).encode('utf-8')
+            }
+            if language and WhisperTranscriber.has_postprocessing(language):
+                cache_data[POSTPROCESS_FIELD] = language
+                cache_data[RAW_KEY_FIELD] = cache_key
+            cache_manager.set(cache_key, cache_data)
+            if fingerprint_key:
+                cache_manager.add_alias(fingerprint_key, cache_key)
+            logger.info(
+                f"Resultado salvo no cache (chave: {cache_key[:16]}...)")
+        except Exception as e:
+            logger.warning(f"Erro ao salvar no cache: {e}")
+
+    @staticmethod
+    def _cached_body(cached_result: Dict[str, Any], processing_time: float) -> bytes:
+        """
+        Corpo JSON da resposta a partir da entrada do cache
+
+        A entrada guarda a resposta serializada sem `cached`/`processing_time`;
+        esses dois campos são prefixados ao objeto, sem parse nem pydantic.
+        """
+        body = cached_result.get("body")
+        if body is None:
+            # Entrada no formato antigo (dicionário) - serializar uma vez
+            body = json.dumps({
+                key: cached_result.get(key)
+                for key in ("success", "transcription", "timing_metrics", "audio_info", "error")
+            }, ensure_ascii=False, separators=(',', ':'))
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        prefix = f'{{"cached":true,"processing_time":{round(processing_time, 2)},'.encode()
+        return prefix + body[1:]
+
+    @staticmethod
+    def _postprocess_response(
+        response: TranscriptionResponse,
+        language: str
+    ) -> TranscriptionResponse:
+        """
+        ✅ NOVO: Resposta com o pós-processamento de texto aplicado à transcrição bruta
+
+        Args:
+            response: Resposta com o texto do modelo
+            language: Idioma da requisição
+
+        Returns:
+            Nova resposta (post_processing_time preenchido) ou a mesma, se o
+            idioma não tem pós-processamento
+        """
+        if response.transcription is None or not WhisperTranscriber.has_postprocessing(language):
+            return response
+
+        post_start = time.time()
+        update = {"transcription": WhisperTranscriber.postprocess(response.transcription, language)}
+        if response.timing_metrics is not None:
+            update["timing_metrics"] = response.timing_metrics.model_copy(
+                update={"post_processing_time": round(time.time() - post_start, 3)})
+        return response.model_copy(update=update)
+
+    @staticmethod
+    def _cached_entry(cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        ✅ NOVO: Entrada do cache com o texto na versão atual do pós-processamento
+
+        O cache guarda a transcrição bruta do modelo. A versão processada é
+        calculada no primeiro hit e memorizada sob uma chave derivada da
+        versão do processador (PortugueseBRTextProcessor.version): mudar as
+        regras ou PORTUGUESE_BR_CONFIG refaz só o processamento de texto.
+        Entradas sem a marca (outros idiomas, formato antigo) são servidas
+        como estão.
+        """
+        cache_manager = get_cache_manager()
+        cached_result = cache_manager.get(cache_key)
+        language = cached_result.get(POSTPROCESS_FIELD) if cached_result else None
+        if not language:
+            return cached_result
+
+        view_key = cache_manager.generate_view_key(
+            cached_result.get(RAW_KEY_FIELD, cache_key),
+            f"{language}:{PortugueseBRTextProcessor.version()}")
+        view = cache_manager.get(view_key, track_stats=False)
+        if view:
+            return view
+
+        view_start = time.time()
+        raw_response = TranscriptionResponse.model_validate_json(
+            TranscriptionService._cached_body(cached_result, cached_result["processing_time"]))
+        response = TranscriptionService._postprocess_response(raw_response, language)
+        view = {
+            "success": response.success,
+            # Custo de recalcular: a versão processada sai antes da bruta na evicção
+            "processing_time": time.time() - view_start,
+            "body": response.model_dump_json(exclude=RESPONSE_BODY_PATCHED_FIELDS).encode('utf-8')
+        }
+        cache_manager.set(view_key, view)
+        logger.info(
+            f"Pós-processamento aplicado ao resultado em cache (chave: {cache_key[:16]}...)")
+        return view
+
+    @staticmethod
+    def get_cached_response_body(cache_key: str, start_time: float) -> Optional[bytes]:
+        """
+        ✅ NOVO: Hit do cache como bytes prontos para a resposta HTTP
+
+        Args:
+            cache_key: Chave de cache da requisição
+            start_time: Início da requisição (para processing_time)
+
+        Returns:
+            JSON da TranscriptionResponse (cached=True) ou None se não houver
+            entrada bem-sucedida
+        """
+        cached_result = TranscriptionService._cached_entry(cache_key)
+        if not cached_result or not cached_result.get("success"):
+            return None
+
+        logger.info(
+            f"Usando resultado do cache (chave: {cache_key[:16]}...)")
+        return TranscriptionService._cached_body(cached_result, time.time() - start_time)
+
+    @staticmethod
+    def _get_cached_response(cache_key: str, start_time: float) -> Optional[TranscriptionResponse]:
+        """
+        Reconstrói resposta a partir do cache
+
+        Usado onde o resultado precisa dos objetos (streaming, fingerprint,
+        workers); a rota HTTP síncrona usa get_cached_response_body.
+
+        Args:
+            cache_key: Chave de cache da requisição
+            start_time: Início da requisição (para processing_time)
+
+        Returns:
+            TranscriptionResponse com cached=True ou None se não houver entrada
+        """
+        cached_result = TranscriptionService._cached_entry(cache_key)
+        if not cached_result:
+            return None
+
+        logger.info(
+            f"Usando resultado do cache (chave: {cache_key[:16]}...)")
+        processing_time = time.time() - start_time
+
+        # Validação direto do JSON (pydantic-core), sem montar segmento por segmento
+        return TranscriptionResponse.model_validate_json(
+            TranscriptionService._cached_body(cached_result, processing_time))
+
+    @staticmethod
+    def _join_in_flight(
+        cache_key: str,
+        start_time: float
+    ) -> Tuple[Optional[Lease], Optional[TranscriptionResponse]]:
+        """
+        ✅ NOVO: Single-flight - requisições idênticas simultâneas calculam uma vez
+
+        Returns:
+            (lease, None) se esta requisição deve transcrever (liberar o lease
+            ao final); (None, resposta) se outra requisição já transcreveu;
+            (None, None) para transcrever sem coordenação
+        """
+        flight = get_single_flight()
+        if flight is None:
+            return None, None
+
+        try:
+            # Quem calculava pode falhar sem gravar no cache: tentar assumir
+            for _ in range(3):
+                lease = flight.acquire(cache_key)
+                if lease is not None:
+                    return lease, None
+
+                logger.info(
+                    f"⏳ Transcrição idêntica em andamento, aguardando (chave: {cache_key[:16]}...)")
+                if not flight.wait(cache_key):
+                    logger.warning(
+                        f"Espera esgotada ({flight.wait_seconds:.0f}s) - transcrevendo sem coordenação")
+                    return None, None
+
+                cached_response = TranscriptionService._get_cached_response(cache_key, start_time)
+                if cached_response:
+                    return None, cached_response
+        except Exception as e:
+            logger.warning(f"Erro no single-flight: {e}")
+
+        return None, None
+
+    @staticmethod
+    def _ensure_content_hash(
+        file_path: str,
+        content_hash: Optional[str],
+        use_cache: bool
+    ) -> Optional[str]:
+        """
+        ✅ NOVO: Hash do arquivo, calculado uma vez por requisição
+
+        Chave do cache de transcrições, do cache de artefatos (ffprobe e
+        áudio convertido) e do cache negativo. Uploads já chegam com o hash
+        calculado.
+        """
+        if content_hash is not None:
+            return content_hash
+        if not ((use_cache and settings.ENABLE_CACHE) or settings.ENABLE_ARTIFACT_CACHE
+                or settings.ENABLE_NEGATIVE_CACHE):
+            return None
+        try:
+            return hash_file(file_path)
+        except OSError as e:
+            logger.warning(f"Erro ao calcular hash do arquivo: {e}")
+            return None
+
+    @staticmethod
+    def get_invalid_media_response(
+        content_hash: Optional[str],
+        start_time: float
+    ) -> Optional[TranscriptionResponse]:
+        """
+        ✅ NOVO: Recusa conteúdo já rejeitado (cache negativo)
+
+        Arquivos corrompidos, sem faixa de áudio ou com decodificação vazia
+        ficam registrados pelo hash; o reenvio falha sem ffprobe, conversão
+        remota nem fila.
+
+        Returns:
+            TranscriptionResponse de erro ou None se o conteúdo não foi recusado
+        """
+        error = get_cache_manager().get_invalid_media(content_hash)
+        if error is None:
+            return None
+
+        logger.info(f"⛔ Conteúdo já recusado ({content_hash[:16]}...): {error}")
+        return TranscriptionResponse(
+            success=False,
+            transcription=None,
+            processing_time=time.time() - start_time,
+            timing_metrics=None,
+            audio_info=None,
+            error=error
+        )
+
+    @staticmethod
+    def _fingerprint_key(
+        prepared: PreparedAudio,
+        model: Optional[str],
+        language: Optional[str],
+        engine: Optional[str]
+    ) -> Optional[str]:
+        """
+        ✅ NOVO: Chave secundária a partir do PCM decodificado
+
+        Returns:
+            Chave do fingerprint ou None (desabilitado ou áudio fora da memória)
+        """
+        if not settings.ENABLE_PCM_FINGERPRINT or prepared.samples is None:
+            return None
+        try:
+            return get_cache_manager().generate_fingerprint_key(
+                hash_pcm(prepared.samples), model, language, engine)
+        except Exception as e:
+            logger.warning(f"Erro ao calcular fingerprint do áudio: {e}")
+            return None
+
+    @staticmethod
+    def _get_fingerprint_response(
+        fingerprint_key: str,
+        cache_key: Optional[str],
+        prepared: PreparedAudio,
+        start_time: float
+    ) -> Optional[TranscriptionResponse]:
+        """
+        ✅ NOVO: Busca pelo fingerprint - mesmo áudio já transcrito em outro container
+
+        No hit, a chave de conteúdo deste arquivo passa a apontar para o
+        mesmo resultado (próximos envios não precisam converter o áudio).
+        """
+        try:
+            cached_response = TranscriptionService._get_cached_response(
+                fingerprint_key, start_time)
+            if not cached_response:
+                return None
+
+            logger.info(
+                f"Áudio equivalente já transcrito (fingerprint: {fingerprint_key[:16]}...)")
+            if cache_key:
+                get_cache_manager().add_alias(cache_key, fingerprint_key)
+            if prepared.audio_info:
+                # Informações do arquivo recebido, não do original
+                cached_response = cached_response.model_copy(
+                    update={"audio_info": prepared.audio_info})
+            return cached_response
+        except Exception as e:
+            logger.warning(f"Erro ao verificar cache por fingerprint: {e}")
+            return None
+
+    @staticmethod
+    def prepare_audio(file_path: str, source_hash: Optional[str] = None) -> PreparedAudio:
+        """
+        Valida, converte e decodifica o arquivo para transcrição
+
+        Vídeos têm o áudio extraído; áudios fora de WAV passam pela conversão
+        remota. Com ENABLE_IN_MEMORY_DECODE (ou quando early-exit/VAD/fingerprint
+        precisam das amostras), o áudio final fica em memória. Com source_hash,
+        ffprobe e conversão já feitos para o arquivo vêm do cache de artefatos.
+
+        Args:
+            file_path: Caminho do arquivo de áudio ou vídeo
+            source_hash: Hash do conteúdo do arquivo (cache de artefatos)
+
+        Returns:
+            PreparedAudio: Áudio pronto ou com `error` preenchido
+        """
+        prepared = PreparedAudio()
+        extension = Path(file_path).suffix.lstrip('.').lower()
+        # Conversão remota pode falhar por rede: áudio vazio só é marcado como
+        # inválido (cache negativo) quando toda a decodificação foi local
+        remote_converted = False
+
+        # Detectar se é vídeo
+        is_video = extension in settings.SUPPORTED_VIDEO_FORMATS
+
+        if is_video:
+            logger.info(f"Arquivo de vídeo detectado: {extension}")
+
+            # Validar vídeo
+            is_valid, error_msg = VideoProcessor.validate_video_file(
+                file_path, source_hash)
+            if not is_valid:
+                prepared.error = error_msg or "Arquivo de vídeo inválido"
+                return prepared
+
+            # Obter informações do vídeo
+            video_info = VideoProcessor.get_video_info(file_path, source_hash)
+            logger.info(f"Informações do vídeo: {video_info}")
+
+            video_duration = 0
+            if video_info and isinstance(video_info, dict):
+                video_duration = video_info.get('duration', 0)
+
+            time_conversion_start = time.time()
+            if settings.ENABLE_IN_MEMORY_DECODE:
+                # ✅ NOVO: Extrair direto para memória (sem WAV temporário)
+                success, result_msg = VideoProcessor.extract_audio_array(
+                    file_path,
+                    timeout=1800,  # 30 minutos max
+                    expected_duration=video_duration,
+                    source_hash=source_hash
+                )
+                if success:
+                    prepared.samples = result_msg
+            else:
+                # Extrair áudio do vídeo
+                prepared.temp_wav_path = os.path.join(
+                    settings.TEMP_AUDIO_DIR,
+                    f"video_extract_{uuid.uuid4().hex}.wav"
+                )
+
+                # Usar timeout adaptativo baseado no tamanho do arquivo
+                success, result_msg = VideoProcessor.extract_audio(
+                    file_path,
+                    prepared.temp_wav_path,
+                    timeout=1800,  # 30 minutos max
+                    source_hash=source_hash
+                )
+                prepared.path = prepared.temp_wav_path
+            prepared.conversion_time = time.time() - time_conversion_start
+
+            if not success:
+                prepared.error = f"Erro ao extrair áudio: {result_msg}"
+                return prepared
+
+            # Criar AudioInfo a partir do vídeo
+            prepared.audio_info = AudioInfo(
+                format=extension,
+                duration=float(video_duration),
+                sample_rate=16000,
+                channels=1,
+                file_size_mb=os.path.getsize(file_path) / (1024 * 1024)
+            )
+        else:
+            # Arquivo de áudio padrão
+            # Validar arquivo
+            is_valid, error_msg = AudioProcessor.validate_audio_file(
+                file_path, source_hash)
+            if not is_valid:
+                prepared.error = str(error_msg) if error_msg else "Arquivo de áudio inválido"
+                return prepared
+
+            # Obter informações do áudio original
+            audio_info_dict = AudioProcessor.get_audio_info(file_path, source_hash)
+            prepared.audio_info = AudioInfo(**audio_info_dict) if audio_info_dict else None
+            expected_duration = prepared.audio_info.duration if prepared.audio_info else None
+
+            # Converter para WAV se necessário
+            if extension != 'wav':
+                temp_wav_path = os.path.join(
+                    settings.TEMP_AUDIO_DIR,
+                    f"temp_{uuid.uuid4().hex}.wav"
+                )
+
+                time_conversion_start = time.time()
+                if extension == 'mp4' and settings.ENABLE_IN_MEMORY_DECODE:
+                    # Extrair áudio do mp4 direto para memória
+                    success, result_msg = VideoProcessor.extract_audio_array(
+                        file_path,
+                        expected_duration=expected_duration,
+                        source_hash=source_hash
+                    )
+                    if not success:
+                        raise ValueError(f"Falha na extração de áudio: {result_msg}")
+                    prepared.samples = result_msg
+                elif extension == 'mp4':
+                    # Extrair áudio de vídeo (arquivo mp4 tratado como áudio)
+                    prepared.temp_wav_path = temp_wav_path
+                    AudioProcessor.extract_audio_from_video(
+                        file_path, temp_wav_path, source_hash)
+                    prepared.path = temp_wav_path
+                else:
+                    # Converter formato de áudio (REMOTA OBRIGATÓRIA)
+                    remote_converted = True
+                    prepared.temp_wav_path = temp_wav_path
+                    converted_path = AudioProcessor.convert_to_wav(
+                        file_path, temp_wav_path, source_hash)
+
+                    # ❌ CRÍTICO: Validar se conversão remota funcionou
+                    if not converted_path or not os.path.exists(converted_path):
+                        logger.error(
+                            f"❌ Falha na conversão remota - arquivo não existe: {converted_path}"
+                        )
+                        prepared.error = "Falha na conversão remota de áudio. Verifique: 1) Máquina remota (192.168.1.33) online, 2) API em 192.168.1.33:8591 respondendo, 3) FFmpeg instalado na máquina remota"
+                        return prepared
+
+                    if converted_path != file_path:
+                        prepared.temp_wav_path = converted_path
+                    prepared.path = converted_path
+                prepared.conversion_time = time.time() - time_conversion_start
+            else:
+                prepared.path = file_path
+
+        # ✅ NOVO: Decodificar WAV para memória - o modelo recebe o array e
+        # não roda uma segunda decodificação com ffmpeg. Early-exit e VAD
+        # também precisam das amostras.
+        needs_samples = (
+            settings.ENABLE_IN_MEMORY_DECODE
+            or settings.ENABLE_SILENCE_EARLY_EXIT
+            or settings.ENABLE_VAD
+            or (settings.ENABLE_CACHE and settings.ENABLE_PCM_FINGERPRINT)
+        )
+        if prepared.samples is None and needs_samples and \
+                prepared.path and os.path.exists(prepared.path):
+            prepared.samples = AudioProcessor.decode_to_array(
+                prepared.path,
+                expected_duration=prepared.audio_info.duration if prepared.audio_info else None
+            )
+
+        if prepared.samples is not None:
+            if len(prepared.samples) < 500:  # Equivalente ao mínimo de 1KB do WAV
+                logger.error(
+                    f"Áudio decodificado muito curto ({len(prepared.samples)} amostras) - provavelmente vazio ou corrompido")
+                prepared.error = "Arquivo de áudio inválido ou vazio. Pode ser que o arquivo não tenha faixa de áudio ou esteja corrompido."
+                if not remote_converted:
+                    get_cache_manager().mark_invalid_media(source_hash, prepared.error)
+            return prepared
+
+        # Validar que o arquivo WAV tem conteúdo válido antes de transcrever
+        if not prepared.path or not os.path.exists(prepared.path):
+            logger.error(f"❌ Arquivo de transcrição não existe: {prepared.path}")
+            prepared.error = f"Arquivo de áudio não encontrado: {prepared.path}"
+            return prepared
+
+        wav_file_size = os.path.getsize(prepared.path)
+        if wav_file_size < 1000:  # Mínimo de 1KB
+            logger.error(
+                f"Arquivo WAV muito pequeno ({wav_file_size} bytes) - provavelmente vazio ou corrompido")
+            prepared.error = f"Arquivo de áudio inválido ou vazio ({wav_file_size} bytes). Pode ser que o arquivo não tenha faixa de áudio ou esteja corrompido."
+            if not remote_converted:
+                get_cache_manager().mark_invalid_media(source_hash, prepared.error)
+
+        return prepared
+
+    @staticmethod
+    def _silent_response(
+        prepared: PreparedAudio,
+        language: str,
+        start_time: float
+    ) -> TranscriptionResponse:
+        """Resposta de sucesso com transcrição vazia para áudio sem fala"""
+        duration = prepared.duration
+        processing_time = time.time() - start_time
+        logger.info(f"⏩ Áudio sem fala ({duration:.1f}s) - pulando transcrição")
+
+        return TranscriptionResponse(
+            success=True,
+            transcription=TranscriptionResult(
+                text="",
+                segments=[],
+                language=language,
+                duration=duration
+            ),
+            processing_time=round(processing_time, 2),
+            timing_metrics=TimingMetrics(
+                conversion_time=round(prepared.conversion_time, 2) if prepared.conversion_time else None,
+                transcription_time=0.0,
+                total_time=round(processing_time, 2),
+                skipped_audio_seconds=round(duration, 2),
+                skipped_audio_percent=100.0
+            ),
+            audio_info=prepared.audio_info,
+            error=None
+        )
+
+    @staticmethod
+    def _build_timing_metrics(
+        prepared: PreparedAudio,
+        transcription_time: float,
+        processing_time: float,
+        vad_time: Optional[float],
+        skipped_audio: Optional[float]
+    ) -> TimingMetrics:
+        """Monta e registra as métricas de timing da requisição"""
+        duration = prepared.duration
+        timing_metrics = TimingMetrics(
+            conversion_time=round(prepared.conversion_time, 2) if prepared.conversion_time else None,
+            model_load_time=None,  # Será capturado internamente pelo WhisperTranscriber
+            transcription_time=round(transcription_time, 2),
+            post_processing_time=None,  # Preenchido em _postprocess_response
+            total_time=round(processing_time, 2),
+            vad_time=round(vad_time, 2) if vad_time is not None else None,
+            skipped_audio_seconds=round(skipped_audio, 2) if skipped_audio is not None else None,
+            skipped_audio_percent=round(
+                skipped_audio / duration * 100, 1
+            ) if skipped_audio is not None and duration else None
+        )
+
+        # Log detalhado das métricas
+        if timing_metrics.conversion_time:
+            logger.info(f"⏱️ Tempo de conversão: {timing_metrics.conversion_time:.2f}s")
+        logger.info(f"⏱️ Tempo de transcrição: {timing_metrics.transcription_time:.2f}s")
+        if timing_metrics.skipped_audio_seconds:
+            logger.info(
+                f"⏱️ Áudio sem fala descartado: {timing_metrics.skipped_audio_seconds:.1f}s "
+                f"({timing_metrics.skipped_audio_percent:.1f}%)")
+        logger.info(f"⏱️ Tempo total: {timing_metrics.total_time:.2f}s")
+
+        return timing_metrics
 
     @staticmethod
     def process_audio_file(
         file_path: str,
         language: Optional[str] = None,
         model: Optional[str] = None,
-        use_cache: bool = True
+        use_cache: bool = True,
+        engine: Optional[str] = None,
+        content_hash: Optional[str] = None
     ) -> TranscriptionResponse:
         """
         Processa arquivo de áudio ou vídeo completo com cache inteligente e métricas de timing
@@ -436,6 +1390,8 @@ class TranscriptionService:
             language: Idioma para transcrição (padrão: português brasileiro)
             model: Modelo Whisper a usar
             use_cache: Se True, usa cache quando disponível
+            engine: Engine de inferência (openai, faster-whisper) - opcional
+            content_hash: Hash do conteúdo calculado durante o upload (evita reler o arquivo)
 
         Returns:
             TranscriptionResponse: Resposta completa da transcrição com timing metrics
@@ -445,269 +1401,123 @@ class TranscriptionService:
             language = settings.WHISPER_LANGUAGE
 
         start_time = time.time()
-        temp_wav_path = None
-        extension = Path(file_path).suffix.lstrip('.').lower()
-        
-        # Variáveis para tracking de timing
-        time_conversion_start = None
-        time_conversion_end = None
-        time_model_load_start = None
-        time_model_load_end = None
-        time_transcription_start = None
-        time_transcription_end = None
-        time_post_processing_start = None
-        time_post_processing_end = None
+        prepared = None
+        content_hash = TranscriptionService._ensure_content_hash(file_path, content_hash, use_cache)
+
+        # ✅ NOVO: Conteúdo já recusado (corrompido, sem áudio) - sem ffprobe nem conversão
+        invalid_response = TranscriptionService.get_invalid_media_response(content_hash, start_time)
+        if invalid_response:
+            return invalid_response
 
         # Verificar cache se habilitado
         cache_key = None
         if use_cache and settings.ENABLE_CACHE:
             try:
-                cache_manager = get_cache_manager()
-                cache_key = cache_manager.generate_cache_key(
-                    file_path, model, language)
-                cached_result = cache_manager.get(cache_key)
-
-                if cached_result:
-                    logger.info(
-                        f"Usando resultado do cache (chave: {cache_key[:16]}...)")
-                    processing_time = time.time() - start_time
-
-                    # Converter dados cacheados de volta para objetos
-                    transcription_dict = cached_result.get("transcription")
-                    audio_info_dict = cached_result.get("audio_info")
-
-                    # Reconstruir objetos
-                    if transcription_dict:
-                        segments = [
-                            TranscriptionSegment(**seg)
-                            for seg in transcription_dict.get("segments", [])
-                        ]
-                        transcription = TranscriptionResult(
-                            text=transcription_dict["text"],
-                            segments=segments,
-                            language=transcription_dict["language"],
-                            duration=transcription_dict["duration"]
-                        )
-                    else:
-                        transcription = None
-
-                    audio_info = AudioInfo(
-                        **audio_info_dict) if audio_info_dict else None
-
-                    return TranscriptionResponse(
-                        success=cached_result.get("success", True),
-                        transcription=transcription,
-                        processing_time=round(processing_time, 2),
-                        timing_metrics=cached_result.get("timing_metrics"),
-                        audio_info=audio_info,
-                        error=cached_result.get("error"),
-                        cached=True
-                    )
+                cache_key = TranscriptionService.generate_cache_key(
+                    file_path, model, language, engine, content_hash=content_hash)
+                cached_response = TranscriptionService._get_cached_response(
+                    cache_key, start_time)
+                if cached_response:
+                    return cached_response
             except Exception as e:
                 logger.warning(f"Erro ao verificar cache: {e}")
                 # Continuar sem cache em caso de erro
 
-        try:
-            # Detectar se é vídeo
-            is_video = extension in settings.SUPPORTED_VIDEO_FORMATS
-
-            if is_video:
-                logger.info(f"Arquivo de vídeo detectado: {extension}")
-
-                # Validar vídeo
-                is_valid, error_msg = VideoProcessor.validate_video_file(
-                    file_path)
-                if not is_valid:
-                    return TranscriptionResponse(
-                        success=False,
-                        transcription=None,
-                        processing_time=time.time() - start_time,
-                        timing_metrics=None,
-                        audio_info=None,
-                        error=error_msg or "Arquivo de vídeo inválido"
-                    )
-
-                # Obter informações do vídeo
-                video_info = VideoProcessor.get_video_info(file_path)
-                logger.info(f"Informações do vídeo: {video_info}")
-
-                # Extrair áudio do vídeo
-                temp_wav_path = os.path.join(
-                    settings.TEMP_AUDIO_DIR,
-                    f"video_extract_{int(time.time())}_{os.getpid()}.wav"
-                )
-
-                # Usar timeout adaptativo baseado no tamanho do arquivo
-                time_conversion_start = time.time()
-                success, result_msg = VideoProcessor.extract_audio(
-                    file_path,
-                    temp_wav_path,
-                    timeout=1800  # 30 minutos max
-                )
-                time_conversion_end = time.time()
-
-                if not success:
-                    return TranscriptionResponse(
-                        success=False,
-                        transcription=None,
-                        processing_time=time.time() - start_time,
-                        timing_metrics=None,
-                        audio_info=None,
-                        error=f"Erro ao extrair áudio: {result_msg}"
-                    )
-
-                transcribe_path = temp_wav_path
-
-                # Criar AudioInfo a partir do vídeo
-                video_duration = 0
-                if video_info and isinstance(video_info, dict):
-                    video_duration = video_info.get('duration', 0)
-
-                audio_info = AudioInfo(
-                    format=extension,
-                    duration=float(video_duration),
-                    sample_rate=16000,
-                    channels=1,
-                    file_size_mb=os.path.getsize(file_path) / (1024 * 1024)
-                )
-            else:
-                # Arquivo de áudio padrão
-                # Validar arquivo
-                is_valid, error_msg = AudioProcessor.validate_audio_file(
-                    file_path)
-                if not is_valid:
-                    return TranscriptionResponse(
-                        success=False,
-                        transcription=None,
-                        processing_time=time.time() - start_time,
-                        timing_metrics=None,
-                        audio_info=None,
-                        error=str(error_msg) if error_msg else "Arquivo de áudio inválido"
-                    )
-
-                # Obter informações do áudio original
-                audio_info_dict = AudioProcessor.get_audio_info(file_path)
-                audio_info = AudioInfo(**audio_info_dict) if audio_info_dict else None
+        # ✅ NOVO: Mesma chave já em processamento (outra requisição/processo)
+        lease = None
+        if cache_key:
+            lease, cached_response = TranscriptionService._join_in_flight(cache_key, start_time)
+            if cached_response:
+                return cached_response
 
-                # Converter para WAV se necessário
-                if extension != 'wav':
-                    temp_wav_path = os.path.join(
-                        settings.TEMP_AUDIO_DIR,
-                        f"temp_{int(time.time())}_{os.getpid()}.wav"
-                    )
-
-                    if extension == 'mp4':
-                        # Extrair áudio de vídeo (arquivo mp4 tratado como áudio)
-                        time_conversion_start = time.time()
-                        AudioProcessor.extract_audio_from_video(
-                            file_path, temp_wav_path)
-                        time_conversion_end = time.time()
-                    else:
-                        # Converter formato de áudio (REMOTA OBRIGATÓRIA)
-                        time_conversion_start = time.time()
-                        converted_path = AudioProcessor.convert_to_wav(file_path, temp_wav_path)
-                        time_conversion_end = time.time()
-                        
-                        # ❌ CRÍTICO: Validar se conversão remota funcionou
-                        if not converted_path or not os.path.exists(converted_path):
-                            logger.error(
-                                f"❌ Falha na conversão remota - arquivo não existe: {converted_path}"
-                            )
-                            return TranscriptionResponse(
-                                success=False,
-                                transcription=None,
-                                processing_time=time.time() - start_time,
-                                timing_metrics=None,
-                                audio_info=None,
-                                error="Falha na conversão remota de áudio. Verifique: 1) Máquina remota (192.168.1.33) online, 2) API em 192.168.1.33:8591 respondendo, 3) FFmpeg instalado na máquina remota"
-                            )
-                        
-                        temp_wav_path = converted_path
-
-                    transcribe_path = temp_wav_path
-                else:
-                    transcribe_path = file_path
-
-            # Validar que o arquivo WAV tem conteúdo válido antes de transcrever
-            if not transcribe_path or not os.path.exists(transcribe_path):
-                logger.error(f"❌ Arquivo de transcrição não existe: {transcribe_path}")
+        try:
+            prepared = TranscriptionService.prepare_audio(file_path, content_hash)
+            if prepared.error:
                 return TranscriptionResponse(
                     success=False,
                     transcription=None,
                     processing_time=time.time() - start_time,
                     timing_metrics=None,
                     audio_info=None,
-                    error=f"Arquivo de áudio não encontrado: {transcribe_path}"
+                    error=prepared.error
                 )
-            
-            wav_file_size = os.path.getsize(transcribe_path)
-            if wav_file_size < 1000:  # Mínimo de 1KB
-                logger.error(
-                    f"Arquivo WAV muito pequeno ({wav_file_size} bytes) - provavelmente vazio ou corrompido")
-                return TranscriptionResponse(
-                    success=False,
-                    transcription=None,
-                    processing_time=time.time() - start_time,
-                    timing_metrics=None,
-                    audio_info=None,
-                    error=f"Arquivo de áudio inválido ou vazio ({wav_file_size} bytes). Pode ser que o arquivo não tenha faixa de áudio ou esteja corrompido."
+
+            # ✅ NOVO: Mesmo áudio em outro container (reencaminhado, remuxado)
+            fingerprint_key = None
+            if use_cache and settings.ENABLE_CACHE:
+                fingerprint_key = TranscriptionService._fingerprint_key(
+                    prepared, model, language, engine)
+                if fingerprint_key:
+                    cached_response = TranscriptionService._get_fingerprint_response(
+                        fingerprint_key, cache_key, prepared, start_time)
+                    if cached_response:
+                        return cached_response
+
+            # ✅ NOVO: Early-exit - áudio silencioso retorna transcrição vazia
+            # sem carregar o modelo
+            if settings.ENABLE_SILENCE_EARLY_EXIT and prepared.samples is not None \
+                    and is_silent(prepared.samples):
+                result = TranscriptionService._silent_response(prepared, language, start_time)
+                if use_cache and settings.ENABLE_CACHE and cache_key:
+                    TranscriptionService._save_to_cache(cache_key, result, fingerprint_key)
+                return result
+
+            # ✅ NOVO: Pré-filtro VAD - enviar apenas as regiões de fala ao modelo
+            transcribe_input = prepared.input
+            vad_time_map = None
+            vad_time = None
+            skipped_audio = None
+            if settings.ENABLE_VAD and prepared.samples is not None:
+                vad_start = time.time()
+                transcribe_input, vad_time_map, skipped_audio = filter_speech(prepared.samples)
+                vad_time = time.time() - vad_start
+
+            # Transcrever com timing (texto bruto do modelo: o cache guarda a
+            # saída da inferência e o pós-processamento é aplicado depois)
+            if LongAudioTranscriber.should_chunk(transcribe_input):
+                # ✅ NOVO: Áudio longo - trechos em paralelo no pool de processos
+                transcription, transcription_time = WhisperTranscriber.transcribe_long(
+                    transcribe_input,
+                    language=language,
+                    model_name=model,
+                    engine=engine,
+                    postprocess=False
+                )
+            else:
+                transcription, transcription_time = WhisperTranscriber.transcribe_with_timing(
+                    transcribe_input,
+                    language=language,
+                    model_name=model,
+                    engine=engine,
+                    postprocess=False
                 )
 
-            # Transcrever com timing
-            time_transcription_start = time.time()
-            transcription, transcription_time = WhisperTranscriber.transcribe_with_timing(
-                transcribe_path,
-                language=language,
-                model_name=model
-            )
-            time_transcription_end = time.time()
+            # Timestamps relativos ao arquivo original
+            if vad_time_map is not None:
+                transcription = vad_time_map.remap_result(transcription, prepared.duration)
 
             processing_time = time.time() - start_time
 
             # Montar métricas de timing
-            timing_metrics = TimingMetrics(
-                conversion_time=round(time_conversion_end - time_conversion_start, 2) if (time_conversion_start and time_conversion_end) else None,
-                model_load_time=None,  # Será capturado internamente pelo WhisperTranscriber
-                transcription_time=round(transcription_time, 2),
-                post_processing_time=None,  # Incluído no transcription_time
-                total_time=round(processing_time, 2)
+            timing_metrics = TranscriptionService._build_timing_metrics(
+                prepared, transcription_time, processing_time, vad_time, skipped_audio
             )
 
-            # Log detalhado das métricas
-            if timing_metrics.conversion_time:
-                logger.info(f"⏱️ Tempo de conversão: {timing_metrics.conversion_time:.2f}s")
-            logger.info(f"⏱️ Tempo de transcrição: {timing_metrics.transcription_time:.2f}s")
-            logger.info(f"⏱️ Tempo total: {timing_metrics.total_time:.2f}s")
-
             result = TranscriptionResponse(
                 success=True,
                 transcription=transcription,
                 processing_time=round(processing_time, 2),
                 timing_metrics=timing_metrics,
-                audio_info=audio_info,
+                audio_info=prepared.audio_info,
                 error=None
             )
 
             # Salvar no cache se habilitado
             if use_cache and settings.ENABLE_CACHE and cache_key:
-                try:
-                    cache_manager = get_cache_manager()
-                    # Converter para dicionário para serialização
-                    cache_data = {
-                        "success": result.success,
-                        "transcription": transcription.model_dump() if transcription else None,
-                        "audio_info": audio_info.model_dump() if audio_info else None,
-                        "timing_metrics": timing_metrics.model_dump() if timing_metrics else None,
-                        "processing_time": result.processing_time,
-                        "error": result.error
-                    }
-                    cache_manager.set(cache_key, cache_data)
-                    logger.info(
-                        f"Resultado salvo no cache (chave: {cache_key[:16]}...)")
-                except Exception as e:
-                    logger.warning(f"Erro ao salvar no cache: {e}")
-
-            return result
+                TranscriptionService._save_to_cache(
+                    cache_key, result, fingerprint_key, language)
+
+            return TranscriptionService._postprocess_response(result, language)
 
         except Exception as e:
             logger.error(f"Erro no processamento: {e}", exc_info=True)
@@ -721,14 +1531,181 @@ class TranscriptionService:
             )
 
         finally:
+            # Resultado já está no cache: liberar quem está esperando
+            if lease is not None:
+                lease.release()
+
             # Limpar memória GPU para evitar vazamento de memória
             WhisperTranscriber.clear_gpu_memory()
 
             # Limpar arquivo temporário
-            if temp_wav_path and os.path.exists(temp_wav_path):
-                try:
-                    os.remove(temp_wav_path)
-                    logger.info(
-                        f"Arquivo temporário removido: {temp_wav_path}")
-                except Exception as e:
-                    logger.warning(f"Erro ao remover arquivo temporário: {e}")
+            if prepared is not None:
+                prepared.cleanup()
+
+    @staticmethod
+    def stream_audio_file(
+        file_path: str,
+        language: Optional[str] = None,
+        model: Optional[str] = None,
+        use_cache: bool = True,
+        engine: Optional[str] = None,
+        content_hash: Optional[str] = None
+    ) -> Iterator[tuple[str, Dict[str, Any]]]:
+        """
+        ✅ NOVO: Processa arquivo entregando eventos incrementais
+
+        Mesmo pipeline de process_audio_file (cache, conversão, early-exit,
+        VAD), mas cada segmento é entregue assim que decodificado e
+        pós-processado. O resultado completo é salvo no cache ao final.
+
+        Args:
+            file_path: Caminho do arquivo de áudio ou vídeo
+            language: Idioma para transcrição (padrão: português brasileiro)
+            model: Modelo Whisper a usar
+            use_cache: Se True, usa cache quando disponível
+            engine: Engine de inferência (openai, faster-whisper) - opcional
+            content_hash: Hash do conteúdo calculado durante o upload (evita reler o arquivo)
+
+        Yields:
+            ("segment", segmento), depois ("summary", resumo) ou ("error", erro)
+        """
+        if language is None:
+            language = settings.WHISPER_LANGUAGE
+
+        start_time = time.time()
+        prepared = None
+
+        def _summary(response: TranscriptionResponse) -> Dict[str, Any]:
+            return {
+                "success": response.success,
+                "text": response.transcription.text if response.transcription else "",
+                "language": response.transcription.language if response.transcription else language,
+                "duration": response.transcription.duration if response.transcription else None,
+                "processing_time": response.processing_time,
+                "cached": response.cached,
+                "audio_info": response.audio_info.model_dump() if response.audio_info else None,
+                "timing_metrics": response.timing_metrics.model_dump() if response.timing_metrics else None,
+            }
+
+        def _replay(response: TranscriptionResponse):
+            for seg in response.transcription.segments if response.transcription else []:
+                yield "segment", seg.model_dump()
+            yield "summary", _summary(response)
+
+        content_hash = TranscriptionService._ensure_content_hash(file_path, content_hash, use_cache)
+        invalid_response = TranscriptionService.get_invalid_media_response(content_hash, start_time)
+        if invalid_response:
+            yield "error", {"success": False, "error": invalid_response.error}
+            return
+
+        cache_key = None
+        if use_cache and settings.ENABLE_CACHE:
+            try:
+                cache_key = TranscriptionService.generate_cache_key(
+                    file_path, model, language, engine, content_hash=content_hash)
+                cached_response = TranscriptionService._get_cached_response(
+                    cache_key, start_time)
+                if cached_response and cached_response.success:
+                    yield from _replay(cached_response)
+                    return
+            except Exception as e:
+                logger.warning(f"Erro ao verificar cache: {e}")
+
+        lease = None
+        if cache_key:
+            lease, cached_response = TranscriptionService._join_in_flight(cache_key, start_time)
+            if cached_response and cached_response.success:
+                yield from _replay(cached_response)
+                return
+
+        try:
+            prepared = TranscriptionService.prepare_audio(file_path, content_hash)
+            if prepared.error:
+                yield "error", {"success": False, "error": prepared.error}
+                return
+
+            fingerprint_key = None
+            if use_cache and settings.ENABLE_CACHE:
+                fingerprint_key = TranscriptionService._fingerprint_key(
+                    prepared, model, language, engine)
+                if fingerprint_key:
+                    cached_response = TranscriptionService._get_fingerprint_response(
+                        fingerprint_key, cache_key, prepared, start_time)
+                    if cached_response and cached_response.success:
+                        yield from _replay(cached_response)
+                        return
+
+            if settings.ENABLE_SILENCE_EARLY_EXIT and prepared.samples is not None \
+                    and is_silent(prepared.samples):
+                result = TranscriptionService._silent_response(prepared, language, start_time)
+                if use_cache and settings.ENABLE_CACHE and cache_key:
+                    TranscriptionService._save_to_cache(cache_key, result, fingerprint_key)
+                yield "summary", _summary(result)
+                return
+
+            transcribe_input = prepared.input
+            vad_time_map = None
+            vad_time = None
+            skipped_audio = None
+            if settings.ENABLE_VAD and prepared.samples is not None:
+                vad_start = time.time()
+                transcribe_input, vad_time_map, skipped_audio = filter_speech(prepared.samples)
+                vad_time = time.time() - vad_start
+
+            transcription_start = time.time()
+            raw_segments = []
+            for raw in WhisperTranscriber.stream_segments(
+                transcribe_input,
+                language=language,
+                model_name=model,
+                engine=engine
+            ):
+                raw_segments.append(raw)
+                segment = WhisperTranscriber._segment_from_raw(raw, language)
+                if vad_time_map is not None:
+                    segment = segment.model_copy(update={
+                        "start": round(vad_time_map.to_original(segment.start), 3),
+                        "end": round(vad_time_map.to_original(segment.end), 3),
+                    })
+                yield "segment", segment.model_dump()
+            transcription_time = time.time() - transcription_start
+
+            # Resultado completo bruto (cache) - o resumo usa o mesmo
+            # pós-processamento da rota síncrona
+            transcription = WhisperTranscriber._build_result({
+                "text": " ".join(seg["text"].strip() for seg in raw_segments),
+                "segments": raw_segments,
+                "language": language,
+                "duration": prepared.duration,
+            }, language, postprocess=False)
+            if vad_time_map is not None:
+                transcription = vad_time_map.remap_result(transcription, prepared.duration)
+
+            processing_time = time.time() - start_time
+            result = TranscriptionResponse(
+                success=True,
+                transcription=transcription,
+                processing_time=round(processing_time, 2),
+                timing_metrics=TranscriptionService._build_timing_metrics(
+                    prepared, transcription_time, processing_time, vad_time, skipped_audio
+                ),
+                audio_info=prepared.audio_info,
+                error=None
+            )
+
+            if use_cache and settings.ENABLE_CACHE and cache_key:
+                TranscriptionService._save_to_cache(
+                    cache_key, result, fingerprint_key, language)
+
+            yield "summary", _summary(TranscriptionService._postprocess_response(result, language))
+
+        except Exception as e:
+            logger.error(f"Erro no processamento em streaming: {e}", exc_info=True)
+            yield "error", {"success": False, "error": str(e)}
+
+        finally:
+            if lease is not None:
+                lease.release()
+            WhisperTranscriber.clear_gpu_memory()
+            if prepared is not None:
+                prepared.cleanup()
@@ -0,0 +1,280 @@
+"""
+Single-flight: uma inferência por chave de cache, mesmo com requisições simultâneas
+
+Quando vários clientes enviam o mesmo arquivo ao mesmo tempo, todos erram o
+cache e cada um rodaria a transcrição inteira. A primeira requisição pega um
+lease no Redis (SET NX com TTL) para a chave de cache; as demais, em
+qualquer processo (web ou Celery), esperam o lease ser liberado e leem o
+resultado do cache.
+
+O lease é renovado enquanto a transcrição roda e expira sozinho se o
+processo morrer, então quem espera nunca fica preso. Sem Redis, a
+deduplicação vale apenas dentro do processo.
+
+Tarefas assíncronas (/transcribe/async) também são registradas por chave
+desde o enfileiramento: submissões idênticas acompanham a tarefa já na
+fila em vez de criar outra.
+"""
+import time
+import uuid
+import logging
+from threading import Event, Lock, Thread
+from typing import Dict, Optional
+
+from django.conf import settings
+
+from .worker_status import get_redis_client
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "daredevil:inflight:"
+TASK_KEY_PREFIX = "daredevil:inflight_task:"
+
+# Só o dono do lease (mesmo token) pode renovar ou liberar
+RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class Lease:
+    """Lease de uma chave em processamento (liberar com release())"""
+
+    def __init__(self, flight: "SingleFlight", key: str, token: Optional[str], local_event: Event):
+        self.flight = flight
+        self.key = key
+        self.token = token
+        self.local_event = local_event
+        self._stop = Event()
+        self._heartbeat: Optional[Thread] = None
+
+    def start_heartbeat(self) -> None:
+        """Renova o lease no Redis enquanto a transcrição roda"""
+        self._heartbeat = Thread(target=self._renew_loop, name="single-flight-lease", daemon=True)
+        self._heartbeat.start()
+
+    def _renew_loop(self) -> None:
+        interval = self.flight.lease_seconds / 3
+        while not self._stop.wait(interval):
+            if not self.flight._renew(self):
+                logger.warning(f"Lease perdido para {self.key[:16]}... (outro processo pode assumir)")
+                return
+
+    def release(self) -> None:
+        """Libera a chave; quem está esperando passa a ler o cache"""
+        self._stop.set()
+        self.flight._release(self)
+
+
+class SingleFlight:
+    """Coordena requisições idênticas simultâneas por chave de cache"""
+
+    def __init__(self, lease_seconds: float, wait_seconds: float, poll_seconds: float = 0.5):
+        """
+        Args:
+            lease_seconds: TTL do lease (renovado a cada lease_seconds/3)
+            wait_seconds: Tempo máximo esperando outro processo terminar
+            poll_seconds: Intervalo de verificação do lease no Redis
+        """
+        self.lease_seconds = lease_seconds
+        self.wait_seconds = wait_seconds
+        self.poll_seconds = poll_seconds
+        self._local_flights: Dict[str, Event] = {}
+        self._local_lock = Lock()
+        self._release_script = None
+        self._renew_script = None
+        self._stats_lock = Lock()
+        self._leaders = 0
+        self._followers = 0
+        self._timeouts = 0
+
+    def _client(self):
+        client = get_redis_client()
+        if client is not None and self._release_script is None:
+            self._release_script = client.register_script(RELEASE_SCRIPT)
+            self._renew_script = client.register_script(RENEW_SCRIPT)
+        return client
+
+    def acquire(self, key: str) -> Optional[Lease]:
+        """
+        Tenta ser o processo que calcula a chave
+
+        Returns:
+            Lease se esta requisição deve calcular o resultado; None se outra
+            requisição já está calculando
+        """
+        # Dentro do processo: threads do worker (--pool=threads) e do web
+        with self._local_lock:
+            if key in self._local_flights:
+                return None
+            local_event = Event()
+            self._local_flights[key] = local_event
+
+        # Entre processos: lease no Redis (token None = só local)
+        lease = Lease(self, key, None, local_event)
+        client = self._client()
+        if client is not None:
+            token = uuid.uuid4().hex
+            try:
+                acquired = client.set(
+                    KEY_PREFIX + key, token, nx=True, px=int(self.lease_seconds * 1000))
+                if acquired:
+                    lease.token = token
+            except redis.RedisError as e:
+                logger.warning(f"Single-flight sem Redis ({e}) - deduplicando só no processo")
+                acquired = True
+            if not acquired:
+                self._release_local(lease)
+                return None
+            if lease.token is not None:
+                lease.start_heartbeat()
+
+        with self._stats_lock:
+            self._leaders += 1
+        return lease
+
+    def wait(self, key: str) -> bool:
+        """
+        Espera a requisição que está calculando a chave terminar
+
+        Returns:
+            True se o lease foi liberado; False se o tempo de espera acabou
+        """
+        with self._stats_lock:
+            self._followers += 1
+
+        deadline = time.time() + self.wait_seconds
+        with self._local_lock:
+            local_event = self._local_flights.get(key)
+        if local_event is not None:
+            if local_event.wait(self.wait_seconds):
+                return True
+            with self._stats_lock:
+                self._timeouts += 1
+            return False
+
+        client = self._client()
+        if client is None:
+            return True
+        while time.time() < deadline:
+            try:
+                if not client.exists(KEY_PREFIX + key):
+                    return True
+            except redis.RedisError as e:
+                logger.warning(f"Erro ao verificar lease no Redis: {e}")
+                return True
+            time.sleep(self.poll_seconds)
+
+        with self._stats_lock:
+            self._timeouts += 1
+        return False
+
+    def claim_task(self, key: str, task_id: str) -> Optional[str]:
+        """
+        ✅ NOVO: Registra task_id como a tarefa assíncrona que calcula a chave
+
+        O registro expira em wait_seconds (tarefa perdida não bloqueia a
+        chave) e é removido pela própria tarefa ao terminar (release_task).
+
+        Returns:
+            None se task_id foi registrada (enfileirar); ID da tarefa já
+            registrada para a chave caso contrário
+        """
+        client = self._client()
+        if client is None:
+            return None
+        try:
+            if client.set(TASK_KEY_PREFIX + key, task_id, nx=True, ex=int(self.wait_seconds)):
+                return None
+            existing = client.get(TASK_KEY_PREFIX + key)
+        except redis.RedisError as e:
+            logger.warning(f"Erro ao registrar tarefa em andamento: {e}")
+            return None
+        if existing is None:
+            return None  # Expirou entre as chamadas: enfileirar sem registro
+        with self._stats_lock:
+            self._followers += 1
+        return existing.decode() if isinstance(existing, bytes) else existing
+
+    def release_task(self, key: str, task_id: str) -> None:
+        """✅ NOVO: Remove o registro da tarefa (só se ainda for task_id)"""
+        client = self._client()
+        if client is None:
+            return
+        try:
+            self._release_script(keys=[TASK_KEY_PREFIX + key], args=[task_id])
+        except redis.RedisError as e:
+            logger.warning(f"Erro ao liberar registro da tarefa (expira sozinho): {e}")
+
+    def _renew(self, lease: Lease) -> bool:
+        try:
+            return bool(self._renew_script(
+                keys=[KEY_PREFIX + lease.key],
+                args=[lease.token, int(self.lease_seconds * 1000)]))
+        except redis.RedisError as e:
+            logger.warning(f"Erro ao renovar lease: {e}")
+            return True  # Tentar de novo no próximo intervalo
+
+    def _release(self, lease: Lease) -> None:
+        if lease.token is not None:
+            try:
+                self._release_script(keys=[KEY_PREFIX + lease.key], args=[lease.token])
+            except redis.RedisError as e:
+                logger.warning(f"Erro ao liberar lease (expira sozinho): {e}")
+        self._release_local(lease)
+
+    def _release_local(self, lease: Lease) -> None:
+        with self._local_lock:
+            if self._local_flights.get(lease.key) is lease.local_event:
+                del self._local_flights[lease.key]
+        lease.local_event.set()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Requisições que calcularam, que esperaram e esperas que expiraram"""
+        with self._stats_lock:
+            return {
+                "leaders": self._leaders,
+                "followers": self._followers,
+                "wait_timeouts": self._timeouts,
+                "in_flight_local": len(self._local_flights),
+            }
+
+
+# Instância global
+_single_flight: Optional[SingleFlight] = None
+_single_flight_lock = Lock()
+
+
+def get_single_flight() -> Optional[SingleFlight]:
+    """
+    Retorna instância singleton do single-flight
+
+    Returns:
+        SingleFlight, ou None se ENABLE_SINGLE_FLIGHT=false
+    """
+    global _single_flight
+    if not settings.ENABLE_SINGLE_FLIGHT:
+        return None
+
+    with _single_flight_lock:
+        if _single_flight is None:
+            _single_flight = SingleFlight(
+                lease_seconds=settings.SINGLE_FLIGHT_LEASE_SECONDS,
+                wait_seconds=settings.SINGLE_FLIGHT_WAIT_SECONDS
+            )
+    return _single_flight
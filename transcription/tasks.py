@@ -7,10 +7,14 @@ import time
 from typing import Optional
 from celery import shared_task
 from celery.exceptions import SoftTimeLimitExceeded
+from celery.signals import worker_process_init, worker_ready, worker_shutdown
 from django.conf import settings
 
 from .services import TranscriptionService, WhisperTranscriber
+from .single_flight import get_single_flight  # ✅ NOVO: Registro de tarefas em andamento
 from .memory_manager import MemoryManager  # ✅ NOVO: Proteção de memória
+from .resumable_upload import ResumableUploadStore  # ✅ NOVO: Expiração de uploads retomáveis
+from .worker_status import start_status_publisher, stop_status_publisher  # ✅ NOVO: Estado para o web
 
 logger = logging.getLogger(__name__)
 
@@ -34,7 +38,10 @@ def transcribe_audio_async(
     language: Optional[str] = None,
     model: Optional[str] = None,
     webhook_url: Optional[str] = None,
-    use_cache: bool = True
+    use_cache: bool = True,
+    engine: Optional[str] = None,
+    content_hash: Optional[str] = None,
+    inflight_key: Optional[str] = None
 ):
     """
     Tarefa assíncrona para transcrever áudio/vídeo
@@ -45,6 +52,10 @@ def transcribe_audio_async(
         model: Modelo Whisper a usar
         webhook_url: URL para notificar quando concluído (opcional)
         use_cache: Se deve usar cache
+        engine: Engine de inferência (openai, faster-whisper) - opcional
+        content_hash: Hash do conteúdo calculado no upload (chave de cache sem reler o arquivo)
+        inflight_key: Chave de cache registrada no enfileiramento (submissões
+            idênticas acompanham esta tarefa até ela terminar)
         
     Returns:
         Dict com resultado da transcrição
@@ -75,7 +86,9 @@ def transcribe_audio_async(
             file_path=file_path,
             language=lang,
             model=model,
-            use_cache=use_cache
+            use_cache=use_cache,
+            engine=engine,
+            content_hash=content_hash
         )
         
         processing_time = time.time() - start_time
@@ -130,6 +143,12 @@ def transcribe_audio_async(
         }
     
     finally:
+        # ✅ NOVO: Novas submissões do mesmo arquivo voltam a enfileirar (ou acertam o cache)
+        if inflight_key:
+            flight = get_single_flight()
+            if flight is not None:
+                flight.release_task(inflight_key, task_id)
+        
         # Limpar memória GPU para evitar vazamento
         try:
             WhisperTranscriber.clear_gpu_memory()
@@ -151,6 +170,44 @@ def transcribe_audio_async(
                 logger.warning(f"[Task {task_id}] Erro ao remover arquivo: {e}")
 
 
+@shared_task(
+    bind=True,
+    name='transcription.transcribe_audio_sync',
+    queue='gpu',
+    time_limit=1800,  # 30 minutos
+    soft_time_limit=1700
+)
+def transcribe_audio_sync(
+    self,
+    file_path: str,
+    language: Optional[str] = None,
+    model: Optional[str] = None,
+    use_cache: bool = True,
+    engine: Optional[str] = None,
+    content_hash: Optional[str] = None
+):
+    """
+    ✅ NOVO: Transcrição para o endpoint síncrono executada no worker
+
+    Usada com INFERENCE_IN_WORKERS=true: o processo web salva o upload no
+    volume compartilhado, aguarda o resultado e remove o arquivo. Sem retry
+    nem webhook - quem espera é a requisição HTTP.
+
+    Returns:
+        TranscriptionResponse serializado (dict)
+    """
+    logger.info(f"[Task {self.request.id}] Transcrição síncrona no worker: {file_path}")
+    result = TranscriptionService.process_audio_file(
+        file_path=file_path,
+        language=language,
+        model=model,
+        use_cache=use_cache,
+        engine=engine,
+        content_hash=content_hash
+    )
+    return result.model_dump()
+
+
 @shared_task(
     bind=True,
     name='transcription.transcribe_batch_async',
@@ -168,7 +225,8 @@ def transcribe_batch_async(
     file_paths: list,
     language: Optional[str] = None,
     model: Optional[str] = None,
-    webhook_url: Optional[str] = None
+    webhook_url: Optional[str] = None,
+    engine: Optional[str] = None
 ):
     """
     Tarefa assíncrona para transcrever múltiplos arquivos em lote
@@ -178,6 +236,7 @@ def transcribe_batch_async(
         language: Idioma da transcrição
         model: Modelo Whisper a usar
         webhook_url: URL para notificar quando concluído
+        engine: Engine de inferência - opcional
         
     Returns:
         Dict com resultados de todas as transcrições
@@ -200,7 +259,8 @@ def transcribe_batch_async(
                 result = TranscriptionService.process_audio_file(
                     file_path=file_path,
                     language=lang,
-                    model=model
+                    model=model,
+                    engine=engine
                 )
                 
                 results.append(result.dict())
@@ -321,6 +381,9 @@ def cleanup_temp_files_task(self):
         # Remover arquivos com idade > 6 horas (aumentado de 1h)
         deleted = MemoryManager.cleanup_old_temp_files(max_age_hours=6)
         
+        # ✅ NOVO: Sessões de upload retomável abandonadas
+        deleted += ResumableUploadStore.cleanup_expired()
+        
         # Forçar limpeza agressiva se disco > 85%
         MemoryManager.force_cleanup_if_needed()
         
@@ -397,10 +460,11 @@ def monitor_memory_task(self):
 )
 def unload_gpu_model_task(self):
     """
-    ✅ PROTEÇÃO: Task agendada para descarregar modelo de GPU periodicamente
+    ✅ PROTEÇÃO: Task agendada para descarregar modelos ociosos periodicamente
     
     Executa a cada 1 hora (configurável em Celery Beat).
-    Descarrega modelo de GPU se não estiver em uso para liberar memória.
+    Descarrega do pool apenas modelos sem uso há mais de
+    MODEL_POOL_IDLE_UNLOAD_SECONDS, mantendo residentes os modelos em uso.
     
     Retorna:
         Dict com status
@@ -408,14 +472,17 @@ def unload_gpu_model_task(self):
     task_id = self.request.id
     
     try:
-        # Descarregar modelo se estiver em GPU
-        WhisperTranscriber.unload_model()
+        # Descarregar apenas modelos ociosos do pool
+        unloaded = WhisperTranscriber.unload_idle_models(
+            settings.MODEL_POOL_IDLE_UNLOAD_SECONDS
+        )
         
-        logger.info(f"[Task {task_id}] Modelo de GPU descarregado com sucesso")
+        logger.info(f"[Task {task_id}] {unloaded} modelo(s) ocioso(s) descarregado(s)")
         
         return {
             "success": True,
-            "message": "Modelo de GPU descarregado"
+            "message": f"{unloaded} modelo(s) ocioso(s) descarregado(s)",
+            "unloaded_models": unloaded
         }
         
     except Exception as e:
@@ -425,3 +492,23 @@ def unload_gpu_model_task(self):
             "error": str(e)
         }
 
+
+# ==================== Estado publicado para o processo web ====================
+
+@worker_ready.connect
+@worker_process_init.connect
+def start_worker_status_publisher(**kwargs):
+    """
+    ✅ NOVO: Publica o estado do worker (GPU, pool de modelos) no Redis
+
+    worker_ready cobre os pools solo/threads (processo principal) e
+    worker_process_init cobre cada filho do pool prefork. /health e
+    /gpu-status no processo web leem esse estado sem importar torch.
+    """
+    start_status_publisher(WhisperTranscriber.get_status_snapshot)
+
+
+@worker_shutdown.connect
+def stop_worker_status_publisher(**kwargs):
+    """Remove o estado do worker ao encerrar"""
+    stop_status_publisher()
@@ -0,0 +1,107 @@
+"""
+Upload handler em streaming: o arquivo vai direto para o disco, sem passar pela RAM
+
+Com os handlers padrão do Django, uploads até FILE_UPLOAD_MAX_MEMORY_SIZE
+ficam inteiros na memória e depois a view copia tudo de novo para
+TEMP_AUDIO_DIR. Aqui cada pedaço recebido é gravado no diretório temporário
+final e passa pelo hash de conteúdo no mesmo passo, então:
+
+- o pico de memória é um pedaço (chunk_size), qualquer que seja o arquivo;
+- a view só renomeia o arquivo (_save_upload), sem segunda cópia nem releitura;
+- MAX_AUDIO_SIZE_MB é aplicado durante o envio: passado o limite, o que já
+  foi gravado é descartado e o resto do corpo só é contado, para a view
+  recusar com o tamanho real.
+"""
+import os
+import uuid
+import logging
+from typing import Optional
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+
+from .cache_manager import new_content_hasher
+
+logger = logging.getLogger(__name__)
+
+PART_PREFIX = "upload_part_"
+
+
+class StreamedUploadedFile(UploadedFile):
+    """
+    Upload já gravado em TEMP_AUDIO_DIR, com o hash calculado durante o envio
+
+    content_hash é None quando o arquivo passou de MAX_AUDIO_SIZE_MB (o
+    conteúdo foi descartado; size mantém o tamanho enviado).
+    """
+
+    def __init__(self, file, name, content_type, size, charset, content_type_extra=None,
+                 content_hash: Optional[str] = None):
+        super().__init__(file, name, content_type, size, charset, content_type_extra)
+        self.content_hash = content_hash
+
+    def temporary_file_path(self) -> str:
+        return self.file.name
+
+    def close(self):
+        """Fecha e remove o arquivo se a view não o moveu (ex.: recusado na validação)"""
+        path = self.file.name
+        try:
+            return self.file.close()
+        finally:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+class StreamingUploadHandler(FileUploadHandler):
+    """Grava e calcula o hash de cada pedaço do upload conforme chega"""
+
+    chunk_size = 1024 * 1024  # 1 MB por pedaço
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        path = os.path.join(settings.TEMP_AUDIO_DIR, f"{PART_PREFIX}{uuid.uuid4().hex}.part")
+        self.file = open(path, 'w+b')
+        self.hasher = new_content_hasher()
+        self.max_bytes = settings.MAX_AUDIO_SIZE_MB * 1024 * 1024
+        self.oversized = False
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.oversized and start + len(raw_data) > self.max_bytes:
+            # Limite estourado: libera o disco e passa só a contar
+            self.oversized = True
+            self.file.truncate(0)
+            logger.warning(
+                f"Upload {self.file_name} passou de {settings.MAX_AUDIO_SIZE_MB}MB - conteúdo descartado"
+            )
+
+        if not self.oversized:
+            self.hasher.update(raw_data)
+            self.file.write(raw_data)
+
+        return None  # Nenhum outro handler recebe o pedaço
+
+    def file_complete(self, file_size):
+        self.file.seek(0)
+        return StreamedUploadedFile(
+            file=self.file,
+            name=self.file_name,
+            content_type=self.content_type,
+            size=file_size,
+            charset=self.charset,
+            content_type_extra=self.content_type_extra,
+            content_hash=None if self.oversized else self.hasher.hexdigest()
+        )
+
+    def upload_interrupted(self):
+        """Cliente desconectou no meio do envio: remove o arquivo parcial"""
+        file = getattr(self, 'file', None)
+        if file is not None:
+            file.close()
+            try:
+                os.remove(file.name)
+            except FileNotFoundError:
+                pass
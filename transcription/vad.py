@@ -0,0 +1,315 @@
+"""
+Pré-filtro de atividade de voz (VAD)
+
+Gravações de reuniões e vídeos costumam ter minutos de silêncio ou música,
+e o Whisper codifica cada janela de 30s mesmo assim. Este estágio fica entre
+a conversão e a transcrição: detecta as regiões de fala, entrega ao modelo
+apenas esses trechos concatenados e guarda um mapa de tempo para que os
+timestamps dos segmentos continuem relativos ao arquivo original.
+
+Detectores disponíveis:
+    - energy: RMS por quadro (padrão, sem dependências extras)
+    - silero: modelo Silero VAD embutido no faster-whisper (opcional)
+"""
+import logging
+from importlib.util import find_spec
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from .long_audio import find_silences
+from .pcm_decoder import SAMPLE_RATE
+from .schemas import TranscriptionResult, TranscriptionSegment
+
+logger = logging.getLogger(__name__)
+
+# Silero VAD vem junto com o faster-whisper (opcional, importado só no uso)
+SILERO_VAD_AVAILABLE = find_spec("faster_whisper") is not None
+
+SpeechRegion = Tuple[int, int]  # (amostra_inicial, amostra_final)
+
+
+class SpeechDetector:
+    """Interface para detectores de regiões de fala"""
+
+    name: str = ""
+
+    def detect(self, samples: np.ndarray) -> List[SpeechRegion]:
+        """
+        Detecta regiões de fala
+
+        Args:
+            samples: Amostras float32 16kHz mono
+
+        Returns:
+            Lista ordenada de (amostra_inicial, amostra_final)
+        """
+        raise NotImplementedError
+
+
+class EnergySpeechDetector(SpeechDetector):
+    """
+    Fala = tudo que não é silêncio longo (energia abaixo do limiar relativo ao pico)
+
+    Pausas curtas entre palavras continuam dentro da região de fala; apenas
+    silêncios com pelo menos VAD_MIN_SILENCE_MS são removidos.
+    """
+
+    name = "energy"
+
+    FRAME_MS = 30
+
+    def detect(self, samples: np.ndarray) -> List[SpeechRegion]:
+        silences = find_silences(
+            samples,
+            threshold_db=settings.VAD_THRESHOLD_DB,
+            min_silence_ms=settings.VAD_MIN_SILENCE_MS,
+            frame_ms=self.FRAME_MS
+        )
+
+        # find_silences não analisa o quadro incompleto do final: silêncio que
+        # chega ao último quadro completo vai até o fim (sem "fala" de ~10ms)
+        frame = int(SAMPLE_RATE * self.FRAME_MS / 1000)
+        analyzed = len(samples) // frame * frame
+        if silences and silences[-1][1] == analyzed:
+            silences[-1] = (silences[-1][0], len(samples))
+
+        regions = []
+        position = 0
+        for start, end in silences:
+            if start > position:
+                regions.append((position, start))
+            position = end
+        if position < len(samples):
+            regions.append((position, len(samples)))
+
+        return regions
+
+
+class SileroSpeechDetector(SpeechDetector):
+    """Silero VAD (rede neural) do faster-whisper - também descarta música e ruído"""
+
+    name = "silero"
+
+    def detect(self, samples: np.ndarray) -> List[SpeechRegion]:
+        if not SILERO_VAD_AVAILABLE:
+            raise RuntimeError(
+                "Silero VAD requer faster-whisper. Instale com: uv add faster-whisper"
+            )
+
+        from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+        options = VadOptions(min_silence_duration_ms=settings.VAD_MIN_SILENCE_MS)
+        return [(ts["start"], ts["end"]) for ts in get_speech_timestamps(samples, options)]
+
+
+DETECTORS = {
+    EnergySpeechDetector.name: EnergySpeechDetector,
+    SileroSpeechDetector.name: SileroSpeechDetector,
+}
+
+_detector_instances: Dict[str, SpeechDetector] = {}
+
+
+def get_speech_detector(name: Optional[str] = None) -> SpeechDetector:
+    """
+    Retorna o detector de fala pelo nome (singleton)
+
+    Args:
+        name: Nome do detector (energy, silero). None usa VAD_DETECTOR
+
+    Raises:
+        ValueError: Se o detector não existir
+    """
+    if name is None:
+        name = settings.VAD_DETECTOR
+
+    if name not in DETECTORS:
+        raise ValueError(
+            f"Detector VAD '{name}' não suportado. Use: {', '.join(sorted(DETECTORS))}"
+        )
+
+    if name not in _detector_instances:
+        _detector_instances[name] = DETECTORS[name]()
+
+    return _detector_instances[name]
+
+
+class TimeMap:
+    """
+    Mapeia tempos do áudio compactado (só fala) para o arquivo original
+
+    Cada trecho de fala é guardado como (início_original, início_compactado,
+    duração), todos em segundos.
+    """
+
+    def __init__(self):
+        self.pieces: List[Tuple[float, float, float]] = []
+
+    def add(self, original_start: float, compact_start: float, duration: float) -> None:
+        self.pieces.append((original_start, compact_start, duration))
+
+    def to_original(self, t: float) -> float:
+        """Converte tempo do áudio compactado em tempo do arquivo original"""
+        if not self.pieces:
+            return t
+
+        # Último trecho que começa antes de t (os trechos são ordenados)
+        current = self.pieces[0]
+        for piece in self.pieces:
+            if piece[1] > t:
+                break
+            current = piece
+
+        original_start, compact_start, duration = current
+        # Tempo no intervalo inserido entre trechos vai para o fim do trecho
+        return original_start + min(max(t - compact_start, 0.0), duration)
+
+    def remap_result(self, result: TranscriptionResult, original_duration: float) -> TranscriptionResult:
+        """Retorna cópia do resultado com timestamps do arquivo original"""
+        segments = [
+            TranscriptionSegment(
+                start=round(self.to_original(seg.start), 3),
+                end=round(self.to_original(seg.end), 3),
+                text=seg.text,
+                confidence=seg.confidence
+            )
+            for seg in result.segments
+        ]
+        return result.model_copy(update={"segments": segments, "duration": original_duration})
+
+
+def apply_vad(
+    samples: np.ndarray,
+    regions: List[SpeechRegion],
+    padding_ms: int,
+    gap_ms: int
+) -> Tuple[np.ndarray, TimeMap]:
+    """
+    Mantém apenas as regiões de fala, concatenadas
+
+    Args:
+        samples: Amostras originais
+        regions: Regiões de fala detectadas
+        padding_ms: Margem adicionada antes e depois de cada região
+        gap_ms: Silêncio inserido entre regiões para não colar palavras
+
+    Returns:
+        (amostras_compactadas, mapa_de_tempo)
+    """
+    padding = int(padding_ms * SAMPLE_RATE / 1000)
+    gap = np.zeros(int(gap_ms * SAMPLE_RATE / 1000), dtype=np.float32)
+
+    # Aplicar margem e unir regiões que passam a se sobrepor
+    padded: List[List[int]] = []
+    for start, end in regions:
+        start = max(0, start - padding)
+        end = min(len(samples), end + padding)
+        if padded and start <= padded[-1][1]:
+            padded[-1][1] = max(padded[-1][1], end)
+        else:
+            padded.append([start, end])
+
+    time_map = TimeMap()
+    parts = []
+    compact_position = 0
+    for i, (start, end) in enumerate(padded):
+        if i > 0 and len(gap):
+            parts.append(gap)
+            compact_position += len(gap)
+        time_map.add(
+            start / SAMPLE_RATE,
+            compact_position / SAMPLE_RATE,
+            (end - start) / SAMPLE_RATE
+        )
+        parts.append(samples[start:end])
+        compact_position += end - start
+
+    compact = np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32)
+    return compact, time_map
+
+
+def is_silent(samples: np.ndarray) -> bool:
+    """
+    Verificação barata (vetorizada) de áudio sem fala
+
+    1. Pico abaixo de SILENCE_PEAK_DBFS: silêncio digital ou ruído muito baixo
+    2. Menos de SILENCE_MIN_ACTIVE_SECONDS em quadros acima de SILENCE_FRAME_DBFS
+    3. Com VAD_DETECTOR=silero, menos fala que o mínimo segundo o modelo
+
+    Os limiares são absolutos (dBFS), ao contrário do detector por energia,
+    que é relativo ao pico e não distingue um arquivo todo silencioso.
+
+    Args:
+        samples: Amostras float32 16kHz mono
+
+    Returns:
+        True se não há fala a transcrever
+    """
+    if len(samples) == 0:
+        return True
+
+    peak = float(np.max(np.abs(samples)))
+    if peak <= 10 ** (settings.SILENCE_PEAK_DBFS / 20):
+        logger.info(f"Áudio silencioso: pico {20 * np.log10(peak + 1e-10):.1f} dBFS")
+        return True
+
+    frame = SAMPLE_RATE * 30 // 1000
+    n_frames = len(samples) // frame
+    if n_frames == 0:
+        return True
+
+    frames = samples[:n_frames * frame].reshape(n_frames, frame)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    active_seconds = np.count_nonzero(rms > 10 ** (settings.SILENCE_FRAME_DBFS / 20)) * 0.03
+    if active_seconds < settings.SILENCE_MIN_ACTIVE_SECONDS:
+        logger.info(f"Áudio silencioso: apenas {active_seconds:.2f}s acima do limiar")
+        return True
+
+    if settings.VAD_DETECTOR == SileroSpeechDetector.name and SILERO_VAD_AVAILABLE:
+        regions = get_speech_detector(SileroSpeechDetector.name).detect(samples)
+        speech_seconds = sum(end - start for start, end in regions) / SAMPLE_RATE
+        if speech_seconds < settings.SILENCE_MIN_ACTIVE_SECONDS:
+            logger.info(f"Sem fala segundo o Silero VAD ({speech_seconds:.2f}s)")
+            return True
+
+    return False
+
+
+def filter_speech(
+    samples: np.ndarray,
+    detector: Optional[str] = None
+) -> Tuple[np.ndarray, Optional[TimeMap], float]:
+    """
+    Executa o VAD e retorna apenas a fala
+
+    Args:
+        samples: Amostras float32 16kHz mono
+        detector: Nome do detector (None usa VAD_DETECTOR)
+
+    Returns:
+        (amostras_para_o_modelo, mapa_de_tempo, segundos_descartados).
+        Sem fala detectada, devolve o áudio original sem mapa.
+    """
+    regions = get_speech_detector(detector).detect(samples)
+    if not regions:
+        return samples, None, 0.0
+
+    compact, time_map = apply_vad(
+        samples,
+        regions,
+        padding_ms=settings.VAD_PADDING_MS,
+        gap_ms=settings.VAD_GAP_MS
+    )
+
+    skipped = max(0.0, (len(samples) - len(compact)) / SAMPLE_RATE)
+    if skipped < settings.VAD_MIN_SKIP_SECONDS:
+        # Pouco a ganhar: transcrever o original evita cortes desnecessários
+        return samples, None, 0.0
+
+    logger.info(
+        f"VAD: {len(regions)} região(ões) de fala, "
+        f"{skipped:.1f}s de {len(samples) / SAMPLE_RATE:.1f}s descartados"
+    )
+    return compact, time_map, skipped
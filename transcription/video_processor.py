@@ -6,7 +6,7 @@ import os
 import subprocess
 import logging
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Union
 
 logger = logging.getLogger(__name__)
 
@@ -21,12 +21,14 @@ class VideoProcessor:
     ]
 
     @staticmethod
-    def validate_video_file(file_path: str) -> Tuple[bool, Optional[str]]:
+    def validate_video_file(file_path: str, source_hash: Optional[str] = None) -> Tuple[bool, Optional[str]]:
         """
         Valida arquivo de vídeo
 
         Args:
             file_path: Caminho do arquivo de vídeo
+            source_hash: Hash do arquivo - reaproveita o ffprobe do cache de artefatos
+                e registra rejeições no cache negativo
 
         Returns:
             Tuple[bool, Optional[str]]: (is_valid, error_message)
@@ -38,6 +40,10 @@ class VideoProcessor:
         if extension not in VideoProcessor.SUPPORTED_VIDEO_FORMATS:
             return False, f"Formato de vídeo '{extension}' não suportado"
 
+        artifacts = VideoProcessor._artifacts(source_hash)
+        if artifacts is not None and artifacts.get_probe(source_hash, "video_valid"):
+            return True, None
+
         # Verificar se ffmpeg consegue ler o arquivo
         try:
             result = subprocess.run(
@@ -50,12 +56,14 @@ class VideoProcessor:
             )
             
             if result.returncode != 0:
-                return False, "Arquivo de vídeo corrompido ou inválido"
+                return VideoProcessor._reject(source_hash, "Arquivo de vídeo corrompido ou inválido")
             
             # Verificar se tem faixa de áudio
             if not result.stdout.strip():
-                return False, "Arquivo de vídeo não contém faixa de áudio"
+                return VideoProcessor._reject(source_hash, "Arquivo de vídeo não contém faixa de áudio")
             
+            if artifacts is not None:
+                artifacts.put_probe(source_hash, "video_valid", {"valid": True})
             return True, None
         except FileNotFoundError:
             return False, "ffprobe não encontrado. Instale ffmpeg."
@@ -65,16 +73,38 @@ class VideoProcessor:
             return False, f"Erro ao validar vídeo: {str(e)}"
 
     @staticmethod
-    def get_video_info(file_path: str) -> dict:
+    def _reject(source_hash: Optional[str], error: str) -> Tuple[bool, str]:
+        """✅ NOVO: Rejeição determinística - registrada no cache negativo pelo hash"""
+        from .cache_manager import get_cache_manager
+        get_cache_manager().mark_invalid_media(source_hash, error)
+        return False, error
+
+    @staticmethod
+    def _artifacts(source_hash: Optional[str]):
+        """✅ NOVO: Cache de artefatos (None sem hash ou se desabilitado)"""
+        if not source_hash:
+            return None
+        from .artifact_cache import get_artifact_cache
+        return get_artifact_cache()
+
+    @staticmethod
+    def get_video_info(file_path: str, source_hash: Optional[str] = None) -> dict:
         """
         Extrai informações do arquivo de vídeo usando ffprobe
 
         Args:
             file_path: Caminho do arquivo de vídeo
+            source_hash: Hash do arquivo - reaproveita o ffprobe do cache de artefatos
 
         Returns:
             dict: Informações do vídeo (duração, resolução, codecs, etc.)
         """
+        artifacts = VideoProcessor._artifacts(source_hash)
+        if artifacts is not None:
+            info = artifacts.get_probe(source_hash, "video_info")
+            if info is not None:
+                return info
+
         try:
             result = subprocess.run(
                 ['ffprobe', '-v', 'error', '-show_format', '-show_streams',
@@ -113,6 +143,8 @@ class VideoProcessor:
                         info['audio_codec'] = stream.get('codec_name')
                 
                 logger.info(f"Informações do vídeo: {info}")
+                if artifacts is not None:
+                    artifacts.put_probe(source_hash, "video_info", info)
                 return info
         except Exception as e:
             logger.warning(f"Erro ao extrair informações do vídeo: {e}")
@@ -150,7 +182,12 @@ class VideoProcessor:
             return base_timeout
 
     @staticmethod
-    def extract_audio(video_path: str, output_path: str, timeout: int = None) -> Tuple[bool, str]:
+    def extract_audio(
+        video_path: str,
+        output_path: str,
+        timeout: int = None,
+        source_hash: Optional[str] = None
+    ) -> Tuple[bool, str]:
         """
         Extrai áudio de arquivo de vídeo usando ffmpeg com timeout adaptativo
         e proteção contra vídeos corrompidos
@@ -159,10 +196,20 @@ class VideoProcessor:
             video_path: Caminho do arquivo de vídeo
             output_path: Caminho de saída para o arquivo WAV
             timeout: Tempo máximo de execução em segundos (None = adaptativo)
+            source_hash: Hash do arquivo - áudio já extraído vem do cache de artefatos
 
         Returns:
             Tuple[bool, str]: (sucesso, mensagem_ou_caminho)
         """
+        from .pcm_decoder import read_wav_samples, write_wav_samples
+
+        artifacts = VideoProcessor._artifacts(source_hash)
+        if artifacts is not None:
+            samples = artifacts.get_audio(source_hash)
+            if samples is not None:
+                write_wav_samples(output_path, samples)
+                return True, output_path
+
         try:
             logger.info(f"Extraindo áudio de vídeo: {video_path}")
             
@@ -215,6 +262,10 @@ class VideoProcessor:
                     return False, "Vídeo não contém faixa de áudio válida ou está corrompido"
                 
                 logger.info(f"Áudio extraído com sucesso: {output_path} ({file_size_mb:.2f}MB)")
+                if artifacts is not None:
+                    samples = read_wav_samples(output_path)
+                    if samples is not None:
+                        artifacts.put_audio(source_hash, samples)
                 return True, output_path
             else:
                 error_msg = result.stderr or "Erro desconhecido ao extrair áudio"
@@ -240,6 +291,63 @@ class VideoProcessor:
             logger.error(f"Erro ao extrair áudio: {e}")
             return False, str(e)
 
+    @staticmethod
+    def extract_audio_array(
+        video_path: str,
+        timeout: int = None,
+        expected_duration: float = None,
+        source_hash: Optional[str] = None
+    ) -> Tuple[bool, Union["np.ndarray", str]]:
+        """
+        Extrai áudio do vídeo direto para memória (float32 16kHz mono)
+
+        Mesmo comando de extract_audio, mas o ffmpeg escreve PCM no stdout em
+        vez de gravar um WAV temporário.
+
+        Args:
+            video_path: Caminho do arquivo de vídeo
+            timeout: Tempo máximo de execução em segundos (None = adaptativo)
+            expected_duration: Duração do vídeo (ffprobe) para pré-alocar o buffer
+            source_hash: Hash do arquivo - áudio já extraído vem do cache de artefatos
+
+        Returns:
+            Tuple[bool, array | str]: (sucesso, amostras_ou_mensagem)
+        """
+        from .pcm_decoder import PCMDecoder
+
+        artifacts = VideoProcessor._artifacts(source_hash)
+        if artifacts is not None:
+            samples = artifacts.get_audio(source_hash)
+            if samples is not None:
+                return True, samples
+
+        logger.info(f"Extraindo áudio de vídeo para memória: {video_path}")
+
+        if timeout is None:
+            timeout = VideoProcessor.calculate_adaptive_timeout(video_path)
+
+        success, result = PCMDecoder.decode(
+            video_path,
+            timeout=timeout,
+            expected_duration=expected_duration,
+            # Limitar análise/probe para detectar vídeos corrompidos rapidamente
+            input_args=['-analyzeduration', '10M', '-probesize', '10M']
+        )
+
+        if not success:
+            logger.error(f"Erro ao extrair áudio: {result}")
+            return False, result
+
+        # Equivalente ao mínimo de 1KB do WAV extraído
+        if len(result) < 500:
+            logger.error(f"Áudio extraído muito curto ({len(result)} amostras) - provavelmente sem áudio")
+            return False, "Vídeo não contém faixa de áudio válida ou está corrompido"
+
+        logger.info(f"Áudio extraído em memória: {len(result) / 16000:.1f}s")
+        if artifacts is not None:
+            artifacts.put_audio(source_hash, result)
+        return True, result
+
     @staticmethod
     def extract_audio_with_compression(
         video_path: str,
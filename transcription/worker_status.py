@@ -0,0 +1,226 @@
+"""
+Estado publicado pelos workers de inferência
+
+O processo web não importa torch/whisper: /health e /gpu-status leem o
+snapshot que cada worker de inferência publica periodicamente no Redis. A
+chave de cada worker tem TTL, de forma que um worker parado some sozinho da
+listagem.
+
+Também expõe métricas do próprio processo (RSS, tempo de inicialização e se
+torch/whisper foram importados) para medir o custo do processo web.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import logging
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Dict, List, Optional
+
+from django.conf import settings
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+    psutil = None
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "daredevil:worker_status:"
+
+# Módulos pesados que o processo web não deve importar
+HEAVY_MODULES = ("torch", "whisper", "faster_whisper", "ctranslate2")
+
+_ready_at: Optional[float] = None
+_redis_client = None
+
+
+def mark_process_ready() -> None:
+    """Registra o fim da inicialização do processo (chamado uma vez, no import da API)"""
+    global _ready_at
+    if _ready_at is None:
+        _ready_at = time.time()
+
+
+def get_process_info() -> Dict[str, Any]:
+    """
+    Métricas do processo atual
+
+    Returns:
+        Dict com pid, rss_mb, startup_seconds, uptime_seconds e os módulos
+        pesados já importados
+    """
+    info: Dict[str, Any] = {
+        "pid": os.getpid(),
+        "heavy_modules_loaded": [name for name in HEAVY_MODULES if name in sys.modules],
+    }
+
+    if PSUTIL_AVAILABLE and psutil is not None:
+        process = psutil.Process()
+        created_at = process.create_time()
+        info["rss_mb"] = round(process.memory_info().rss / (1024 * 1024), 1)
+        info["uptime_seconds"] = round(time.time() - created_at, 1)
+        if _ready_at is not None:
+            info["startup_seconds"] = round(_ready_at - created_at, 2)
+
+    return info
+
+
+def get_redis_client():
+    """Cliente Redis compartilhado (None se redis não estiver instalado)"""
+    global _redis_client
+    if not REDIS_AVAILABLE:
+        return None
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=2,
+            socket_connect_timeout=2
+        )
+    return _redis_client
+
+
+class WorkerStatusPublisher:
+    """Publica periodicamente o snapshot do worker no Redis"""
+
+    def __init__(self, collector: Callable[[], Dict[str, Any]], interval: float, ttl: float):
+        """
+        Args:
+            collector: Função que monta o snapshot (device, GPUs, pool de modelos)
+            interval: Segundos entre publicações
+            ttl: Validade da chave no Redis (deve ser maior que interval)
+        """
+        self.collector = collector
+        self.interval = interval
+        self.ttl = ttl
+        self.hostname = socket.gethostname()
+        self.worker_id = f"{self.hostname}:{os.getpid()}"
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+
+    @property
+    def key(self) -> str:
+        return f"{KEY_PREFIX}{self.worker_id}"
+
+    def publish(self) -> bool:
+        """Publica um snapshot; retorna False se o Redis estiver indisponível"""
+        client = get_redis_client()
+        if client is None:
+            return False
+
+        try:
+            snapshot = self.collector()
+            snapshot.update({
+                "worker_id": self.worker_id,
+                "hostname": self.hostname,
+                "published_at": time.time(),
+                "process": get_process_info(),
+            })
+            client.set(self.key, json.dumps(snapshot, default=str), ex=int(self.ttl))
+            return True
+        except Exception as e:
+            logger.warning(f"Falha ao publicar estado do worker: {e}")
+            return False
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.publish()
+            self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        """Inicia a thread de publicação (idempotente)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name="worker-status-publisher", daemon=True)
+        self._thread.start()
+        logger.info(f"Publicando estado do worker {self.worker_id} a cada {self.interval:.0f}s")
+
+    def stop(self) -> None:
+        """Para a publicação e remove a chave do worker"""
+        self._stop.set()
+        client = get_redis_client()
+        if client is not None:
+            try:
+                client.delete(self.key)
+            except Exception as e:
+                logger.debug(f"Erro ao remover estado do worker: {e}")
+
+
+_publisher: Optional[WorkerStatusPublisher] = None
+_publisher_lock = Lock()
+
+
+def start_status_publisher(collector: Callable[[], Dict[str, Any]]) -> Optional[WorkerStatusPublisher]:
+    """
+    Inicia o publicador do processo (um por processo)
+
+    Returns:
+        Publicador em execução, ou None se desabilitado por WORKER_STATUS_PUBLISH
+    """
+    global _publisher
+    if not settings.WORKER_STATUS_PUBLISH:
+        return None
+
+    with _publisher_lock:
+        if _publisher is None or _publisher.worker_id != f"{socket.gethostname()}:{os.getpid()}":
+            _publisher = WorkerStatusPublisher(
+                collector,
+                interval=settings.WORKER_STATUS_INTERVAL_SECONDS,
+                ttl=settings.WORKER_STATUS_TTL_SECONDS
+            )
+        _publisher.start()
+        return _publisher
+
+
+def stop_status_publisher() -> None:
+    """Para o publicador do processo, se houver"""
+    global _publisher
+    with _publisher_lock:
+        if _publisher is not None:
+            _publisher.stop()
+            _publisher = None
+
+
+def read_worker_status() -> List[Dict[str, Any]]:
+    """
+    Lê os snapshots publicados pelos workers ativos
+
+    Returns:
+        Lista de snapshots (vazia se não houver workers ou Redis indisponível)
+    """
+    client = get_redis_client()
+    if client is None:
+        return []
+
+    try:
+        keys = list(client.scan_iter(match=f"{KEY_PREFIX}*", count=100))
+        values = client.mget(keys) if keys else []
+    except Exception as e:
+        logger.warning(f"Falha ao ler estado dos workers: {e}")
+        return []
+
+    now = time.time()
+    workers = []
+    for value in values:
+        if not value:
+            continue
+        try:
+            snapshot = json.loads(value)
+        except (TypeError, ValueError):
+            continue
+        if now - snapshot.get("published_at", 0) > settings.WORKER_STATUS_TTL_SECONDS:
+            continue
+        workers.append(snapshot)
+
+    return sorted(workers, key=lambda w: w.get("worker_id", ""))